@@ -1,4 +1,11 @@
 const H2H_PATH_RE = /^\/h2h\/([1-9]\d{0,9})\/([1-9]\d{0,9})(?:\/index\.html|\/)?$/;
+// Must match OG_SHARD_COUNT and og_shard_index() in scripts/build_h2h.py.
+const OG_SHARD_COUNT = 256;
+// Shards are tens of kilobytes; refuse to buffer anything wildly larger.
+const MAX_SHARD_BYTES = 1 << 20;
+const SHARD_CACHE_ENTRIES = 64;
+// Per-isolate LRU of parsed shards, keyed by the ASSETS binding.
+const shardCaches = new WeakMap();
 
 export async function onRequest(context) {
   const { request, env } = context;
@@ -31,37 +38,25 @@ export async function onRequest(context) {
   let player2Name = `Player ${p2}`;
   let description = "Head-to-Head Matchup Comparison — Table Hockey H2H";
 
-  // Load the player-centric H2H dataset and reject fabricated share paths.
-  const dataUrl = new URL(`/data/og/${p1}.json`, request.url);
+  // Read the pair's compact share record and reject fabricated share paths.
+  const p1IsFirst = Number(p1) < Number(p2);
+  const id1 = p1IsFirst ? p1 : p2;
+  const id2 = p1IsFirst ? p2 : p1;
   try {
-    const dataResponse = await env.ASSETS.fetch(dataUrl);
-    if (!dataResponse.ok) {
+    const pairs = await loadShard(env, request.url, ogShardIndex(id1, id2));
+    if (!pairs) {
       return redirectNoStore(url.origin);
     }
-    const data = await dataResponse.json();
-    if (!data.player || String(data.player.id) !== p1) {
-      return redirectNoStore(url.origin);
-    }
-    if (data.player.name) {
-      player1Name = data.player.name;
-    }
-
-    const oppData = data.opponents && data.opponents[p2];
-    if (!oppData) {
+    const record = pairs[`${id1}-${id2}`];
+    if (!Array.isArray(record)) {
       return redirectNoStore(`${url.origin}/?p1=${p1}`);
     }
-    if (oppData.player && oppData.player.name) {
-      player2Name = oppData.player.name;
-    }
-
-    const summary = oppData.summary;
-    if (summary) {
-      const w = summary.wins_player ?? 0;
-      const d = summary.draws ?? 0;
-      const l = summary.wins_opponent ?? 0;
-      const n = summary.total_matches ?? 0;
-      description = `${w}-${d}-${l} record over ${n} games`;
-    }
+    const [name1, name2, total, wins1, draws, wins2] = record;
+    player1Name = (p1IsFirst ? name1 : name2) || player1Name;
+    player2Name = (p1IsFirst ? name2 : name1) || player2Name;
+    const w = (p1IsFirst ? wins1 : wins2) ?? 0;
+    const l = (p1IsFirst ? wins2 : wins1) ?? 0;
+    description = `${w}-${draws ?? 0}-${l} record over ${total ?? 0} games`;
   } catch (error) {
     console.error("Error fetching H2H static data:", error);
     return redirectNoStore(url.origin);
@@ -106,6 +101,49 @@ export async function onRequest(context) {
   });
 }
 
+export function ogShardIndex(id1, id2) {
+  // FNV-1a (32-bit) over "id1-id2"; the IDs are ASCII digits.
+  let hash = 0x811c9dc5;
+  const key = `${id1}-${id2}`;
+  for (let i = 0; i < key.length; i += 1) {
+    hash = Math.imul(hash ^ key.charCodeAt(i), 0x01000193) >>> 0;
+  }
+  return hash % OG_SHARD_COUNT;
+}
+
+async function loadShard(env, requestUrl, index) {
+  let cache = shardCaches.get(env.ASSETS);
+  if (!cache) {
+    cache = new Map();
+    shardCaches.set(env.ASSETS, cache);
+  }
+  const cached = cache.get(index);
+  if (cached) {
+    cache.delete(index);
+    cache.set(index, cached);
+    return cached;
+  }
+
+  const name = `${index.toString(16).padStart(2, "0")}.json`;
+  const response = await env.ASSETS.fetch(new URL(`/data/og/${name}`, requestUrl));
+  if (!response.ok) return null;
+  if (Number(response.headers.get("content-length")) > MAX_SHARD_BYTES) {
+    throw new Error(`Share shard ${name} exceeds ${MAX_SHARD_BYTES} bytes`);
+  }
+  const text = await response.text();
+  if (text.length > MAX_SHARD_BYTES) {
+    throw new Error(`Share shard ${name} exceeds ${MAX_SHARD_BYTES} bytes`);
+  }
+  const pairs = JSON.parse(text).pairs;
+  if (!pairs || typeof pairs !== "object") return null;
+
+  cache.set(index, pairs);
+  while (cache.size > SHARD_CACHE_ENTRIES) {
+    cache.delete(cache.keys().next().value);
+  }
+  return pairs;
+}
+
 function redirectNoStore(location) {
   return new Response(null, {
     status: 302,
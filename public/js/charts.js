@@ -1,5 +1,5 @@
 import { state, elements, isSeriesMode } from "./state.js";
-import { getChronologicalItems } from "./form.js?v=20260801-generational-run-v3";
+import { getChronologicalItems, getPairChart } from "./form.js?v=20260801-generational-run-v3";
 import { formatPercent } from "./summary.js";
 import { escapeHtml, formatDateRange } from "./utils.js";
 import { SVG_TREND, SVG_BAR_CHART } from "./constants.js";
@@ -125,16 +125,16 @@ export function renderChartPlaceholder(containerEl, message, iconType) {
   containerEl.appendChild(placeholder);
 }
 
-export function renderRecordChart(matches) {
-  if (!state.playerA) {
-    renderChartPlaceholder(elements.recordChart, "No selection", "trend");
-    return;
-  }
-  if (matches.length < 2) {
-    renderChartPlaceholder(elements.recordChart, "Not enough data to build trend.", "trend");
-    return;
+// Running totals after each result; a long rivalry's come precomputed.
+function getRunningRecord(ordered, chart) {
+  if (chart) {
+    return ordered.map((_, index) => {
+      const total = index + 1;
+      const wins = chart.wins[index];
+      const draws = chart.draws[index];
+      return { winRate: (wins / total) * 100, wins, losses: total - wins - draws, draws, total };
+    });
   }
-  const ordered = getChronologicalItems(matches);
   const values = [];
   let wins = 0;
   let losses = 0;
@@ -152,6 +152,20 @@ export function renderRecordChart(matches) {
       total,
     });
   });
+  return values;
+}
+
+export function renderRecordChart(matches) {
+  if (!state.playerA) {
+    renderChartPlaceholder(elements.recordChart, "No selection", "trend");
+    return;
+  }
+  if (matches.length < 2) {
+    renderChartPlaceholder(elements.recordChart, "Not enough data to build trend.", "trend");
+    return;
+  }
+  const ordered = getChronologicalItems(matches);
+  const values = getRunningRecord(ordered, getPairChart(matches));
   const measuredWidth = Math.round(elements.recordChart.getBoundingClientRect().width);
   const width = Math.max(280, Math.min(720, measuredWidth || 520));
   const height = 210;
@@ -304,15 +318,22 @@ export function renderGoalsChart(matches) {
     return;
   }
   const byYear = new Map();
-  matches.forEach((match) => {
-    if (!match.year) return;
-    const entry = byYear.get(match.year) || { goalsA: 0, goalsB: 0, games: 0, totalGames: 0 };
-    entry.goalsA += match.goals_a;
-    entry.goalsB += match.goals_b;
-    entry.games += 1;
-    entry.totalGames += match.total_games || 1;
-    byYear.set(match.year, entry);
-  });
+  const chart = getPairChart(matches);
+  if (chart) {
+    chart.years.forEach(({ year, goalsA, goalsB, games }) => {
+      byYear.set(year, { goalsA, goalsB, games, totalGames: games });
+    });
+  } else {
+    matches.forEach((match) => {
+      if (!match.year) return;
+      const entry = byYear.get(match.year) || { goalsA: 0, goalsB: 0, games: 0, totalGames: 0 };
+      entry.goalsA += match.goals_a;
+      entry.goalsB += match.goals_b;
+      entry.games += 1;
+      entry.totalGames += match.total_games || 1;
+      byYear.set(match.year, entry);
+    });
+  }
   const years = Array.from(byYear.keys()).sort();
   if (!years.length) {
     renderChartPlaceholder(elements.goalsChart, "No data available.", "bar");
@@ -18,6 +18,23 @@ import {
   parseIdList,
 } from "./players.js";
 
+const DAY_MS = 86400000;
+// Older builds interned tournament and stage strings too; keep decoding them.
+const COLUMNAR_STRING_FIELDS = new Set([
+  "stage_ref",
+  "tournament_name",
+  "tournament_level",
+  "stage",
+  "stage_type",
+  "source",
+  "source_url",
+  "stage_url",
+  "result_url",
+  "tournament_url",
+  "source_tournament_id",
+  "source_stage_id",
+]);
+
 function setBoundedCache(cache, key, value, maxEntries = 12) {
   cache.delete(key);
   cache.set(key, value);
@@ -57,8 +74,139 @@ export async function fetchJson(url, timeoutMs = 20000, externalSignal = null) {
   }
 }
 
+export function dayNumberToDate(day) {
+  if (day == null || day === "") return "";
+  const value = Number(day);
+  if (!Number.isFinite(value)) return "";
+  return new Date(value * DAY_MS).toISOString().slice(0, 10);
+}
+
+// Schema-2 player files store each opponent's matches as column arrays, with
+// repeated strings referenced by index into the file's string table.
+export function decodeMatchColumns(columns, strings = []) {
+  if (!columns || !Array.isArray(columns.day)) return [];
+  const fields = Object.keys(columns);
+  const rows = new Array(columns.day.length);
+  for (let row = 0; row < rows.length; row += 1) {
+    const match = {};
+    for (const field of fields) {
+      const value = columns[field][row];
+      if (field === "overtime") {
+        match.overtime = Boolean(value);
+      } else if (COLUMNAR_STRING_FIELDS.has(field)) {
+        match[field] = value == null ? null : strings[value] ?? "";
+      } else {
+        match[field] = value;
+      }
+    }
+    rows[row] = match;
+  }
+  return rows;
+}
+
+export function attachColumnarMatches(payload) {
+  if (payload?.encoding !== "columnar" || !payload.opponents) return payload;
+  const strings = Array.isArray(payload.strings) ? payload.strings : [];
+  Object.values(payload.opponents).forEach((opponent) => {
+    if (!opponent?.match_columns) return;
+    let decoded = null;
+    // Decode lazily: a matchup view only ever reads one opponent.
+    Object.defineProperty(opponent, "matches", {
+      configurable: true,
+      enumerable: true,
+      get() {
+        decoded ??= decodeMatchColumns(opponent.match_columns, strings);
+        return decoded;
+      },
+    });
+  });
+  return payload;
+}
+
+export function fetchMeta() {
+  if (!state.metaRequest) {
+    state.metaRequest = fetchJson("data/meta.json").catch((err) => {
+      state.metaRequest = null;
+      throw err;
+    });
+  }
+  return state.metaRequest;
+}
+
+export function fetchLookup() {
+  if (!state.lookupRequest) {
+    state.lookupRequest = (async () => {
+      const meta = await fetchMeta();
+      if (!meta?.lookup) return null;
+      state.lookup = await fetchJson(`data/${meta.lookup}`);
+      return state.lookup;
+    })().catch((err) => {
+      state.lookupRequest = null;
+      throw err;
+    });
+  }
+  return state.lookupRequest;
+}
+
+export function expandMatchRefs(raw, lookup = state.lookup) {
+  if (raw?.stage_ref == null || !lookup) return raw;
+  const stage = lookup.stages?.[raw.stage_ref];
+  if (!stage) return raw;
+  const tournament = lookup.tournaments?.[stage.tournament_ref] || {};
+  return { ...tournament, ...stage, ...raw };
+}
+
+async function hasPairFiles() {
+  try {
+    const meta = await fetchMeta();
+    return Boolean(meta?.layout?.pair_files);
+  } catch {
+    return false;
+  }
+}
+
+async function hasGroupFiles() {
+  try {
+    const meta = await fetchMeta();
+    return Boolean(meta?.layout?.group_files);
+  } catch {
+    return false;
+  }
+}
+
+// A curated alias group's player files, merged at build time with duplicate
+// matches removed. Any other set of IDs, such as an explicit subset of a group,
+// gets null and reads each member's file.
+export async function fetchGroupPayload(ids, signal = null) {
+  const group = normalizeAliasIds(ids);
+  if (group.length < 2) return null;
+  const curated = getAliasGroup(group[0]);
+  if (curated.length !== group.length || curated.some((id, index) => id !== group[index])) {
+    return null;
+  }
+  const key = group.join("-");
+  if (state.groupFileCache.has(key)) {
+    return state.groupFileCache.get(key);
+  }
+  if (!(await hasGroupFiles())) return null;
+  const [payload] = await Promise.all([
+    fetchJson(`data/groups/${key}.json`, 20000, signal),
+    fetchLookup(),
+  ]);
+  if (!payload?.opponents) return null;
+  const normalizedPayload = {
+    ...attachColumnarMatches(payload),
+    player: normalizePlayerRecord(payload.player),
+  };
+  setBoundedCache(state.groupFileCache, key, normalizedPayload, 6);
+  return normalizedPayload;
+}
+
 export async function fetchPairPayload(id1, id2, onProgress, signal = null) {
-  const payload = await fetchJson(`data/h2h/${id1}/${id2}.json`, 20000, signal);
+  const [payload] = await Promise.all([
+    fetchJson(`data/h2h/${id1}/${id2}.json`, 20000, signal),
+    fetchLookup(),
+  ]);
   if (!payload) return null;
   const normalizedPlayers = {
     player1: normalizePlayerRecord(payload.player1),
@@ -97,10 +245,14 @@ export async function fetchPlayerPayload(playerId, signal = null) {
     state.playerFileRequests.delete(playerId);
   }
   const request = (async () => {
-    const payload = await fetchJson(`data/h2h/${playerId}.json`, 20000, signal);
+    // Match entries reference the shared lookup, so load both before normalizing.
+    const [payload] = await Promise.all([
+      fetchJson(`data/h2h/${playerId}.json`, 20000, signal),
+      fetchLookup(),
+    ]);
     if (!payload) return null;
     const normalizedPayload = {
-      ...payload,
+      ...attachColumnarMatches(payload),
       player: normalizePlayerRecord(payload.player),
     };
     setBoundedCache(state.playerFileCache, playerId, normalizedPayload);
@@ -117,8 +269,71 @@ export async function fetchPlayerPayload(playerId, signal = null) {
   }
 }
 
-export function normalizeMatchBase(raw) {
-  const date = raw.date || raw.Date || "";
+export async function fetchSummaryPayload(playerId, signal = null) {
+  if (state.playerFileCache.has(playerId)) {
+    return state.playerFileCache.get(playerId);
+  }
+  if (state.summaryFileCache.has(playerId)) {
+    return state.summaryFileCache.get(playerId);
+  }
+  const payload = await fetchJson(`data/summary/${playerId}.json`, 20000, signal);
+  if (!payload) {
+    // Builds before summary files only have the full player file.
+    return fetchPlayerPayload(playerId, signal);
+  }
+  const normalizedPayload = { ...payload, player: normalizePlayerRecord(payload.player) };
+  setBoundedCache(state.summaryFileCache, playerId, normalizedPayload, 24);
+  return normalizedPayload;
+}
+
+export async function fetchCareerPayload(playerId, signal = null) {
+  if (state.careerFileCache.has(playerId)) {
+    return state.careerFileCache.get(playerId);
+  }
+  const payload = await fetchJson(`data/career/${playerId}.json`, 20000, signal);
+  if (!payload?.career) return null;
+  const normalizedPayload = { ...payload, player: normalizePlayerRecord(payload.player) };
+  setBoundedCache(state.careerFileCache, playerId, normalizedPayload, 24);
+  return normalizedPayload;
+}
+
+// Career totals from the build, for a profile header before the full player
+// files arrive. Alias groups add up; streak, form and distinct counts cannot be
+// combined across files, so they are left out for groups.
+export async function loadPlayerCareer(playerId, explicitIds = [], signal = null) {
+  const group = getEffectiveAliasGroup(playerId, explicitIds);
+  const payloads = await Promise.all(group.map((id) => fetchCareerPayload(id, signal)));
+  if (!payloads.length || payloads.some((payload) => !payload)) return null;
+  if (payloads.length === 1) return payloads[0].career;
+
+  const careers = payloads.map((payload) => payload.career);
+  const sum = (field) => careers.reduce((total, career) => total + (career[field] || 0), 0);
+  const dates = (field) => careers.map((career) => career[field]).filter(Boolean).sort();
+  const matches = sum("matches");
+  const firstDates = dates("first_date");
+  const lastDates = dates("last_date");
+  return {
+    matches,
+    wins: sum("wins"),
+    draws: sum("draws"),
+    losses: sum("losses"),
+    win_rate: matches ? sum("wins") / matches : null,
+    goals_for: sum("goals_for"),
+    goals_against: sum("goals_against"),
+    goal_difference: sum("goal_difference"),
+    overtime_games: sum("overtime_games"),
+    opponents: null,
+    tournaments: null,
+    first_date: firstDates[0] || null,
+    last_date: lastDates[lastDates.length - 1] || null,
+    current_streak: null,
+    form: "",
+  };
+}
+
+export function normalizeMatchBase(match) {
+  const raw = expandMatchRefs(match);
+  const date = raw.date || raw.Date || dayNumberToDate(raw.day);
   const ts = Date.parse(date);
   const stage = decodeHtmlEntities(raw.stage || raw.Stage || "");
   const tournamentName = decodeHtmlEntities(raw.tournament_name || raw.TournamentName || "");
@@ -209,6 +424,64 @@ export function normalizeSinglePlayerMatch(raw, opponentId, opponentPlayer) {
   };
 }
 
+// Playoff series the build already reconstructed for one pair. Each game points
+// at one shared record, so buildPlayoffSeries() can skip regrouping and
+// reordering. Only attach these to matches read from a single player's file.
+export function attachPrebuiltSeries(matches, seriesList) {
+  if (!Array.isArray(seriesList)) return matches;
+  seriesList.forEach((series) => {
+    const games = Array.isArray(series?.games) ? series.games : [];
+    if (!games.length || games.some((index) => !matches[index])) return;
+    const prebuilt = { size: games.length, best_of: series.best_of ?? null };
+    games.forEach((index, position) => {
+      matches[index].prebuilt_series = prebuilt;
+      matches[index].prebuilt_series_game = position;
+    });
+  });
+  return matches;
+}
+
+// Chart timelines the build precomputed for a long rivalry, turned to player A.
+// Each game remembers its position in the pair so form.js and charts.js can
+// place it without sorting; the chart only describes views holding every game.
+export function attachPairChart(matches, chart, isPlayerA) {
+  const order = Array.isArray(chart?.order) ? chart.order : null;
+  if (!order || order.length !== matches.length || !matches.length) return null;
+  if (!Array.isArray(chart.wins) || !Array.isArray(chart.draws)) return null;
+  const rank = new Array(order.length);
+  for (let index = 0; index < order.length; index += 1) {
+    const position = order[index];
+    if (!Number.isInteger(position) || !matches[position] || rank[position] !== undefined) {
+      return null;
+    }
+    rank[position] = index;
+  }
+  matches.forEach((match, position) => {
+    match.pair_position = position;
+  });
+  const wins = isPlayerA
+    ? chart.wins
+    : chart.wins.map((count, index) => index + 1 - count - chart.draws[index]);
+  const years = (Array.isArray(chart.years) ? chart.years : []).map(
+    ([year, goalsFor, goalsAgainst, games]) => ({
+      year: String(year),
+      goalsA: isPlayerA ? goalsFor : goalsAgainst,
+      goalsB: isPlayerA ? goalsAgainst : goalsFor,
+      games,
+    })
+  );
+  const winResult = isPlayerA ? "W" : "L";
+  return {
+    size: order.length,
+    order,
+    rank,
+    wins,
+    draws: chart.draws,
+    years,
+    winStreak: chart.streak?.result === winResult ? Number(chart.streak.length) || 0 : 0,
+  };
+}
+
 export function buildMatchKey(match) {
   const stableSourceId = match.source_match_id
     ? `${match.source || ""}|${match.source_tournament_id || ""}|${match.source_stage_id || ""}|${match.source_match_id}`
@@ -236,13 +509,15 @@ export async function buildGroupMatches(groupA, groupB, onProgress, signal = nul
   const matches = [];
   const seen = new Set();
   const opponentIds = groupB.map((id) => String(id));
+  const groupPayload = await fetchGroupPayload(groupA, signal);
+  const sourceIds = groupPayload ? [groupA[0]] : groupA;
 
-  for (let i = 0; i < groupA.length; i += 1) {
-    const playerId = groupA[i];
+  for (let i = 0; i < sourceIds.length; i += 1) {
+    const playerId = sourceIds[i];
     if (onProgress) {
-      onProgress(i + 1, groupA.length);
+      onProgress(i + 1, sourceIds.length);
     }
-    const payload = await fetchPlayerPayload(playerId, signal);
+    const payload = groupPayload || await fetchPlayerPayload(playerId, signal);
     if (!payload || !payload.opponents) continue;
     for (const opponentId of opponentIds) {
       const opponent = payload.opponents[opponentId];
@@ -276,11 +551,13 @@ export async function loadPlayerStats(
   const matches = [];
   const seen = new Set();
   let playerA = getPlayerById(playerId) || { id: playerId, name: `Player ${playerId}` };
+  const groupPayload = await fetchGroupPayload(groupA, signal);
+  const sourceIds = groupPayload ? [groupA[0]] : groupA;
 
-  for (let index = 0; index < groupA.length; index += 1) {
-    const groupId = groupA[index];
-    if (onProgress) onProgress(index + 1, groupA.length);
-    const payload = await fetchPlayerPayload(groupId, signal);
+  for (let index = 0; index < sourceIds.length; index += 1) {
+    const groupId = sourceIds[index];
+    if (onProgress) onProgress(index + 1, sourceIds.length);
+    const payload = groupPayload || await fetchPlayerPayload(groupId, signal);
     if (!payload || !payload.opponents) continue;
     if (!playerA?.name && payload.player) playerA = payload.player;
 
@@ -289,9 +566,12 @@ export async function loadPlayerStats(
       if (!Number.isFinite(opponentId) || selfIds.has(opponentId)) return;
       if (!opponentPayload || !Array.isArray(opponentPayload.matches)) return;
       const opponentPlayer = opponentPayload.player || getPlayerById(opponentId);
+      const normalizedMatches = opponentPayload.matches.map(
+        (match) => normalizeSinglePlayerMatch(match, opponentId, opponentPlayer)
+      );
+      if (groupA.length === 1) attachPrebuiltSeries(normalizedMatches, opponentPayload.series);
 
-      opponentPayload.matches.forEach((match) => {
-        const normalized = normalizeSinglePlayerMatch(match, opponentId, opponentPlayer);
+      normalizedMatches.forEach((normalized) => {
         const key = buildScopedMatchKey(normalized);
         if (seen.has(key)) return;
         seen.add(key);
@@ -333,8 +613,32 @@ export async function loadMatchup(
     return data;
   }
 
-  // The build emits player-centric files, so start with p1 instead of making
-  // a guaranteed 404 request for a legacy pair-centric path.
+  // Pair files are opt-in at build time; meta.json says whether they exist, so
+  // a default build never pays for a guaranteed 404.
+  if (p1 !== p2 && (await hasPairFiles())) {
+    const id1 = Math.min(p1, p2);
+    const id2 = Math.max(p1, p2);
+    const pairPayload = await fetchPairPayload(id1, id2, onProgress, signal);
+    if (pairPayload) {
+      const aIsId1 = p1 === id1;
+      const playerA = (aIsId1 ? pairPayload.player1 : pairPayload.player2)
+        || getPlayerById(p1) || { id: p1, name: `Player ${p1}` };
+      const playerB = (aIsId1 ? pairPayload.player2 : pairPayload.player1)
+        || getPlayerById(p2) || { id: p2, name: `Player ${p2}` };
+      const matches = Array.isArray(pairPayload.matches)
+        ? attachPrebuiltSeries(
+          pairPayload.matches.map((match) => normalizePlayerMatch(match, aIsId1)),
+          pairPayload.series
+        )
+        : [];
+      const chart = attachPairChart(matches, pairPayload.chart, aIsId1);
+      const data = { playerA, playerB, matches, chart };
+      setBoundedCache(state.pairCache, cacheKey, data, 20);
+      return data;
+    }
+  }
+
+  // Otherwise read the player-centric files, starting with p1.
   const playerPayload = await fetchPlayerPayload(p1, signal);
   if (playerPayload && playerPayload.opponents) {
     const opponent = playerPayload.opponents[String(p2)];
@@ -342,9 +646,13 @@ export async function loadMatchup(
       const playerA = playerPayload.player || getPlayerById(p1) || { id: p1, name: `Player ${p1}` };
       const playerB = opponent.player || getPlayerById(p2) || { id: p2, name: `Player ${p2}` };
       const matches = Array.isArray(opponent.matches)
-        ? opponent.matches.map((match) => normalizePlayerMatch(match, true))
+        ? attachPrebuiltSeries(
+          opponent.matches.map((match) => normalizePlayerMatch(match, true)),
+          opponent.series
+        )
         : [];
-      const data = { playerA, playerB, matches };
+      const chart = attachPairChart(matches, opponent.chart, true);
+      const data = { playerA, playerB, matches, chart };
       setBoundedCache(state.pairCache, cacheKey, data, 20);
       return data;
     }
@@ -357,9 +665,13 @@ export async function loadMatchup(
       const playerA = getPlayerById(p1) || { id: p1, name: `Player ${p1}` };
       const playerB = otherPayload.player || getPlayerById(p2) || { id: p2, name: `Player ${p2}` };
       const matches = Array.isArray(opponent.matches)
-        ? opponent.matches.map((match) => normalizePlayerMatch(match, false))
+        ? attachPrebuiltSeries(
+          opponent.matches.map((match) => normalizePlayerMatch(match, false)),
+          opponent.series
+        )
         : [];
-      const data = { playerA, playerB, matches };
+      const chart = attachPairChart(matches, opponent.chart, false);
+      const data = { playerA, playerB, matches, chart };
       setBoundedCache(state.pairCache, cacheKey, data, 20);
       return data;
     }
@@ -391,7 +703,7 @@ export async function loadOpponentsForPlayer(playerId, explicitIds = [], signal
     const opponentMap = new Map();
 
     for (const gId of groupIds) {
-      const payload = await fetchPlayerPayload(gId, signal);
+      const payload = await fetchSummaryPayload(gId, signal);
       if (!payload || !payload.opponents) continue;
       for (const [oppIdStr, oppData] of Object.entries(payload.opponents)) {
         const oppId = Number(oppIdStr);
@@ -41,26 +41,72 @@ export function getFormItemIdentity(item = {}) {
   ].join("|");
 }
 
-export function getChronologicalItems(items) {
-  return [...items].sort((a, b) => {
-    const numericFields = ["ts", "stage_sequence", "round_number", "playoff_game_number"];
-    for (const field of numericFields) {
-      const difference = numberOrZero(a[field]) - numberOrZero(b[field]);
-      if (difference) return difference;
-    }
+function compareChronological(a, b) {
+  const numericFields = ["ts", "stage_sequence", "round_number", "playoff_game_number"];
+  for (const field of numericFields) {
+    const difference = numberOrZero(a[field]) - numberOrZero(b[field]);
+    if (difference) return difference;
+  }
 
-    const sourceIdDifference = numberOrZero(a.source_match_id) - numberOrZero(b.source_match_id);
-    if (sourceIdDifference) return sourceIdDifference;
+  const sourceIdDifference = numberOrZero(a.source_match_id) - numberOrZero(b.source_match_id);
+  if (sourceIdDifference) return sourceIdDifference;
+
+  const identityA = getFormItemIdentity(a);
+  const identityB = getFormItemIdentity(b);
+  if (identityA < identityB) return -1;
+  if (identityA > identityB) return 1;
+  return 0;
+}
 
-    const identityA = getFormItemIdentity(a);
-    const identityB = getFormItemIdentity(b);
-    if (identityA < identityB) return -1;
-    if (identityA > identityB) return 1;
-    return 0;
+function placeByPairChart(items, chart) {
+  const ordered = new Array(items.length);
+  items.forEach((item) => {
+    ordered[chart.rank[item.pair_position]] = item;
   });
+  return ordered;
+}
+
+// Same order a stable sort with compareChronological() would produce.
+function isChronological(ordered) {
+  for (let index = 0; index < ordered.length; index += 1) {
+    const item = ordered[index];
+    if (!item) return false;
+    if (!index) continue;
+    const previous = ordered[index - 1];
+    const difference = compareChronological(previous, item);
+    if (difference > 0 || (difference === 0 && previous.pair_position > item.pair_position)) {
+      return false;
+    }
+  }
+  return true;
+}
+
+const checkedPairCharts = new WeakMap();
+
+// The build's chart for the current pair, when `items` are all of its games.
+// Its order is checked against compareChronological() once per load.
+export function getPairChart(items) {
+  const chart = state.pairChart;
+  if (!chart || !Array.isArray(items) || items.length !== chart.size) return null;
+  for (const item of items) {
+    if (item?.type === "series" || !Number.isInteger(item?.pair_position)) return null;
+    if (item.pair_position < 0 || item.pair_position >= chart.size) return null;
+  }
+  if (!checkedPairCharts.has(chart)) {
+    checkedPairCharts.set(chart, isChronological(placeByPairChart(items, chart)));
+  }
+  return checkedPairCharts.get(chart) ? chart : null;
+}
+
+export function getChronologicalItems(items) {
+  const chart = getPairChart(items);
+  if (chart) return placeByPairChart(items, chart);
+  return [...items].sort(compareChronological);
 }
 
 export function getCurrentWinStreak(items) {
+  const chart = getPairChart(items);
+  if (chart) return chart.winStreak;
   const ordered = getChronologicalItems(items);
   const latest = ordered[ordered.length - 1];
   if (!latest || latest.result !== "A") return 0;
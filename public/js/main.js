@@ -23,11 +23,13 @@ import {
   updateSelectionControls,
 } from "./players.js";
 import {
+  loadPlayerCareer,
   loadPlayerStats,
   loadMatchup,
   loadOpponentsForPlayer,
   cancelOpponentLoading,
   fetchJson,
+  fetchMeta,
 } from "./data.js";
 import { buildPlayoffSeries, annotatePlayoffGamesWithSeries } from "./series.js";
 import {
@@ -37,8 +39,8 @@ import {
   resetFilters,
   updateFilterCount,
 } from "./filters.js";
-import { setupTypeahead } from "./typeahead.js";
-import { renderSummary } from "./summary.js";
+import { createSearchIndex, setupTypeahead } from "./typeahead.js";
+import { renderCareerPreview, renderSummary } from "./summary.js";
 import { initOpponents, renderSinglePlayerPanels } from "./opponents.js";
 import {
   updateUrl,
@@ -52,6 +54,7 @@ import {
   handleRecentClick,
   initRecent,
 } from "./recent.js";
+import { initRivalries, loadRivalries } from "./rivalries.js";
 import {
   renderForm,
   resetFormPresentation,
@@ -282,6 +285,7 @@ export function resetCurrentResults(options = {}) {
   if (elements.singlePlayerSection) elements.singlePlayerSection.hidden = true;
   const keepPlayerA = Boolean(options.keepPlayerA);
   state.baseMatches = [];
+  state.pairChart = null;
   state.stageMatches = [];
   state.filteredMatches = [];
   state.playerA = keepPlayerA ? getSelectionPlayer(elements.playerA, resolvePlayerId(elements.playerA)) : null;
@@ -364,6 +368,7 @@ export async function handleCompare(options = {}) {
   resetFormPresentation();
   setStatus(isSingle ? "Loading player stats..." : "Loading matchup...");
   state.baseMatches = [];
+  state.pairChart = null;
   state.stageMatches = [];
   state.filteredMatches = [];
   if (elements.stageMeta) elements.stageMeta.textContent = "";
@@ -375,6 +380,18 @@ export async function handleCompare(options = {}) {
   if (elements.emptyState) elements.emptyState.hidden = true;
   if (elements.errorState) elements.errorState.hidden = true;
 
+  // A single-player profile gets its headline totals from one small career file
+  // while the full player files load.
+  let comparisonSettled = false;
+  if (isSingle) {
+    loadPlayerCareer(idA, idsA, requestSignal)
+      .then((career) => {
+        if (currentToken !== compareRequestToken || comparisonSettled) return;
+        renderCareerPreview(selectedPlayerA || getPlayerById(idA), career);
+      })
+      .catch(() => {});
+  }
+
   try {
     const data = isSingle
       ? await loadPlayerStats(idA, (current, total) => {
@@ -385,6 +402,7 @@ export async function handleCompare(options = {}) {
           if (currentToken !== compareRequestToken) return;
           setStatus(`Loading chunks ${current}/${total}...`);
         }, idsA, idsB, requestSignal);
+    comparisonSettled = true;
 
     if (currentToken !== compareRequestToken) {
       return;
@@ -410,6 +428,7 @@ export async function handleCompare(options = {}) {
           : "These players have not faced each other in the dataset.";
       }
       state.baseMatches = [];
+      state.pairChart = null;
       state.filteredMatches = [];
       if (elements.stageMeta) elements.stageMeta.textContent = "";
       setDataControlsEnabled(false);
@@ -422,6 +441,7 @@ export async function handleCompare(options = {}) {
     }
 
     state.baseMatches = matches;
+    state.pairChart = isSingle ? null : data?.chart || null;
     state.page = 1;
     state.sort = { key: "date", direction: "desc" };
     state.perPage = Number(elements.pageSize.value);
@@ -457,6 +477,7 @@ export async function handleCompare(options = {}) {
     }, 2000);
     maybeScrollToResults(options);
   } catch (err) {
+    comparisonSettled = true;
     if (currentToken !== compareRequestToken) return;
     console.error(err);
     setLoading(false);
@@ -575,7 +596,7 @@ export function handleCopyLink() {
 export async function renderDataFreshness() {
   const el = document.getElementById("data-freshness");
   if (!el) return;
-  const meta = await fetchJson("data/meta.json");
+  const meta = await fetchMeta();
   if (!meta || !meta.generated_at) return;
   const date = new Date(meta.generated_at);
   if (Number.isNaN(date.getTime())) return;
@@ -665,14 +686,27 @@ export function setStageTab(stage) {
 
 export async function loadPlayers() {
   setStatus("Loading players...");
-  const payload = await fetchJson("data/players.json");
+  // The slim search list carries only what the UI reads; older builds only
+  // have the full players.json.
+  const [searchPlayers, searchIndex] = await Promise.all([
+    fetchJson("data/search/players.json").catch(() => null),
+    fetchJson("data/search/index.json").catch(() => null),
+  ]);
+  const payload = Array.isArray(searchPlayers?.players) && Array.isArray(searchPlayers.fields)
+    ? searchPlayers.players.map((row) => Object.fromEntries(
+      searchPlayers.fields.map((field, index) => [field, row[index]])
+    ))
+    : await fetchJson("data/players.json");
   if (!Array.isArray(payload)) {
     throw new Error("Player index is missing or invalid.");
   }
   state.playersById.clear();
   state.aliasMap.clear();
-  state.players = payload
-    .map(normalizePlayerRecord)
+  const normalizedPlayers = payload.map(normalizePlayerRecord);
+  state.searchIndex = searchPlayers && searchIndex
+    ? createSearchIndex(searchIndex, normalizedPlayers)
+    : null;
+  state.players = normalizedPlayers
     .filter((player) => Number.isInteger(Number(player?.id))
       && Number(player.id) > 0
       && player.name
@@ -837,9 +871,11 @@ export async function init() {
   initTabs();
   initModeToggle();
   initGoalsModeToggle();
+  initRivalries();
 
   await loadPlayers();
   renderRecent();
+  loadRivalries().catch((err) => console.warn("Could not load rivalry leaderboards:", err));
   renderDataFreshness().catch((err) => console.warn("Could not load data freshness:", err));
 
   const urlSelection = getUrlSelection();
@@ -26,7 +26,7 @@ export function initRecent({ onCompare, getSignal } = {}) {
   getRequestSignal = getSignal || (() => null);
 }
 
-function createMatchupChip(p1Id, p2Id, p1Name, p2Name, p1Ids, p2Ids) {
+export function createMatchupChip(p1Id, p2Id, p1Name, p2Name, p1Ids, p2Ids) {
   const button = document.createElement("button");
   button.type = "button";
   button.textContent = `${decodeHtmlEntities(p1Name)} vs ${decodeHtmlEntities(p2Name)}`;
@@ -0,0 +1,89 @@
+import { state, elements } from "./state.js";
+import { fetchJson } from "./data.js";
+import { createMatchupChip, handleRecentClick } from "./recent.js";
+
+export const RIVALRY_BOARDS = {
+  most_played: "Most played",
+  most_even: "Closest",
+  longest_span: "Longest running",
+  recent_heavy: "Active now",
+};
+const RIVALRY_CHIPS = 5;
+
+export function describeRivalry(entry, board) {
+  const games = `${entry.matches} game${entry.matches === 1 ? "" : "s"}`;
+  const [winsA, winsB] = entry.wins || [0, 0];
+  if (board === "longest_span") {
+    const first = entry.first_date?.slice(0, 4) || "?";
+    const last = entry.last_date?.slice(0, 4) || "?";
+    return `${games}, ${first}–${last}`;
+  }
+  if (board === "recent_heavy") {
+    return `${games}, last ${entry.last_date || "unknown"}`;
+  }
+  return `${games}, ${winsA}-${entry.draws || 0}-${winsB}`;
+}
+
+// Leaderboard pairs are single IDs; players missing from players.json are dropped.
+export function getRivalryEntries(board, limit = RIVALRY_CHIPS) {
+  const entries = state.leaderboards?.boards?.[board];
+  if (!Array.isArray(entries)) return [];
+  return entries
+    .filter((entry) => Array.isArray(entry?.ids)
+      && entry.ids.every((id) => state.playersById.has(Number(id))))
+    .slice(0, limit);
+}
+
+export function renderRivalries() {
+  if (!elements.rivalries || !elements.rivalryList) return;
+  const entries = getRivalryEntries(state.rivalryBoard);
+  elements.rivalries.hidden = !state.leaderboards;
+  elements.rivalryButtons?.forEach((button) => {
+    const isActive = button.dataset.board === state.rivalryBoard;
+    button.classList.toggle("is-active", isActive);
+    button.setAttribute("aria-pressed", isActive ? "true" : "false");
+  });
+  elements.rivalryList.innerHTML = "";
+  if (!entries.length) {
+    elements.rivalryList.innerHTML = "<span class=\"muted\">No rivalries yet</span>";
+    return;
+  }
+  const fragment = document.createDocumentFragment();
+  entries.forEach((entry) => {
+    const [idA, idB] = entry.ids.map(Number);
+    const [nameA, nameB] = entry.names || [];
+    const button = createMatchupChip(
+      idA,
+      idB,
+      state.playersById.get(idA)?.name || nameA,
+      state.playersById.get(idB)?.name || nameB,
+      [idA],
+      [idB]
+    );
+    const detail = document.createElement("span");
+    detail.className = "rivalry-detail";
+    detail.textContent = describeRivalry(entry, state.rivalryBoard);
+    button.appendChild(detail);
+    button.title = `${button.firstChild.textContent}: ${detail.textContent}`;
+    fragment.appendChild(button);
+  });
+  elements.rivalryList.appendChild(fragment);
+}
+
+export async function loadRivalries() {
+  const payload = await fetchJson("data/leaderboards.json");
+  if (!payload?.boards) return;
+  state.leaderboards = payload;
+  renderRivalries();
+}
+
+export function initRivalries() {
+  elements.rivalryButtons?.forEach((button) => {
+    button.addEventListener("click", () => {
+      if (!RIVALRY_BOARDS[button.dataset.board]) return;
+      state.rivalryBoard = button.dataset.board;
+      renderRivalries();
+    });
+  });
+  if (elements.rivalryList) elements.rivalryList.addEventListener("click", handleRecentClick);
+}
@@ -23,7 +23,7 @@ export function buildPlayoffSeries(matches) {
   matches
     .filter((match) => match.stage_type === "playoff")
     .forEach((match) => {
-      const key = getSeriesGroupKey(match);
+      const key = match.prebuilt_series || getSeriesGroupKey(match);
       if (!groups.has(key)) groups.set(key, []);
       groups.get(key).push(match);
     });
@@ -47,8 +47,20 @@ export function annotatePlayoffGamesWithSeries(matches) {
   }));
 }
 
+// Games in the build's order when the group is exactly one prebuilt series.
+function getPrebuiltSeriesGames(matches) {
+  const prebuilt = matches[0]?.prebuilt_series;
+  if (!prebuilt || prebuilt.size !== matches.length) return null;
+  const ordered = new Array(matches.length);
+  matches.forEach((match) => {
+    if (match.prebuilt_series === prebuilt) ordered[match.prebuilt_series_game] = match;
+  });
+  return ordered.includes(undefined) ? null : ordered;
+}
+
 export function createSeriesFromMatches(matches) {
-  const ordered = [...matches].sort((a, b) => {
+  const prebuiltGames = getPrebuiltSeriesGames(matches);
+  const ordered = prebuiltGames || [...matches].sort((a, b) => {
     const seqA = a.stage_sequence ?? 0;
     const seqB = b.stage_sequence ?? 0;
     const roundA = a.round_number ?? 0;
@@ -84,12 +96,12 @@ export function createSeriesFromMatches(matches) {
         ? "B"
         : "D";
   const maxWins = Math.max(summary.gameWinsA, summary.gameWinsB);
-  const bestOf =
-    result !== "D" && maxWins > 0
+  const bestOf = prebuiltGames?.[0].prebuilt_series.best_of
+    ?? (result !== "D" && maxWins > 0
       ? Math.max(maxWins * 2 - 1, ordered.length + (ordered.length % 2 === 0 ? 1 : 0))
       : ordered.length > 1
         ? ordered.length + (ordered.length % 2 === 0 ? 1 : 0)
-        : 1;
+        : 1);
   const gameDiff = summary.gameWinsA - summary.gameWinsB;
 
   return {
@@ -7,12 +7,22 @@ export const STORAGE_KEYS = {
 export const state = {
   players: [],
   playersById: new Map(),
+  searchIndex: null,
   aliasMap: new Map(),
   pairCache: new Map(),
   playerStatsCache: new Map(),
   playerFileCache: new Map(),
   playerFileRequests: new Map(),
+  summaryFileCache: new Map(),
+  careerFileCache: new Map(),
+  groupFileCache: new Map(),
+  leaderboards: null,
+  rivalryBoard: "most_played",
+  metaRequest: null,
+  lookup: null,
+  lookupRequest: null,
   baseMatches: [],
+  pairChart: null,
   stageMatches: [],
   filteredMatches: [],
   playerA: null,
@@ -53,6 +63,9 @@ export const elements = {
   shareImageBtn: document.getElementById("share-image-btn"),
   status: document.getElementById("status"),
   recentList: document.getElementById("recent-list"),
+  rivalries: document.getElementById("rivalries"),
+  rivalryButtons: document.querySelectorAll("#rivalry-board-toggle .mode-btn"),
+  rivalryList: document.getElementById("rivalry-list"),
   tabs: document.querySelectorAll(".tab"),
   playoffModeToggle: document.getElementById("playoff-mode-toggle"),
   modeButtons: document.querySelectorAll("#playoff-mode-toggle .mode-btn"),
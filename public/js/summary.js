@@ -364,6 +364,33 @@ export function getSeriesHighlightInfo(series, side) {
   };
 }
 
+export function renderCareerPreview(player, career) {
+  if (!player || !career?.matches) return;
+  const winPct = (career.win_rate ?? 0) * 100;
+  const goalDiff = career.goal_difference > 0
+    ? `+${career.goal_difference}`
+    : String(career.goal_difference);
+  const dateRange = career.first_date && career.last_date
+    ? ` (${career.first_date} – ${career.last_date})`
+    : "";
+  const opponents = career.opponents ? ` against ${career.opponents} opponents` : "";
+  elements.headline.textContent = player.name;
+  elements.subhead.textContent = `${career.matches} ${career.matches === 1 ? "game" : "games"}${opponents}${dateRange}. Goal difference: ${goalDiff}.`;
+  elements.record.hidden = false;
+  const streak = career.current_streak
+    ? ` · streak ${career.current_streak.length}${career.current_streak.result}`
+    : "";
+  const form = career.form ? `Form ${escapeHtml(career.form)}${streak}` : "";
+  elements.record.innerHTML = `
+    <div class="muted">W-D-L record</div>
+    <div><strong>${career.wins}-${career.draws}-${career.losses}</strong></div>
+    <div class="muted">${formatPercent(winPct)} wins</div>
+    ${form ? `<div class="muted">${form}</div>` : ""}
+  `;
+  elements.summaryGrid.innerHTML = "";
+  if (elements.summarySection) elements.summarySection.hidden = false;
+}
+
 export function renderSummary(items) {
   if (isSeriesMode()) {
     renderSeriesSummary(items);
@@ -60,11 +60,104 @@ function normalizeAliasIds(ids) {
   return unique;
 }
 
+const SUGGESTION_LIMIT = 20;
+
+function compareSuggestionRank(a, b) {
+  const rA = getWorldRank(a);
+  const rB = getWorldRank(b);
+  if (rA !== null && rB !== null) return rA - rB;
+  if (rA !== null) return -1;
+  if (rB !== null) return 1;
+  const activity = (b.matches ?? 0) - (a.matches ?? 0);
+  if (activity) return activity;
+  // Same key as build_search_index(), so indexed and scanned suggestions agree on ties.
+  if (a.search_key !== b.search_key) return a.search_key < b.search_key ? -1 : 1;
+  return a.id - b.id;
+}
+
+export function createSearchIndex(payload, players) {
+  if (!payload?.postings || !Array.isArray(payload.gram_sizes) || !payload.gram_sizes.length) {
+    return null;
+  }
+  return {
+    players,
+    minGram: Math.min(...payload.gram_sizes),
+    maxGram: Math.max(...payload.gram_sizes),
+    postings: payload.postings,
+    decoded: new Map(),
+  };
+}
+
+function getPostings(index, gram) {
+  let positions = index.decoded.get(gram);
+  if (!positions) {
+    const deltas = index.postings[gram] || [];
+    positions = new Array(deltas.length);
+    let position = 0;
+    for (let i = 0; i < deltas.length; i += 1) {
+      position += deltas[i];
+      positions[i] = position;
+    }
+    index.decoded.set(gram, positions);
+  }
+  return positions;
+}
+
+function intersectSorted(a, b) {
+  const output = [];
+  let i = 0;
+  let j = 0;
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      output.push(a[i]);
+      i += 1;
+      j += 1;
+    } else if (a[i] < b[j]) {
+      i += 1;
+    } else {
+      j += 1;
+    }
+  }
+  return output;
+}
+
+// Candidate positions in rank order, or null when the query is too short to index.
+export function findCandidatePositions(index, value) {
+  if (value.length < index.minGram) return null;
+  if (value.length <= index.maxGram) return getPostings(index, value);
+  const grams = new Set();
+  for (let start = 0; start + index.maxGram <= value.length; start += 1) {
+    grams.add(value.slice(start, start + index.maxGram));
+  }
+  const lists = Array.from(grams, (gram) => getPostings(index, gram))
+    .sort((a, b) => a.length - b.length);
+  return lists.reduce((candidates, list) => (candidates.length ? intersectSorted(candidates, list) : candidates));
+}
+
+function findIndexedSuggestions(index, value) {
+  const positions = findCandidatePositions(index, value);
+  const count = positions ? positions.length : index.players.length;
+  const results = [];
+  const identities = new Set();
+  // Players are stored in rank order, so the first matches are the best ones;
+  // stop once enough distinct people (or alias groups) are collected.
+  for (let i = 0; i < count && identities.size < SUGGESTION_LIMIT; i += 1) {
+    const player = index.players[positions ? positions[i] : i];
+    if (!player?.name || !player.search_key?.includes(value)) continue;
+    results.push(player);
+    const aliasIds = normalizeAliasIds(state.aliasMap.get(Number(player.id)) || []);
+    identities.add(aliasIds.length > 1 ? aliasIds.join(",") : `id:${player.id}`);
+  }
+  return results;
+}
+
 export function buildSuggestions(query) {
   const value = normalizeText(query);
   let results = [];
   if (value.length === 0) {
-    results = [...state.players];
+    results = [...state.players].sort(compareSuggestionRank);
+  } else if (state.searchIndex) {
+    results = findIndexedSuggestions(state.searchIndex, value);
   } else {
     for (const player of state.players) {
       if (!player.name) continue;
@@ -72,18 +165,10 @@ export function buildSuggestions(query) {
         results.push(player);
       }
     }
+    results.sort(compareSuggestionRank);
   }
 
-  results.sort((a, b) => {
-    const rA = getWorldRank(a);
-    const rB = getWorldRank(b);
-    if (rA !== null && rB !== null) return rA - rB;
-    if (rA !== null) return -1;
-    if (rB !== null) return 1;
-    return a.name.localeCompare(b.name);
-  });
-
-  return withGroupedDuplicateSuggestions(results).slice(0, 20);
+  return withGroupedDuplicateSuggestions(results).slice(0, SUGGESTION_LIMIT);
 }
 
 export function buildOpponentSuggestions(query) {
@@ -101,7 +186,7 @@ export function buildOpponentSuggestions(query) {
   }
 
   results.sort((a, b) => b.totalMatches - a.totalMatches);
-  return withGroupedDuplicateSuggestions(results).slice(0, 20);
+  return withGroupedDuplicateSuggestions(results).slice(0, SUGGESTION_LIMIT);
 }
 
 export function createSuggestionIdentity(player) {
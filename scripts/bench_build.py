@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Time the build's heavy steps on seeded synthetic data at several scales.
+
+    python3 scripts/bench_build.py [--scales 1,10,100] [--repeat 3] [--seed 1]
+                                   [--output bench.json] [--compare baseline.json]
+
+Scale 1 is BASE_PLAYERS players and BASE_MATCHES matches from
+scripts/generate_synthetic_data.py; scale 100 is roughly the size of the live dataset and
+needs a few minutes and a few GB of temporary disk. Each scale generates its sources once,
+then runs process_matches_df, read_extra_matches_csv,
+deduplicate_overlapping_source_matches, a full update_match_ratings, the MIN_MATCHES filter
+(which also sorts the matches), build_player_files and publish_staged_data --repeat times.
+Results are printed as JSON; --compare reports each step's median against an earlier result
+and exits with 1 if any step is more than --max-regression times slower.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import build_h2h as h2h  # noqa: E402
+from generate_synthetic_data import generate_synthetic_sources  # noqa: E402
+
+BASE_PLAYERS = 200
+BASE_MATCHES = 10_000
+RESULT_VERSION = 1
+# Steps faster than this in the baseline are too noisy to fail a comparison.
+MIN_COMPARED_SECONDS = 0.05
+
+
+def run_pipeline(source_dir: Path, work_dir: Path, min_matches: int, durability: str) -> list:
+    metrics = h2h.BuildMetrics()
+    players, _ = h2h.load_players(
+        source_dir / "players_data.csv", h2h.load_rankings(source_dir / "ranking.txt")
+    )
+    levels = h2h.load_tournament_levels(source_dir / "tournament_metadata.csv")
+    raw = pd.read_parquet(source_dir / "scraped_matches.parquet", engine="pyarrow")
+    raw = raw.rename(columns=h2h.PARQUET_COLUMN_NAMES)
+
+    with metrics.measure("process_matches_df", {"matches": len(raw)}) as record:
+        primary = h2h.process_matches_df(raw)
+        record["rows_out"] = {"matches": len(primary)}
+    with metrics.measure("read_extra_matches_csv") as record:
+        extra = h2h.read_extra_matches_csv(
+            source_dir / "extra_matches.csv", h2h.build_unique_player_name_index(players)
+        )
+        record["rows_out"] = {"matches": len(extra)}
+    matches = pd.concat([primary, extra], ignore_index=True)
+    matches["tournament_level"] = matches["tournament_id"].map(
+        lambda tid: levels.get(int(tid)) if pd.notna(tid) else None
+    )
+    with metrics.measure(
+        "deduplicate_overlapping_source_matches", {"matches": len(matches)}
+    ) as record:
+        matches = h2h.deduplicate_overlapping_source_matches(matches)
+        record["rows_out"] = {"matches": len(matches)}
+    with metrics.measure("update_match_ratings", {"matches": len(matches)}) as record:
+        rated = h2h.update_match_ratings(matches, work_dir / "ratings", resume=False)
+        record["rows_out"] = {"matches": len(rated)}
+    with metrics.measure("filter", {"matches": len(matches)}) as record:
+        filtered = h2h.run_filter_stage(
+            {"min_matches": min_matches}, {"matches": matches, "players": players}
+        )
+        record["rows_out"] = h2h.count_rows(filtered)
+
+    data_dir = work_dir / "data"
+    staging_dir = work_dir / "data-build"
+    backup_dir = work_dir / "data-previous"
+    h2h.prepare_data_staging(data_dir, staging_dir, backup_dir)
+    with metrics.measure(
+        "build_player_files", {"matches": len(filtered["eligible_matches"])}
+    ) as record:
+        files = h2h.build_player_files(
+            filtered["eligible_matches"],
+            filtered["player_names"],
+            staging_dir / "h2h",
+            staging_dir / "og",
+            durability == "file",
+            metrics=metrics,
+        )["files"]
+        record["rows_out"] = {"files": len(files)}
+    with metrics.measure("publish_staged_data", {"files": len(files)}):
+        h2h.publish_staged_data(data_dir, staging_dir, backup_dir, durability)
+    return metrics.stages
+
+
+def summarize_runs(runs: list) -> dict:
+    summary = {}
+    for name in [record["name"] for record in runs[0]]:
+        records = [record for run in runs for record in run if record["name"] == name]
+        walls = [record["wall_seconds"] for record in records]
+        summary[name] = {
+            "median_wall_seconds": round(statistics.median(walls), 3),
+            "min_wall_seconds": min(walls),
+            "median_cpu_seconds": round(
+                statistics.median(record["cpu_seconds"] for record in records), 3
+            ),
+            "max_peak_rss_delta_bytes": max(
+                (record["peak_rss_delta_bytes"] or 0 for record in records), default=0
+            ),
+            "rows_in": records[0].get("rows_in", {}),
+            "rows_out": records[0].get("rows_out", {}),
+        }
+    return summary
+
+
+def compare_results(current: dict, baseline: dict, max_regression: float) -> list:
+    """Return (scale, step, baseline, current, ratio, regressed) for steps in both results."""
+    baseline_scales = {entry["scale"]: entry for entry in baseline.get("scales", [])}
+    rows = []
+    for entry in current["scales"]:
+        previous = baseline_scales.get(entry["scale"])
+        if previous is None:
+            continue
+        for name, step in entry["summary"].items():
+            if name not in previous["summary"]:
+                continue
+            before = previous["summary"][name]["median_wall_seconds"]
+            after = step["median_wall_seconds"]
+            ratio = after / before if before else float("inf") if after else 1.0
+            regressed = before >= MIN_COMPARED_SECONDS and ratio > max_regression
+            rows.append((entry["scale"], name, before, after, ratio, regressed))
+    return rows
+
+
+def parse_scales(text: str) -> list[int]:
+    try:
+        scales = [int(part) for part in text.split(",") if part.strip()]
+    except ValueError as exc:
+        raise ValueError("--scales must be a comma-separated list of integers.") from exc
+    if not scales or min(scales) < 1:
+        raise ValueError("--scales must list integers of at least 1.")
+    return sorted(set(scales))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark build steps on synthetic data.")
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--overlap-rate", type=float, default=0.1)
+    parser.add_argument("--min-matches", type=int, default=50)
+    parser.add_argument("--durability", choices=h2h.DURABILITY_POLICIES, default="none")
+    parser.add_argument("--work-dir", help="Keep generated sources and output here")
+    parser.add_argument("--output", help="Also write the JSON result to this path")
+    parser.add_argument("--compare", help="Earlier JSON result to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.25)
+    args = parser.parse_args()
+    scales = parse_scales(args.scales)
+    if args.repeat < 1:
+        raise ValueError("--repeat must be at least 1.")
+
+    result = {
+        "version": RESULT_VERSION,
+        "seed": args.seed,
+        "overlap_rate": args.overlap_rate,
+        "min_matches": args.min_matches,
+        "durability": args.durability,
+        "base": {"players": BASE_PLAYERS, "matches": BASE_MATCHES},
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "scales": [],
+    }
+    # The build's progress lines go to stderr so stdout stays one JSON document.
+    with tempfile.TemporaryDirectory() as tmpdir, contextlib.redirect_stdout(sys.stderr):
+        root = Path(args.work_dir) if args.work_dir else Path(tmpdir)
+        for scale in scales:
+            scale_dir = root / f"scale-{scale}"
+            print(f"Generating scale {scale}...", file=sys.stderr)
+            sources = generate_synthetic_sources(
+                scale_dir / "sources",
+                BASE_PLAYERS * scale,
+                BASE_MATCHES * scale,
+                args.overlap_rate,
+                args.seed,
+            )
+            runs = []
+            for repeat in range(args.repeat):
+                print(f"Scale {scale}, run {repeat + 1}/{args.repeat}...", file=sys.stderr)
+                runs.append(
+                    run_pipeline(
+                        scale_dir / "sources", scale_dir, args.min_matches, args.durability
+                    )
+                )
+            result["scales"].append(
+                {"scale": scale, "sources": sources, "summary": summarize_runs(runs), "runs": runs}
+            )
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    if not args.compare:
+        return 0
+    with Path(args.compare).open("r", encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = 0
+    for scale, name, before, after, ratio, regressed in compare_results(
+        result, baseline, args.max_regression
+    ):
+        regressions += regressed
+        print(
+            f"{'REGRESSED' if regressed else 'ok':>9}  {scale:>4}x  {name:<40} "
+            f"{before:8.3f}s -> {after:8.3f}s  ({ratio:.2f}x)",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
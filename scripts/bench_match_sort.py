@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Compare the old and current match ordering on seeded synthetic data.
+
+    python3 scripts/bench_match_sort.py [--scales 1,10,100] [--repeat 5] [--min-matches 50]
+
+The old path counted matches per player with value_counts, sorted every match with a
+seven-column sort_values(kind="mergesort", na_position="last") and then dropped the
+ineligible players. The current path counts with np.bincount, filters first and orders the
+remaining matches with one np.lexsort over packed integer keys (match_sort_order). Both run
+on the parsed and deduplicated matches of each scale; the script checks that they pick the
+same rows in the same order and prints the median timings as JSON.
+"""
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import build_h2h as h2h  # noqa: E402
+from bench_build import BASE_MATCHES, BASE_PLAYERS, parse_scales  # noqa: E402
+from generate_synthetic_data import generate_synthetic_sources  # noqa: E402
+
+
+def load_matches(source_dir: Path) -> pd.DataFrame:
+    players, _ = h2h.load_players(
+        source_dir / "players_data.csv", h2h.load_rankings(source_dir / "ranking.txt")
+    )
+    matches = pd.concat(
+        [
+            h2h.read_matches_parquet(source_dir / "scraped_matches.parquet"),
+            h2h.read_extra_matches_csv(
+                source_dir / "extra_matches.csv", h2h.build_unique_player_name_index(players)
+            ),
+        ],
+        ignore_index=True,
+    )
+    return h2h.deduplicate_overlapping_source_matches(matches)
+
+
+def sort_then_filter(matches: pd.DataFrame, min_matches: int) -> pd.DataFrame:
+    counts = pd.concat([matches["player1_id"], matches["player2_id"]]).value_counts()
+    eligible_ids = set(counts[counts >= min_matches].index.astype(int).tolist())
+    matches = matches.sort_values(h2h.MATCH_SORT_COLUMNS, kind="mergesort", na_position="last")
+    return matches[
+        matches["player1_id"].isin(eligible_ids) & matches["player2_id"].isin(eligible_ids)
+    ]
+
+
+def filter_then_lexsort(matches: pd.DataFrame, min_matches: int) -> pd.DataFrame:
+    counts = h2h.count_player_matches(
+        matches["player1_id"].to_numpy(), matches["player2_id"].to_numpy()
+    )
+    eligible_ids = set(counts[counts >= min_matches].index.astype(int).tolist())
+    matches = matches[
+        matches["player1_id"].isin(eligible_ids) & matches["player2_id"].isin(eligible_ids)
+    ]
+    return matches.take(h2h.match_sort_order(matches))
+
+
+def time_path(path, matches: pd.DataFrame, min_matches: int, repeat: int):
+    walls = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = path(matches, min_matches)
+        walls.append(time.perf_counter() - started)
+    return result, walls
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the match filter and sort.")
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--overlap-rate", type=float, default=0.1)
+    parser.add_argument("--min-matches", type=int, default=50)
+    args = parser.parse_args()
+    scales = parse_scales(args.scales)
+    if args.repeat < 1:
+        raise ValueError("--repeat must be at least 1.")
+
+    result = {"seed": args.seed, "min_matches": args.min_matches, "scales": []}
+    # The build's progress lines go to stderr so stdout stays one JSON document.
+    with tempfile.TemporaryDirectory() as tmpdir, contextlib.redirect_stdout(sys.stderr):
+        for scale in scales:
+            print(f"Generating scale {scale}...", file=sys.stderr)
+            source_dir = Path(tmpdir) / f"scale-{scale}"
+            generate_synthetic_sources(
+                source_dir, BASE_PLAYERS * scale, BASE_MATCHES * scale, args.overlap_rate, args.seed
+            )
+            matches = load_matches(source_dir)
+            expected, old_walls = time_path(
+                sort_then_filter, matches, args.min_matches, args.repeat
+            )
+            actual, new_walls = time_path(
+                filter_then_lexsort, matches, args.min_matches, args.repeat
+            )
+            if not actual.index.equals(expected.index):
+                raise RuntimeError(f"Scale {scale}: the two paths ordered matches differently.")
+            old_median = statistics.median(old_walls)
+            new_median = statistics.median(new_walls)
+            result["scales"].append(
+                {
+                    "scale": scale,
+                    "matches": len(matches),
+                    "eligible_matches": len(actual),
+                    "sort_then_filter_seconds": round(old_median, 4),
+                    "filter_then_lexsort_seconds": round(new_median, 4),
+                    "speedup": round(old_median / new_median, 2) if new_median else None,
+                }
+            )
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
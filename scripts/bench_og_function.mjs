@@ -0,0 +1,153 @@
+#!/usr/bin/env node
+// Measure share-link latency of functions/h2h/[[path]].js against a built dataset.
+//
+//   node scripts/bench_og_function.mjs [--data public/data] [--requests 500]
+//                                      [--cold 50] [--latency-ms 2] [--seed 1]
+//
+// ASSETS is a stand-in that serves files from --data after a fixed delay, which
+// approximates the asset fetch inside a Pages isolate. "Cold" requests import a
+// fresh copy of the module (an empty per-isolate cache); "warm" requests reuse
+// one module across --requests share links. Results are printed as JSON.
+import { readFile, readdir } from "node:fs/promises";
+import path from "node:path";
+import { fileURLToPath, pathToFileURL } from "node:url";
+import { performance } from "node:perf_hooks";
+
+const ROOT_DIR = path.resolve(path.dirname(fileURLToPath(import.meta.url)), "..");
+const FUNCTION_URL = pathToFileURL(path.join(ROOT_DIR, "functions", "h2h", "[[path]].js")).href;
+
+function parseArgs(argv) {
+  const options = {
+    data: path.join(ROOT_DIR, "public", "data"),
+    requests: 500,
+    cold: 50,
+    latencyMs: 2,
+    seed: 1,
+  };
+  for (let i = 0; i < argv.length; i += 2) {
+    const [flag, value] = [argv[i], argv[i + 1]];
+    if (flag === "--data") options.data = path.resolve(value);
+    else if (flag === "--requests") options.requests = Number(value);
+    else if (flag === "--cold") options.cold = Number(value);
+    else if (flag === "--latency-ms") options.latencyMs = Number(value);
+    else if (flag === "--seed") options.seed = Number(value);
+    else throw new Error(`Unknown option ${flag}`);
+  }
+  return options;
+}
+
+function seededRandom(seed) {
+  let state = seed >>> 0 || 1;
+  return () => {
+    state = Math.imul(state ^ (state >>> 15), 0x2c1b3c6d) >>> 0;
+    state = (state + 0x6d2b79f5) >>> 0;
+    return state / 0x100000000;
+  };
+}
+
+function createAssets(dataDir, latencyMs) {
+  const stats = { fetches: 0, bytes: 0 };
+  const fetch = async (url) => {
+    stats.fetches += 1;
+    const relative = decodeURIComponent(new URL(url).pathname).replace(/^\/data\//, "");
+    await new Promise((resolve) => setTimeout(resolve, latencyMs));
+    try {
+      const body = await readFile(path.join(dataDir, relative));
+      stats.bytes += body.length;
+      return new Response(body, {
+        headers: { "content-type": "application/json", "content-length": String(body.length) },
+      });
+    } catch {
+      return new Response("Not Found", { status: 404 });
+    }
+  };
+  return { env: { ASSETS: { fetch } }, stats };
+}
+
+async function samplePairs(dataDir, count, random) {
+  const ogDir = path.join(dataDir, "og");
+  const keys = [];
+  for (const name of (await readdir(ogDir)).sort()) {
+    const payload = JSON.parse(await readFile(path.join(ogDir, name), "utf-8"));
+    keys.push(...Object.keys(payload.pairs || {}));
+  }
+  if (!keys.length) throw new Error(`No share records found under ${ogDir}`);
+  return Array.from({ length: count }, () => {
+    const [id1, id2] = keys[Math.floor(random() * keys.length)].split("-");
+    return random() < 0.5 ? [id1, id2] : [id2, id1];
+  });
+}
+
+function summarize(samples) {
+  const sorted = [...samples].sort((a, b) => a - b);
+  const pick = (q) => sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+  const round = (value) => Math.round(value * 1000) / 1000;
+  return {
+    requests: sorted.length,
+    mean_ms: round(sorted.reduce((sum, value) => sum + value, 0) / sorted.length),
+    p50_ms: round(pick(0.5)),
+    p95_ms: round(pick(0.95)),
+    max_ms: round(sorted[sorted.length - 1]),
+  };
+}
+
+async function timeRequest(onRequest, env, [p1, p2]) {
+  const request = new Request(`https://bench.example/h2h/${p1}/${p2}`);
+  const started = performance.now();
+  const response = await onRequest({ request, env });
+  await response.arrayBuffer();
+  const elapsed = performance.now() - started;
+  if (response.status !== 200) {
+    throw new Error(`/h2h/${p1}/${p2} returned ${response.status}`);
+  }
+  return elapsed;
+}
+
+async function main() {
+  const options = parseArgs(process.argv.slice(2));
+  const random = seededRandom(options.seed);
+  const pairs = await samplePairs(options.data, options.requests + options.cold, random);
+
+  const cold = [];
+  const coldStats = { fetches: 0, bytes: 0 };
+  for (let i = 0; i < options.cold; i += 1) {
+    const { onRequest } = await import(`${FUNCTION_URL}?isolate=${i}`);
+    const assets = createAssets(options.data, options.latencyMs);
+    cold.push(await timeRequest(onRequest, assets.env, pairs[options.requests + i]));
+    coldStats.fetches += assets.stats.fetches;
+    coldStats.bytes += assets.stats.bytes;
+  }
+
+  const { onRequest } = await import(`${FUNCTION_URL}?isolate=warm`);
+  const warmAssets = createAssets(options.data, options.latencyMs);
+  const warm = [];
+  for (let i = 0; i < options.requests; i += 1) {
+    warm.push(await timeRequest(onRequest, warmAssets.env, pairs[i]));
+  }
+
+  console.log(
+    JSON.stringify(
+      {
+        data_dir: options.data,
+        asset_latency_ms: options.latencyMs,
+        cold: {
+          ...summarize(cold),
+          asset_fetches: coldStats.fetches,
+          asset_bytes: coldStats.bytes,
+        },
+        warm: {
+          ...summarize(warm),
+          asset_fetches: warmAssets.stats.fetches,
+          asset_bytes: warmAssets.stats.bytes,
+        },
+      },
+      null,
+      2,
+    ),
+  );
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
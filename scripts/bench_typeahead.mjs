@@ -0,0 +1,166 @@
+#!/usr/bin/env node
+// Measure per-keystroke typeahead latency against a built dataset.
+//
+//   node scripts/bench_typeahead.mjs [--data public/data] [--players 0]
+//                                    [--names 200] [--seed 1]
+//
+// Each sampled player name is "typed" one character at a time and every prefix
+// runs buildSuggestions() twice: once through search/index.json and once as
+// the linear scan used when the index is missing. --players N repeats the
+// published list (with fresh ids) up to N players and rebuilds the index the
+// same way scripts/build_h2h.py does, to project latency at a larger roster.
+import { readFile } from "node:fs/promises";
+import path from "node:path";
+import { fileURLToPath } from "node:url";
+import { performance } from "node:perf_hooks";
+
+globalThis.document = {
+  getElementById: () => null,
+  querySelector: () => null,
+  querySelectorAll: () => [],
+};
+globalThis.window = {
+  location: { search: "", href: "https://bench.example/" },
+  matchMedia: () => ({ matches: false, addEventListener: () => {} }),
+};
+
+const ROOT_DIR = path.resolve(path.dirname(fileURLToPath(import.meta.url)), "..");
+const { state } = await import("../public/js/state.js");
+const { normalizePlayerRecord } = await import("../public/js/players.js");
+const { buildSuggestions, createSearchIndex } = await import("../public/js/typeahead.js");
+
+function parseArgs(argv) {
+  const options = {
+    data: path.join(ROOT_DIR, "public", "data"),
+    players: 0,
+    names: 200,
+    seed: 1,
+  };
+  for (let i = 0; i < argv.length; i += 2) {
+    const [flag, value] = [argv[i], argv[i + 1]];
+    if (flag === "--data") options.data = path.resolve(value);
+    else if (flag === "--players") options.players = Number(value);
+    else if (flag === "--names") options.names = Number(value);
+    else if (flag === "--seed") options.seed = Number(value);
+    else throw new Error(`Unknown option ${flag}`);
+  }
+  return options;
+}
+
+function seededRandom(seed) {
+  let value = seed >>> 0 || 1;
+  return () => {
+    value = Math.imul(value ^ (value >>> 15), 0x2c1b3c6d) >>> 0;
+    value = (value + 0x6d2b79f5) >>> 0;
+    return value / 0x100000000;
+  };
+}
+
+async function readJson(dataDir, relativePath) {
+  return JSON.parse(await readFile(path.join(dataDir, relativePath), "utf-8"));
+}
+
+function buildIndexPayload(players, gramSizes) {
+  const postings = new Map();
+  players.forEach((player, position) => {
+    const grams = new Set();
+    for (const size of gramSizes) {
+      for (let start = 0; start + size <= player.search_key.length; start += 1) {
+        grams.add(player.search_key.slice(start, start + size));
+      }
+    }
+    for (const gram of grams) {
+      const list = postings.get(gram);
+      if (list) list.push(position);
+      else postings.set(gram, [position]);
+    }
+  });
+  return {
+    version: 1,
+    gram_sizes: gramSizes,
+    postings: Object.fromEntries(Array.from(postings, ([gram, positions]) => [
+      gram,
+      positions.map((position, index) => position - (index ? positions[index - 1] : 0)),
+    ])),
+  };
+}
+
+function summarize(samples) {
+  const sorted = [...samples].sort((a, b) => a - b);
+  const pick = (q) => sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+  const round = (value) => Math.round(value * 1000) / 1000;
+  return {
+    keystrokes: sorted.length,
+    mean_ms: round(sorted.reduce((sum, value) => sum + value, 0) / sorted.length),
+    p50_ms: round(pick(0.5)),
+    p95_ms: round(pick(0.95)),
+    max_ms: round(sorted[sorted.length - 1]),
+  };
+}
+
+function timeKeystrokes(queries) {
+  const samples = [];
+  for (const query of queries) {
+    const started = performance.now();
+    buildSuggestions(query);
+    samples.push(performance.now() - started);
+  }
+  return samples;
+}
+
+async function main() {
+  const options = parseArgs(process.argv.slice(2));
+  const random = seededRandom(options.seed);
+  const slim = await readJson(options.data, "search/players.json");
+  let players = slim.players.map((row) => normalizePlayerRecord(
+    Object.fromEntries(slim.fields.map((field, index) => [field, row[index]]))
+  ));
+  let indexPayload = await readJson(options.data, "search/index.json");
+  if (options.players > players.length) {
+    const published = players;
+    players = Array.from({ length: options.players }, (_, i) => ({
+      ...published[i % published.length],
+      id: i + 1,
+    }));
+    indexPayload = buildIndexPayload(players, indexPayload.gram_sizes);
+  }
+
+  state.players = players;
+  state.playersById = new Map(players.map((player) => [player.id, player]));
+  const queries = [];
+  for (let i = 0; i < options.names; i += 1) {
+    const name = players[Math.floor(random() * players.length)].name;
+    for (let end = 1; end <= name.length; end += 1) queries.push(name.slice(0, end));
+  }
+
+  const indexStarted = performance.now();
+  const index = createSearchIndex(indexPayload, players);
+  const indexLoadMs = performance.now() - indexStarted;
+
+  state.searchIndex = null;
+  timeKeystrokes(queries.slice(0, 50));
+  const scan = timeKeystrokes(queries);
+  state.searchIndex = index;
+  timeKeystrokes(queries.slice(0, 50));
+  const indexed = timeKeystrokes(queries);
+
+  console.log(
+    JSON.stringify(
+      {
+        data_dir: options.data,
+        players: players.length,
+        grams: Object.keys(indexPayload.postings).length,
+        index_setup_ms: Math.round(indexLoadMs * 1000) / 1000,
+        indexed: summarize(indexed),
+        linear_scan: summarize(scan),
+      },
+      null,
+      2,
+    ),
+  );
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
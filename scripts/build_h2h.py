@@ -1,18 +1,37 @@
 #!/usr/bin/env python3
+import argparse
+import cProfile
 import json
 import hashlib
+import heapq
+import html
 import os
 import re
 import sys
 import shutil
+import time
+import tracemalloc
 import unicodedata
-from collections import deque
-from datetime import datetime, timezone
+import zlib
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
 from urllib.parse import urlparse
 
+import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage; peak RSS is then reported as null.
+    resource = None
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 ROOT_DIR = SCRIPT_DIR.parent
@@ -25,8 +44,88 @@ PUBLIC_DIR = ROOT_DIR / "public"
 DATA_DIR = PUBLIC_DIR / "data"
 H2H_DIR = DATA_DIR / "h2h"
 OG_H2H_DIR = DATA_DIR / "og"
+ALIASES_PATH = PUBLIC_DIR / "aliases.json"
 DATA_STAGING_DIR = ROOT_DIR / ".data-build"
 DATA_BACKUP_DIR = ROOT_DIR / ".data-previous"
+INCREMENTAL_STATE_PATH = CACHE_DIR / "h2h-build-state.json"
+# Every ranking the builds have parsed, one snapshot per ranking_as_of date; matches get
+# each player's world rank from the latest snapshot on or before the match date.
+RANKING_HISTORY_PATH = CACHE_DIR / "ranking-history.parquet"
+# Elo ratings over every dated match, in date order. RATING_STATE_DIR keeps the ratings
+# after the last processed match, so a build only applies the matches that sort after
+# it; INCREMENTAL_BUILD=0 recomputes them from scratch, with identical results.
+RATING_STATE_DIR = CACHE_DIR / "ratings"
+RATING_STATE_VERSION = 1
+RATING_INITIAL = 1500.0
+RATING_K_FACTOR = 32.0
+# Each build stage pickles its outputs to {STAGE_CHECKPOINT_DIR}/{stage}/ so a later run can
+# resume with --from-stage; bump the version when a stage's outputs change shape.
+STAGE_CHECKPOINT_DIR = CACHE_DIR / "stages"
+STAGE_CHECKPOINT_VERSION = 2
+# Timings, peak RSS growth and row counts of the last build, including the stages that
+# finish after meta.json is written; --profile leaves per-stage profiles in PROFILE_DIR.
+BUILD_METRICS_PATH = CACHE_DIR / "build-metrics.json"
+PROFILE_DIR = CACHE_DIR / "profile"
+PROFILE_TOP_ALLOCATIONS = 25
+# OUT_OF_CORE=1 spills normalized matches to a parquet dataset under OUT_OF_CORE_DIR,
+# bucketed by a hash of id1, and emits player files a group of buckets at a time.
+OUT_OF_CORE_DIR = CACHE_DIR / "partitions"
+MATCH_PARTITION_COUNT = 256
+# Match sources are read and validated this many rows at a time (INGEST_BATCH_ROWS), so
+# ingest memory follows the batch size rather than the size of the source files.
+INGEST_BATCH_ROWS = 100_000
+# Rough in-memory size of player payloads per byte of the match frame they come from.
+OUT_OF_CORE_PAYLOAD_FACTOR = 6
+# Bump when the emitted player-file layout changes so incremental builds start over.
+H2H_SCHEMA_VERSION = 4
+# "file" fsyncs every artifact, "batch" syncs the staged tree once before the
+# swap, and "none" leaves flushing to the OS (ephemeral CI runners).
+DURABILITY_POLICIES = ("file", "batch", "none")
+# "objects" is the original one-dict-per-match layout; "columnar" is the opt-in
+# schema-2 layout with per-opponent column arrays and a per-file string table.
+H2H_ENCODINGS = ("objects", "columnar")
+COLUMNAR_SCHEMA_VERSION = 2
+# Share metadata is partitioned by canonical pair into this many og/{shard}.json
+# files; functions/h2h/[[path]].js hard-codes the same count and hash.
+OG_SHARD_COUNT = 256
+# Typeahead index: n-gram lengths with postings, and the slim player row layout.
+SEARCH_GRAM_SIZES = (2, 3)
+SEARCH_PLAYER_FIELDS = [
+    "id",
+    "name",
+    "country",
+    "world_rank",
+    "ranking_points",
+    "ranking_as_of",
+    "matches",
+]
+# Stage-name markers classifyStage() in public/js/utils.js uses to tell playoff
+# stages from round-robin ones when the source has no explicit stage type.
+PLAYOFF_STAGE_MARKERS = (
+    "playoff",
+    "knockout",
+    "elimination",
+    "bracket",
+    "final",
+    "semi",
+    "quarter",
+    "round of",
+    "1/",
+)
+ROUND_ROBIN_STAGE_MARKERS = ("round", "group", "rr", "league")
+# Pairs with at least this many matches get precomputed chart timelines.
+CHART_MIN_MATCHES = 50
+# Optional per-opponent records that ride along with the match list.
+OPPONENT_EXTRA_FIELDS = ("series", "chart", "ranks", "ratings")
+# Career files list this many of a player's most recent results as form.
+CAREER_FORM_LENGTH = 10
+# Rivalry leaderboards keep this many pairs per board; every board but the
+# most-played one only ranks pairs that met at least LEADERBOARD_MIN_MATCHES times.
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MIN_MATCHES = 20
+SIZE_REPORT_PATH = CACHE_DIR / "size-report.json"
+# Upper bucket edges for the size report histogram; the last bucket is open-ended.
+SIZE_HISTOGRAM_EDGES = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20)
 RANKING_HEADER = "Rank ID_Player Player Club Nation Points Player_Value"
 RANKING_ROW_RE = re.compile(
     r"(?:^|\s)(\d+)\s+(\d+)\s+(.+?)\s+([A-Z]{3})\s+(\d+)\s+(\d+)"
@@ -54,14 +153,125 @@ def to_int(series: pd.Series) -> pd.Series:
     return numeric.astype("Int64")
 
 
-def write_json(path: Path, payload: object) -> None:
+def encode_json(payload: object) -> bytes:
+    """The exact bytes write_json() writes for ``payload``."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_json(path: Path, payload: object, fsync: bool = True) -> dict:
+    """Atomically write compact JSON and return its manifest entry."""
     path.parent.mkdir(parents=True, exist_ok=True)
     temporary_path = path.with_suffix(f"{path.suffix}.tmp")
-    with temporary_path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
-        f.flush()
-        os.fsync(f.fileno())
+    data = encode_json(payload)
+    with temporary_path.open("wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
     temporary_path.replace(path)
+    return {"sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_rows(values: dict) -> Dict[str, int]:
+    return {
+        name: len(value)
+        for name, value in values.items()
+        if isinstance(value, (pd.DataFrame, list, dict, MatchPartitions))
+    }
+
+
+class BuildMetrics:
+    """Wall time, CPU time, peak RSS growth and row counts of nested build steps."""
+
+    def __init__(self, profile_dir: Optional[Path] = None) -> None:
+        self.stages: list[dict] = []
+        self.profile_dir = profile_dir
+        self._open: list[dict] = []
+
+    @contextmanager
+    def measure(self, name: str, rows_in: Optional[Dict[str, int]] = None):
+        record: dict = {"name": name}
+        if rows_in:
+            record["rows_in"] = rows_in
+        (self._open[-1].setdefault("steps", []) if self._open else self.stages).append(record)
+        profiler = None
+        if self.profile_dir is not None and not self._open:
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            profiler.enable()
+        self._open.append(record)
+        start_rss = peak_rss_bytes()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = round(time.perf_counter() - start_wall, 3)
+            record["cpu_seconds"] = round(time.process_time() - start_cpu, 3)
+            end_rss = peak_rss_bytes()
+            record["peak_rss_delta_bytes"] = (
+                None if end_rss is None or start_rss is None else end_rss - start_rss
+            )
+            self._open.pop()
+            if profiler is not None:
+                profiler.disable()
+                record["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self.write_profile(name, profiler, snapshot)
+
+    def write_profile(
+        self, name: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot
+    ) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.profile_dir / f"{name}.prof")
+        allocations = snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]
+        (self.profile_dir / f"{name}.allocations.txt").write_text(
+            "".join(f"{statistic}\n" for statistic in allocations), encoding="utf-8"
+        )
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{record['name']} {record.get('wall_seconds', 0):.1f}s" for record in self.stages
+        )
+
+
+def fsync_directory(path: Path) -> None:
+    """Persist directory entries (renames, new files) where the platform allows it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def sync_tree(root: Path) -> None:
+    """Flush a whole staged tree to disk in one pass instead of once per file."""
+    if hasattr(os, "sync"):
+        os.sync()
+    else:
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for name in filenames:
+                fd = os.open(Path(dirpath) / name, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+    for dirpath, _dirnames, _filenames in os.walk(root, topdown=False):
+        fsync_directory(Path(dirpath))
 
 
 def file_sha256(path: Path) -> str:
@@ -72,6 +282,199 @@ def file_sha256(path: Path) -> str:
     return digest.hexdigest()
 
 
+def player_file_counts(payload: dict) -> dict:
+    opponents = payload.get("opponents", {})
+    return {
+        "opponents": len(opponents),
+        "matches": sum(
+            int(opponent.get("summary", {}).get("total_matches", 0))
+            for opponent in opponents.values()
+        ),
+    }
+
+
+def describe_output_file(path: Path) -> dict:
+    """Build a manifest entry for an artifact that was not written in this run."""
+    entry = {"sha256": file_sha256(path), "bytes": path.stat().st_size}
+    with path.open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    if isinstance(payload, dict) and "opponents" in payload:
+        entry.update(player_file_counts(payload))
+    elif isinstance(payload, dict) and "player1" in payload:
+        entry["matches"] = int(payload["summary"]["total_matches"])
+        entry["chunks"] = len(payload.get("chunks", []))
+    elif isinstance(payload, dict) and set(payload) == {"matches"}:
+        entry["matches"] = len(payload["matches"])
+    elif isinstance(payload, dict) and "career" in payload:
+        entry["matches"] = int(payload["career"]["matches"])
+    elif isinstance(payload, dict) and set(payload) == {"pairs"}:
+        entry["pairs"] = len(payload["pairs"])
+        entry["matches"] = sum(record[2] for record in payload["pairs"].values())
+    return entry
+
+
+def load_output_manifest(data_dir: Path) -> Dict[str, dict]:
+    manifest_path = data_dir / "manifest.json"
+    try:
+        with manifest_path.open("r", encoding="utf-8") as handle:
+            return json.load(handle).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def diff_output_manifests(
+    old_files: Dict[str, dict], new_files: Dict[str, dict]
+) -> Dict[str, list[str]]:
+    """Compare two builds by manifest alone, without reading any payloads."""
+    return {
+        "added": sorted(new_files.keys() - old_files.keys()),
+        "removed": sorted(old_files.keys() - new_files.keys()),
+        "changed": sorted(
+            path
+            for path in old_files.keys() & new_files.keys()
+            if old_files[path].get("sha256") != new_files[path].get("sha256")
+        ),
+    }
+
+
+def format_bytes(size: int) -> str:
+    if size < 1 << 10:
+        return f"{size} B"
+    if size < 1 << 20:
+        return f"{size / (1 << 10):.0f} KiB"
+    return f"{size / (1 << 20):.1f} MiB"
+
+
+def size_report_group(path: str) -> str:
+    parts = path.split("/")
+    if len(parts) == 1:
+        return "root"
+    if parts[0] == "h2h" and len(parts) > 2:
+        return "pairs"
+    return parts[0]
+
+
+def build_size_report(
+    data_dir: Path,
+    files: Dict[str, dict],
+    player_names: Dict[int, str],
+    top_n: int = 20,
+) -> dict:
+    """Summarize artifact sizes, with zlib level 6 and 9 estimates of the served bytes."""
+    sizes = {}
+    for path in sorted(files):
+        data = (data_dir / path).read_bytes()
+        sizes[path] = {
+            "bytes": len(data),
+            "gzip_bytes": len(zlib.compress(data, 6)),
+            "zlib9_bytes": len(zlib.compress(data, 9)),
+        }
+
+    raw_sizes = np.fromiter(
+        (entry["bytes"] for entry in sizes.values()), dtype=np.int64, count=len(sizes)
+    )
+    counts = np.bincount(
+        np.searchsorted(SIZE_HISTOGRAM_EDGES, raw_sizes, side="right"),
+        minlength=len(SIZE_HISTOGRAM_EDGES) + 1,
+    )
+    lower_edges = (0, *SIZE_HISTOGRAM_EDGES)
+    histogram = [
+        {
+            "min_bytes": lower,
+            "max_bytes": upper,
+            "label": f"< {format_bytes(upper)}" if upper else f">= {format_bytes(lower)}",
+            "files": int(count),
+        }
+        for lower, upper, count in zip(
+            lower_edges, (*SIZE_HISTOGRAM_EDGES, None), counts.tolist()
+        )
+    ]
+
+    totals = {"files": 0, "bytes": 0, "gzip_bytes": 0, "zlib9_bytes": 0}
+    groups: Dict[str, dict] = {}
+    for path, entry in sizes.items():
+        group = groups.setdefault(
+            size_report_group(path),
+            {**dict.fromkeys(totals, 0), "max_bytes": 0, "max_gzip_bytes": 0},
+        )
+        for target in (totals, group):
+            target["files"] += 1
+            for key in ("bytes", "gzip_bytes", "zlib9_bytes"):
+                target[key] += entry[key]
+        group["max_bytes"] = max(group["max_bytes"], entry["bytes"])
+        group["max_gzip_bytes"] = max(group["max_gzip_bytes"], entry["gzip_bytes"])
+
+    player_paths = [path for path in sizes if size_report_group(path) == "h2h"]
+    largest = sorted(player_paths, key=lambda path: (-sizes[path]["bytes"], path))[:top_n]
+    largest_players = []
+    for path in largest:
+        pid = int(Path(path).stem)
+        largest_players.append(
+            {
+                "id": pid,
+                "name": player_names.get(pid, ""),
+                **sizes[path],
+                "opponents": files[path].get("opponents"),
+                "matches": files[path].get("matches"),
+            }
+        )
+
+    return {
+        "totals": totals,
+        "groups": dict(sorted(groups.items())),
+        "histogram": histogram,
+        "largest_players": largest_players,
+    }
+
+
+def enforce_size_budget(
+    report: dict,
+    max_files: Optional[int] = None,
+    max_player_file_bytes: Optional[int] = None,
+    max_player_file_gzip_bytes: Optional[int] = None,
+) -> None:
+    """Fail the build before publishing when artifacts outgrow their budgets."""
+    file_count = report["totals"]["files"]
+    if max_files is not None and file_count > max_files:
+        raise RuntimeError(
+            f"Build produced {file_count} files; maximum allowed is {max_files}."
+        )
+    player_files = report["groups"].get("h2h")
+    if player_files is None:
+        return
+    if max_player_file_bytes is not None and player_files["max_bytes"] > max_player_file_bytes:
+        largest = report["largest_players"][0]
+        raise RuntimeError(
+            f"Player file h2h/{largest['id']}.json is {format_bytes(largest['bytes'])}; "
+            f"maximum allowed is {format_bytes(max_player_file_bytes)}."
+        )
+    if (
+        max_player_file_gzip_bytes is not None
+        and player_files["max_gzip_bytes"] > max_player_file_gzip_bytes
+    ):
+        raise RuntimeError(
+            f"Largest player file is {format_bytes(player_files['max_gzip_bytes'])} "
+            f"gzipped; maximum allowed is {format_bytes(max_player_file_gzip_bytes)}."
+        )
+
+
+def print_size_report(report: dict) -> None:
+    totals = report["totals"]
+    print(
+        f"Output size: {totals['files']} files, {format_bytes(totals['bytes'])} raw, "
+        f"{format_bytes(totals['gzip_bytes'])} gzip, "
+        f"{format_bytes(totals['zlib9_bytes'])} zlib -9."
+    )
+    for bucket in report["histogram"]:
+        if bucket["files"]:
+            print(f"  {bucket['label']:>12}: {bucket['files']} files")
+    for entry in report["largest_players"][:5]:
+        print(
+            f"  h2h/{entry['id']}.json ({entry['name']}): "
+            f"{format_bytes(entry['bytes'])} raw, {format_bytes(entry['gzip_bytes'])} gzip"
+        )
+
+
 def prepare_data_staging(
     data_dir: Path = DATA_DIR,
     staging_dir: Path = DATA_STAGING_DIR,
@@ -91,8 +494,13 @@ def publish_staged_data(
     data_dir: Path = DATA_DIR,
     staging_dir: Path = DATA_STAGING_DIR,
     backup_dir: Path = DATA_BACKUP_DIR,
+    durability: str = "file",
 ) -> None:
     """Swap a complete staged dataset into place, restoring the old one on failure."""
+    if durability not in DURABILITY_POLICIES:
+        raise ValueError(f"Unknown durability policy: {durability!r}")
+    if durability == "batch":
+        sync_tree(staging_dir)
     if backup_dir.exists():
         shutil.rmtree(backup_dir)
     if data_dir.exists():
@@ -103,6 +511,8 @@ def publish_staged_data(
         if backup_dir.exists() and not data_dir.exists():
             backup_dir.replace(data_dir)
         raise
+    if durability != "none":
+        fsync_directory(data_dir.parent)
     if backup_dir.exists():
         shutil.rmtree(backup_dir)
 
@@ -201,6 +611,382 @@ def load_rankings(ranking_path: Path) -> Dict[int, dict]:
     return rankings
 
 
+RANKING_HISTORY_SCHEMA = pa.schema(
+    [
+        ("ranking_as_of", pa.date32()),
+        ("ranking_id", pa.int32()),
+        ("world_rank", pa.int32()),
+        ("ranking_points", pa.int32()),
+    ]
+)
+
+
+def read_ranking_history(path: Path) -> pd.DataFrame:
+    """Load the ranking snapshot store; empty if no build has written it yet."""
+    table = pq.read_table(path) if path.exists() else RANKING_HISTORY_SCHEMA.empty_table()
+    return table.cast(RANKING_HISTORY_SCHEMA).to_pandas(date_as_object=False)
+
+
+def update_ranking_history(path: Path, rankings: Dict[int, dict]) -> pd.DataFrame:
+    """Store ``rankings`` as the snapshot for its as-of date; return every snapshot."""
+    history = read_ranking_history(path)
+    as_of_dates = {item["ranking_as_of"] for item in rankings.values() if item["ranking_as_of"]}
+    if len(as_of_dates) != 1:
+        if rankings:
+            print("Ranking has no single as-of date; not adding it to the ranking history.")
+        return history
+    as_of = pd.Timestamp(as_of_dates.pop())
+    snapshot = pd.DataFrame(
+        {
+            "ranking_as_of": as_of,
+            "ranking_id": list(rankings),
+            "world_rank": [item["world_rank"] for item in rankings.values()],
+            "ranking_points": [item["ranking_points"] for item in rankings.values()],
+        }
+    )
+    history = pd.concat(
+        [history.loc[history["ranking_as_of"] != as_of], snapshot], ignore_index=True
+    ).sort_values(["ranking_as_of", "ranking_id"], kind="mergesort")
+    table = pa.table(
+        {
+            "ranking_as_of": pa.array(
+                history["ranking_as_of"].to_numpy(dtype="datetime64[D]"), pa.date32()
+            ),
+            **{
+                column: pa.array(history[column].to_numpy(dtype="int64"), pa.int32())
+                for column in ("ranking_id", "world_rank", "ranking_points")
+            },
+        }
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    pq.write_table(table, temporary_path, compression="zstd")
+    os.replace(temporary_path, path)
+    return table.to_pandas(date_as_object=False)
+
+
+class PlayerRankings(NamedTuple):
+    """Ranking snapshots plus the ranking ID of each published player that has one."""
+
+    history: pd.DataFrame
+    ranking_ids: Dict[int, int]
+
+
+def add_match_ranks(matches: pd.DataFrame, rankings: PlayerRankings) -> None:
+    """Set ``rank_id1``/``rank_id2`` to each side's world rank as of the match date."""
+    for column in ("rank_id1", "rank_id2"):
+        matches[column] = pd.array([pd.NA] * len(matches), dtype="Int64")
+    history = rankings.history
+    dated = matches["date_dt"].notna().to_numpy()
+    if history.empty or not dated.any():
+        return
+    snapshot_dates = pd.DataFrame(
+        {"ranking_as_of": np.unique(history["ranking_as_of"].to_numpy(dtype="datetime64[ns]"))}
+    )
+    rows = pd.DataFrame(
+        {
+            "position": np.flatnonzero(dated),
+            "date_dt": matches["date_dt"].to_numpy(dtype="datetime64[ns]")[dated],
+        }
+    ).sort_values("date_dt", kind="mergesort")
+    rows = pd.merge_asof(
+        rows, snapshot_dates, left_on="date_dt", right_on="ranking_as_of", direction="backward"
+    )
+    rows = rows.loc[rows["ranking_as_of"].notna()]
+    ranks = history[["ranking_as_of", "ranking_id", "world_rank"]].astype(
+        {"ranking_as_of": "datetime64[ns]", "ranking_id": "int64"}
+    )
+    for id_column, rank_column in (("id1", "rank_id1"), ("id2", "rank_id2")):
+        side = rows.assign(
+            ranking_id=matches[id_column]
+            .map(rankings.ranking_ids)
+            .to_numpy(dtype="float64", na_value=np.nan)[rows["position"].to_numpy()]
+        )
+        side = side.loc[side["ranking_id"].notna()].astype({"ranking_id": "int64"})
+        side = side.merge(ranks, on=["ranking_as_of", "ranking_id"], how="inner")
+        values = np.zeros(len(matches), dtype="int64")
+        missing = np.ones(len(matches), dtype=bool)
+        values[side["position"].to_numpy()] = side["world_rank"].to_numpy(dtype="int64")
+        missing[side["position"].to_numpy()] = False
+        matches[rank_column] = pd.arrays.IntegerArray(values, missing)
+
+
+def player_ranking_histories(
+    rankings: PlayerRankings, player_ids: Iterable[int]
+) -> Dict[int, dict]:
+    """Each player's snapshots as day-number columns, for their career file."""
+    ranking_ids = {
+        pid: rankings.ranking_ids[pid] for pid in player_ids if pid in rankings.ranking_ids
+    }
+    history = rankings.history.loc[
+        rankings.history["ranking_id"].isin(set(ranking_ids.values()))
+    ]
+    days = (
+        history["ranking_as_of"].to_numpy(dtype="datetime64[D]").astype("int64").tolist()
+    )
+    columns: Dict[int, dict] = {}
+    for day, ranking_id, world_rank, points in zip(
+        days,
+        history["ranking_id"].tolist(),
+        history["world_rank"].tolist(),
+        history["ranking_points"].tolist(),
+    ):
+        entry = columns.setdefault(
+            ranking_id, {"day": [], "world_rank": [], "ranking_points": []}
+        )
+        entry["day"].append(day)
+        entry["world_rank"].append(world_rank)
+        entry["ranking_points"].append(points)
+    return {
+        pid: columns[ranking_id]
+        for pid, ranking_id in ranking_ids.items()
+        if ranking_id in columns
+    }
+
+
+# Same-day matches are rated in tournament, stage, round and playoff-game order.
+RATING_ORDER_COLUMNS = ["tournament_id", "stage_sequence", "round_number", "playoff_game_number"]
+RATING_SOURCE_COLUMNS = [
+    "date_dt",
+    "id1",
+    "id2",
+    "goals_id1",
+    "goals_id2",
+    *RATING_ORDER_COLUMNS,
+    "source_match_id",
+]
+
+
+def rating_match_keys(matches: pd.DataFrame) -> pd.DataFrame:
+    """Day, players, order columns and a content ``key`` of every dated match."""
+    dated = matches.loc[matches["date_dt"].notna()]
+    frame = pd.DataFrame(
+        {
+            "day": dated["date_dt"].to_numpy(dtype="datetime64[D]").astype("int64"),
+            **{
+                column: dated[column].to_numpy(dtype="int64")
+                for column in ("id1", "id2", "goals_id1", "goals_id2")
+            },
+            **{
+                column: dated[column].to_numpy(dtype="int64", na_value=-1)
+                for column in RATING_ORDER_COLUMNS
+            },
+            "source_match_id": dated["source_match_id"]
+            .astype("string")
+            .fillna("")
+            .to_numpy(dtype=object),
+        },
+        index=dated.index,
+    )
+    frame["key"] = pd.util.hash_pandas_object(frame, index=False).to_numpy().view("int64")
+    return frame
+
+
+def rate_matches(
+    ratings: list[float],
+    player1: list[int],
+    player2: list[int],
+    scores: list[float],
+    k_factor: float = RATING_K_FACTOR,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Apply Elo updates in order, updating ``ratings`` in place; return pre-match ratings."""
+    count = len(scores)
+    before1 = [0.0] * count
+    before2 = [0.0] * count
+    changes = [0.0] * count
+    for row in range(count):
+        first = player1[row]
+        second = player2[row]
+        rating1 = ratings[first]
+        rating2 = ratings[second]
+        change = k_factor * (scores[row] - 1.0 / (1.0 + 10.0 ** ((rating2 - rating1) / 400.0)))
+        ratings[first] = rating1 + change
+        ratings[second] = rating2 - change
+        before1[row] = rating1
+        before2[row] = rating2
+        changes[row] = change
+    return np.array(before1), np.array(before2), np.array(changes)
+
+
+def rating_settings() -> dict:
+    return {
+        "version": RATING_STATE_VERSION,
+        "initial": RATING_INITIAL,
+        "k_factor": RATING_K_FACTOR,
+    }
+
+
+def load_rating_state(state_dir: Path, keys: np.ndarray) -> Optional[Tuple[dict, pd.DataFrame]]:
+    """The stored state and rated matches, if they are a prefix of ``keys``."""
+    try:
+        with (state_dir / "state.json").open("r", encoding="utf-8") as handle:
+            state = json.load(handle)
+        rated = pd.read_parquet(state_dir / "matches.parquet")
+    except (OSError, ValueError):
+        return None
+    processed = state.get("matches", -1)
+    if (
+        state.get("settings") != rating_settings()
+        or len(rated) != processed
+        or processed > len(keys)
+        or hashlib.blake2b(keys[:processed].tobytes(), digest_size=16).hexdigest()
+        != state.get("digest")
+    ):
+        return None
+    return state, rated
+
+
+def update_match_ratings(
+    matches: pd.DataFrame, state_dir: Path = RATING_STATE_DIR, resume: bool = True
+) -> pd.DataFrame:
+    """Rate every dated match in date order, continuing a stored prefix with ``resume``."""
+    frame = rating_match_keys(matches)
+    frame = frame.take(
+        np.lexsort(
+            [frame["key"], *(frame[column] for column in reversed(RATING_ORDER_COLUMNS))]
+            + [frame["day"]]
+        )
+    )
+    frame["occurrence"] = frame.groupby("key", sort=False).cumcount()
+    keys = frame["key"].to_numpy()
+
+    stored = load_rating_state(state_dir, keys) if resume else None
+    if stored is None:
+        player_ids: list[int] = []
+        ratings: list[float] = []
+        rated = None
+        processed = 0
+    else:
+        state, rated = stored
+        player_ids = state["players"]["ids"]
+        ratings = state["players"]["ratings"]
+        processed = state["matches"]
+    new = frame.iloc[processed:]
+    if stored is not None:
+        print(f"Rated {len(new)} new matches after {processed} already rated.")
+    elif resume:
+        print(f"Rating all {len(new)} dated matches from scratch.")
+
+    positions = {pid: position for position, pid in enumerate(player_ids)}
+    for pid in pd.unique(np.concatenate([new["id1"].to_numpy(), new["id2"].to_numpy()])):
+        if int(pid) not in positions:
+            positions[int(pid)] = len(player_ids)
+            player_ids.append(int(pid))
+            ratings.append(RATING_INITIAL)
+    goal_difference = np.sign(new["goals_id1"].to_numpy() - new["goals_id2"].to_numpy())
+    before1, before2, changes = rate_matches(
+        ratings,
+        [positions[pid] for pid in new["id1"].tolist()],
+        [positions[pid] for pid in new["id2"].tolist()],
+        ((goal_difference + 1) / 2).tolist(),
+    )
+    rated_new = pd.DataFrame(
+        {
+            "key": new["key"].to_numpy(),
+            "occurrence": new["occurrence"].to_numpy(dtype="int64"),
+            "day": new["day"].to_numpy(),
+            "id1": new["id1"].to_numpy(),
+            "id2": new["id2"].to_numpy(),
+            "rating_id1": before1.astype("float64"),
+            "rating_id2": before2.astype("float64"),
+            "change": changes.astype("float64"),
+        }
+    )
+    rated = rated_new if rated is None else pd.concat([rated, rated_new], ignore_index=True)
+    if stored is None or len(new):
+        state_dir.mkdir(parents=True, exist_ok=True)
+        rated.to_parquet(state_dir / "matches.parquet.tmp", index=False)
+        os.replace(state_dir / "matches.parquet.tmp", state_dir / "matches.parquet")
+        state = {
+            "settings": rating_settings(),
+            "matches": len(rated),
+            "last_match": (
+                {"day": day_number_to_date(int(rated["day"].iloc[-1])), "key": int(keys[-1])}
+                if len(rated)
+                else None
+            ),
+            "digest": hashlib.blake2b(keys.tobytes(), digest_size=16).hexdigest(),
+            "players": {"ids": player_ids, "ratings": ratings},
+        }
+        write_json(state_dir / "state.json", state, False)
+    return rated
+
+
+def player_rating_histories(
+    match_ratings: pd.DataFrame, player_ids: Iterable[int]
+) -> Dict[int, dict]:
+    """Each player's rounded rating after their last match of every active day."""
+    sides = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "player": match_ratings[id_column].to_numpy(),
+                    "day": match_ratings["day"].to_numpy(),
+                    "rating": match_ratings[rating_column].to_numpy()
+                    + sign * match_ratings["change"].to_numpy(),
+                    "row": np.arange(len(match_ratings)),
+                }
+            )
+            for id_column, rating_column, sign in (
+                ("id1", "rating_id1", 1.0),
+                ("id2", "rating_id2", -1.0),
+            )
+        ],
+        ignore_index=True,
+    )
+    sides = sides.loc[sides["player"].isin(set(player_ids))]
+    sides = sides.sort_values(["player", "row"], kind="mergesort").drop_duplicates(
+        ["player", "day"], keep="last"
+    )
+    histories: Dict[int, dict] = {}
+    for player, day, rating in zip(
+        sides["player"].tolist(),
+        sides["day"].tolist(),
+        np.rint(sides["rating"].to_numpy()).astype("int64").tolist(),
+    ):
+        entry = histories.setdefault(player, {"day": [], "rating": []})
+        entry["day"].append(day)
+        entry["rating"].append(rating)
+    return histories
+
+
+class PlayerRatings(NamedTuple):
+    """Pre-match ratings by sorted match key, plus the published players' rating histories."""
+
+    keys: np.ndarray
+    rating_id1: np.ndarray
+    rating_id2: np.ndarray
+    histories: Dict[int, dict]
+
+
+def player_ratings(match_ratings: pd.DataFrame, player_ids: Iterable[int]) -> PlayerRatings:
+    order = np.lexsort([match_ratings["occurrence"], match_ratings["key"]])
+    return PlayerRatings(
+        match_ratings["key"].to_numpy()[order],
+        np.rint(match_ratings["rating_id1"].to_numpy()[order]).astype("int64"),
+        np.rint(match_ratings["rating_id2"].to_numpy()[order]).astype("int64"),
+        player_rating_histories(match_ratings, player_ids),
+    )
+
+
+def add_match_ratings(matches: pd.DataFrame, ratings: PlayerRatings) -> None:
+    """Set ``rating_id1``/``rating_id2`` to each side's rounded pre-match rating."""
+    keys = rating_match_keys(matches)["key"]
+    occurrences = keys.groupby(keys, sort=False).cumcount().to_numpy()
+    rows = np.searchsorted(ratings.keys, keys.to_numpy()) + occurrences
+    rows = np.minimum(rows, max(len(ratings.keys) - 1, 0))
+    found = (
+        ratings.keys[rows] == keys.to_numpy() if len(ratings.keys) else np.zeros(len(rows), bool)
+    )
+    positions = np.flatnonzero(matches["date_dt"].notna().to_numpy())[found]
+    for column, values in (("rating_id1", ratings.rating_id1), ("rating_id2", ratings.rating_id2)):
+        rated = np.zeros(len(matches), dtype="int64")
+        missing = np.ones(len(matches), dtype=bool)
+        rated[positions] = values[rows[found]]
+        missing[positions] = False
+        matches[column] = pd.arrays.IntegerArray(rated, missing)
+
+
 def load_players(
     players_path: Path, rankings: Optional[Dict[int, dict]] = None
 ) -> Tuple[Iterable[dict], Dict[int, str]]:
@@ -346,7 +1132,10 @@ def ensure_string_column(
         df[name] = default
 
 
-def process_matches_df(matches: pd.DataFrame) -> pd.DataFrame:
+def process_matches_df(
+    matches: pd.DataFrame, verbose: bool = True, date_format: Optional[str] = None
+) -> pd.DataFrame:
+    """Validate and normalize raw match rows; counters go to ``attrs["validation"]``."""
     matches = matches.copy()
     input_rows = len(matches)
     player1_ids = to_int(matches["player1_id"])
@@ -377,14 +1166,8 @@ def process_matches_df(matches: pd.DataFrame) -> pd.DataFrame:
         )
         if is_walkover.any():
             walkover_rows = int(is_walkover.sum())
-            print(f"Dropped {walkover_rows} walkover rows.")
             valid_rows &= ~is_walkover
     dropped_rows = int((~valid_rows).sum())
-    if dropped_rows:
-        print(
-            f"Dropped {dropped_rows} match rows with missing, non-integral, "
-            "or invalid player IDs/scores, self-matches, or walkovers."
-        )
 
     matches = matches.loc[valid_rows].copy()
     matches["player1_id"] = player1_ids.loc[valid_rows].astype("int64")
@@ -433,12 +1216,10 @@ def process_matches_df(matches: pd.DataFrame) -> pd.DataFrame:
         }
     )
     unknown_overtime = ~(false_overtime | true_overtime)
-    if unknown_overtime.any():
-        print(
-            f"Treated {int(unknown_overtime.sum())} unrecognized overtime values as false."
-        )
     matches["overtime"] = true_overtime
-    matches["date_dt"] = pd.to_datetime(matches["date_raw"], errors="coerce")
+    matches["date_dt"] = pd.to_datetime(
+        matches["date_raw"], errors="coerce", format=date_format
+    )
     matches["date"] = matches["date_dt"].dt.strftime("%Y-%m-%d")
 
     ensure_string_column(matches, "tournament_name")
@@ -480,7 +1261,52 @@ def process_matches_df(matches: pd.DataFrame) -> pd.DataFrame:
         "walkover_rows": walkover_rows,
         "unknown_overtime_rows": int(unknown_overtime.sum()),
     }
+    if verbose:
+        report_match_validation(matches.attrs["validation"])
+    return matches
+
+
+def report_match_validation(validation: dict) -> None:
+    if validation.get("resolved_missing_player_ids"):
+        print(
+            f"Resolved {validation['resolved_missing_player_ids']} missing supplemental "
+            "player IDs from unique exact names."
+        )
+    if validation["walkover_rows"]:
+        print(f"Dropped {validation['walkover_rows']} walkover rows.")
+    if validation["dropped_rows"]:
+        print(
+            f"Dropped {validation['dropped_rows']} match rows with missing, non-integral, "
+            "or invalid player IDs/scores, self-matches, or walkovers."
+        )
+    if validation["unknown_overtime_rows"]:
+        print(
+            f"Treated {validation['unknown_overtime_rows']} unrecognized overtime values "
+            "as false."
+        )
 
+
+def source_date_format(date_raw: pd.Series) -> Optional[str]:
+    """The format pandas would infer from a source's first date; None until one is seen."""
+    dates = date_raw.dropna()
+    if not len(dates) or not isinstance(dates.iloc[0], str):
+        return None
+    return guess_datetime_format(dates.iloc[0]) or "mixed"
+
+
+def concat_match_batches(batches: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate processed match batches, summing their validation counters."""
+    frames = []
+    validation: Dict[str, int] = {}
+    for batch in batches:
+        for key, value in batch.attrs["validation"].items():
+            validation[key] = validation.get(key, 0) + value
+        frames.append(batch)
+    # Batches with every row dropped can carry other dtypes; keep one for the columns.
+    kept = [frame for frame in frames if len(frame)] or frames[:1]
+    matches = pd.concat(kept, ignore_index=True)
+    matches.attrs["validation"] = validation
+    report_match_validation(validation)
     return matches
 
 OVERLAP_DEDUPE_COLUMNS = [
@@ -497,21 +1323,13 @@ OVERLAP_DEDUPE_COLUMNS = [
 MIN_TOURNAMENT_CROSSWALK_MATCHES = 3
 
 
-def infer_tournament_crosswalk(
+def tournament_overlaps(
     matches: pd.DataFrame,
     is_bordshockey: pd.Series,
     tournament_ids: pd.Series,
     tournament_names: Optional[pd.Series],
-) -> Tuple[
-    Dict[Tuple[int, int], int],
-    list[Tuple[Tuple[int, int], list[int], list[int]]],
-]:
-    """Infer unambiguous tournament pairs from repeated exact game overlaps.
-
-    Cross-source tournament IDs and names are not always the same. Matching normalized
-    names are direct evidence; otherwise, require three distinct matching game
-    signatures. In both cases the inferred ID mapping must be one-to-one.
-    """
+) -> pd.DataFrame:
+    """Join primary and bordshockey rows that share an exact game signature."""
     signature_hashes = pd.util.hash_pandas_object(
         matches[OVERLAP_DEDUPE_COLUMNS], index=False
     )
@@ -543,20 +1361,27 @@ def infer_tournament_crosswalk(
         primary["_primary_tournament_name"] = ""
         bordshockey["_bordshockey_tournament_name"] = ""
 
-    overlaps = primary.merge(
+    return primary.merge(
         bordshockey,
         on=OVERLAP_DEDUPE_COLUMNS,
         how="inner",
         sort=False,
     )
-    if overlaps.empty:
-        return {}, []
 
-    pair_columns = ["_primary_tournament_id", "_bordshockey_tournament_id"]
+
+CROSSWALK_PAIR_COLUMNS = ["_primary_tournament_id", "_bordshockey_tournament_id"]
+
+
+def tournament_crosswalk_evidence(
+    overlaps: pd.DataFrame,
+) -> Tuple[Dict[Tuple[int, int], int], set[Tuple[int, int]]]:
+    """Count distinct shared game signatures per tournament pair; list name matches."""
+    if overlaps.empty:
+        return {}, set()
     unique_signatures = overlaps.drop_duplicates(
-        [*pair_columns, *OVERLAP_DEDUPE_COLUMNS]
+        [*CROSSWALK_PAIR_COLUMNS, *OVERLAP_DEDUPE_COLUMNS]
     )
-    evidence_counts = unique_signatures.groupby(pair_columns, sort=False).size()
+    evidence_counts = unique_signatures.groupby(CROSSWALK_PAIR_COLUMNS, sort=False).size()
     evidence = {
         (int(primary_id), int(bordshockey_id)): int(count)
         for (primary_id, bordshockey_id), count in evidence_counts.items()
@@ -574,10 +1399,15 @@ def infer_tournament_crosswalk(
     matching_name_pairs = {
         (int(primary_id), int(bordshockey_id))
         for primary_id, bordshockey_id in overlaps.loc[
-            matching_names, pair_columns
+            matching_names, CROSSWALK_PAIR_COLUMNS
         ].itertuples(index=False, name=None)
     }
+    return evidence, matching_name_pairs
 
+
+def select_tournament_crosswalk(
+    evidence: Dict[Tuple[int, int], int], matching_name_pairs: set[Tuple[int, int]]
+) -> Dict[Tuple[int, int], int]:
     candidates = {
         pair
         for pair, count in evidence.items()
@@ -589,22 +1419,47 @@ def infer_tournament_crosswalk(
         primary_candidates.setdefault(primary_id, set()).add(bordshockey_id)
         bordshockey_candidates.setdefault(bordshockey_id, set()).add(primary_id)
 
-    crosswalk = {
+    return {
         (primary_id, bordshockey_id): evidence[(primary_id, bordshockey_id)]
         for primary_id, bordshockey_id in candidates
         if len(primary_candidates[primary_id]) == 1
         and len(bordshockey_candidates[bordshockey_id]) == 1
     }
+
+
+def infer_tournament_crosswalk(
+    matches: pd.DataFrame,
+    is_bordshockey: pd.Series,
+    tournament_ids: pd.Series,
+    tournament_names: Optional[pd.Series],
+    crosswalk: Optional[Dict[Tuple[int, int], int]] = None,
+) -> Tuple[
+    Dict[Tuple[int, int], int],
+    list[Tuple[Tuple[int, int], list[int], list[int]]],
+]:
+    """Infer unambiguous tournament pairs from repeated exact game overlaps.
+
+    Cross-source tournament IDs and names are not always the same. Matching normalized
+    names are direct evidence; otherwise, require three distinct matching game
+    signatures. In both cases the inferred ID mapping must be one-to-one. A given
+    ``crosswalk`` is used as is.
+    """
+    overlaps = tournament_overlaps(matches, is_bordshockey, tournament_ids, tournament_names)
+    if overlaps.empty:
+        return crosswalk or {}, []
+    if crosswalk is None:
+        crosswalk = select_tournament_crosswalk(*tournament_crosswalk_evidence(overlaps))
+
     accepted_pairs = [
         (int(primary_id), int(bordshockey_id)) in crosswalk
-        for primary_id, bordshockey_id in overlaps[pair_columns].itertuples(
+        for primary_id, bordshockey_id in overlaps[CROSSWALK_PAIR_COLUMNS].itertuples(
             index=False, name=None
         )
     ]
     overlap_groups = []
     accepted_overlaps = overlaps.loc[accepted_pairs]
     for _, group in accepted_overlaps.groupby(
-        [*pair_columns, *OVERLAP_DEDUPE_COLUMNS],
+        [*CROSSWALK_PAIR_COLUMNS, *OVERLAP_DEDUPE_COLUMNS],
         dropna=False,
         sort=False,
     ):
@@ -620,7 +1475,38 @@ def infer_tournament_crosswalk(
     return crosswalk, overlap_groups
 
 
-def deduplicate_overlapping_source_matches(matches: pd.DataFrame) -> pd.DataFrame:
+def source_overlap_columns(
+    matches: pd.DataFrame,
+) -> Optional[Tuple[pd.Series, pd.Series, Optional[pd.Series]]]:
+    """Return (is_bordshockey, tournament_ids, tournament_names), or None if nothing overlaps."""
+    if matches.empty or "source" not in matches:
+        return None
+    if any(column not in matches for column in OVERLAP_DEDUPE_COLUMNS):
+        return None
+    source_text = matches["source"].fillna("").astype(str).str.lower()
+    is_bordshockey = source_text.str.contains("bordshockey", regex=False)
+    if not is_bordshockey.any():
+        return None
+    if "tournament_id" in matches:
+        tournament_ids = to_int(matches["tournament_id"])
+    else:
+        tournament_ids = pd.Series(pd.NA, index=matches.index, dtype="Int64")
+    return is_bordshockey, tournament_ids, matches.get("tournament_name")
+
+
+def source_overlap_evidence(
+    matches: pd.DataFrame,
+) -> Tuple[Dict[Tuple[int, int], int], set[Tuple[int, int]]]:
+    """Crosswalk evidence from one partition of the matches, for select_tournament_crosswalk."""
+    columns = source_overlap_columns(matches)
+    if columns is None:
+        return {}, set()
+    return tournament_crosswalk_evidence(tournament_overlaps(matches, *columns))
+
+
+def deduplicate_overlapping_source_matches(
+    matches: pd.DataFrame, crosswalk: Optional[Dict[Tuple[int, int], int]] = None
+) -> pd.DataFrame:
     if matches.empty or "source" not in matches:
         return matches
 
@@ -632,22 +1518,16 @@ def deduplicate_overlapping_source_matches(matches: pd.DataFrame) -> pd.DataFram
     if "tournament_level" not in matches:
         matches["tournament_level"] = None
 
-    source_text = matches["source"].fillna("").astype(str).str.lower()
-    is_bordshockey = source_text.str.contains("bordshockey", regex=False)
-    if not is_bordshockey.any():
+    columns = source_overlap_columns(matches)
+    if columns is None:
         return matches
-
-    if "tournament_id" in matches:
-        tournament_ids = to_int(matches["tournament_id"])
-    else:
-        tournament_ids = pd.Series(pd.NA, index=matches.index, dtype="Int64")
-
-    tournament_names = matches.get("tournament_name")
+    is_bordshockey, tournament_ids, tournament_names = columns
     tournament_crosswalk, overlap_groups = infer_tournament_crosswalk(
         matches,
         is_bordshockey,
         tournament_ids,
         tournament_names,
+        crosswalk,
     )
 
     drop_indices = []
@@ -679,50 +1559,129 @@ def deduplicate_overlapping_source_matches(matches: pd.DataFrame) -> pd.DataFram
     return matches.drop(index=drop_indices).reset_index(drop=True)
 
 
-def read_matches_parquet(matches_path: Path) -> pd.DataFrame:
-    matches = pd.read_parquet(matches_path, engine="pyarrow")
-    matches = matches.rename(
-        columns={
-            "StageID": "stage_id",
-            "Player1": "player1_name",
-            "Player1ID": "player1_id",
-            "Player2": "player2_name",
-            "Player2ID": "player2_id",
-            "GoalsPlayer1": "goals_player1",
-            "GoalsPlayer2": "goals_player2",
-            "Overtime": "overtime_raw",
-            "Stage": "stage",
-            "RoundNumber": "round_number",
-            "PlayoffGameNumber": "playoff_game_number",
-            "Date": "date_raw",
-            "TournamentName": "tournament_name",
-            "TournamentID": "tournament_id",
-            "StageSequence": "stage_sequence",
-            "MatchID": "source_match_id",
-        }
-    )
-    return process_matches_df(matches)
+# Primary parquet columns and the internal names process_matches_df() expects.
+PARQUET_COLUMN_NAMES = {
+    "StageID": "stage_id",
+    "Player1": "player1_name",
+    "Player1ID": "player1_id",
+    "Player2": "player2_name",
+    "Player2ID": "player2_id",
+    "GoalsPlayer1": "goals_player1",
+    "GoalsPlayer2": "goals_player2",
+    "Overtime": "overtime_raw",
+    "Stage": "stage",
+    "RoundNumber": "round_number",
+    "PlayoffGameNumber": "playoff_game_number",
+    "Date": "date_raw",
+    "TournamentName": "tournament_name",
+    "TournamentID": "tournament_id",
+    "StageSequence": "stage_sequence",
+    "MatchID": "source_match_id",
+}
+# Published match order: by pair, then chronologically within a tournament's stages.
+MATCH_SORT_COLUMNS = [
+    "id1",
+    "id2",
+    "date_dt",
+    "tournament_id",
+    "stage_sequence",
+    "round_number",
+    "playoff_game_number",
+]
+
+
+def sort_key_codes(values: pd.Series) -> Tuple[np.ndarray, int]:
+    """Codes of a column that sort like its values, missing last, and the largest code."""
+    missing = values.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        raw = values.array.asi8
+    else:
+        raw = values.to_numpy(dtype="int64", na_value=0)
+    raw = raw.view("uint64") ^ np.uint64(1 << 63)
+    present = raw[~missing]
+    if not len(present):
+        return np.zeros(len(raw), dtype="uint64"), 0
+    offsets = raw - present.min()
+    step = np.gcd.reduce(offsets[~missing]) or np.uint64(1)
+    codes = offsets // step
+    top = int(codes[~missing].max()) + 1
+    codes[missing] = top
+    return codes, top
+
+
+def pack_sort_keys(keys: list[Tuple[np.ndarray, int]]) -> list[np.ndarray]:
+    """Pack consecutive (codes, largest code) sort keys into as few uint64 words as fit."""
+    words: list[np.ndarray] = []
+    bits_used = 64
+    for codes, top in keys:
+        bits = max(top.bit_length(), 1)
+        if bits_used + bits <= 64:
+            words[-1] = (words[-1] << np.uint64(bits)) | codes
+            bits_used += bits
+        else:
+            words.append(codes.copy())
+            bits_used = bits
+    return words
+
+
+def match_sort_order(
+    matches: pd.DataFrame, columns: Iterable[str] = MATCH_SORT_COLUMNS
+) -> np.ndarray:
+    """Row positions that sort ``matches`` by ``columns`` stably, missing values last."""
+    words = pack_sort_keys([sort_key_codes(matches[column]) for column in columns])
+    if not words or not len(matches):
+        return np.arange(len(matches))
+    return np.lexsort(words[::-1])
+
+
+def count_player_matches(player1_ids: np.ndarray, player2_ids: np.ndarray) -> pd.Series:
+    """Matches per player ID, counted over both ID columns and indexed by ID."""
+    ids = np.concatenate([player1_ids, player2_ids]).astype("int64", copy=False)
+    if not len(ids):
+        return pd.Series(dtype="int64")
+    if int(ids.max()) < max(4 * len(ids), 1 << 16):
+        counts = np.bincount(ids)
+        present = np.flatnonzero(counts)
+        return pd.Series(counts[present], index=present)
+    unique_ids, counts = np.unique(ids, return_counts=True)
+    return pd.Series(counts, index=unique_ids)
+
+
+def read_matches_parquet(
+    matches_path: Path, batch_rows: int = INGEST_BATCH_ROWS
+) -> pd.DataFrame:
+    return concat_match_batches(iter_matches_parquet(matches_path, batch_rows))
+
+
+EXTRA_MATCHES_CSV_DTYPES = {
+    "StageType": "string",
+    "TournamentURL": "string",
+    "ResultURL": "string",
+    "StageURL": "string",
+    "SourceURL": "string",
+    "Source": "string",
+    "SourceTournamentID": "string",
+    "SourceStageID": "string",
+    "SourceMatchID": "string",
+}
 
 
 def read_extra_matches_csv(
     csv_path: Path,
     player_name_to_id: Optional[Dict[str, int]] = None,
+    batch_rows: int = INGEST_BATCH_ROWS,
 ) -> pd.DataFrame:
-    matches = pd.read_csv(
-        csv_path,
-        encoding="utf-8-sig",
-        dtype={
-            "StageType": "string",
-            "TournamentURL": "string",
-            "ResultURL": "string",
-            "StageURL": "string",
-            "SourceURL": "string",
-            "Source": "string",
-            "SourceTournamentID": "string",
-            "SourceStageID": "string",
-            "SourceMatchID": "string",
-        },
+    return concat_match_batches(
+        iter_extra_matches_csv(csv_path, player_name_to_id, batch_rows)
     )
+
+
+def process_extra_matches_df(
+    matches: pd.DataFrame,
+    player_name_to_id: Optional[Dict[str, int]] = None,
+    verbose: bool = True,
+    date_format: Optional[str] = None,
+) -> pd.DataFrame:
     # Map CSV columns to internal schema
     matches = matches.rename(
         columns={
@@ -783,16 +1742,285 @@ def read_extra_matches_csv(
                 ].astype("int64")
                 matches[id_column] = resolved_column
                 resolved_total += int(resolved_mask.sum())
-        if resolved_total:
-            print(
-                f"Resolved {resolved_total} missing supplemental player IDs "
-                "from unique exact names."
-            )
 
-    processed = process_matches_df(matches)
+    processed = process_matches_df(matches, verbose=False, date_format=date_format)
     processed.attrs["validation"]["resolved_missing_player_ids"] = resolved_total
+    if verbose:
+        report_match_validation(processed.attrs["validation"])
     return processed
 
+# Columns an out-of-core build keeps, with the Arrow types they are spilled as.
+# ``row_number`` is the match's position in the concatenated sources, which keeps
+# dedupe and sort ties in the same order as an in-memory build.
+MATCH_PARTITION_SCHEMA = pa.schema(
+    [
+        ("row_number", pa.int64()),
+        ("id2_bucket", pa.int32()),
+        ("player1_id", pa.int64()),
+        ("player2_id", pa.int64()),
+        ("player1_name", pa.string()),
+        ("player2_name", pa.string()),
+        ("goals_player1", pa.int64()),
+        ("goals_player2", pa.int64()),
+        ("id1", pa.int64()),
+        ("id2", pa.int64()),
+        ("goals_id1", pa.int64()),
+        ("goals_id2", pa.int64()),
+        ("overtime", pa.bool_()),
+        ("date_dt", pa.timestamp("us")),
+        ("date", pa.string()),
+        ("tournament_id", pa.int64()),
+        ("tournament_name", pa.string()),
+        ("tournament_level", pa.string()),
+        ("stage", pa.string()),
+        ("stage_type", pa.string()),
+        ("stage_id", pa.int64()),
+        ("stage_sequence", pa.int64()),
+        ("round_number", pa.int64()),
+        ("playoff_game_number", pa.int64()),
+        ("source", pa.string()),
+        ("source_url", pa.string()),
+        ("stage_url", pa.string()),
+        ("result_url", pa.string()),
+        ("tournament_url", pa.string()),
+        ("source_tournament_id", pa.string()),
+        ("source_stage_id", pa.string()),
+        ("source_match_id", pa.string()),
+    ]
+)
+MATCH_PARTITION_NULLABLE_INTS = [
+    "tournament_id",
+    "stage_id",
+    "stage_sequence",
+    "round_number",
+    "playoff_game_number",
+]
+MATCH_PARTITIONING = ds.partitioning(pa.schema([("bucket", pa.int32())]), flavor="hive")
+
+
+def match_partition_index(
+    ids: Iterable[int], bucket_count: int = MATCH_PARTITION_COUNT
+) -> np.ndarray:
+    """Bucket player IDs by the splitmix64 finalizer, so nearby IDs spread evenly."""
+    values = np.asarray(ids, dtype="uint64")
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    values = values ^ (values >> np.uint64(31))
+    return (values % np.uint64(bucket_count)).astype("int32")
+
+
+def match_partition_frame(table: pa.Table) -> pd.DataFrame:
+    frame = table.to_pandas()
+    for column in MATCH_PARTITION_NULLABLE_INTS:
+        if column in frame:
+            frame[column] = frame[column].astype("Int64")
+    if "tournament_level" in frame:
+        frame["tournament_level"] = frame["tournament_level"].astype(object).where(
+            frame["tournament_level"].notna(), None
+        )
+    return frame
+
+
+def read_match_dataset(
+    directory: Path,
+    expression: Optional[ds.Expression] = None,
+    columns: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    directory.mkdir(parents=True, exist_ok=True)
+    dataset = ds.dataset(
+        directory,
+        schema=MATCH_PARTITION_SCHEMA.append(pa.field("bucket", pa.int32())),
+        format="parquet",
+        partitioning=MATCH_PARTITIONING,
+    )
+    return match_partition_frame(dataset.to_table(columns=columns, filter=expression))
+
+
+class MatchPartitions:
+    """Deduplicated matches on disk, as a parquet dataset bucketed by a hash of id1."""
+
+    def __init__(
+        self,
+        directory: Path,
+        bucket_rows: list[int],
+        bucket_bytes: list[int],
+        eligible_ids: Optional[frozenset[int]] = None,
+    ) -> None:
+        self.directory = directory
+        self.bucket_rows = bucket_rows
+        self.bucket_bytes = bucket_bytes
+        self.eligible_ids = eligible_ids
+
+    def __len__(self) -> int:
+        return sum(self.bucket_rows)
+
+    def read(
+        self, expression: Optional[ds.Expression] = None, columns: Optional[list[str]] = None
+    ) -> pd.DataFrame:
+        if self.eligible_ids is not None:
+            eligible = pa.array(sorted(self.eligible_ids), type=pa.int64())
+            eligible_rows = ds.field("player1_id").isin(eligible) & ds.field(
+                "player2_id"
+            ).isin(eligible)
+            expression = eligible_rows if expression is None else expression & eligible_rows
+        return read_match_dataset(self.directory, expression, columns)
+
+    def read_bucket(self, bucket: int, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        return self.read(ds.field("bucket") == bucket, columns)
+
+    def read_players(self, buckets: list[int]) -> pd.DataFrame:
+        """Every match of the players in ``buckets``, in published order."""
+        frame = self.read(
+            ds.field("bucket").isin(buckets) | ds.field("id2_bucket").isin(buckets)
+        )
+        return frame.take(match_sort_order(frame, [*MATCH_SORT_COLUMNS, "row_number"]))
+
+    def restrict(self, eligible_ids: Iterable[int]) -> "MatchPartitions":
+        """Limit reads to matches between ``eligible_ids``, recounting every bucket."""
+        restricted = MatchPartitions(self.directory, [], [], frozenset(eligible_ids))
+        for bucket, (rows, size) in enumerate(zip(self.bucket_rows, self.bucket_bytes)):
+            kept = len(restricted.read_bucket(bucket, ["row_number"])) if rows else 0
+            restricted.bucket_rows.append(kept)
+            restricted.bucket_bytes.append(size * kept // rows if rows else 0)
+        return restricted
+
+
+def iter_matches_parquet(
+    matches_path: Path, batch_rows: int = INGEST_BATCH_ROWS
+) -> Iterable[pd.DataFrame]:
+    """Yield the parquet's rows ``batch_rows`` at a time, validated but not reported."""
+    parquet = pq.ParquetFile(matches_path)
+    if not parquet.metadata.num_rows:
+        batches = [parquet.schema_arrow.empty_table()]
+    else:
+        batches = parquet.iter_batches(batch_size=batch_rows)
+    date_format = None
+    for batch in batches:
+        frame = batch.to_pandas().rename(columns=PARQUET_COLUMN_NAMES)
+        date_format = date_format or source_date_format(frame["date_raw"])
+        yield process_matches_df(frame, verbose=False, date_format=date_format)
+
+
+def iter_extra_matches_csv(
+    csv_path: Path,
+    player_name_to_id: Optional[Dict[str, int]] = None,
+    batch_rows: int = INGEST_BATCH_ROWS,
+) -> Iterable[pd.DataFrame]:
+    """Yield the supplemental CSV's rows ``batch_rows`` at a time, validated but not reported."""
+    with pd.read_csv(
+        csv_path, encoding="utf-8-sig", dtype=EXTRA_MATCHES_CSV_DTYPES, chunksize=batch_rows
+    ) as reader:
+        empty = True
+        date_format = None
+        for chunk in reader:
+            empty = False
+            if "Date" in chunk:
+                date_format = date_format or source_date_format(chunk["Date"])
+            yield process_extra_matches_df(
+                chunk, player_name_to_id, verbose=False, date_format=date_format
+            )
+    if empty:
+        header = pd.read_csv(
+            csv_path, encoding="utf-8-sig", dtype=EXTRA_MATCHES_CSV_DTYPES, nrows=0
+        )
+        yield process_extra_matches_df(header, player_name_to_id, verbose=False)
+
+
+def partition_matches(
+    frames: Iterable[pd.DataFrame],
+    directory: Path,
+    bucket_count: int = MATCH_PARTITION_COUNT,
+) -> Tuple[MatchPartitions, int]:
+    """Spill frames with ``row_number`` set into partitions; return them and duplicates removed."""
+    if directory.exists():
+        shutil.rmtree(directory)
+    raw_dir = directory / "raw"
+    raw_schema = MATCH_PARTITION_SCHEMA.append(pa.field("bucket", pa.int32()))
+
+    # One write per frame: a single streaming write would hold an open row group for
+    # every bucket until the last frame.
+    for index, frame in enumerate(frames):
+        frame = frame.assign(
+            bucket=match_partition_index(frame["id1"], bucket_count),
+            id2_bucket=match_partition_index(frame["id2"], bucket_count),
+        )
+        ds.write_dataset(
+            pa.Table.from_pandas(frame[raw_schema.names], schema=raw_schema, preserve_index=False),
+            raw_dir,
+            basename_template=f"part-{index}-{{i}}.parquet",
+            format="parquet",
+            partitioning=MATCH_PARTITIONING,
+            max_partitions=bucket_count,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    evidence: Dict[Tuple[int, int], int] = {}
+    matching_name_pairs: set[Tuple[int, int]] = set()
+    for bucket in range(bucket_count):
+        bucket_evidence, bucket_name_pairs = source_overlap_evidence(
+            read_match_dataset(
+                raw_dir,
+                ds.field("bucket") == bucket,
+                [*OVERLAP_DEDUPE_COLUMNS, "source", "tournament_id", "tournament_name"],
+            )
+        )
+        for pair, count in bucket_evidence.items():
+            evidence[pair] = evidence.get(pair, 0) + count
+        matching_name_pairs.update(bucket_name_pairs)
+    crosswalk = select_tournament_crosswalk(evidence, matching_name_pairs)
+
+    partitions = MatchPartitions(directory / "matches", [], [])
+    removed = 0
+    for bucket in range(bucket_count):
+        matches = read_match_dataset(raw_dir, ds.field("bucket") == bucket)
+        deduped = deduplicate_overlapping_source_matches(matches, crosswalk)
+        removed += len(matches) - len(deduped)
+        partitions.bucket_rows.append(len(deduped))
+        partitions.bucket_bytes.append(int(deduped.memory_usage(deep=True).sum()))
+        if len(deduped):
+            bucket_dir = partitions.directory / f"bucket={bucket}"
+            bucket_dir.mkdir(parents=True, exist_ok=True)
+            pq.write_table(
+                pa.Table.from_pandas(
+                    deduped[MATCH_PARTITION_SCHEMA.names],
+                    schema=MATCH_PARTITION_SCHEMA,
+                    preserve_index=False,
+                ),
+                bucket_dir / "part-0.parquet",
+            )
+    shutil.rmtree(raw_dir)
+    return partitions, removed
+
+
+def count_partition_matches(partitions: MatchPartitions) -> pd.Series:
+    """Count matches per player in one streaming pass over the player ID columns."""
+    counts: Counter = Counter()
+    for bucket, rows in enumerate(partitions.bucket_rows):
+        if not rows:
+            continue
+        ids = partitions.read_bucket(bucket, ["player1_id", "player2_id"])
+        counts.update(
+            count_player_matches(
+                ids["player1_id"].to_numpy(), ids["player2_id"].to_numpy()
+            ).to_dict()
+        )
+    return pd.Series(counts, dtype="int64").sort_index()
+
+
+def plan_partition_groups(partitions: MatchPartitions, memory_budget_bytes: int) -> list[list[int]]:
+    """Group consecutive buckets so each group's player payloads fit the memory budget."""
+    groups: list[list[int]] = []
+    group_bytes = 0
+    for bucket, size in enumerate(partitions.bucket_bytes):
+        estimate = 2 * size * OUT_OF_CORE_PAYLOAD_FACTOR
+        if not groups or group_bytes + estimate > memory_budget_bytes:
+            groups.append([])
+            group_bytes = 0
+        groups[-1].append(bucket)
+        group_bytes += estimate
+    return groups
+
+
 def filter_players(
     players: Iterable[dict],
     eligible_ids: set[int],
@@ -845,469 +2073,2340 @@ def filter_players(
     return filtered, id_to_name
 
 
-def build_player_files(
-    matches: pd.DataFrame,
-    player_names: Dict[int, str],
-    h2h_dir: Path = H2H_DIR,
-    og_dir: Path = OG_H2H_DIR,
-) -> Dict[int, dict]:
-    if h2h_dir.exists():
-        shutil.rmtree(h2h_dir)
-    h2h_dir.mkdir(parents=True, exist_ok=True)
-    if og_dir.exists():
-        shutil.rmtree(og_dir)
-    og_dir.mkdir(parents=True, exist_ok=True)
-
-    player_payloads: Dict[int, dict] = {}
-    for pid, name in player_names.items():
-        player_payloads[pid] = {"player": {"id": pid, "name": name}, "opponents": {}}
-
-    def finish_group(
-        id1_int: int,
-        id2_int: int,
-        first_player1_id: int,
-        first_player1_name: str,
-        first_player2_name: str,
-        total_matches: int,
-        wins_id1: int,
-        wins_id2: int,
-        draws: int,
-        goals_for_id1: int,
-        goals_for_id2: int,
-        overtime_games: int,
-        first_meeting_date: Optional[str],
-        last_meeting_date: Optional[str],
-        tournaments: Dict[int, dict],
-        last10: deque,
-        matches_id1: list,
-    ) -> None:
-        if id1_int not in player_payloads or id2_int not in player_payloads:
-            return
+def typeahead_key(name: str) -> str:
+    """Mirror normalizeText() in public/js/utils.js applied to a decoded name."""
+    text = unicodedata.normalize("NFD", html.unescape(name or ""))
+    return "".join(char for char in text if not "\u0300" <= char <= "\u036f").lower()
+
+
+def build_search_index(
+    players: Iterable[dict], activity: Dict[int, int]
+) -> Tuple[dict, dict]:
+    """Build the slim typeahead player list, in suggestion order, and its n-gram postings."""
+    ordered = sorted(
+        players,
+        key=lambda player: (
+            player["world_rank"] is None,
+            player["world_rank"] or 0,
+            -activity.get(player["id"], 0),
+            # compareSuggestionRank() compares search keys by UTF-16 code unit.
+            typeahead_key(player["name"]).encode("utf-16-be"),
+            player["id"],
+        ),
+    )
+    rows = []
+    postings: Dict[str, list[int]] = {}
+    for position, player in enumerate(ordered):
+        rows.append(
+            [
+                *(player[field] for field in SEARCH_PLAYER_FIELDS[:-1]),
+                activity.get(player["id"], 0),
+            ]
+        )
+        key = typeahead_key(player["name"])
+        grams = {
+            key[start : start + size]
+            for size in SEARCH_GRAM_SIZES
+            for start in range(len(key) - size + 1)
+        }
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
 
-        name1 = player_names.get(id1_int)
-        name2 = player_names.get(id2_int)
-        if not name1:
-            if first_player1_id == id1_int:
-                name1 = first_player1_name
-            else:
-                name1 = first_player2_name
-        if not name2:
-            if first_player1_id == id2_int:
-                name2 = first_player1_name
-            else:
-                name2 = first_player2_name
+    def delta_encode(positions: list[int]) -> list[int]:
+        return [positions[0]] + [b - a for a, b in zip(positions, positions[1:])]
 
-        last10_w = sum(1 for r in last10 if r == "W")
-        last10_l = sum(1 for r in last10 if r == "L")
-        last10_d = sum(1 for r in last10 if r == "D")
+    return (
+        {"version": 1, "fields": SEARCH_PLAYER_FIELDS, "players": rows},
+        {
+            "version": 1,
+            "gram_sizes": list(SEARCH_GRAM_SIZES),
+            "postings": {gram: delta_encode(postings[gram]) for gram in sorted(postings)},
+        },
+    )
 
-        tournaments_list = [
-            {"id": tid, "name": item["name"], "level": item.get("level")}
-            for tid, item in tournaments.items()
-        ]
-        tournaments_list.sort(key=lambda x: (x["name"].lower(), x["id"]))
 
-        summary_id1 = {
-            "total_matches": total_matches,
-            "wins_player": wins_id1,
-            "wins_opponent": wins_id2,
-            "draws": draws,
-            "goals_for_player": goals_for_id1,
-            "goals_for_opponent": goals_for_id2,
-            "overtime_games": overtime_games,
-            "first_meeting_date": first_meeting_date,
-            "last_meeting_date": last_meeting_date,
-            "tournaments": tournaments_list,
-            "last_10": {"wins": last10_w, "losses": last10_l, "draws": last10_d},
-        }
+PAIR_HASH_COLUMNS = [
+    "player1_id",
+    "player1_name",
+    "player2_name",
+    "date",
+    "tournament_id",
+    "tournament_name",
+    "tournament_level",
+    "stage",
+    "stage_type",
+    "stage_id",
+    "stage_sequence",
+    "round_number",
+    "playoff_game_number",
+    "goals_id1",
+    "goals_id2",
+    "overtime",
+    "source",
+    "source_url",
+    "stage_url",
+    "result_url",
+    "tournament_url",
+    "source_tournament_id",
+    "source_stage_id",
+    "source_match_id",
+    "rank_id1",
+    "rank_id2",
+    "rating_id1",
+    "rating_id2",
+]
 
-        matches_id2 = [
-            {
-                **match,
-                "goals_for_player": match["goals_for_opponent"],
-                "goals_for_opponent": match["goals_for_player"],
-            }
-            for match in matches_id1
-        ]
 
-        summary_id2 = {
-            "total_matches": total_matches,
-            "wins_player": wins_id2,
-            "wins_opponent": wins_id1,
-            "draws": draws,
-            "goals_for_player": goals_for_id2,
-            "goals_for_opponent": goals_for_id1,
-            "overtime_games": overtime_games,
-            "first_meeting_date": first_meeting_date,
-            "last_meeting_date": last_meeting_date,
-            "tournaments": tournaments_list,
-            "last_10": {"wins": last10_l, "losses": last10_w, "draws": last10_d},
+# Tournament and stage detail lives once in the shared lookup file; match entries
+# carry only a ``stage_ref`` into it.
+LOOKUP_TOURNAMENT_FIELDS = [
+    "tournament_id",
+    "tournament_name",
+    "tournament_level",
+    "tournament_url",
+    "source_tournament_id",
+]
+LOOKUP_STAGE_FIELDS = [
+    "stage",
+    "stage_type",
+    "stage_id",
+    "stage_sequence",
+    "stage_url",
+    "source_stage_id",
+]
+MATCH_FIELDS = [
+    "date",
+    "stage_ref",
+    "round_number",
+    "playoff_game_number",
+    "goals_for_player",
+    "goals_for_opponent",
+    "overtime",
+    "source",
+    "source_url",
+    "result_url",
+    "source_match_id",
+]
+# Repeated labels and URLs are stored once per file and referenced by index.
+COLUMNAR_STRING_FIELDS = {
+    "stage_ref",
+    "source",
+    "source_url",
+    "result_url",
+}
+DAY_NUMBER_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def date_to_day_number(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    return date.fromisoformat(value).toordinal() - DAY_NUMBER_EPOCH
+
+
+def day_number_to_date(value: Optional[int]) -> Optional[str]:
+    if value is None:
+        return None
+    return date.fromordinal(int(value) + DAY_NUMBER_EPOCH).isoformat()
+
+
+def encode_columnar_payload(payload: dict) -> dict:
+    """Convert a player payload into the schema-2 column layout."""
+    strings: list[str] = []
+    string_index: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        position = string_index.get(value)
+        if position is None:
+            position = string_index[value] = len(strings)
+            strings.append(value)
+        return position
+
+    opponents = {}
+    for opponent_id, opponent in payload["opponents"].items():
+        matches = opponent["matches"]
+        columns: Dict[str, list] = {}
+        for field in MATCH_FIELDS:
+            values = [match[field] for match in matches]
+            if field == "date":
+                columns["day"] = [date_to_day_number(value) for value in values]
+            elif field == "overtime":
+                columns[field] = [int(value) for value in values]
+            elif field in COLUMNAR_STRING_FIELDS:
+                columns[field] = [intern(value) for value in values]
+            else:
+                columns[field] = values
+        opponents[opponent_id] = {
+            "player": opponent["player"],
+            "summary": opponent["summary"],
+            "match_columns": columns,
         }
+        for field in OPPONENT_EXTRA_FIELDS:
+            if field in opponent:
+                opponents[opponent_id][field] = opponent[field]
+    return {
+        "schema": COLUMNAR_SCHEMA_VERSION,
+        "encoding": "columnar",
+        "player": payload["player"],
+        "strings": strings,
+        "opponents": opponents,
+    }
+
 
-        player_payloads[id1_int]["opponents"][str(id2_int)] = {
-            "player": {"id": id2_int, "name": name2},
-            "summary": summary_id1,
-            "matches": matches_id1,
+def decode_columnar_payload(payload: dict) -> dict:
+    """Expand a schema-2 payload back into the object layout, field for field."""
+    if payload.get("encoding") != "columnar":
+        return payload
+    strings = payload.get("strings", [])
+    opponents = {}
+    for opponent_id, opponent in payload["opponents"].items():
+        columns = opponent["match_columns"]
+        matches = []
+        for row in range(len(columns["day"])):
+            match = {}
+            for field in MATCH_FIELDS:
+                if field == "date":
+                    match[field] = day_number_to_date(columns["day"][row])
+                elif field == "overtime":
+                    match[field] = bool(columns[field][row])
+                elif field in COLUMNAR_STRING_FIELDS:
+                    position = columns[field][row]
+                    match[field] = None if position is None else strings[position]
+                else:
+                    match[field] = columns[field][row]
+            matches.append(match)
+        opponents[opponent_id] = {
+            "player": opponent["player"],
+            "summary": opponent["summary"],
+            "matches": matches,
         }
-        player_payloads[id2_int]["opponents"][str(id1_int)] = {
-            "player": {"id": id1_int, "name": name1},
-            "summary": summary_id2,
-            "matches": matches_id2,
+        for field in OPPONENT_EXTRA_FIELDS:
+            if field in opponent:
+                opponents[opponent_id][field] = opponent[field]
+    return {"player": payload["player"], "opponents": opponents}
+
+
+def map_unique_values(series: pd.Series, function) -> np.ndarray:
+    """Apply ``function`` once per distinct value instead of once per row."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    mapped[:-1] = [function(value) for value in uniques]
+    mapped[-1] = function(None)
+    return mapped[codes]
+
+
+def content_refs(frame: pd.DataFrame) -> np.ndarray:
+    """Derive short, build-stable reference IDs from row content."""
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype="uint64")
+    codes, uniques = pd.factorize(hashes)
+    labels = np.array([f"{int(value) >> 16:012x}" for value in uniques], dtype=object)
+    return labels[codes]
+
+
+def match_lookup_frame(matches: pd.DataFrame) -> pd.DataFrame:
+    """Clean tournament and stage columns and give each row its content-hashed lookup refs."""
+    frame = pd.DataFrame(index=matches.index)
+    for field in LOOKUP_TOURNAMENT_FIELDS + LOOKUP_STAGE_FIELDS:
+        if field in {"tournament_id", "stage_id", "stage_sequence"}:
+            frame[field] = matches[field].astype("Int64")
+        elif field == "tournament_level":
+            frame[field] = map_unique_values(
+                matches["tournament_level"], normalize_tournament_level
+            )
+        else:
+            frame[field] = map_unique_values(matches[field], clean_optional_string)
+    frame["tournament_ref"] = content_refs(frame[LOOKUP_TOURNAMENT_FIELDS])
+    frame["stage_ref"] = content_refs(frame[["tournament_ref", *LOOKUP_STAGE_FIELDS]])
+    return frame
+
+
+def lookup_records(frame: pd.DataFrame, ref_column: str, fields: list[str]) -> dict:
+    unique = frame.drop_duplicates([ref_column, *fields]).sort_values(ref_column)
+    if unique[ref_column].duplicated().any():
+        raise RuntimeError(f"Lookup reference collision in {ref_column}.")
+    values = unique[fields].astype(object).where(unique[fields].notna(), None)
+    return {
+        ref: {
+            field: int(value) if isinstance(value, (int, np.integer)) else value
+            for field, value in zip(fields, row)
         }
+        for ref, row in zip(unique[ref_column], values.itertuples(index=False, name=None))
+    }
+
+
+def build_match_lookup(frame: pd.DataFrame) -> dict:
+    """Build the shared tournament/stage lookup from a ``match_lookup_frame``."""
+    return {
+        "version": 1,
+        "tournaments": lookup_records(frame, "tournament_ref", LOOKUP_TOURNAMENT_FIELDS),
+        "stages": lookup_records(
+            frame, "stage_ref", ["tournament_ref", *LOOKUP_STAGE_FIELDS]
+        ),
+    }
+
+
+def write_content_hashed_json(
+    directory: Path, payload: object, fsync: bool = True
+) -> Tuple[str, dict]:
+    """Write ``payload`` under a name derived from its bytes; return (name, entry)."""
+    pending_path = directory / ".pending.json"
+    entry = write_json(pending_path, payload, fsync)
+    name = f"{entry['sha256'][:16]}.json"
+    os.replace(pending_path, directory / name)
+    return name, entry
+
+
+def og_shard_index(id1: int, id2: int, shard_count: int = OG_SHARD_COUNT) -> int:
+    """FNV-1a (32-bit) of ``"{id1}-{id2}"``, matching ogShardIndex in the Pages Function."""
+    value = 0x811C9DC5
+    for byte in f"{id1}-{id2}".encode("ascii"):
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value % shard_count
+
+
+def og_shard_name(index: int) -> str:
+    return f"{index:02x}.json"
+
+
+def write_og_shards(
+    og_dir: Path,
+    pair_keys: list[Tuple[int, int]],
+    pair_names: list[Tuple[str, str]],
+    pair_counts: np.ndarray,
+    fsync: bool = True,
+) -> Dict[str, dict]:
+    """Write every og shard, empty ones too, from pair keys, names and counts."""
+    files = {}
+    for index, pairs in enumerate(og_shard_pairs(pair_keys, pair_names, pair_counts)):
+        files[f"{og_dir.name}/{og_shard_name(index)}"] = write_og_shard(
+            og_dir, index, pairs, fsync
+        )
+    return files
+
+
+def og_shard_pairs(
+    pair_keys: list[Tuple[int, int]],
+    pair_names: list[Tuple[str, str]],
+    pair_counts: np.ndarray,
+) -> list[dict]:
+    """Group share records into the ``pairs`` mapping of every og shard."""
+    shards: list[dict] = [{} for _ in range(OG_SHARD_COUNT)]
+    for (id1, id2), (name1, name2), counts in zip(pair_keys, pair_names, pair_counts.tolist()):
+        shards[og_shard_index(id1, id2)][f"{id1}-{id2}"] = [name1, name2, *counts]
+    return shards
+
 
+def share_pair_records(
+    matches: pd.DataFrame,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    pair_keys: list[Tuple[int, int]],
+    published_pairs: np.ndarray,
+    player_names: Dict[int, str],
+) -> Tuple[list[Tuple[int, int]], list[Tuple[str, str]], np.ndarray]:
+    """Keys, display names and counts of the ``published_pairs`` groups, for write_og_shards()."""
     id1_values = matches["id1"].to_numpy(dtype="int64", copy=False)
     id2_values = matches["id2"].to_numpy(dtype="int64", copy=False)
     player1_id_values = matches["player1_id"].to_numpy(dtype="int64", copy=False)
     player1_name_values = matches["player1_name"].to_numpy(dtype=object, copy=False)
     player2_name_values = matches["player2_name"].to_numpy(dtype=object, copy=False)
-    date_values = matches["date"].to_numpy(dtype=object, copy=False)
-    tournament_id_values = matches["tournament_id"].to_numpy(
-        dtype="int64", na_value=-1, copy=False
+    outcomes = np.sign(
+        matches["goals_id1"].to_numpy(dtype="int64", copy=False)
+        - matches["goals_id2"].to_numpy(dtype="int64", copy=False)
+    )
+    if len(starts):
+        pair_counts = np.column_stack(
+            [
+                ends - starts,
+                np.add.reduceat((outcomes > 0).astype("int64"), starts),
+                np.add.reduceat((outcomes == 0).astype("int64"), starts),
+                np.add.reduceat((outcomes < 0).astype("int64"), starts),
+            ]
+        )[published_pairs]
+    else:
+        pair_counts = np.zeros((0, 4), dtype="int64")
+    pair_names = []
+    for start in starts[published_pairs].tolist():
+        id1, id2 = int(id1_values[start]), int(id2_values[start])
+        name1, name2 = player1_name_values[start], player2_name_values[start]
+        if int(player1_id_values[start]) != id1:
+            name1, name2 = name2, name1
+        pair_names.append((player_names.get(id1) or name1, player_names.get(id2) or name2))
+    return (
+        [pair_keys[group_index] for group_index in published_pairs.tolist()],
+        pair_names,
+        pair_counts,
     )
-    tournament_name_values = matches["tournament_name"].to_numpy(dtype=object, copy=False)
-    if "tournament_level" not in matches:
-        matches["tournament_level"] = None
-    tournament_level_values = matches["tournament_level"].to_numpy(dtype=object, copy=False)
-    stage_values = matches["stage"].to_numpy(dtype=object, copy=False)
-    stage_type_values = matches["stage_type"].to_numpy(dtype=object, copy=False)
-    stage_id_values = matches["stage_id"].to_numpy(dtype="int64", na_value=-1, copy=False)
-    stage_sequence_values = matches["stage_sequence"].to_numpy(
-        dtype="int64", na_value=-1, copy=False
-    )
-    round_number_values = matches["round_number"].to_numpy(
-        dtype="int64", na_value=-1, copy=False
-    )
-    playoff_game_number_values = matches["playoff_game_number"].to_numpy(
-        dtype="int64", na_value=-1, copy=False
-    )
-    goals_id1_values = matches["goals_id1"].to_numpy(dtype="int64", copy=False)
-    goals_id2_values = matches["goals_id2"].to_numpy(dtype="int64", copy=False)
-    overtime_values = matches["overtime"].to_numpy(dtype=bool, copy=False)
-    source_values = matches["source"].to_numpy(dtype=object, copy=False)
-    source_url_values = matches["source_url"].to_numpy(dtype=object, copy=False)
-    stage_url_values = matches["stage_url"].to_numpy(dtype=object, copy=False)
-    result_url_values = matches["result_url"].to_numpy(dtype=object, copy=False)
-    tournament_url_values = matches["tournament_url"].to_numpy(dtype=object, copy=False)
-    source_tournament_id_values = matches["source_tournament_id"].to_numpy(
-        dtype=object, copy=False
-    )
-    source_stage_id_values = matches["source_stage_id"].to_numpy(dtype=object, copy=False)
-    source_match_id_values = matches["source_match_id"].to_numpy(dtype=object, copy=False)
-
-    current_id1 = None
-    current_id2 = None
-    first_player1_id = None
-    first_player1_name = ""
-    first_player2_name = ""
-    total_matches = 0
-    wins_id1 = 0
-    wins_id2 = 0
-    draws = 0
-    goals_for_id1 = 0
-    goals_for_id2 = 0
-    overtime_games = 0
-    first_meeting_date = None
-    last_meeting_date = None
-    tournaments: Dict[int, dict] = {}
-    last10 = deque(maxlen=10)
-    matches_id1 = []
 
-    for idx in range(len(id1_values)):
-        id1_int = int(id1_values[idx])
-        id2_int = int(id2_values[idx])
-
-        if current_id1 is None:
-            current_id1 = id1_int
-            current_id2 = id2_int
-            first_player1_id = int(player1_id_values[idx])
-            first_player1_name = player1_name_values[idx]
-            first_player2_name = player2_name_values[idx]
-        elif id1_int != current_id1 or id2_int != current_id2:
-            finish_group(
-                current_id1,
-                current_id2,
-                first_player1_id,
-                first_player1_name,
-                first_player2_name,
-                total_matches,
-                wins_id1,
-                wins_id2,
-                draws,
-                goals_for_id1,
-                goals_for_id2,
-                overtime_games,
-                first_meeting_date,
-                last_meeting_date,
-                tournaments,
-                last10,
-                matches_id1,
-            )
-            current_id1 = id1_int
-            current_id2 = id2_int
-            first_player1_id = int(player1_id_values[idx])
-            first_player1_name = player1_name_values[idx]
-            first_player2_name = player2_name_values[idx]
-            total_matches = 0
-            wins_id1 = 0
-            wins_id2 = 0
-            draws = 0
-            goals_for_id1 = 0
-            goals_for_id2 = 0
-            overtime_games = 0
-            first_meeting_date = None
-            last_meeting_date = None
-            tournaments = {}
-            last10 = deque(maxlen=10)
-            matches_id1 = []
-
-        date_raw = date_values[idx]
-        date_value = date_raw if isinstance(date_raw, str) else None
-        tournament_id_raw = int(tournament_id_values[idx])
-        tournament_id = None if tournament_id_raw == -1 else tournament_id_raw
-        tournament_level_raw = tournament_level_values[idx]
-        tournament_level = normalize_tournament_level(tournament_level_raw)
-        stage_id_raw = int(stage_id_values[idx])
-        stage_id = None if stage_id_raw == -1 else stage_id_raw
-        stage_sequence_raw = int(stage_sequence_values[idx])
-        stage_sequence = None if stage_sequence_raw == -1 else stage_sequence_raw
-        round_number_raw = int(round_number_values[idx])
-        round_number = None if round_number_raw == -1 else round_number_raw
-        playoff_game_number_raw = int(playoff_game_number_values[idx])
-        playoff_game_number = (
-            None if playoff_game_number_raw == -1 else playoff_game_number_raw
-        )
-        goals_id1 = int(goals_id1_values[idx])
-        goals_id2 = int(goals_id2_values[idx])
-        overtime = bool(overtime_values[idx])
-        source = clean_optional_string(source_values[idx])
-        source_url = clean_optional_string(source_url_values[idx])
-        stage_url = clean_optional_string(stage_url_values[idx])
-        result_url = clean_optional_string(result_url_values[idx])
-        tournament_url = clean_optional_string(tournament_url_values[idx])
-        source_tournament_id = clean_optional_string(source_tournament_id_values[idx])
-        source_stage_id = clean_optional_string(source_stage_id_values[idx])
-        source_match_id = clean_optional_string(source_match_id_values[idx])
 
-        matches_id1.append(
-            {
-                "date": date_value,
-                "tournament_id": tournament_id,
-                "tournament_name": tournament_name_values[idx],
-                "tournament_level": tournament_level,
-                "stage": stage_values[idx],
-                "stage_type": clean_optional_string(stage_type_values[idx]),
-                "stage_id": stage_id,
-                "stage_sequence": stage_sequence,
-                "round_number": round_number,
-                "playoff_game_number": playoff_game_number,
-                "goals_for_player": goals_id1,
-                "goals_for_opponent": goals_id2,
-                "overtime": overtime,
-                "source": source,
-                "source_url": source_url,
-                "stage_url": stage_url,
-                "result_url": result_url,
-                "tournament_url": tournament_url,
-                "source_tournament_id": source_tournament_id,
-                "source_stage_id": source_stage_id,
-                "source_match_id": source_match_id,
-            }
-        )
+def write_og_shard(og_dir: Path, index: int, pairs: dict, fsync: bool = True) -> dict:
+    return {
+        **write_json(og_dir / og_shard_name(index), {"pairs": pairs}, fsync),
+        "pairs": len(pairs),
+        "matches": sum(record[2] for record in pairs.values()),
+    }
 
-        total_matches += 1
-        goals_for_id1 += goals_id1
-        goals_for_id2 += goals_id2
 
-        if goals_id1 > goals_id2:
-            wins_id1 += 1
-            result_marker = "W"
-        elif goals_id1 < goals_id2:
-            wins_id2 += 1
-            result_marker = "L"
-        else:
-            draws += 1
-            result_marker = "D"
+def pair_group_bounds(
+    id1_values: np.ndarray, id2_values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return [start, end) row ranges of consecutive (id1, id2) groups."""
+    if not len(id1_values):
+        empty = np.zeros(0, dtype="int64")
+        return empty, empty
+    changes = np.flatnonzero(
+        (id1_values[1:] != id1_values[:-1]) | (id2_values[1:] != id2_values[:-1])
+    ) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(id1_values)]))
+    return starts, ends
 
-        if overtime:
-            overtime_games += 1
 
-        if date_value:
-            last10.append(result_marker)
-            if first_meeting_date is None:
-                first_meeting_date = date_value
-            last_meeting_date = date_value
+def pair_content_hashes(
+    matches: pd.DataFrame,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    player_names: Dict[int, str],
+) -> list[str]:
+    """Fingerprint every pair group from its ordered match rows and display names."""
+    if not len(starts):
+        return []
+    row_hashes = pd.util.hash_pandas_object(
+        matches[PAIR_HASH_COLUMNS], index=False
+    ).to_numpy()
+    id1_values = matches["id1"].to_numpy(dtype="int64", copy=False)
+    id2_values = matches["id2"].to_numpy(dtype="int64", copy=False)
+    hashes = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        digest = hashlib.blake2b(row_hashes[start:end].tobytes(), digest_size=12)
+        names = (
+            player_names.get(int(id1_values[start]), ""),
+            player_names.get(int(id2_values[start]), ""),
+        )
+        digest.update("\x1f".join(names).encode("utf-8"))
+        hashes.append(digest.hexdigest())
+    return hashes
 
-        if tournament_id is not None:
-            tournaments[tournament_id] = {
-                "name": tournament_name_values[idx],
-                "level": tournament_level,
-            }
 
-    if current_id1 is not None:
-        finish_group(
-            current_id1,
-            current_id2,
-            first_player1_id,
-            first_player1_name,
-            first_player2_name,
-            total_matches,
-            wins_id1,
-            wins_id2,
-            draws,
-            goals_for_id1,
-            goals_for_id2,
-            overtime_games,
-            first_meeting_date,
-            last_meeting_date,
-            tournaments,
-            last10,
-            matches_id1,
-        )
-
-    for pid, payload in player_payloads.items():
-        write_json(h2h_dir / f"{pid}.json", payload)
-        og_opponents = {
-            opponent_id: {
-                "player": opponent["player"],
-                "summary": {
-                    key: opponent["summary"].get(key, 0)
-                    for key in [
-                        "total_matches",
-                        "wins_player",
-                        "wins_opponent",
-                        "draws",
-                    ]
-                },
-            }
-            for opponent_id, opponent in payload["opponents"].items()
-        }
-        write_json(
-            og_dir / f"{pid}.json",
-            {"player": payload["player"], "opponents": og_opponents},
-        )
-    return player_payloads
+def player_content_hashes(
+    pair_keys: list[Tuple[int, int]],
+    pair_hashes: list[str],
+    player_names: Dict[int, str],
+    career_extras: Optional[Dict[int, dict]] = None,
+) -> Dict[int, str]:
+    """Fingerprint each player file from its name, pair hashes and career extras."""
+    entries: Dict[int, list] = {pid: [] for pid in player_names}
+    for (id1_int, id2_int), pair_hash in zip(pair_keys, pair_hashes):
+        if id1_int in entries and id2_int in entries:
+            entries[id1_int].append((id2_int, pair_hash))
+            entries[id2_int].append((id1_int, pair_hash))
+    return {
+        pid: hashlib.blake2b(
+            json.dumps(
+                [player_names[pid], sorted(pairs), (career_extras or {}).get(pid)]
+            ).encode("utf-8"),
+            digest_size=12,
+        ).hexdigest()
+        for pid, pairs in entries.items()
+    }
 
 
+def pair_side_values(player_values: np.ndarray, opponent_values: np.ndarray) -> Optional[dict]:
+    """Per-match values of both sides of a pair, -1 as null; None if none is known."""
+    if (player_values < 0).all() and (opponent_values < 0).all():
+        return None
+    return {
+        side: [None if value < 0 else value for value in values.tolist()]
+        for side, values in (("player", player_values), ("opponent", opponent_values))
+    }
 
-def download_cached(url: str, path: Path) -> None:
-    parsed_url = urlparse(url)
-    if parsed_url.scheme not in {"http", "https"} or not parsed_url.netloc:
-        raise ValueError(f"Unsupported source URL: {url!r}")
-    cache_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:12]
-    dl.download(
-        url,
-        path,
-        etag_path=CACHE_DIR / f"{path.stem}.{cache_key}.etag",
-        last_modified_path=CACHE_DIR / f"{path.stem}.{cache_key}.last_modified",
-        retries=5,
-        backoff=1.5,
-        timeout=120,
-    )
 
+def link_or_copy(source: Path, target: Path) -> None:
+    """Hardlink an unchanged artifact from the live tree, or copy it if linking fails."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def build_settings_fingerprint(
+    min_matches: int,
+    encoding: str = "objects",
+    pair_chunk_matches: Optional[int] = None,
+    chart_min_matches: int = CHART_MIN_MATCHES,
+) -> dict:
+    """Describe everything besides match rows that shapes the emitted files."""
+    return {
+        "schema": H2H_SCHEMA_VERSION,
+        "min_matches": min_matches,
+        "encoding": encoding,
+        "pair_chunk_matches": pair_chunk_matches,
+        "chart_min_matches": chart_min_matches,
+        "builder_sha256": file_sha256(Path(__file__).resolve()),
+        "pandas": pd.__version__,
+    }
 
-def main() -> int:
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-    matches_url = os.environ.get("MATCHES_PARQUET_URL", dl.DEFAULT_MATCHES_URL)
-    players_url = os.environ.get("PLAYERS_CSV_URL", dl.DEFAULT_PLAYERS_URL)
-    tournaments_url = os.environ.get("TOURNAMENTS_CSV_URL", dl.DEFAULT_TOURNAMENTS_URL)
-    tournament_metadata_url = os.environ.get(
-        "TOURNAMENT_METADATA_CSV_URL", dl.DEFAULT_TOURNAMENT_METADATA_URL
+def load_incremental_state(
+    state_path: Path,
+    data_dir: Path,
+    settings: dict,
+) -> Optional[dict]:
+    """Return the previous build state if it still describes the live dataset."""
+    if not state_path.exists():
+        return None
+    try:
+        with state_path.open("r", encoding="utf-8") as handle:
+            previous_state = json.load(handle)
+        with (data_dir / "meta.json").open("r", encoding="utf-8") as handle:
+            live_meta = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if previous_state.get("settings") != settings:
+        print("Build settings or schema changed; rebuilding every player file.")
+        return None
+    if previous_state.get("generated_at") != live_meta.get("generated_at"):
+        print("Live dataset does not match the saved build state; rebuilding everything.")
+        return None
+    return previous_state
+
+
+def frontend_stage_type(stage_type: str, stage: str, tournament_name: str) -> str:
+    """Mirror normalizeStageType() and classifyStage() in public/js/utils.js."""
+    text = typeahead_key(stage_type).replace("_", "-")
+    if text == "playoff":
+        return "playoff"
+    if text in {"round-robin", "round robin"}:
+        return "round-robin"
+    stage_text = typeahead_key(stage)
+    if "team" in stage_text or "team" in typeahead_key(tournament_name):
+        return "round-robin"
+    if not stage_text:
+        return "other"
+    if any(marker in stage_text for marker in PLAYOFF_STAGE_MARKERS):
+        return "playoff"
+    if any(marker in stage_text for marker in ROUND_ROBIN_STAGE_MARKERS):
+        return "round-robin"
+    return "other"
+
+
+def build_playoff_series(matches: pd.DataFrame) -> Dict[Tuple[int, int], list[dict]]:
+    """Reconstruct playoff series per pair like public/js/series.js; ``matches`` in pair order."""
+    stage_columns = ["stage_type", "stage", "tournament_name"]
+    combinations = matches[stage_columns].drop_duplicates()
+    playoff_combinations = combinations.loc[
+        [
+            frontend_stage_type(*combination) == "playoff"
+            for combination in combinations.itertuples(index=False)
+        ]
+    ]
+    positions = np.flatnonzero(
+        pd.MultiIndex.from_frame(matches[stage_columns]).isin(
+            pd.MultiIndex.from_frame(playoff_combinations)
+        )
     )
-    ranking_url = os.environ.get("RANKING_TXT_URL", dl.DEFAULT_RANKING_URL)
-    extra_matches_url = os.environ.get("EXTRA_MATCHES_URL", EXTRA_MATCHES_URL).strip()
-    require_rankings = os.environ.get("REQUIRE_RANKINGS", "0").strip().casefold() in {
-        "1",
-        "true",
-        "yes",
+    if not len(positions):
+        return {}
+    playoff = matches.iloc[positions]
+
+    tournament_names = pd.Series(
+        map_unique_values(playoff["tournament_name"], lambda name: html.unescape(name or "")),
+        index=playoff.index,
+    ).replace("", "unknown")
+    tournament_scope = np.where(
+        playoff["tournament_id"].notna(),
+        "id:" + playoff["tournament_id"].astype("Int64").astype(str),
+        np.where(
+            playoff["source_tournament_id"] != "",
+            "source:" + playoff["source"] + ":" + playoff["source_tournament_id"],
+            "name:"
+            + tournament_names
+            + ":year:"
+            + playoff["date"].str.slice(0, 4).fillna(""),
+        ),
+    )
+    series_codes = (
+        pd.DataFrame(
+            {
+                "id1": playoff["id1"].to_numpy(),
+                "id2": playoff["id2"].to_numpy(),
+                "tournament_scope": tournament_scope,
+                "stage_id": playoff["stage_id"].to_numpy(),
+                "source_stage_id": playoff["source_stage_id"].to_numpy(),
+                "stage_sequence": playoff["stage_sequence"].to_numpy(),
+                "stage": map_unique_values(playoff["stage"], typeahead_key),
+                "round_number": playoff["round_number"].to_numpy(),
+            }
+        )
+        .groupby(
+            [
+                "id1",
+                "id2",
+                "tournament_scope",
+                "stage_id",
+                "source_stage_id",
+                "stage_sequence",
+                "stage",
+                "round_number",
+            ],
+            sort=False,
+            dropna=False,
+        )
+        .ngroup()
+        .to_numpy()
+    )
+
+    # Undated games sort as timestamp 0, like Date.parse() failures in the browser.
+    timestamps = np.where(
+        playoff["date_dt"].isna().to_numpy(),
+        0,
+        playoff["date_dt"].to_numpy(dtype="datetime64[ns]").astype("int64"),
+    )
+    stage_sequences, round_numbers, game_numbers = (
+        playoff[column].to_numpy(dtype="int64", na_value=0)
+        for column in ("stage_sequence", "round_number", "playoff_game_number")
+    )
+    order = np.lexsort((game_numbers, round_numbers, stage_sequences, timestamps, series_codes))
+    sorted_codes = series_codes[order]
+    series_starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_codes)) + 1))
+    game_counts = np.diff(np.append(series_starts, len(order)))
+
+    goals_id1 = playoff["goals_id1"].to_numpy(dtype="int64")[order]
+    goals_id2 = playoff["goals_id2"].to_numpy(dtype="int64")[order]
+    overtime = playoff["overtime"].to_numpy(dtype=bool)[order]
+    wins_id1 = np.add.reduceat((goals_id1 > goals_id2).astype("int64"), series_starts)
+    wins_id2 = np.add.reduceat((goals_id1 < goals_id2).astype("int64"), series_starts)
+    draws = game_counts - wins_id1 - wins_id2
+    series_goals_id1 = np.add.reduceat(goals_id1, series_starts)
+    series_goals_id2 = np.add.reduceat(goals_id2, series_starts)
+    overtime_games = np.add.reduceat(overtime.astype("int64"), series_starts)
+    odd_counts = game_counts + (game_counts % 2 == 0)
+    best_of = np.where(
+        wins_id1 != wins_id2,
+        np.maximum(np.maximum(wins_id1, wins_id2) * 2 - 1, odd_counts),
+        np.where(game_counts > 1, odd_counts, 1),
+    )
+
+    id1_values = matches["id1"].to_numpy(dtype="int64", copy=False)
+    id2_values = matches["id2"].to_numpy(dtype="int64", copy=False)
+    pair_starts, pair_ends = pair_group_bounds(id1_values, id2_values)
+    game_offsets = positions[order] - np.repeat(pair_starts, pair_ends - pair_starts)[
+        positions[order]
+    ]
+    # Series are listed by first game, then stage sequence, keeping the order
+    # in which they first appear for ties.
+    first_appearance = np.minimum.reduceat(order, series_starts)
+    series_order = np.lexsort(
+        (
+            first_appearance,
+            stage_sequences[order][series_starts],
+            timestamps[order][series_starts],
+        )
+    )
+
+    series_by_pair: Dict[Tuple[int, int], list[dict]] = {}
+    first_positions = positions[order][series_starts]
+    game_lists = np.split(game_offsets, series_starts[1:])
+    for index in series_order.tolist():
+        pair_key = (
+            int(id1_values[first_positions[index]]),
+            int(id2_values[first_positions[index]]),
+        )
+        wins_player = int(wins_id1[index])
+        wins_opponent = int(wins_id2[index])
+        if wins_player == wins_opponent:
+            result = "D"
+        else:
+            result = "W" if wins_player > wins_opponent else "L"
+        series_by_pair.setdefault(pair_key, []).append(
+            {
+                "games": game_lists[index].tolist(),
+                "result": result,
+                "wins_player": wins_player,
+                "wins_opponent": wins_opponent,
+                "draws": int(draws[index]),
+                "goals_for_player": int(series_goals_id1[index]),
+                "goals_for_opponent": int(series_goals_id2[index]),
+                "overtime_games": int(overtime_games[index]),
+                "best_of": int(best_of[index]),
+            }
+        )
+    return series_by_pair
+
+
+def opponent_series(series: list[dict]) -> list[dict]:
+    """Flip id1-perspective series records to the other player's perspective."""
+    return [
+        {
+            **record,
+            "result": {"W": "L", "L": "W"}.get(record["result"], record["result"]),
+            "wins_player": record["wins_opponent"],
+            "wins_opponent": record["wins_player"],
+            "goals_for_player": record["goals_for_opponent"],
+            "goals_for_opponent": record["goals_for_player"],
+        }
+        for record in series
+    ]
+
+
+def build_pair_charts(
+    matches: pd.DataFrame, min_matches: int = CHART_MIN_MATCHES
+) -> Dict[Tuple[int, int], dict]:
+    """Precompute id1's chart timelines for pairs with at least ``min_matches`` matches."""
+    id1_values = matches["id1"].to_numpy(dtype="int64", copy=False)
+    id2_values = matches["id2"].to_numpy(dtype="int64", copy=False)
+    pair_starts, pair_ends = pair_group_bounds(id1_values, id2_values)
+    charted = (pair_ends - pair_starts) >= min_matches
+    if not charted.any():
+        return {}
+    pair_starts, pair_ends = pair_starts[charted], pair_ends[charted]
+    positions = np.concatenate(
+        [np.arange(start, end) for start, end in zip(pair_starts.tolist(), pair_ends.tolist())]
+    )
+    pair_index = np.repeat(np.arange(len(pair_starts)), pair_ends - pair_starts)
+    frame = matches.iloc[positions]
+
+    def text(column: str) -> pd.Series:
+        return frame[column].astype("string").fillna("")
+
+    # getFormItemIdentity() in matchup mode, where there is no opponent_id.
+    identity = (
+        text("source")
+        + "|"
+        + text("source_tournament_id")
+        + "|"
+        + text("source_stage_id")
+        + "|"
+        + text("source_match_id")
+        + "||"
+        + text("date")
+        + "|"
+        + text("stage_sequence")
+        + "|"
+        + text("round_number")
+        + "|"
+        + text("playoff_game_number")
+        + "|"
+        + text("goals_id1")
+        + "|"
+        + text("goals_id2")
+    )
+    _, identity_codes = np.unique(identity.to_numpy(dtype=object), return_inverse=True)
+    timestamps = np.where(
+        frame["date_dt"].isna().to_numpy(),
+        0,
+        frame["date_dt"].to_numpy(dtype="datetime64[ns]").astype("int64"),
+    )
+    source_match_numbers = (
+        pd.to_numeric(frame["source_match_id"], errors="coerce").fillna(0).to_numpy()
+    )
+    order = np.lexsort(
+        (
+            identity_codes,
+            source_match_numbers,
+            *(
+                frame[column].to_numpy(dtype="int64", na_value=0)
+                for column in ("playoff_game_number", "round_number", "stage_sequence")
+            ),
+            timestamps,
+            pair_index,
+        )
+    )
+
+    goals_id1 = frame["goals_id1"].to_numpy(dtype="int64")
+    goals_id2 = frame["goals_id2"].to_numpy(dtype="int64")
+    outcomes = np.sign(goals_id1 - goals_id2)[order]
+    bounds = np.concatenate(([0], np.cumsum(pair_ends - pair_starts)))
+    cumulative_wins = np.cumsum(outcomes > 0)
+    cumulative_draws = np.cumsum(outcomes == 0)
+    offsets = positions[order] - np.repeat(pair_starts, pair_ends - pair_starts)
+
+    years = frame["date"].str.slice(0, 4)
+    yearly = (
+        pd.DataFrame(
+            {
+                "pair": pair_index,
+                "year": years.to_numpy(dtype=object),
+                "goals_for": goals_id1,
+                "goals_against": goals_id2,
+            }
+        )
+        .dropna(subset=["year"])
+        .groupby(["pair", "year"], sort=True)
+        .agg(
+            goals_for=("goals_for", "sum"),
+            goals_against=("goals_against", "sum"),
+            games=("goals_for", "size"),
+        )
+        .reset_index()
+    )
+    years_by_pair: Dict[int, list] = {}
+    for row in yearly.itertuples(index=False):
+        years_by_pair.setdefault(int(row.pair), []).append(
+            [row.year, int(row.goals_for), int(row.goals_against), int(row.games)]
+        )
+
+    charts: Dict[Tuple[int, int], dict] = {}
+    for index, (start, end) in enumerate(zip(bounds[:-1].tolist(), bounds[1:].tolist())):
+        wins_before = int(cumulative_wins[start - 1]) if start else 0
+        draws_before = int(cumulative_draws[start - 1]) if start else 0
+        pair_outcomes = outcomes[start:end]
+        changes = np.flatnonzero(pair_outcomes != pair_outcomes[-1])
+        streak_length = len(pair_outcomes) - (int(changes[-1]) + 1 if len(changes) else 0)
+        first = int(pair_starts[index])
+        charts[(int(id1_values[first]), int(id2_values[first]))] = {
+            "order": offsets[start:end].tolist(),
+            "wins": (cumulative_wins[start:end] - wins_before).tolist(),
+            "draws": (cumulative_draws[start:end] - draws_before).tolist(),
+            "years": years_by_pair.get(index, []),
+            "streak": {
+                "result": {1: "W", 0: "D", -1: "L"}[int(pair_outcomes[-1])],
+                "length": streak_length,
+            },
+        }
+    return charts
+
+
+def opponent_chart(chart: dict) -> dict:
+    """Flip an id1-perspective chart record to the other player's perspective."""
+    return {
+        "order": chart["order"],
+        "wins": [
+            index + 1 - wins - draws
+            for index, (wins, draws) in enumerate(zip(chart["wins"], chart["draws"]))
+        ],
+        "draws": chart["draws"],
+        "years": [[year, against, goals, games] for year, goals, against, games in chart["years"]],
+        "streak": {
+            **chart["streak"],
+            "result": {"W": "L", "L": "W"}.get(chart["streak"]["result"], "D"),
+        },
     }
-    require_tournament_metadata = os.environ.get(
-        "REQUIRE_TOURNAMENT_METADATA", "0"
-    ).strip().casefold() in {"1", "true", "yes"}
-    skip_downloads = os.environ.get("SKIP_DOWNLOADS", "0").strip().casefold() in {
-        "1",
-        "true",
-        "yes",
+
+
+def rivalry_pair_rows(matches: pd.DataFrame, player_names: Dict[int, str]) -> list[tuple]:
+    """Aggregate published pairs into (id1, id2, matches, wins1, draws, wins2, first, last)."""
+    outcomes = np.sign(
+        matches["goals_id1"].to_numpy(dtype="int64") - matches["goals_id2"].to_numpy(dtype="int64")
+    )
+    pairs = (
+        matches.assign(wins1=outcomes > 0, draws=outcomes == 0, wins2=outcomes < 0)
+        .groupby(["id1", "id2"], sort=True)
+        .agg(
+            matches=("wins1", "size"),
+            wins1=("wins1", "sum"),
+            draws=("draws", "sum"),
+            wins2=("wins2", "sum"),
+            first_date=("date_dt", "min"),
+            last_date=("date_dt", "max"),
+        )
+        .reset_index()
+    )
+    pairs = pairs[pairs["id1"].isin(player_names) & pairs["id2"].isin(player_names)]
+    return [
+        (
+            int(row.id1),
+            int(row.id2),
+            int(row.matches),
+            int(row.wins1),
+            int(row.draws),
+            int(row.wins2),
+            None if pd.isna(row.first_date) else row.first_date.date(),
+            None if pd.isna(row.last_date) else row.last_date.date(),
+        )
+        for row in pairs.itertuples(index=False)
+    ]
+
+
+def select_rivalry_rows(rows: list[tuple], size: int, min_matches: int) -> Dict[str, list]:
+    """Pick the top ``size`` rows of every board."""
+    regulars = [row for row in rows if row[2] >= min_matches]
+    dated = [row for row in regulars if row[6] is not None]
+
+    def tiebreak(row: tuple) -> tuple:
+        return (row[2], -row[0], -row[1])
+
+    return {
+        "most_played": heapq.nlargest(size, rows, key=tiebreak),
+        # Smallest gap between the two win counts, as a share of all meetings.
+        "most_even": heapq.nsmallest(
+            size,
+            regulars,
+            key=lambda row: (abs(row[3] - row[5]) / row[2], *(-value for value in tiebreak(row))),
+        ),
+        "longest_span": heapq.nlargest(
+            size, dated, key=lambda row: ((row[7] - row[6]).days, *tiebreak(row))
+        ),
+        "recent_heavy": heapq.nlargest(size, dated, key=lambda row: (row[7], *tiebreak(row))),
     }
-    try:
-        min_matches = int(os.environ.get("MIN_MATCHES", "50"))
-    except ValueError as exc:
-        raise ValueError("MIN_MATCHES must be an integer.") from exc
-    if min_matches < 1:
-        raise ValueError("MIN_MATCHES must be at least 1.")
-    try:
-        min_ranking_rows = int(os.environ.get("MIN_RANKING_ROWS", "1"))
-        min_tournament_levels = int(os.environ.get("MIN_TOURNAMENT_LEVELS", "1"))
-    except ValueError as exc:
-        raise ValueError(
-            "MIN_RANKING_ROWS and MIN_TOURNAMENT_LEVELS must be integers."
-        ) from exc
-    max_ranking_age_raw = os.environ.get("MAX_RANKING_AGE_DAYS", "").strip()
-    try:
-        max_ranking_age_days = int(max_ranking_age_raw) if max_ranking_age_raw else None
-    except ValueError as exc:
-        raise ValueError("MAX_RANKING_AGE_DAYS must be an integer.") from exc
-    if min_ranking_rows < 1 or min_tournament_levels < 1:
-        raise ValueError("Ranking and tournament metadata minimums must be at least 1.")
-    if max_ranking_age_days is not None and max_ranking_age_days < 0:
-        raise ValueError("MAX_RANKING_AGE_DAYS cannot be negative.")
-    try:
-        max_main_rejection_rate = float(
-            os.environ.get("MAX_MAIN_REJECTION_RATE", "1")
+
+
+def build_rivalry_leaderboards(
+    matches: Optional[pd.DataFrame],
+    player_names: Dict[int, str],
+    size: int = LEADERBOARD_SIZE,
+    min_matches: int = LEADERBOARD_MIN_MATCHES,
+    pair_rows: Optional[list[tuple]] = None,
+) -> dict:
+    """Rank published pairs, or the given ``pair_rows``, into the rivalry boards."""
+    if pair_rows is None:
+        pair_rows = rivalry_pair_rows(matches, player_names)
+    boards = select_rivalry_rows(pair_rows, size, min_matches)
+
+    def entry(row: tuple) -> dict:
+        id1, id2, total, wins1, draws, wins2, first_date, last_date = row
+        return {
+            "ids": [id1, id2],
+            "names": [player_names[id1], player_names[id2]],
+            "matches": total,
+            "wins": [wins1, wins2],
+            "draws": draws,
+            "first_date": first_date.isoformat() if first_date else None,
+            "last_date": last_date.isoformat() if last_date else None,
+        }
+
+    return {
+        "version": 1,
+        "size": size,
+        "min_matches": min_matches,
+        "boards": {name: [entry(row) for row in board] for name, board in boards.items()},
+    }
+
+
+def build_career_aggregates(
+    matches: pd.DataFrame,
+    player_ids: Iterable[int],
+    form_length: int = CAREER_FORM_LENGTH,
+    career_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, dict]:
+    """Career totals of the published players, or only ``career_ids``, ordered like form.js."""
+    player_ids = list(player_ids)
+    career_ids = player_ids if career_ids is None else list(career_ids)
+    published = matches["id1"].isin(player_ids) & matches["id2"].isin(player_ids)
+    frame = matches.loc[published]
+    order_columns = {
+        "ts": frame["date_dt"].to_numpy(dtype="datetime64[ns]").astype("int64"),
+        **{
+            column: frame[column].to_numpy(dtype="int64", na_value=0)
+            for column in ("stage_sequence", "round_number", "playoff_game_number")
+        },
+        "source_match_number": pd.to_numeric(frame["source_match_id"], errors="coerce")
+        .fillna(0)
+        .to_numpy(),
+    }
+    # NaT sorts first, like the zero timestamp undated matches get in the browser.
+    order_columns["ts"] = np.where(
+        frame["date_dt"].isna().to_numpy(), np.iinfo("int64").min, order_columns["ts"]
+    )
+    sides = [
+        pd.DataFrame(
+            {
+                "player": frame[player_column].to_numpy(dtype="int64"),
+                "opponent": frame[opponent_column].to_numpy(dtype="int64"),
+                "goals_for": frame[for_column].to_numpy(dtype="int64"),
+                "goals_against": frame[against_column].to_numpy(dtype="int64"),
+                "overtime": frame["overtime"].to_numpy(dtype=bool),
+                "date": frame["date"].to_numpy(dtype=object),
+                "tournament_id": frame["tournament_id"].to_numpy(dtype="float64", na_value=np.nan),
+                **order_columns,
+            }
         )
-        max_extra_rejection_rate = float(
-            os.environ.get("MAX_EXTRA_REJECTION_RATE", "1")
+        for player_column, opponent_column, for_column, against_column in (
+            ("id1", "id2", "goals_id1", "goals_id2"),
+            ("id2", "id1", "goals_id2", "goals_id1"),
         )
-    except ValueError as exc:
-        raise ValueError("Source rejection-rate limits must be numbers.") from exc
-    if not 0 <= max_main_rejection_rate <= 1 or not 0 <= max_extra_rejection_rate <= 1:
-        raise ValueError("Source rejection-rate limits must be between 0 and 1.")
+    ]
+    if len(career_ids) < len(player_ids):
+        sides = [side.loc[side["player"].isin(career_ids)] for side in sides]
+    results = pd.concat(sides, ignore_index=True).sort_values(
+        ["player", "ts", "stage_sequence", "round_number", "playoff_game_number",
+         "source_match_number"],
+        kind="mergesort",
+    )
+    outcome = np.sign(results["goals_for"] - results["goals_against"])
+    results["result"] = np.select([outcome > 0, outcome < 0], ["W", "L"], "D")
+    results["win"] = outcome > 0
+    results["draw"] = outcome == 0
+    results["loss"] = outcome < 0
+
+    grouped = results.groupby("player", sort=False)
+    totals = grouped.agg(
+        matches=("result", "size"),
+        wins=("win", "sum"),
+        draws=("draw", "sum"),
+        losses=("loss", "sum"),
+        goals_for=("goals_for", "sum"),
+        goals_against=("goals_against", "sum"),
+        overtime_games=("overtime", "sum"),
+        opponents=("opponent", "nunique"),
+        tournaments=("tournament_id", "nunique"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+    )
+    run_starts = (results["result"] != results["result"].shift()) | (
+        results["player"] != results["player"].shift()
+    )
+    run_ids = run_starts.cumsum()
+    run_lengths = run_ids.map(run_ids.value_counts())
+    latest = results.assign(run_length=run_lengths).groupby("player", sort=False).tail(1)
+    streaks = dict(
+        zip(
+            latest["player"].tolist(),
+            zip(latest["result"].tolist(), latest["run_length"].tolist()),
+        )
+    )
+    forms = (
+        grouped.tail(form_length).groupby("player", sort=False)["result"].agg("".join).to_dict()
+    )
+
+    careers: Dict[int, dict] = {}
+    for pid in career_ids:
+        if pid not in totals.index:
+            careers[pid] = {
+                "matches": 0,
+                "wins": 0,
+                "draws": 0,
+                "losses": 0,
+                "win_rate": None,
+                "goals_for": 0,
+                "goals_against": 0,
+                "goal_difference": 0,
+                "overtime_games": 0,
+                "opponents": 0,
+                "tournaments": 0,
+                "first_date": None,
+                "last_date": None,
+                "current_streak": None,
+                "form": "",
+            }
+            continue
+        row = totals.loc[pid]
+        streak_result, streak_length = streaks[pid]
+        careers[pid] = {
+            "matches": int(row["matches"]),
+            "wins": int(row["wins"]),
+            "draws": int(row["draws"]),
+            "losses": int(row["losses"]),
+            "win_rate": round(int(row["wins"]) / int(row["matches"]), 4),
+            "goals_for": int(row["goals_for"]),
+            "goals_against": int(row["goals_against"]),
+            "goal_difference": int(row["goals_for"]) - int(row["goals_against"]),
+            "overtime_games": int(row["overtime_games"]),
+            "opponents": int(row["opponents"]),
+            "tournaments": int(row["tournaments"]),
+            "first_date": row["first_date"] if isinstance(row["first_date"], str) else None,
+            "last_date": row["last_date"] if isinstance(row["last_date"], str) else None,
+            "current_streak": {"result": streak_result, "length": int(streak_length)},
+            "form": forms[pid],
+        }
+    return careers
+
+
+def load_alias_groups(path: Path, published_ids: Iterable[int]) -> list[list[int]]:
+    """Read curated alias groups the way loadPlayers() in public/js/main.js does."""
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    groups = payload if isinstance(payload, list) else None
+    if isinstance(payload, dict) and isinstance(payload.get("groups"), list):
+        groups = payload["groups"]
+    if groups is None:
+        raise ValueError(f"{path} is malformed.")
+
+    published = set(published_ids)
+    grouped: set[int] = set()
+    alias_groups = []
+    for group in groups:
+        ids = group if isinstance(group, list) else (group or {}).get("ids", [])
+        members = set()
+        for value in ids if isinstance(ids, list) else []:
+            try:
+                members.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        members &= published
+        if len(members) < 2:
+            continue
+        if members & grouped:
+            print(f"Skipping overlapping alias group: {','.join(map(str, sorted(members)))}")
+            continue
+        grouped |= members
+        alias_groups.append(sorted(members))
+    return alias_groups
+
+
+def alias_group_file_name(ids: Iterable[int]) -> str:
+    return f"{'-'.join(str(pid) for pid in ids)}.json"
+
+
+def alias_match_key(match: dict, lookup: dict) -> str:
+    """Mirror buildMatchKey() in public/js/data.js for one player-file match entry."""
+    stage = lookup["stages"].get(match.get("stage_ref"), {})
+    tournament = lookup["tournaments"].get(stage.get("tournament_ref"), {})
+    if match.get("source_match_id"):
+        return "|".join(
+            [
+                match.get("source") or "",
+                str(tournament.get("source_tournament_id") or ""),
+                str(stage.get("source_stage_id") or ""),
+                match["source_match_id"],
+            ]
+        )
+    tournament_name = html.unescape(tournament.get("tournament_name") or "")
+    stage_name = html.unescape(stage.get("stage") or "")
+
+    def text(value: object, fallback: str = "") -> str:
+        return fallback if value is None else str(value)
+
+    return "|".join(
+        [
+            text(match.get("date")),
+            text(tournament.get("tournament_id"), tournament_name),
+            text(stage.get("stage_id"), stage_name),
+            frontend_stage_type(stage.get("stage_type") or "", stage_name, tournament_name),
+            text(stage.get("stage_sequence")),
+            text(match.get("round_number")),
+            text(match.get("playoff_game_number")),
+            text(match["goals_for_player"]),
+            text(match["goals_for_opponent"]),
+            "1" if match.get("overtime") else "0",
+        ]
+    )
+
+
+def match_result(match: dict) -> str:
+    """W, D or L for the file owner in one player-file match entry."""
+    if match["goals_for_player"] > match["goals_for_opponent"]:
+        return "W"
+    if match["goals_for_player"] < match["goals_for_opponent"]:
+        return "L"
+    return "D"
+
+
+def merge_opponent_entries(entries: list[dict], lookup: dict) -> dict:
+    """Merge one opponent's entries from several alias members' player files."""
+    seen = set()
+    matches = []
+    for entry in entries:
+        for match in entry["matches"]:
+            key = alias_match_key(match, lookup)
+            if key in seen:
+                continue
+            seen.add(key)
+            matches.append(match)
+
+    tournaments = {}
+    for entry in entries:
+        for tournament in entry["summary"].get("tournaments", []):
+            tournaments.setdefault(tournament["id"], tournament)
+    dated = sorted((match for match in matches if match.get("date")), key=lambda m: m["date"])
+    results = [match_result(match) for match in matches]
+    last_10 = [match_result(match) for match in dated[-10:]]
+    return {
+        "player": entries[0]["player"],
+        "summary": {
+            "total_matches": len(matches),
+            "wins_player": results.count("W"),
+            "wins_opponent": results.count("L"),
+            "draws": results.count("D"),
+            "goals_for_player": sum(match["goals_for_player"] for match in matches),
+            "goals_for_opponent": sum(match["goals_for_opponent"] for match in matches),
+            "overtime_games": sum(1 for match in matches if match.get("overtime")),
+            "first_meeting_date": dated[0]["date"] if dated else None,
+            "last_meeting_date": dated[-1]["date"] if dated else None,
+            "tournaments": sorted(
+                tournaments.values(), key=lambda item: (item["name"].lower(), item["id"])
+            ),
+            "last_10": {
+                "wins": last_10.count("W"),
+                "losses": last_10.count("L"),
+                "draws": last_10.count("D"),
+            },
+        },
+        "matches": matches,
+    }
+
+
+def build_alias_group_files(
+    alias_groups: list[list[int]],
+    player_names: Dict[int, str],
+    lookup: dict,
+    h2h_dir: Path = H2H_DIR,
+    group_dir: Optional[Path] = None,
+    og_dir: Path = OG_H2H_DIR,
+    fsync: bool = True,
+    encoding: str = "objects",
+) -> Dict[str, dict]:
+    """Merge alias members' player files into group files; runs after build_player_files()."""
+    if group_dir is None:
+        group_dir = h2h_dir.parent / "groups"
+    if group_dir.exists():
+        shutil.rmtree(group_dir)
+    group_dir.mkdir(parents=True, exist_ok=True)
+
+    group_of = {pid: tuple(group) for group in alias_groups for pid in group}
+    output_files: Dict[str, dict] = {}
+    og_records: Dict[Tuple[int, int], list] = {}
+    for group in alias_groups:
+        members = set(group)
+        entries_by_opponent: Dict[int, list] = {}
+        played: set[Tuple[int, int]] = set()
+        for pid in group:
+            with (h2h_dir / f"{pid}.json").open("r", encoding="utf-8") as handle:
+                member_payload = decode_columnar_payload(json.load(handle))
+            for opponent_id, entry in member_payload["opponents"].items():
+                played.add((pid, int(opponent_id)))
+                if int(opponent_id) not in members:
+                    entries_by_opponent.setdefault(int(opponent_id), []).append(entry)
+        payload = {
+            "player": {"id": group[0], "name": player_names[group[0]], "ids": group},
+            "opponents": {
+                str(opponent_id): merge_opponent_entries(entries, lookup)
+                for opponent_id, entries in sorted(entries_by_opponent.items())
+            },
+        }
+        relative_path = f"{group_dir.name}/{alias_group_file_name(group)}"
+        output_files[relative_path] = {
+            **write_json(
+                h2h_dir.parent / relative_path,
+                encode_columnar_payload(payload) if encoding == "columnar" else payload,
+                fsync,
+            ),
+            **player_file_counts(payload),
+        }
+
+        # Like buildGroupMatches(), an aliased opponent's members are merged too.
+        identities: Dict[tuple, dict] = {}
+        for opponent_id, opponent in payload["opponents"].items():
+            identity = identities.setdefault(
+                group_of.get(int(opponent_id), (int(opponent_id),)), {}
+            )
+            for match in opponent["matches"]:
+                identity.setdefault(alias_match_key(match, lookup), match)
+        for opponent_group, merged in identities.items():
+            results = [match_result(match) for match in merged.values()]
+            wins, draws, losses = results.count("W"), results.count("D"), results.count("L")
+            for pid in group:
+                for opponent_id in opponent_group:
+                    # Only pairs that met have a record, so share links to others stay rejected.
+                    if (pid, opponent_id) not in played:
+                        continue
+                    id1, id2 = min(pid, opponent_id), max(pid, opponent_id)
+                    og_records[(id1, id2)] = [
+                        player_names[id1],
+                        player_names[id2],
+                        len(results),
+                        *((wins, draws, losses) if id1 == pid else (losses, draws, wins)),
+                    ]
+
+    records_by_shard: Dict[int, dict] = {}
+    for (id1, id2), record in og_records.items():
+        records_by_shard.setdefault(og_shard_index(id1, id2), {})[f"{id1}-{id2}"] = record
+    for index, records in sorted(records_by_shard.items()):
+        with (og_dir / og_shard_name(index)).open("r", encoding="utf-8") as handle:
+            pairs = json.load(handle)["pairs"]
+        pairs.update(records)
+        output_files[f"{og_dir.name}/{og_shard_name(index)}"] = write_og_shard(
+            og_dir, index, pairs, fsync
+        )
+    return output_files
+
+
+def prepare_player_matches(
+    matches: pd.DataFrame,
+    player_ids: Iterable[int],
+    rankings: Optional[PlayerRankings],
+    ratings: Optional[PlayerRatings],
+) -> Dict[int, dict]:
+    """Add the columns player files read; return the career extras of ``player_ids``."""
+    player_ids = set(player_ids)
+    if "tournament_level" not in matches:
+        matches["tournament_level"] = None
+    career_extras: Dict[int, dict] = {}
+    if rankings is not None:
+        add_match_ranks(matches, rankings)
+        for pid, history in player_ranking_histories(rankings, player_ids).items():
+            career_extras.setdefault(pid, {})["ranking_history"] = history
+    if ratings is not None:
+        add_match_ratings(matches, ratings)
+        for pid, history in ratings.histories.items():
+            if pid in player_ids:
+                career_extras.setdefault(pid, {})["rating_history"] = history
+    for column in ("rank_id1", "rank_id2", "rating_id1", "rating_id2"):
+        if column not in matches:
+            matches[column] = pd.array([pd.NA] * len(matches), dtype="Int64")
+    return career_extras
+
+
+class PairColumns(NamedTuple):
+    """The match columns a pair's opponent entries are built from."""
+
+    player1_id: np.ndarray
+    player1_name: np.ndarray
+    player2_name: np.ndarray
+    date: np.ndarray
+    stage_ref: np.ndarray
+    tournament_id: np.ndarray
+    tournament_name: np.ndarray
+    tournament_level: np.ndarray
+    round_number: np.ndarray
+    playoff_game_number: np.ndarray
+    goals_id1: np.ndarray
+    goals_id2: np.ndarray
+    overtime: np.ndarray
+    source: np.ndarray
+    source_url: np.ndarray
+    result_url: np.ndarray
+    source_match_id: np.ndarray
+    rank_id1: np.ndarray
+    rank_id2: np.ndarray
+    rating_id1: np.ndarray
+    rating_id2: np.ndarray
+
+
+def pair_columns(matches: pd.DataFrame) -> PairColumns:
+    stage_refs = (
+        matches["stage_ref"] if "stage_ref" in matches else match_lookup_frame(matches)["stage_ref"]
+    )
+    return PairColumns(
+        player1_id=matches["player1_id"].to_numpy(dtype="int64", copy=False),
+        player1_name=matches["player1_name"].to_numpy(dtype=object, copy=False),
+        player2_name=matches["player2_name"].to_numpy(dtype=object, copy=False),
+        date=matches["date"].to_numpy(dtype=object, copy=False),
+        stage_ref=stage_refs.to_numpy(dtype=object, copy=False),
+        tournament_id=matches["tournament_id"].to_numpy(dtype="int64", na_value=-1, copy=False),
+        tournament_name=matches["tournament_name"].to_numpy(dtype=object, copy=False),
+        tournament_level=matches["tournament_level"].to_numpy(dtype=object, copy=False),
+        round_number=matches["round_number"].to_numpy(dtype="int64", na_value=-1, copy=False),
+        playoff_game_number=matches["playoff_game_number"].to_numpy(
+            dtype="int64", na_value=-1, copy=False
+        ),
+        goals_id1=matches["goals_id1"].to_numpy(dtype="int64", copy=False),
+        goals_id2=matches["goals_id2"].to_numpy(dtype="int64", copy=False),
+        overtime=matches["overtime"].to_numpy(dtype=bool, copy=False),
+        source=matches["source"].to_numpy(dtype=object, copy=False),
+        source_url=matches["source_url"].to_numpy(dtype=object, copy=False),
+        result_url=matches["result_url"].to_numpy(dtype=object, copy=False),
+        source_match_id=matches["source_match_id"].to_numpy(dtype=object, copy=False),
+        rank_id1=matches["rank_id1"].to_numpy(dtype="int64", na_value=-1),
+        rank_id2=matches["rank_id2"].to_numpy(dtype="int64", na_value=-1),
+        rating_id1=matches["rating_id1"].to_numpy(dtype="int64", na_value=-1),
+        rating_id2=matches["rating_id2"].to_numpy(dtype="int64", na_value=-1),
+    )
+
+
+def pair_opponent_entry(
+    columns: PairColumns,
+    start: int,
+    end: int,
+    id1_int: int,
+    id2_int: int,
+    player_names: Dict[int, str],
+    series: list[dict],
+    chart: Optional[dict],
+) -> Tuple[str, dict]:
+    """id1's display name and its opponent entry for the pair in rows ``start:end``."""
+    first_player1_id = int(columns.player1_id[start])
+    name1 = player_names.get(id1_int)
+    name2 = player_names.get(id2_int)
+    if not name1:
+        if first_player1_id == id1_int:
+            name1 = columns.player1_name[start]
+        else:
+            name1 = columns.player2_name[start]
+    if not name2:
+        if first_player1_id == id2_int:
+            name2 = columns.player1_name[start]
+        else:
+            name2 = columns.player2_name[start]
+
+    total_matches = 0
+    wins_id1 = 0
+    wins_id2 = 0
+    draws = 0
+    goals_for_id1 = 0
+    goals_for_id2 = 0
+    overtime_games = 0
+    first_meeting_date = None
+    last_meeting_date = None
+    tournaments: Dict[int, dict] = {}
+    last10 = deque(maxlen=10)
+    matches_id1 = []
+
+    for idx in range(start, end):
+        date_raw = columns.date[idx]
+        date_value = date_raw if isinstance(date_raw, str) else None
+        tournament_id_raw = int(columns.tournament_id[idx])
+        tournament_id = None if tournament_id_raw == -1 else tournament_id_raw
+        tournament_level = normalize_tournament_level(columns.tournament_level[idx])
+        round_number_raw = int(columns.round_number[idx])
+        round_number = None if round_number_raw == -1 else round_number_raw
+        playoff_game_number_raw = int(columns.playoff_game_number[idx])
+        playoff_game_number = (
+            None if playoff_game_number_raw == -1 else playoff_game_number_raw
+        )
+        goals_id1 = int(columns.goals_id1[idx])
+        goals_id2 = int(columns.goals_id2[idx])
+        overtime = bool(columns.overtime[idx])
+
+        matches_id1.append(
+            {
+                "date": date_value,
+                "stage_ref": columns.stage_ref[idx],
+                "round_number": round_number,
+                "playoff_game_number": playoff_game_number,
+                "goals_for_player": goals_id1,
+                "goals_for_opponent": goals_id2,
+                "overtime": overtime,
+                "source": clean_optional_string(columns.source[idx]),
+                "source_url": clean_optional_string(columns.source_url[idx]),
+                "result_url": clean_optional_string(columns.result_url[idx]),
+                "source_match_id": clean_optional_string(columns.source_match_id[idx]),
+            }
+        )
+
+        total_matches += 1
+        goals_for_id1 += goals_id1
+        goals_for_id2 += goals_id2
+
+        if goals_id1 > goals_id2:
+            wins_id1 += 1
+            result_marker = "W"
+        elif goals_id1 < goals_id2:
+            wins_id2 += 1
+            result_marker = "L"
+        else:
+            draws += 1
+            result_marker = "D"
+
+        if overtime:
+            overtime_games += 1
+
+        if date_value:
+            last10.append(result_marker)
+            if first_meeting_date is None:
+                first_meeting_date = date_value
+            last_meeting_date = date_value
+
+        if tournament_id is not None:
+            tournaments[tournament_id] = {
+                "name": columns.tournament_name[idx],
+                "level": tournament_level,
+            }
+
+    tournaments_list = [
+        {"id": tid, "name": item["name"], "level": item.get("level")}
+        for tid, item in tournaments.items()
+    ]
+    tournaments_list.sort(key=lambda x: (x["name"].lower(), x["id"]))
+
+    entry = {
+        "player": {"id": id2_int, "name": name2},
+        "summary": {
+            "total_matches": total_matches,
+            "wins_player": wins_id1,
+            "wins_opponent": wins_id2,
+            "draws": draws,
+            "goals_for_player": goals_for_id1,
+            "goals_for_opponent": goals_for_id2,
+            "overtime_games": overtime_games,
+            "first_meeting_date": first_meeting_date,
+            "last_meeting_date": last_meeting_date,
+            "tournaments": tournaments_list,
+            "last_10": {
+                "wins": sum(1 for r in last10 if r == "W"),
+                "losses": sum(1 for r in last10 if r == "L"),
+                "draws": sum(1 for r in last10 if r == "D"),
+            },
+        },
+        "matches": matches_id1,
+    }
+    if series:
+        entry["series"] = series
+    if chart:
+        entry["chart"] = chart
+    for field, values_id1, values_id2 in (
+        ("ranks", columns.rank_id1, columns.rank_id2),
+        ("ratings", columns.rating_id1, columns.rating_id2),
+    ):
+        values = pair_side_values(values_id1[start:end], values_id2[start:end])
+        if values:
+            entry[field] = values
+    return name1, entry
+
+
+def mirrored_opponent_entry(entry: dict, player: dict) -> dict:
+    """The other side's opponent entry, against ``player``."""
+    summary = entry["summary"]
+    mirrored = {
+        "player": player,
+        "summary": {
+            **summary,
+            "wins_player": summary["wins_opponent"],
+            "wins_opponent": summary["wins_player"],
+            "goals_for_player": summary["goals_for_opponent"],
+            "goals_for_opponent": summary["goals_for_player"],
+            "last_10": {
+                "wins": summary["last_10"]["losses"],
+                "losses": summary["last_10"]["wins"],
+                "draws": summary["last_10"]["draws"],
+            },
+        },
+        "matches": [
+            {
+                **match,
+                "goals_for_player": match["goals_for_opponent"],
+                "goals_for_opponent": match["goals_for_player"],
+            }
+            for match in entry["matches"]
+        ],
+    }
+    if "series" in entry:
+        mirrored["series"] = opponent_series(entry["series"])
+    if "chart" in entry:
+        mirrored["chart"] = opponent_chart(entry["chart"])
+    for field in ("ranks", "ratings"):
+        if field in entry:
+            mirrored[field] = {
+                "player": entry[field]["opponent"],
+                "opponent": entry[field]["player"],
+            }
+    return mirrored
+
+
+class PlayerFileWriter:
+    """Player payloads of one build and the files written for them."""
+
+    def __init__(
+        self,
+        player_names: Dict[int, str],
+        h2h_dir: Path,
+        fsync: bool,
+        previous_state: Optional[dict],
+        previous_dir: Path,
+        encoding: str,
+        summary_dir: Optional[Path],
+        pair_chunk_matches: Optional[int],
+        career_dir: Optional[Path],
+    ) -> None:
+        self.player_names = player_names
+        self.h2h_dir = h2h_dir
+        self.summary_dir = summary_dir or h2h_dir.parent / "summary"
+        self.career_dir = career_dir or h2h_dir.parent / "career"
+        self.fsync = fsync
+        self.encoding = encoding
+        self.pair_chunk_matches = pair_chunk_matches
+        self.previous_dir = previous_dir
+        self.previous_pairs = (previous_state or {}).get("pairs", {})
+        self.previous_players = (previous_state or {}).get("players", {})
+        self.previous_files = load_output_manifest(previous_dir) if previous_state else {}
+        self.payloads: Dict[int, dict] = {
+            pid: {"player": {"id": pid, "name": name}, "opponents": {}}
+            for pid, name in player_names.items()
+        }
+        self.files: Dict[str, dict] = {}
+        self.rebuild_ids: set[int] = set()
+        self.linked_ids: set[int] = set()
+        self.previous_opponents: Dict[int, dict] = {}
+
+    def link_previous(self, relative_paths: list[str]) -> bool:
+        """Link unchanged artifacts from the live tree if every one of them exists."""
+        if not all((self.previous_dir / path).exists() for path in relative_paths):
+            return False
+        for path in relative_paths:
+            link_or_copy(self.previous_dir / path, self.h2h_dir.parent / path)
+            self.files[path] = self.previous_files.get(path) or describe_output_file(
+                self.previous_dir / path
+            )
+        return True
+
+    def reuse_players(self, player_hashes: Dict[int, str]) -> None:
+        """Link unchanged player files and load the previous opponents of the others."""
+        for pid, player_hash in player_hashes.items():
+            previous_h2h = self.previous_dir / self.h2h_dir.name / f"{pid}.json"
+            if str(pid) in self.previous_players and previous_h2h.exists():
+                if self.previous_players[str(pid)] == player_hash and self.link_previous(
+                    [
+                        f"{output_dir.name}/{pid}.json"
+                        for output_dir in (self.h2h_dir, self.summary_dir, self.career_dir)
+                    ]
+                ):
+                    self.linked_ids.add(pid)
+                    continue
+                with previous_h2h.open("r", encoding="utf-8") as handle:
+                    previous_payload = decode_columnar_payload(json.load(handle))
+                self.previous_opponents[pid] = previous_payload.get("opponents", {})
+            self.rebuild_ids.add(pid)
+
+    def reuse_opponent_entries(self, id1_int: int, id2_int: int, pair_hash: str) -> bool:
+        """Copy unchanged opponent entries for dirty players; report if all were reused."""
+        reused_all = True
+        for player_id, opponent_id in ((id1_int, id2_int), (id2_int, id1_int)):
+            if player_id not in self.rebuild_ids:
+                continue
+            previous_entry = None
+            if self.previous_pairs.get(f"{id1_int}-{id2_int}") == pair_hash:
+                previous_entry = self.previous_opponents.get(player_id, {}).get(str(opponent_id))
+            if previous_entry is None:
+                reused_all = False
+            else:
+                self.payloads[player_id]["opponents"][str(opponent_id)] = previous_entry
+        return reused_all
+
+    def previous_pair_paths(self, id1_int: int, id2_int: int) -> list[str]:
+        """List a pair's previous file and chunk files, as recorded by the manifest."""
+        pair_path = f"{self.h2h_dir.name}/{id1_int}/{id2_int}.json"
+        entry = self.previous_files.get(pair_path)
+        if entry is not None:
+            chunk_count = int(entry.get("chunks", 0))
+        elif (self.previous_dir / pair_path).exists():
+            with (self.previous_dir / pair_path).open("r", encoding="utf-8") as handle:
+                chunk_count = len(json.load(handle).get("chunks", []))
+        else:
+            return [pair_path]
+        return [pair_path] + [
+            f"{self.h2h_dir.name}/{id1_int}/{id2_int}.{chunk}.json"
+            for chunk in range(1, chunk_count + 1)
+        ]
+
+    def write_pair_file(self, id1_int: int, name1: str, entry: dict) -> None:
+        id2_int = entry["player"]["id"]
+        pair_header = {
+            "player1": {"id": id1_int, "name": name1},
+            "player2": entry["player"],
+            "summary": entry["summary"],
+        }
+        for field in ("series", "chart", "ranks", "ratings"):
+            if field in entry:
+                pair_header[field] = entry[field]
+        matches_id1 = entry["matches"]
+        pair_path = f"{self.h2h_dir.name}/{id1_int}/{id2_int}.json"
+        chunk_paths = []
+        if len(matches_id1) > self.pair_chunk_matches:
+            for chunk_start in range(0, len(matches_id1), self.pair_chunk_matches):
+                chunk_path = (
+                    f"{self.h2h_dir.name}/{id1_int}/{id2_int}.{len(chunk_paths) + 1}.json"
+                )
+                chunk_matches = matches_id1[chunk_start : chunk_start + self.pair_chunk_matches]
+                self.files[chunk_path] = {
+                    **write_json(
+                        self.h2h_dir.parent / chunk_path, {"matches": chunk_matches}, self.fsync
+                    ),
+                    "matches": len(chunk_matches),
+                }
+                chunk_paths.append(chunk_path)
+            pair_payload = {**pair_header, "chunks": chunk_paths}
+        else:
+            pair_payload = {**pair_header, "matches": matches_id1}
+        self.files[pair_path] = {
+            **write_json(self.h2h_dir.parent / pair_path, pair_payload, self.fsync),
+            "matches": entry["summary"]["total_matches"],
+            "chunks": len(chunk_paths),
+        }
+
+    def add_pairs(
+        self,
+        matches: pd.DataFrame,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        pair_keys: list[Tuple[int, int]],
+        pair_hashes: list[str],
+        pair_file_ids: Iterable[int],
+        chart_min_matches: int,
+        metrics: BuildMetrics,
+    ) -> None:
+        """Add published pairs' opponent entries; pair files only for id1 in ``pair_file_ids``."""
+        columns = pair_columns(matches)
+        with metrics.measure("series") as record:
+            series_by_pair = build_playoff_series(matches)
+            record["rows_out"] = {"pairs": len(series_by_pair)}
+        with metrics.measure("charts") as record:
+            charts_by_pair = build_pair_charts(matches, chart_min_matches)
+            record["rows_out"] = {"pairs": len(charts_by_pair)}
+
+        with metrics.measure("pair_entries", {"pairs": len(pair_keys)}):
+            for (start, end), (id1_int, id2_int), pair_hash in zip(
+                zip(starts.tolist(), ends.tolist()), pair_keys, pair_hashes
+            ):
+                if id1_int not in self.payloads or id2_int not in self.payloads:
+                    continue
+                write_pair_file = (
+                    self.pair_chunk_matches is not None
+                    and id1_int in pair_file_ids
+                    and not (
+                        self.previous_pairs.get(f"{id1_int}-{id2_int}") == pair_hash
+                        and self.link_previous(self.previous_pair_paths(id1_int, id2_int))
+                    )
+                )
+                if (
+                    self.reuse_opponent_entries(id1_int, id2_int, pair_hash)
+                    and not write_pair_file
+                ):
+                    continue
+                name1, entry = pair_opponent_entry(
+                    columns,
+                    start,
+                    end,
+                    id1_int,
+                    id2_int,
+                    self.player_names,
+                    series_by_pair.get((id1_int, id2_int), []),
+                    charts_by_pair.get((id1_int, id2_int)),
+                )
+                if write_pair_file:
+                    self.write_pair_file(id1_int, name1, entry)
+                if id1_int in self.rebuild_ids:
+                    self.payloads[id1_int]["opponents"][str(id2_int)] = entry
+                if id2_int in self.rebuild_ids:
+                    self.payloads[id2_int]["opponents"][str(id1_int)] = mirrored_opponent_entry(
+                        entry, {"id": id1_int, "name": name1}
+                    )
+
+    def write_players(self, careers: Dict[int, dict], career_extras: Dict[int, dict]) -> None:
+        """Write the career, h2h and summary files of the players being rebuilt."""
+        for pid, payload in self.payloads.items():
+            if pid not in self.rebuild_ids:
+                continue
+            self.files[f"{self.career_dir.name}/{pid}.json"] = {
+                **write_json(
+                    self.career_dir / f"{pid}.json",
+                    {
+                        "player": payload["player"],
+                        "career": careers[pid],
+                        **career_extras.get(pid, {}),
+                    },
+                    self.fsync,
+                ),
+                "matches": careers[pid]["matches"],
+            }
+            h2h_path = f"{self.h2h_dir.name}/{pid}.json"
+            if self.encoding == "columnar":
+                object_bytes = len(
+                    json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                )
+                self.files[h2h_path] = {
+                    **write_json(
+                        self.h2h_dir / f"{pid}.json", encode_columnar_payload(payload), self.fsync
+                    ),
+                    **player_file_counts(payload),
+                    "object_bytes": object_bytes,
+                }
+            else:
+                self.files[h2h_path] = {
+                    **write_json(self.h2h_dir / f"{pid}.json", payload, self.fsync),
+                    **player_file_counts(payload),
+                }
+            summary_payload = {
+                "player": payload["player"],
+                "opponents": {
+                    opponent_id: {"player": opponent["player"], "summary": opponent["summary"]}
+                    for opponent_id, opponent in payload["opponents"].items()
+                },
+            }
+            self.files[f"{self.summary_dir.name}/{pid}.json"] = {
+                **write_json(self.summary_dir / f"{pid}.json", summary_payload, self.fsync),
+                **player_file_counts(summary_payload),
+            }
+
+
+def build_player_files(
+    matches: pd.DataFrame,
+    player_names: Dict[int, str],
+    h2h_dir: Path = H2H_DIR,
+    og_dir: Path = OG_H2H_DIR,
+    fsync: bool = True,
+    previous_state: Optional[dict] = None,
+    previous_dir: Path = DATA_DIR,
+    encoding: str = "objects",
+    summary_dir: Optional[Path] = None,
+    pair_chunk_matches: Optional[int] = None,
+    career_dir: Optional[Path] = None,
+    chart_min_matches: int = CHART_MIN_MATCHES,
+    metrics: Optional[BuildMetrics] = None,
+    rankings: Optional[PlayerRankings] = None,
+    ratings: Optional[PlayerRatings] = None,
+) -> dict:
+    """Write per-player H2H, share, summary and career files, plus optional pair files."""
+    if metrics is None:
+        metrics = BuildMetrics()
+    writer = PlayerFileWriter(
+        player_names,
+        h2h_dir,
+        fsync,
+        previous_state,
+        previous_dir,
+        encoding,
+        summary_dir,
+        pair_chunk_matches,
+        career_dir,
+    )
+    for output_dir in (h2h_dir, og_dir, writer.summary_dir, writer.career_dir):
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+    career_extras = prepare_player_matches(matches, player_names, rankings, ratings)
+    id1_values = matches["id1"].to_numpy(dtype="int64", copy=False)
+    id2_values = matches["id2"].to_numpy(dtype="int64", copy=False)
+    starts, ends = pair_group_bounds(id1_values, id2_values)
+    pair_keys = [
+        (int(id1_values[start]), int(id2_values[start])) for start in starts.tolist()
+    ]
+
+    with metrics.measure("pair_hashes", {"matches": len(matches)}) as record:
+        pair_hashes = pair_content_hashes(matches, starts, ends, player_names)
+        player_hashes = player_content_hashes(
+            pair_keys, pair_hashes, player_names, career_extras
+        )
+        record["rows_out"] = {"pairs": len(pair_keys), "players": len(player_hashes)}
+    with metrics.measure("reuse_previous") as record:
+        writer.reuse_players(player_hashes)
+        record["rows_out"] = {
+            "linked": len(writer.linked_ids),
+            "rebuilt": len(writer.rebuild_ids),
+        }
+    writer.add_pairs(
+        matches, starts, ends, pair_keys, pair_hashes, player_names, chart_min_matches, metrics
+    )
+    with metrics.measure("og_shards") as record:
+        published_pairs = np.array(
+            [
+                group_index
+                for group_index, (id1, id2) in enumerate(pair_keys)
+                if id1 in player_names and id2 in player_names
+            ],
+            dtype="int64",
+        )
+        writer.files.update(
+            write_og_shards(
+                og_dir,
+                *share_pair_records(
+                    matches, starts, ends, pair_keys, published_pairs, player_names
+                ),
+                fsync,
+            )
+        )
+        record["rows_out"] = {"pairs": len(published_pairs)}
+    with metrics.measure("careers", {"matches": len(matches)}) as record:
+        careers = build_career_aggregates(matches, player_names.keys())
+        record["rows_out"] = {"players": len(careers)}
+    with metrics.measure("write_players") as record:
+        writer.write_players(careers, career_extras)
+        record["rows_out"] = {"players": len(writer.rebuild_ids)}
+    if previous_state is not None:
+        print(
+            f"Reused {len(writer.linked_ids)} unchanged player files; "
+            f"rebuilt {len(writer.rebuild_ids)}."
+        )
+    return {
+        "pairs": {
+            f"{id1_int}-{id2_int}": pair_hash
+            for (id1_int, id2_int), pair_hash in zip(pair_keys, pair_hashes)
+        },
+        "players": {str(pid): player_hash for pid, player_hash in player_hashes.items()},
+        "files": writer.files,
+    }
+
+
+def build_partition_player_files(
+    matches: pd.DataFrame,
+    player_names: Dict[int, str],
+    owned_ids: set[int],
+    h2h_dir: Path = H2H_DIR,
+    fsync: bool = True,
+    previous_state: Optional[dict] = None,
+    previous_dir: Path = DATA_DIR,
+    encoding: str = "objects",
+    summary_dir: Optional[Path] = None,
+    pair_chunk_matches: Optional[int] = None,
+    career_dir: Optional[Path] = None,
+    chart_min_matches: int = CHART_MIN_MATCHES,
+    metrics: Optional[BuildMetrics] = None,
+    rankings: Optional[PlayerRankings] = None,
+    ratings: Optional[PlayerRatings] = None,
+) -> dict:
+    """Write the files of ``owned_ids`` from all their matches; return share records too."""
+    if metrics is None:
+        metrics = BuildMetrics()
+    writer = PlayerFileWriter(
+        player_names,
+        h2h_dir,
+        fsync,
+        previous_state,
+        previous_dir,
+        encoding,
+        summary_dir,
+        pair_chunk_matches,
+        career_dir,
+    )
+    for output_dir in (h2h_dir, writer.summary_dir, writer.career_dir):
+        output_dir.mkdir(parents=True, exist_ok=True)
+    career_extras = prepare_player_matches(matches, owned_ids, rankings, ratings)
+    id1_values = matches["id1"].to_numpy(dtype="int64", copy=False)
+    id2_values = matches["id2"].to_numpy(dtype="int64", copy=False)
+    starts, ends = pair_group_bounds(id1_values, id2_values)
+    pair_keys = [
+        (int(id1_values[start]), int(id2_values[start])) for start in starts.tolist()
+    ]
+
+    with metrics.measure("pair_hashes", {"matches": len(matches)}) as record:
+        pair_hashes = pair_content_hashes(matches, starts, ends, player_names)
+        # Other partitions see the rest of a non-owned player's pairs.
+        player_hashes = {
+            pid: player_hash
+            for pid, player_hash in player_content_hashes(
+                pair_keys, pair_hashes, player_names, career_extras
+            ).items()
+            if pid in owned_ids
+        }
+        record["rows_out"] = {"pairs": len(pair_keys), "players": len(player_hashes)}
+    with metrics.measure("reuse_previous") as record:
+        writer.reuse_players(player_hashes)
+        record["rows_out"] = {
+            "linked": len(writer.linked_ids),
+            "rebuilt": len(writer.rebuild_ids),
+        }
+    writer.add_pairs(
+        matches, starts, ends, pair_keys, pair_hashes, owned_ids, chart_min_matches, metrics
+    )
+    with metrics.measure("og_shards") as record:
+        published_pairs = np.array(
+            [
+                group_index
+                for group_index, (id1, id2) in enumerate(pair_keys)
+                if id1 in owned_ids and id2 in player_names
+            ],
+            dtype="int64",
+        )
+        og_pairs = share_pair_records(
+            matches, starts, ends, pair_keys, published_pairs, player_names
+        )
+        record["rows_out"] = {"pairs": len(published_pairs)}
+    with metrics.measure("careers", {"matches": len(matches)}) as record:
+        careers = build_career_aggregates(matches, player_names.keys(), career_ids=owned_ids)
+        record["rows_out"] = {"players": len(careers)}
+    with metrics.measure("write_players") as record:
+        writer.write_players(careers, career_extras)
+        record["rows_out"] = {"players": len(writer.rebuild_ids)}
+    return {
+        "pairs": {
+            f"{id1_int}-{id2_int}": pair_hash
+            for (id1_int, id2_int), pair_hash in zip(pair_keys, pair_hashes)
+            if id1_int in owned_ids
+        },
+        "players": {str(pid): player_hash for pid, player_hash in player_hashes.items()},
+        "files": writer.files,
+        "og_pairs": og_pairs,
+        "reused": (len(writer.linked_ids), len(writer.rebuild_ids)),
+    }
+
+
+def emit_match_partitions(
+    partitions: MatchPartitions,
+    player_names: Dict[int, str],
+    memory_budget_bytes: int,
+    h2h_dir: Path = H2H_DIR,
+    og_dir: Path = OG_H2H_DIR,
+    fsync: bool = True,
+    previous_state: Optional[dict] = None,
+    previous_dir: Path = DATA_DIR,
+    encoding: str = "objects",
+    summary_dir: Optional[Path] = None,
+    pair_chunk_matches: Optional[int] = None,
+    career_dir: Optional[Path] = None,
+    chart_min_matches: int = CHART_MIN_MATCHES,
+    metrics: Optional[BuildMetrics] = None,
+    rankings: Optional[PlayerRankings] = None,
+    ratings: Optional[PlayerRatings] = None,
+) -> dict:
+    """Run build_partition_player_files() over bucket groups that fit the memory budget."""
+    if metrics is None:
+        metrics = BuildMetrics()
+    if summary_dir is None:
+        summary_dir = h2h_dir.parent / "summary"
+    if career_dir is None:
+        career_dir = h2h_dir.parent / "career"
+    for output_dir in (h2h_dir, og_dir, summary_dir, career_dir):
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    player_ids = np.array(list(player_names), dtype="int64")
+    player_buckets = match_partition_index(player_ids, len(partitions.bucket_rows))
+    lookup: Dict[str, dict] = {"tournaments": {}, "stages": {}}
+    pairs: Dict[str, str] = {}
+    players: Dict[str, str] = {}
+    output_files: Dict[str, dict] = {}
+    og_pairs: list[tuple] = []
+    rivalry_rows: set[tuple] = set()
+    match_count = 0
+    linked_count = rebuilt_count = 0
+    groups = plan_partition_groups(partitions, memory_budget_bytes)
+    print(f"Emitting {len(partitions.bucket_rows)} match buckets in {len(groups)} groups.")
+    for group in groups:
+        owned_ids = set(player_ids[np.isin(player_buckets, group)].tolist())
+        with metrics.measure("partition", {"buckets": len(group)}) as record:
+            matches = partitions.read_players(group)
+            lookup_frame = match_lookup_frame(matches)
+            matches["stage_ref"] = lookup_frame["stage_ref"]
+            for kind, records in build_match_lookup(lookup_frame).items():
+                if kind == "version":
+                    continue
+                for ref, entry in records.items():
+                    if lookup[kind].setdefault(ref, entry) != entry:
+                        raise RuntimeError(f"Lookup reference collision in {kind}.")
+            state = build_partition_player_files(
+                matches,
+                player_names,
+                owned_ids,
+                h2h_dir,
+                fsync,
+                previous_state,
+                previous_dir,
+                encoding,
+                summary_dir,
+                pair_chunk_matches,
+                career_dir,
+                chart_min_matches,
+                metrics,
+                rankings,
+                ratings,
+            )
+            pairs.update(state["pairs"])
+            players.update(state["players"])
+            output_files.update(state["files"])
+            keys, names, counts = state["og_pairs"]
+            og_pairs.extend(zip(keys, names, counts.tolist()))
+            linked_count += state["reused"][0]
+            rebuilt_count += state["reused"][1]
+            owned_matches = matches[matches["id1"].isin(owned_ids)]
+            match_count += len(owned_matches)
+            boards = select_rivalry_rows(
+                rivalry_pair_rows(owned_matches, player_names),
+                LEADERBOARD_SIZE,
+                LEADERBOARD_MIN_MATCHES,
+            )
+            rivalry_rows.update(row for board in boards.values() for row in board)
+            record["rows_out"] = {"matches": len(matches), "players": len(owned_ids)}
+
+    if previous_state is not None:
+        print(f"Reused {linked_count} unchanged player files; rebuilt {rebuilt_count}.")
+    og_pairs.sort()
+    output_files.update(
+        write_og_shards(
+            og_dir,
+            [key for key, _, _ in og_pairs],
+            [names for _, names, _ in og_pairs],
+            np.array([counts for _, _, counts in og_pairs], dtype="int64").reshape(-1, 4),
+            fsync,
+        )
+    )
+
+    def pair_order(key: str) -> Tuple[int, int]:
+        id1, id2 = key.split("-")
+        return int(id1), int(id2)
+
+    return {
+        "pairs": {key: pairs[key] for key in sorted(pairs, key=pair_order)},
+        "players": {str(pid): players[str(pid)] for pid in player_names if str(pid) in players},
+        "files": output_files,
+        "lookup": {
+            "version": 1,
+            **{kind: dict(sorted(records.items())) for kind, records in lookup.items()},
+        },
+        "rivalry_rows": sorted(rivalry_rows, key=lambda row: (row[0], row[1])),
+        "matches": match_count,
+    }
+
+
+def download_cached(url: str, path: Path) -> None:
+    parsed_url = urlparse(url)
+    if parsed_url.scheme not in {"http", "https"} or not parsed_url.netloc:
+        raise ValueError(f"Unsupported source URL: {url!r}")
+    cache_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:12]
+    dl.download(
+        url,
+        path,
+        etag_path=CACHE_DIR / f"{path.stem}.{cache_key}.etag",
+        last_modified_path=CACHE_DIR / f"{path.stem}.{cache_key}.last_modified",
+        retries=5,
+        backoff=1.5,
+        timeout=120,
+    )
 
-    matches_path = CACHE_DIR / "scraped_matches.parquet"
-    extra_matches_path = CACHE_DIR / "extra_matches.csv"
-    players_path = CACHE_DIR / "players_data.csv"
-    tournaments_path = CACHE_DIR / "tournament_data.csv"
-    tournament_metadata_path = CACHE_DIR / "tournament_metadata.csv"
-    ranking_path = CACHE_DIR / "ranking.txt"
 
-    if skip_downloads:
-        required_paths = [matches_path, players_path, tournaments_path]
-        if extra_matches_url:
-            required_paths.append(extra_matches_path)
-        if require_tournament_metadata:
-            required_paths.append(tournament_metadata_path)
-        if require_rankings:
-            required_paths.append(ranking_path)
-        missing_paths = [path for path in required_paths if not path.exists()]
-        if missing_paths:
-            missing = ", ".join(str(path) for path in missing_paths)
-            raise FileNotFoundError(f"SKIP_DOWNLOADS requested but cache files are missing: {missing}")
-        print("Using cached source data (SKIP_DOWNLOADS=1).")
-    else:
-        print("Downloading source data...")
-        download_cached(matches_url, matches_path)
-        if extra_matches_url:
-            download_cached(extra_matches_url, extra_matches_path)
-        else:
-            print("Supplemental match source disabled (EXTRA_MATCHES_URL is empty).")
-        download_cached(players_url, players_path)
-        download_cached(tournaments_url, tournaments_path)
-        download_cached(tournament_metadata_url, tournament_metadata_path)
+SOURCE_PIPELINE_WORKERS = 4
+
+
+class SourcePipeline:
+    """Download and parse the sources on a thread pool; result() re-raises a task's error."""
+
+    def __init__(self, config: dict, workers: int = SOURCE_PIPELINE_WORKERS):
+        self.config = config
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="source")
+        self.fetches: Dict[str, Future] = {}
+        self.futures: Dict[str, Future] = {}
+        self.downloading = False
+        paths = config["paths"]
+        # name: (source file, parsed sources it joins, parser)
+        self.tasks: Dict[str, Tuple[str, Tuple[str, ...], Callable[..., object]]] = {
+            "rankings": (
+                "ranking",
+                (),
+                lambda: load_rankings(paths["ranking"]) if paths["ranking"].exists() else {},
+            ),
+            "players": (
+                "players",
+                ("rankings",),
+                lambda rankings: load_players(paths["players"], rankings)[0],
+            ),
+            "tournament_levels": (
+                "tournament_metadata",
+                (),
+                lambda: load_tournament_levels(paths["tournament_metadata"]),
+            ),
+            "tournaments": (
+                "tournaments",
+                ("tournament_levels",),
+                lambda levels: load_tournaments(paths["tournaments"], levels),
+            ),
+            "primary_matches": (
+                "matches",
+                (),
+                lambda: read_matches_parquet(paths["matches"], config["ingest_batch_rows"]),
+            ),
+            # Resolving supplemental names is a join, so it waits for players.
+            "extra_matches": (
+                "extra_matches",
+                ("players",),
+                lambda players: read_extra_matches_csv(
+                    paths["extra_matches"],
+                    build_unique_player_name_index(players),
+                    config["ingest_batch_rows"],
+                ),
+            ),
+        }
+
+    def source_files(self) -> list[str]:
+        files = ["matches", "players", "tournaments", "tournament_metadata", "ranking"]
+        if self.config["extra_matches_url"]:
+            files.insert(1, "extra_matches")
+        return files
+
+    def start(self, download: bool) -> None:
+        """Submit every fetch, then every parser the build will read."""
+        self.downloading = download
+        for source in self.source_files():
+            self.fetch(source)
+        names = ["rankings", "players", "tournament_levels", "tournaments"]
+        if not self.config["out_of_core"]:
+            names.append("primary_matches")
+            if self.config["extra_matches_url"]:
+                names.append("extra_matches")
+        for name in names:
+            self.future(name)
+
+    def wait_for_downloads(self) -> None:
+        for future in self.fetches.values():
+            future.result()
+
+    def fetch(self, source: str) -> Future:
+        if source not in self.fetches:
+            self.fetches[source] = self.executor.submit(
+                self.download_source, source, self.downloading
+            )
+        return self.fetches[source]
+
+    def download_source(self, source: str, download: bool) -> None:
+        if not download:
+            return
+        url = self.config[f"{source}_url"]
+        path = self.config["paths"][source]
+        if source != "ranking":
+            download_cached(url, path)
+            return
         try:
-            download_cached(ranking_url, ranking_path)
+            download_cached(url, path)
         except RuntimeError as exc:
-            if require_rankings:
+            if self.config["require_rankings"]:
                 raise RuntimeError(
                     "Ranking refresh failed while REQUIRE_RANKINGS is enabled."
                 ) from exc
-            if ranking_path.exists():
+            if path.exists():
                 print(f"Warning: failed to refresh ranking; using cached file. {exc}")
             else:
                 print(f"Warning: failed to download ranking; continuing without it. {exc}")
 
+    def future(self, name: str) -> Future:
+        if name not in self.futures:
+            source, joins, parse = self.tasks[name]
+            waits = [self.fetch(source), *(self.future(join) for join in joins)]
+
+            def run() -> object:
+                results = [future.result() for future in waits]
+                return parse(*results[1:])
+
+            self.futures[name] = self.executor.submit(run)
+        return self.futures[name]
 
+    def result(self, name: str):
+        return self.future(name).result()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class BuildStage(NamedTuple):
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    run: Callable[[dict, dict], dict]
+    key_inputs: Callable[[dict], dict]
+
+
+def source_file_hashes(paths: Iterable[Path]) -> Dict[str, Optional[str]]:
+    return {path.name: file_sha256(path) if path.exists() else None for path in paths}
+
+
+def stage_checkpoint_key(stage: BuildStage, config: dict, upstream_key: str) -> str:
+    """Hash a stage's own inputs together with the key of the stage before it."""
+    data = json.dumps(
+        {
+            "version": STAGE_CHECKPOINT_VERSION,
+            "stage": stage.name,
+            "upstream": upstream_key,
+            "inputs": stage.key_inputs(config),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def write_stage_checkpoint(directory: Path, key: str, outputs: dict) -> None:
+    """Pickle each output separately; key.json is written last and marks the set complete."""
+    (directory / "key.json").unlink(missing_ok=True)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, value in outputs.items():
+        temporary_path = directory / f"{name}.pkl.tmp"
+        pd.to_pickle(value, temporary_path)
+        temporary_path.replace(directory / f"{name}.pkl")
+    write_json(directory / "key.json", {"key": key, "outputs": sorted(outputs)}, False)
+
+
+def read_stage_checkpoint(directory: Path, key: str, names: Iterable[str]) -> Optional[dict]:
+    try:
+        with (directory / "key.json").open("r", encoding="utf-8") as handle:
+            saved = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    names = list(names)
+    if saved.get("key") != key or not set(names) <= set(saved.get("outputs", [])):
+        return None
+    return {name: pd.read_pickle(directory / f"{name}.pkl") for name in names}
+
+
+def run_build_stages(
+    stages: Iterable[BuildStage],
+    config: dict,
+    from_stage: Optional[str] = None,
+    until_stage: Optional[str] = None,
+    checkpoint_dir: Path = STAGE_CHECKPOINT_DIR,
+    metrics: Optional[BuildMetrics] = None,
+) -> dict:
+    """Run stages from ``from_stage``, reading earlier stages' outputs from their checkpoints."""
+    stages = list(stages)
+    names = [stage.name for stage in stages]
+    start = names.index(from_stage) if from_stage else 0
+    stop = names.index(until_stage) if until_stage else len(stages) - 1
+    if start > stop:
+        raise ValueError(f"Stage {from_stage!r} runs after {until_stage!r}.")
+
+    needed = {name for stage in stages[start : stop + 1] for name in stage.inputs}
+    providers: Dict[str, int] = {}
+    for index, stage in enumerate(stages[:start]):
+        providers.update({name: index for name in stage.outputs if name in needed})
+    missing = needed - providers.keys() - {
+        name for stage in stages[start : stop + 1] for name in stage.outputs
+    }
+    if missing:
+        raise ValueError(f"No stage produces {', '.join(sorted(missing))}.")
+
+    if metrics is None:
+        metrics = BuildMetrics()
+    context: dict = {}
+    key = ""
+    for index, stage in enumerate(stages[: stop + 1]):
+        key = stage_checkpoint_key(stage, config, key)
+        directory = checkpoint_dir / stage.name
+        if index < start:
+            wanted = [name for name, provider in providers.items() if provider == index]
+            if not wanted:
+                continue
+            with metrics.measure(stage.name) as record:
+                record["resumed"] = True
+                outputs = read_stage_checkpoint(directory, key, wanted)
+                if outputs is None:
+                    raise RuntimeError(
+                        f"The {stage.name!r} checkpoint is missing or was built from other "
+                        f"sources or settings; resume from {stage.name!r} or an earlier stage."
+                    )
+                record["rows_out"] = count_rows(outputs)
+            print(f"Resuming from the {stage.name!r} checkpoint ({', '.join(wanted)}).")
+            context.update(outputs)
+            continue
+        # A failed run must not leave the previous run's checkpoint looking current.
+        (directory / "key.json").unlink(missing_ok=True)
+        inputs = {name: context[name] for name in stage.inputs}
+        with metrics.measure(stage.name, count_rows(inputs)) as record:
+            outputs = stage.run(config, inputs)
+            record["rows_out"] = count_rows(outputs)
+        context.update(outputs)
+        if stage.outputs:
+            write_stage_checkpoint(
+                directory, key, {name: outputs[name] for name in stage.outputs}
+            )
+    return context
+
+
+def run_download_stage(config: dict, inputs: dict) -> dict:
+    paths = config["paths"]
+    if config["skip_downloads"]:
+        required_paths = [paths["matches"], paths["players"], paths["tournaments"]]
+        if config["extra_matches_url"]:
+            required_paths.append(paths["extra_matches"])
+        if config["require_tournament_metadata"]:
+            required_paths.append(paths["tournament_metadata"])
+        if config["require_rankings"]:
+            required_paths.append(paths["ranking"])
+        missing_paths = [path for path in required_paths if not path.exists()]
+        if missing_paths:
+            missing = ", ".join(str(path) for path in missing_paths)
+            raise FileNotFoundError(f"SKIP_DOWNLOADS requested but cache files are missing: {missing}")
+        print("Using cached source data (SKIP_DOWNLOADS=1).")
+        # Parsing starts now and runs on while the later stages wait for what they read.
+        config["sources"].start(download=False)
+        return {}
+
+    print("Downloading source data...")
+    if not config["extra_matches_url"]:
+        print("Supplemental match source disabled (EXTRA_MATCHES_URL is empty).")
+    # Each source starts parsing as soon as its own download lands.
+    config["sources"].start(download=True)
+    config["sources"].wait_for_downloads()
+    return {}
+
+
+def run_load_stage(config: dict, inputs: dict) -> dict:
+    paths = config["paths"]
+    sources = config["sources"]
+    require_rankings = config["require_rankings"]
+    min_ranking_rows = config["min_ranking_rows"]
+    max_ranking_age_days = config["max_ranking_age_days"]
     print("Loading players...")
-    rankings = load_rankings(ranking_path) if ranking_path.exists() else {}
+    rankings = sources.result("rankings")
     if require_rankings and len(rankings) < min_ranking_rows:
         raise RuntimeError(
             f"Ranking data has {len(rankings)} rows; at least {min_ranking_rows} are required."
@@ -1326,38 +4425,49 @@ def main() -> int:
                 f"Ranking data is {ranking_age.days} days old; maximum is "
                 f"{max_ranking_age_days}."
             )
-    players, player_names = load_players(players_path, rankings)
+    players = sources.result("players")
+    ranking_history = update_ranking_history(paths["ranking_history"], rankings)
 
     print("Loading tournaments...")
-    tournament_levels = load_tournament_levels(tournament_metadata_path)
-    if require_tournament_metadata and len(tournament_levels) < min_tournament_levels:
+    tournament_levels = sources.result("tournament_levels")
+    min_tournament_levels = config["min_tournament_levels"]
+    if config["require_tournament_metadata"] and len(tournament_levels) < min_tournament_levels:
         raise RuntimeError(
             f"Tournament metadata has {len(tournament_levels)} levels; at least "
             f"{min_tournament_levels} are required."
         )
-    tournaments = load_tournaments(tournaments_path, tournament_levels)
-    prepare_data_staging()
-    write_json(DATA_STAGING_DIR / "tournaments.json", tournaments)
+    tournaments = sources.result("tournaments")
+    return {
+        "players": players,
+        "tournaments": tournaments,
+        "tournament_levels": tournament_levels,
+        "ranking_history": ranking_history,
+    }
+
 
+def run_matches_stage(config: dict, inputs: dict) -> dict:
+    if config["out_of_core"]:
+        return run_partitioned_matches_stage(config, inputs)
+    sources = config["sources"]
+    tournament_levels = inputs["tournament_levels"]
     print("Processing matches...")
-    matches_main = read_matches_parquet(matches_path)
+    matches_main = sources.result("primary_matches")
     source_validation = {"primary": dict(matches_main.attrs.get("validation", {}))}
     enforce_rejection_budget(
         "Primary match source",
         source_validation["primary"],
-        max_main_rejection_rate,
+        config["max_main_rejection_rate"],
     )
     match_frames = [matches_main]
-    if extra_matches_url:
-        player_name_to_id = build_unique_player_name_index(players)
-        matches_extra = read_extra_matches_csv(extra_matches_path, player_name_to_id)
+    if config["extra_matches_url"]:
+        matches_extra = sources.result("extra_matches")
         source_validation["supplemental"] = dict(
             matches_extra.attrs.get("validation", {})
         )
         enforce_rejection_budget(
             "Supplemental match source",
             source_validation["supplemental"],
-            max_extra_rejection_rate,
+            config["max_extra_rejection_rate"],
         )
         match_frames.append(matches_extra)
 
@@ -1371,70 +4481,702 @@ def main() -> int:
     if deduped_count:
         print(f"Removed {deduped_count} overlapping source matches.")
     source_validation["cross_source_duplicates_removed"] = deduped_count
-
-    sort_cols = [
-        "id1",
-        "id2",
-        "date_dt",
-        "tournament_id",
-        "stage_sequence",
-        "round_number",
-        "playoff_game_number",
+    return {"matches": matches, "source_validation": source_validation}
+
+
+def run_partitioned_matches_stage(config: dict, inputs: dict) -> dict:
+    paths = config["paths"]
+    tournament_levels = inputs["tournament_levels"]
+    print(f"Spilling matches to {OUT_OF_CORE_DIR}...")
+    sources = [
+        (
+            "primary",
+            "Primary match source",
+            iter_matches_parquet(paths["matches"], config["ingest_batch_rows"]),
+            config["max_main_rejection_rate"],
+        )
     ]
-    matches = matches.sort_values(sort_cols, kind="mergesort", na_position="last")
+    if config["extra_matches_url"]:
+        player_name_to_id = build_unique_player_name_index(inputs["players"])
+        sources.append(
+            (
+                "supplemental",
+                "Supplemental match source",
+                iter_extra_matches_csv(
+                    paths["extra_matches"], player_name_to_id, config["ingest_batch_rows"]
+                ),
+                config["max_extra_rejection_rate"],
+            )
+        )
+    source_validation: dict = {}
+
+    def frames() -> Iterable[pd.DataFrame]:
+        row_number = 0
+        for name, label, batches, maximum_rate in sources:
+            validation = source_validation.setdefault(name, {})
+            for batch in batches:
+                for key, value in batch.attrs.get("validation", {}).items():
+                    validation[key] = validation.get(key, 0) + value
+                batch["tournament_level"] = batch["tournament_id"].map(
+                    lambda tid: tournament_levels.get(int(tid)) if pd.notna(tid) else None
+                )
+                batch["row_number"] = np.arange(row_number, row_number + len(batch))
+                row_number += len(batch)
+                yield batch
+            report_match_validation(validation)
+            enforce_rejection_budget(label, validation, maximum_rate)
+
+    matches, deduped_count = partition_matches(frames(), OUT_OF_CORE_DIR)
+    if deduped_count:
+        print(f"Removed {deduped_count} overlapping source matches.")
+    source_validation["cross_source_duplicates_removed"] = deduped_count
+    return {"matches": matches, "source_validation": source_validation}
+
+
+def run_ratings_stage(config: dict, inputs: dict) -> dict:
+    matches = inputs["matches"]
+    if isinstance(matches, MatchPartitions):
+        matches = matches.read(columns=RATING_SOURCE_COLUMNS)
+    print("Rating matches...")
+    match_ratings = update_match_ratings(
+        matches, config["paths"]["rating_state"], resume=config["incremental"]
+    )
+    return {"match_ratings": match_ratings}
 
+
+def run_filter_stage(config: dict, inputs: dict) -> dict:
+    min_matches = config["min_matches"]
+    matches = inputs["matches"]
     print(f"Filtering players with {min_matches}+ matches...")
-    all_ids = pd.concat([matches["player1_id"], matches["player2_id"]])
-    match_counts = all_ids.value_counts()
+    if isinstance(matches, MatchPartitions):
+        match_counts = count_partition_matches(matches)
+    else:
+        match_counts = count_player_matches(
+            matches["player1_id"].to_numpy(), matches["player2_id"].to_numpy()
+        )
     eligible_ids = set(match_counts[match_counts >= min_matches].index.astype(int).tolist())
 
-    matches = matches[
-        matches["player1_id"].isin(eligible_ids)
-        & matches["player2_id"].isin(eligible_ids)
-    ]
+    if isinstance(matches, MatchPartitions):
+        matches = matches.restrict(eligible_ids)
+        # filter_players() only looks up the names of eligible players missing from
+        # the player list.
+        listed_ids = {player["id"] for player in inputs["players"]}
+        missing = pa.array(sorted(eligible_ids - listed_ids), type=pa.int64())
+        name_rows = matches.read(
+            ds.field("player1_id").isin(missing) | ds.field("player2_id").isin(missing),
+            [
+                "player1_id",
+                "player1_name",
+                "player2_id",
+                "player2_name",
+                *MATCH_SORT_COLUMNS,
+                "row_number",
+            ],
+        )
+        name_rows = name_rows.take(
+            match_sort_order(name_rows, [*MATCH_SORT_COLUMNS, "row_number"])
+        )
+    else:
+        # Drop ineligible players first, so only published matches are sorted.
+        matches = matches[
+            matches["player1_id"].isin(eligible_ids)
+            & matches["player2_id"].isin(eligible_ids)
+        ]
+        matches = matches.take(match_sort_order(matches))
+        name_rows = matches
+
+    players, player_names = filter_players(inputs["players"], eligible_ids, name_rows)
+    return {
+        "eligible_matches": matches,
+        "published_players": players,
+        "player_names": player_names,
+        "match_counts": {int(pid): int(count) for pid, count in match_counts.items()},
+    }
+
 
-    players, player_names = filter_players(players, eligible_ids, matches)
-    write_json(DATA_STAGING_DIR / "players.json", players)
+def published_tournaments(tournaments: list[dict], match_lookup: dict) -> list[dict]:
+    """The tournaments that some published match's stage points to."""
+    published_ids = {
+        entry["tournament_id"]
+        for entry in match_lookup["tournaments"].values()
+        if entry["tournament_id"] is not None
+    }
+    return [tournament for tournament in tournaments if tournament["id"] in published_ids]
+
+
+def run_emit_stage(config: dict, inputs: dict) -> dict:
+    paths = config["paths"]
+    fsync_files = config["fsync_files"]
+    h2h_encoding = config["h2h_encoding"]
+    chart_min_matches = config["chart_min_matches"]
+    matches = inputs["eligible_matches"]
+    players = inputs["published_players"]
+    player_names = inputs["player_names"]
+    metrics = config["metrics"]
+    prepare_data_staging()
+    output_files: Dict[str, dict] = {}
+
+    with metrics.measure("search_index", {"players": len(players)}):
+        output_files["players.json"] = write_json(
+            DATA_STAGING_DIR / "players.json", players, fsync_files
+        )
+        search_players, search_index = build_search_index(players, inputs["match_counts"])
+        for name, payload in (("players.json", search_players), ("index.json", search_index)):
+            output_files[f"search/{name}"] = write_json(
+                DATA_STAGING_DIR / "search" / name, payload, fsync_files
+            )
 
     print("Building H2H player files...")
-    build_player_files(
-        matches,
-        player_names,
+    layout = {
+        "summary_files": True,
+        "career_files": True,
+        "group_files": True,
+        "chart_min_matches": chart_min_matches,
+        "pair_files": config["pair_files"],
+        "pair_chunk_matches": config["pair_chunk_matches"] if config["pair_files"] else None,
+    }
+    build_settings = build_settings_fingerprint(
+        config["min_matches"], h2h_encoding, layout["pair_chunk_matches"], chart_min_matches
+    )
+    previous_state = (
+        load_incremental_state(INCREMENTAL_STATE_PATH, DATA_DIR, build_settings)
+        if config["incremental"]
+        else None
+    )
+    player_file_args = (
         DATA_STAGING_DIR / "h2h",
         DATA_STAGING_DIR / "og",
+        fsync_files,
+        previous_state,
+        DATA_DIR,
+        h2h_encoding,
+        DATA_STAGING_DIR / "summary",
+        layout["pair_chunk_matches"],
+        DATA_STAGING_DIR / "career",
+        chart_min_matches,
+        metrics,
+    )
+    rankings = PlayerRankings(
+        inputs["ranking_history"],
+        {
+            player["id"]: player["ranking_id"]
+            for player in players
+            if player["ranking_id"] is not None
+        },
+    )
+    with metrics.measure("ratings", {"matches": len(inputs["match_ratings"])}):
+        ratings = player_ratings(inputs["match_ratings"], player_names)
+    if isinstance(matches, MatchPartitions):
+        with metrics.measure("player_files", {"matches": len(matches)}) as record:
+            build_state = emit_match_partitions(
+                matches,
+                player_names,
+                config["out_of_core_memory_bytes"],
+                *player_file_args,
+                rankings=rankings,
+                ratings=ratings,
+            )
+            output_files.update(build_state.pop("files"))
+            record["rows_out"] = {"files": len(output_files)}
+        match_lookup = build_state.pop("lookup")
+        leaderboards = build_rivalry_leaderboards(
+            None, player_names, pair_rows=build_state.pop("rivalry_rows")
+        )
+        match_count = build_state.pop("matches")
+    else:
+        print("Building tournament and stage lookup...")
+        with metrics.measure("lookup", {"matches": len(matches)}) as record:
+            lookup_frame = match_lookup_frame(matches)
+            matches["stage_ref"] = lookup_frame["stage_ref"]
+            published_rows = matches["player1_id"].isin(player_names) & matches[
+                "player2_id"
+            ].isin(player_names)
+            match_lookup = build_match_lookup(lookup_frame.loc[published_rows])
+            record["rows_out"] = {
+                name: len(match_lookup[name]) for name in ("tournaments", "stages")
+            }
+        with metrics.measure("player_files", {"matches": len(matches)}) as record:
+            build_state = build_player_files(
+                matches, player_names, *player_file_args, rankings=rankings, ratings=ratings
+            )
+            output_files.update(build_state.pop("files"))
+            record["rows_out"] = {"files": len(output_files)}
+        with metrics.measure("leaderboards"):
+            leaderboards = build_rivalry_leaderboards(matches, player_names)
+        match_count = len(matches)
+
+    lookup_dir = DATA_STAGING_DIR / "lookup"
+    lookup_dir.mkdir(parents=True, exist_ok=True)
+    lookup_name, lookup_entry = write_content_hashed_json(
+        lookup_dir, match_lookup, fsync_files
+    )
+    lookup_path = f"{lookup_dir.name}/{lookup_name}"
+    output_files[lookup_path] = lookup_entry
+    tournaments = published_tournaments(inputs["tournaments"], match_lookup)
+    output_files["tournaments.json"] = write_json(
+        DATA_STAGING_DIR / "tournaments.json", tournaments, fsync_files
+    )
+    print(
+        f"Lookup {lookup_path}: {len(match_lookup['tournaments'])} tournaments, "
+        f"{len(match_lookup['stages'])} stages."
+    )
+    with metrics.measure("alias_groups") as record:
+        alias_groups = load_alias_groups(ALIASES_PATH, player_names)
+        output_files.update(
+            build_alias_group_files(
+                alias_groups,
+                player_names,
+                match_lookup,
+                DATA_STAGING_DIR / "h2h",
+                DATA_STAGING_DIR / "groups",
+                DATA_STAGING_DIR / "og",
+                fsync_files,
+                h2h_encoding,
+            )
+        )
+        record["rows_out"] = {"groups": len(alias_groups)}
+    print(f"Merged {len(alias_groups)} alias groups into group files.")
+    output_files["leaderboards.json"] = write_json(
+        DATA_STAGING_DIR / "leaderboards.json", leaderboards, fsync_files
     )
+    h2h_entries = [
+        entry
+        for path, entry in output_files.items()
+        if path.startswith("h2h/") and path.count("/") == 1
+    ]
+    h2h_size = {
+        "format": h2h_encoding,
+        "bytes": sum(entry["bytes"] for entry in h2h_entries),
+    }
+    if h2h_encoding == "columnar":
+        h2h_size["object_bytes"] = sum(
+            entry.get("object_bytes", entry["bytes"]) for entry in h2h_entries
+        )
+        saved = 1 - h2h_size["bytes"] / h2h_size["object_bytes"] if h2h_entries else 0.0
+        print(
+            f"Columnar H2H files: {h2h_size['object_bytes'] / 1e6:.1f} MB as objects, "
+            f"{h2h_size['bytes'] / 1e6:.1f} MB encoded ({saved:.0%} smaller)."
+        )
 
-    write_json(
+    generated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    output_files["meta.json"] = write_json(
         DATA_STAGING_DIR / "meta.json",
         {
-            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "generated_at": generated_at,
             "players": len(players),
-            "matches": int(len(matches)),
-            "source_validation": source_validation,
+            "matches": int(match_count),
+            "layout": layout,
+            "lookup": lookup_path,
+            "h2h_encoding": h2h_size,
+            "source_validation": inputs["source_validation"],
             "source_files": {
                 label: {
                     "sha256": file_sha256(path),
                     "bytes": path.stat().st_size,
                 }
                 for label, path in {
-                    "primary_matches": matches_path,
-                    **({"supplemental_matches": extra_matches_path} if extra_matches_url else {}),
-                    "players": players_path,
-                    "tournaments": tournaments_path,
+                    "primary_matches": paths["matches"],
+                    **(
+                        {"supplemental_matches": paths["extra_matches"]}
+                        if config["extra_matches_url"]
+                        else {}
+                    ),
+                    "players": paths["players"],
+                    "tournaments": paths["tournaments"],
                     **(
-                        {"tournament_metadata": tournament_metadata_path}
-                        if tournament_metadata_path.exists()
+                        {"tournament_metadata": paths["tournament_metadata"]}
+                        if paths["tournament_metadata"].exists()
                         else {}
                     ),
-                    **({"rankings": ranking_path} if ranking_path.exists() else {}),
+                    **({"rankings": paths["ranking"]} if paths["ranking"].exists() else {}),
                 }.items()
             },
         },
+        fsync_files,
+    )
+    manifest_entry = write_json(
+        DATA_STAGING_DIR / "manifest.json",
+        {"version": 1, "files": dict(sorted(output_files.items()))},
+        fsync_files,
+    )
+
+    size_budgets = config["size_budgets"]
+    with metrics.measure("size_report", {"files": len(output_files) + 1}):
+        size_report = build_size_report(
+            DATA_STAGING_DIR,
+            {**output_files, "manifest.json": manifest_entry},
+            player_names,
+            config["size_report_top_n"],
+        )
+    write_json(SIZE_REPORT_PATH, {"generated_at": generated_at, **size_report}, False)
+    print_size_report(size_report)
+    enforce_size_budget(
+        size_report,
+        size_budgets["MAX_OUTPUT_FILES"],
+        size_budgets["MAX_PLAYER_FILE_BYTES"],
+        size_budgets["MAX_PLAYER_FILE_GZIP_BYTES"],
     )
+    return {
+        "build_state": build_state,
+        "build_settings": build_settings,
+        "generated_at": generated_at,
+    }
+
 
+def add_build_metrics(staging_dir: Path, stages: list[dict], fsync: bool = True) -> None:
+    """Record stage metrics in a staged meta.json and update its manifest entry."""
+    with (staging_dir / "meta.json").open("r", encoding="utf-8") as handle:
+        meta = json.load(handle)
+    meta["build_metrics"] = {"stages": stages}
+    files = load_output_manifest(staging_dir)
+    files["meta.json"] = write_json(staging_dir / "meta.json", meta, fsync)
+    write_json(staging_dir / "manifest.json", {"version": 1, "files": files}, fsync)
+
+
+def run_publish_stage(config: dict, inputs: dict) -> dict:
+    if not (DATA_STAGING_DIR / "manifest.json").exists():
+        raise RuntimeError(f"No complete staged dataset in {DATA_STAGING_DIR}; run 'emit' first.")
+    # Only a build that ran emit itself has its metrics; the swap below is too late to
+    # record in the dataset it publishes.
+    finished = [stage for stage in config["metrics"].stages if "wall_seconds" in stage]
+    if any(stage["name"] == "emit" and not stage.get("resumed") for stage in finished):
+        add_build_metrics(DATA_STAGING_DIR, finished, config["fsync_files"])
     print("Publishing complete dataset...")
-    publish_staged_data()
-    print("Build completed.")
+    INCREMENTAL_STATE_PATH.unlink(missing_ok=True)
+    publish_staged_data(durability=config["durability"])
+    write_json(
+        INCREMENTAL_STATE_PATH,
+        {
+            "settings": inputs["build_settings"],
+            "generated_at": inputs["generated_at"],
+            **inputs["build_state"],
+        },
+        config["fsync_files"],
+    )
+    return {}
+
+
+def load_stage_key_inputs(config: dict) -> dict:
+    paths = config["paths"]
+    return {
+        "sources": source_file_hashes(
+            [paths["players"], paths["tournaments"], paths["tournament_metadata"], paths["ranking"]]
+        ),
+        **{
+            name: config[name]
+            for name in (
+                "require_rankings",
+                "min_ranking_rows",
+                "max_ranking_age_days",
+                "require_tournament_metadata",
+                "min_tournament_levels",
+            )
+        },
+    }
+
+
+def matches_stage_key_inputs(config: dict) -> dict:
+    paths = config["paths"]
+    extra = [paths["extra_matches"]] if config["extra_matches_url"] else []
+    return {
+        "sources": source_file_hashes([paths["matches"], *extra]),
+        "supplemental": bool(config["extra_matches_url"]),
+        "out_of_core": config["out_of_core"],
+        "max_main_rejection_rate": config["max_main_rejection_rate"],
+        "max_extra_rejection_rate": config["max_extra_rejection_rate"],
+    }
+
+
+def emit_stage_key_inputs(config: dict) -> dict:
+    return {
+        "aliases": source_file_hashes([ALIASES_PATH]),
+        **{
+            name: config[name]
+            for name in (
+                "h2h_encoding",
+                "pair_files",
+                "pair_chunk_matches",
+                "chart_min_matches",
+                "incremental",
+                "size_budgets",
+                "size_report_top_n",
+            )
+        },
+    }
+
+
+# Build pipeline, in order. A stage reads only the named outputs of earlier stages; the
+# outputs of every stage that has any are checkpointed under STAGE_CHECKPOINT_DIR.
+BUILD_STAGES = (
+    BuildStage("download", (), (), run_download_stage, lambda config: {}),
+    BuildStage(
+        "load",
+        (),
+        ("players", "tournaments", "tournament_levels", "ranking_history"),
+        run_load_stage,
+        load_stage_key_inputs,
+    ),
+    BuildStage(
+        "matches",
+        ("players", "tournament_levels"),
+        ("matches", "source_validation"),
+        run_matches_stage,
+        matches_stage_key_inputs,
+    ),
+    BuildStage(
+        "ratings",
+        ("matches",),
+        ("match_ratings",),
+        run_ratings_stage,
+        lambda config: rating_settings(),
+    ),
+    BuildStage(
+        "filter",
+        ("matches", "players"),
+        ("eligible_matches", "published_players", "player_names", "match_counts"),
+        run_filter_stage,
+        lambda config: {"min_matches": config["min_matches"]},
+    ),
+    BuildStage(
+        "emit",
+        (
+            "eligible_matches",
+            "published_players",
+            "player_names",
+            "match_counts",
+            "tournaments",
+            "source_validation",
+            "ranking_history",
+            "match_ratings",
+        ),
+        ("build_state", "build_settings", "generated_at"),
+        run_emit_stage,
+        emit_stage_key_inputs,
+    ),
+    BuildStage(
+        "publish",
+        ("build_state", "build_settings", "generated_at"),
+        (),
+        run_publish_stage,
+        lambda config: {"durability": config["durability"]},
+    ),
+)
+BUILD_STAGE_NAMES = tuple(stage.name for stage in BUILD_STAGES)
+
+
+def load_build_config() -> dict:
+    """Read the build settings from the environment; raises ValueError for any out of range."""
+    matches_url = os.environ.get("MATCHES_PARQUET_URL", dl.DEFAULT_MATCHES_URL)
+    players_url = os.environ.get("PLAYERS_CSV_URL", dl.DEFAULT_PLAYERS_URL)
+    tournaments_url = os.environ.get("TOURNAMENTS_CSV_URL", dl.DEFAULT_TOURNAMENTS_URL)
+    tournament_metadata_url = os.environ.get(
+        "TOURNAMENT_METADATA_CSV_URL", dl.DEFAULT_TOURNAMENT_METADATA_URL
+    )
+    ranking_url = os.environ.get("RANKING_TXT_URL", dl.DEFAULT_RANKING_URL)
+    extra_matches_url = os.environ.get("EXTRA_MATCHES_URL", EXTRA_MATCHES_URL).strip()
+    require_rankings = os.environ.get("REQUIRE_RANKINGS", "0").strip().casefold() in {
+        "1",
+        "true",
+        "yes",
+    }
+    require_tournament_metadata = os.environ.get(
+        "REQUIRE_TOURNAMENT_METADATA", "0"
+    ).strip().casefold() in {"1", "true", "yes"}
+    skip_downloads = os.environ.get("SKIP_DOWNLOADS", "0").strip().casefold() in {
+        "1",
+        "true",
+        "yes",
+    }
+    try:
+        min_matches = int(os.environ.get("MIN_MATCHES", "50"))
+    except ValueError as exc:
+        raise ValueError("MIN_MATCHES must be an integer.") from exc
+    if min_matches < 1:
+        raise ValueError("MIN_MATCHES must be at least 1.")
+    try:
+        min_ranking_rows = int(os.environ.get("MIN_RANKING_ROWS", "1"))
+        min_tournament_levels = int(os.environ.get("MIN_TOURNAMENT_LEVELS", "1"))
+    except ValueError as exc:
+        raise ValueError(
+            "MIN_RANKING_ROWS and MIN_TOURNAMENT_LEVELS must be integers."
+        ) from exc
+    max_ranking_age_raw = os.environ.get("MAX_RANKING_AGE_DAYS", "").strip()
+    try:
+        max_ranking_age_days = int(max_ranking_age_raw) if max_ranking_age_raw else None
+    except ValueError as exc:
+        raise ValueError("MAX_RANKING_AGE_DAYS must be an integer.") from exc
+    if min_ranking_rows < 1 or min_tournament_levels < 1:
+        raise ValueError("Ranking and tournament metadata minimums must be at least 1.")
+    if max_ranking_age_days is not None and max_ranking_age_days < 0:
+        raise ValueError("MAX_RANKING_AGE_DAYS cannot be negative.")
+    try:
+        max_main_rejection_rate = float(
+            os.environ.get("MAX_MAIN_REJECTION_RATE", "1")
+        )
+        max_extra_rejection_rate = float(
+            os.environ.get("MAX_EXTRA_REJECTION_RATE", "1")
+        )
+    except ValueError as exc:
+        raise ValueError("Source rejection-rate limits must be numbers.") from exc
+    if not 0 <= max_main_rejection_rate <= 1 or not 0 <= max_extra_rejection_rate <= 1:
+        raise ValueError("Source rejection-rate limits must be between 0 and 1.")
+    durability = os.environ.get("DATA_DURABILITY", "file").strip().casefold() or "file"
+    if durability not in DURABILITY_POLICIES:
+        raise ValueError(
+            f"DATA_DURABILITY must be one of: {', '.join(DURABILITY_POLICIES)}."
+        )
+    fsync_files = durability == "file"
+    h2h_encoding = os.environ.get("H2H_ENCODING", "objects").strip().casefold() or "objects"
+    if h2h_encoding not in H2H_ENCODINGS:
+        raise ValueError(f"H2H_ENCODING must be one of: {', '.join(H2H_ENCODINGS)}.")
+    pair_files = os.environ.get("PAIR_FILES", "0").strip().casefold() in {
+        "1",
+        "true",
+        "yes",
+    }
+    try:
+        pair_chunk_matches = int(os.environ.get("PAIR_CHUNK_MATCHES", "250"))
+    except ValueError as exc:
+        raise ValueError("PAIR_CHUNK_MATCHES must be an integer.") from exc
+    if pair_chunk_matches < 1:
+        raise ValueError("PAIR_CHUNK_MATCHES must be at least 1.")
+    try:
+        chart_min_matches = int(os.environ.get("CHART_MIN_MATCHES", str(CHART_MIN_MATCHES)))
+    except ValueError as exc:
+        raise ValueError("CHART_MIN_MATCHES must be an integer.") from exc
+    if chart_min_matches < 1:
+        raise ValueError("CHART_MIN_MATCHES must be at least 1.")
+    size_budgets = {}
+    for budget_name in (
+        "MAX_OUTPUT_FILES",
+        "MAX_PLAYER_FILE_BYTES",
+        "MAX_PLAYER_FILE_GZIP_BYTES",
+    ):
+        budget_raw = os.environ.get(budget_name, "").strip()
+        try:
+            size_budgets[budget_name] = int(budget_raw) if budget_raw else None
+        except ValueError as exc:
+            raise ValueError(f"{budget_name} must be an integer.") from exc
+        if size_budgets[budget_name] is not None and size_budgets[budget_name] < 1:
+            raise ValueError(f"{budget_name} must be at least 1.")
+    try:
+        size_report_top_n = int(os.environ.get("SIZE_REPORT_TOP_N", "20"))
+    except ValueError as exc:
+        raise ValueError("SIZE_REPORT_TOP_N must be an integer.") from exc
+    if size_report_top_n < 1:
+        raise ValueError("SIZE_REPORT_TOP_N must be at least 1.")
+    incremental = os.environ.get("INCREMENTAL_BUILD", "1").strip().casefold() in {
+        "1",
+        "true",
+        "yes",
+    }
+    out_of_core = os.environ.get("OUT_OF_CORE", "0").strip().casefold() in {
+        "1",
+        "true",
+        "yes",
+    }
+    try:
+        ingest_batch_rows = int(os.environ.get("INGEST_BATCH_ROWS", str(INGEST_BATCH_ROWS)))
+    except ValueError as exc:
+        raise ValueError("INGEST_BATCH_ROWS must be an integer.") from exc
+    if ingest_batch_rows < 1:
+        raise ValueError("INGEST_BATCH_ROWS must be at least 1.")
+    try:
+        out_of_core_memory_mb = int(os.environ.get("OUT_OF_CORE_MEMORY_MB", "1024"))
+    except ValueError as exc:
+        raise ValueError("OUT_OF_CORE_MEMORY_MB must be an integer.") from exc
+    if out_of_core_memory_mb < 1:
+        raise ValueError("OUT_OF_CORE_MEMORY_MB must be at least 1.")
+
+    matches_path = CACHE_DIR / "scraped_matches.parquet"
+    extra_matches_path = CACHE_DIR / "extra_matches.csv"
+    players_path = CACHE_DIR / "players_data.csv"
+    tournaments_path = CACHE_DIR / "tournament_data.csv"
+    tournament_metadata_path = CACHE_DIR / "tournament_metadata.csv"
+    ranking_path = CACHE_DIR / "ranking.txt"
+
+    return {
+        "matches_url": matches_url,
+        "players_url": players_url,
+        "tournaments_url": tournaments_url,
+        "tournament_metadata_url": tournament_metadata_url,
+        "ranking_url": ranking_url,
+        "extra_matches_url": extra_matches_url,
+        "require_rankings": require_rankings,
+        "require_tournament_metadata": require_tournament_metadata,
+        "skip_downloads": skip_downloads,
+        "min_matches": min_matches,
+        "min_ranking_rows": min_ranking_rows,
+        "min_tournament_levels": min_tournament_levels,
+        "max_ranking_age_days": max_ranking_age_days,
+        "max_main_rejection_rate": max_main_rejection_rate,
+        "max_extra_rejection_rate": max_extra_rejection_rate,
+        "durability": durability,
+        "fsync_files": fsync_files,
+        "h2h_encoding": h2h_encoding,
+        "pair_files": pair_files,
+        "pair_chunk_matches": pair_chunk_matches,
+        "chart_min_matches": chart_min_matches,
+        "size_budgets": size_budgets,
+        "size_report_top_n": size_report_top_n,
+        "incremental": incremental,
+        "out_of_core": out_of_core,
+        "out_of_core_memory_bytes": out_of_core_memory_mb << 20,
+        "ingest_batch_rows": ingest_batch_rows,
+        "paths": {
+            "matches": matches_path,
+            "extra_matches": extra_matches_path,
+            "players": players_path,
+            "tournaments": tournaments_path,
+            "tournament_metadata": tournament_metadata_path,
+            "ranking": ranking_path,
+            "ranking_history": RANKING_HISTORY_PATH,
+            "rating_state": RATING_STATE_DIR,
+        },
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the static H2H dataset.")
+    parser.add_argument(
+        "--from-stage",
+        choices=BUILD_STAGE_NAMES,
+        help="Start at this stage, reading earlier results from their checkpoints",
+    )
+    parser.add_argument(
+        "--until-stage", choices=BUILD_STAGE_NAMES, help="Stop after this stage"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Write cProfile stats and top tracemalloc allocators per stage to {PROFILE_DIR}",
+    )
+    args = parser.parse_args(argv)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    config = load_build_config()
+    if args.profile and PROFILE_DIR.exists():
+        shutil.rmtree(PROFILE_DIR)
+    metrics = BuildMetrics(PROFILE_DIR if args.profile else None)
+    config["metrics"] = metrics
+    config["sources"] = SourcePipeline(config)
+    try:
+        run_build_stages(
+            BUILD_STAGES, config, args.from_stage, args.until_stage, metrics=metrics
+        )
+    finally:
+        config["sources"].close()
+        write_json(BUILD_METRICS_PATH, {"stages": metrics.stages}, False)
+    print(f"Stage timings: {metrics.summary()}.")
+    if args.profile:
+        print(f"Per-stage profiles written to {PROFILE_DIR}.")
+    if args.until_stage and args.until_stage != BUILD_STAGE_NAMES[-1]:
+        print(
+            f"Stopped after the {args.until_stage!r} stage; "
+            f"checkpoints are in {STAGE_CHECKPOINT_DIR}."
+        )
+    else:
+        print("Build completed.")
     return 0
 
 
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Serve the site locally, building each data file the first time it is requested.
+
+    python3 scripts/dev_server.py [--port 8000] [--bind 127.0.0.1] [--cache-size 256]
+
+Startup reads the emit stage's inputs from the stage checkpoints of the last build (running
+``python3 scripts/build_h2h.py --until-stage filter`` once is enough), runs the stages
+before emit instead when a checkpoint is missing or stale, and indexes the published
+matches by player. A player's h2h, summary and career files then come from
+build_partition_player_files() over just that player's matches, so they are byte-identical
+to a full build's with the same settings, and og shards from the same share records. The most
+recently requested players and shards are kept in an LRU cache of ``--cache-size`` entries
+each. Build settings such as MIN_MATCHES and H2H_ENCODING are read from the environment,
+as the build reads them.
+
+The served meta.json turns group and pair files off, so the site reads alias groups
+member by member, and og shards are not rewritten for alias groups. Everything outside
+``/data/`` is served from ``public/``.
+"""
+import argparse
+import functools
+import hashlib
+import http.server
+import io
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import build_h2h as h2h  # noqa: E402
+
+# Checkpoints written by ``python3 scripts/build_h2h.py`` pickle its classes under
+# ``__main__``; this name lets this script read them when it is ``__main__``.
+MatchPartitions = h2h.MatchPartitions
+
+DEFAULT_CACHE_SIZE = 256
+DATA_PREFIX = "/data/"
+PLAYER_FILE_KINDS = ("h2h", "summary", "career")
+PLAYER_FILE_PATTERN = re.compile(r"(h2h|summary|career)/([1-9][0-9]*)\.json")
+OG_SHARD_PATTERN = re.compile(r"og/([0-9a-f]{2})\.json")
+
+
+class DevDataset:
+    """The emit stage's inputs, answering requests for single ``data/`` files.
+
+    Player files and og shards are built on first request and cached; the other files are
+    small and encoded up front, except leaderboards.json, which is built once when first
+    requested.
+    """
+
+    def __init__(
+        self,
+        inputs: dict,
+        encoding: str = "objects",
+        chart_min_matches: int = h2h.CHART_MIN_MATCHES,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        matches = inputs["eligible_matches"]
+        if isinstance(matches, h2h.MatchPartitions):
+            matches = matches.read()
+            matches = matches.take(
+                h2h.match_sort_order(matches, [*h2h.MATCH_SORT_COLUMNS, "row_number"])
+            )
+        players = inputs["published_players"]
+        self.player_names: Dict[int, str] = inputs["player_names"]
+        self.encoding = encoding
+        self.chart_min_matches = chart_min_matches
+
+        lookup_frame = h2h.match_lookup_frame(matches)
+        matches["stage_ref"] = lookup_frame["stage_ref"]
+        published_rows = matches["player1_id"].isin(self.player_names) & matches[
+            "player2_id"
+        ].isin(self.player_names)
+        match_lookup = h2h.build_match_lookup(lookup_frame.loc[published_rows])
+        self.matches = matches
+
+        self.rankings = h2h.PlayerRankings(
+            inputs["ranking_history"],
+            {
+                player["id"]: player["ranking_id"]
+                for player in players
+                if player["ranking_id"] is not None
+            },
+        )
+        self.ratings = h2h.player_ratings(inputs["match_ratings"], self.player_names)
+
+        # Row positions of each player's matches: both sides of every row, grouped by
+        # player, so a player's rows are one slice of ``player_rows``.
+        sides = np.concatenate(
+            (
+                matches["id1"].to_numpy(dtype="int64", copy=False),
+                matches["id2"].to_numpy(dtype="int64", copy=False),
+            )
+        )
+        order = np.argsort(sides, kind="stable")
+        self.player_rows = np.tile(np.arange(len(matches), dtype="int64"), 2)[order]
+        self.player_ids, self.player_starts = np.unique(sides[order], return_index=True)
+        self.player_ends = np.append(self.player_starts[1:], len(sides))
+
+        lookup_bytes = h2h.encode_json(match_lookup)
+        lookup_path = f"lookup/{hashlib.sha256(lookup_bytes).hexdigest()[:16]}.json"
+        search_players, search_index = h2h.build_search_index(players, inputs["match_counts"])
+        self.files: Dict[str, bytes] = {
+            "players.json": h2h.encode_json(players),
+            "search/players.json": h2h.encode_json(search_players),
+            "search/index.json": h2h.encode_json(search_index),
+            "tournaments.json": h2h.encode_json(
+                h2h.published_tournaments(inputs["tournaments"], match_lookup)
+            ),
+            lookup_path: lookup_bytes,
+            "meta.json": h2h.encode_json(
+                {
+                    "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "players": len(players),
+                    "matches": len(matches),
+                    "layout": {
+                        "summary_files": True,
+                        "career_files": True,
+                        "group_files": False,
+                        "chart_min_matches": chart_min_matches,
+                        "pair_files": False,
+                        "pair_chunk_matches": None,
+                    },
+                    "lookup": lookup_path,
+                    "h2h_encoding": {"format": encoding},
+                    "source_validation": inputs["source_validation"],
+                }
+            ),
+        }
+        self.lock = threading.Lock()
+        self.built_player_files = functools.lru_cache(maxsize=cache_size)(
+            self.build_player_files
+        )
+        self.built_og_shard = functools.lru_cache(maxsize=cache_size)(self.build_og_shard)
+
+    def file(self, path: str) -> Optional[bytes]:
+        """The bytes of ``data/{path}``, or None if a full build would not write it."""
+        if path in self.files:
+            return self.files[path]
+        # One file is built at a time; requests for cached files wait for it too.
+        with self.lock:
+            if path == "leaderboards.json":
+                return self.leaderboards
+            player_file = PLAYER_FILE_PATTERN.fullmatch(path)
+            if player_file:
+                kind, pid = player_file.group(1), int(player_file.group(2))
+                if pid not in self.player_names:
+                    return None
+                return self.built_player_files(pid)[kind]
+            og_shard = OG_SHARD_PATTERN.fullmatch(path)
+            if og_shard and int(og_shard.group(1), 16) < h2h.OG_SHARD_COUNT:
+                return self.built_og_shard(int(og_shard.group(1), 16))
+        return None
+
+    def build_player_files(self, pid: int) -> Dict[str, Optional[bytes]]:
+        """Run build_partition_player_files() over ``pid``'s matches and read back its files."""
+        index = int(np.searchsorted(self.player_ids, pid))
+        if index < len(self.player_ids) and self.player_ids[index] == pid:
+            rows = np.sort(
+                self.player_rows[self.player_starts[index] : self.player_ends[index]]
+            )
+        else:
+            rows = np.zeros(0, dtype="int64")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            h2h.build_partition_player_files(
+                self.matches.take(rows),
+                self.player_names,
+                {pid},
+                root / "h2h",
+                False,
+                encoding=self.encoding,
+                chart_min_matches=self.chart_min_matches,
+                rankings=self.rankings,
+                ratings=self.ratings,
+            )
+            paths = {kind: root / kind / f"{pid}.json" for kind in PLAYER_FILE_KINDS}
+            return {
+                kind: path.read_bytes() if path.exists() else None
+                for kind, path in paths.items()
+            }
+
+    def build_og_shard(self, index: int) -> bytes:
+        return h2h.encode_json({"pairs": self.og_shard_pairs[index]})
+
+    @functools.cached_property
+    def og_shard_pairs(self) -> list[dict]:
+        """Every og shard's share records, as write_og_shards() would write them."""
+        id1_values = self.matches["id1"].to_numpy(dtype="int64", copy=False)
+        id2_values = self.matches["id2"].to_numpy(dtype="int64", copy=False)
+        starts, ends = h2h.pair_group_bounds(id1_values, id2_values)
+        pair_keys = [
+            (int(id1_values[start]), int(id2_values[start])) for start in starts.tolist()
+        ]
+        published_pairs = np.array(
+            [
+                group_index
+                for group_index, (id1, id2) in enumerate(pair_keys)
+                if id1 in self.player_names and id2 in self.player_names
+            ],
+            dtype="int64",
+        )
+        return h2h.og_shard_pairs(
+            *h2h.share_pair_records(
+                self.matches, starts, ends, pair_keys, published_pairs, self.player_names
+            )
+        )
+
+    @functools.cached_property
+    def leaderboards(self) -> bytes:
+        return h2h.encode_json(h2h.build_rivalry_leaderboards(self.matches, self.player_names))
+
+
+def load_emit_inputs(config: dict) -> dict:
+    """The emit stage's inputs, from checkpoints if they match the sources and settings."""
+    emit_index = h2h.BUILD_STAGE_NAMES.index("emit")
+    serve = h2h.BUILD_STAGES[emit_index]._replace(
+        name="serve", outputs=(), run=lambda config, inputs: dict(inputs)
+    )
+    stages = [*h2h.BUILD_STAGES[:emit_index], serve]
+    config["metrics"] = h2h.BuildMetrics()
+    config["sources"] = h2h.SourcePipeline(config)
+    try:
+        try:
+            return h2h.run_build_stages(stages, config, "serve")
+        except RuntimeError as exc:
+            print(f"{exc} Running the stages before emit instead.")
+            return h2h.run_build_stages(stages, config)
+    finally:
+        config["sources"].close()
+
+
+class DevRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves ``/data/`` from a DevDataset and everything else from ``public/``."""
+
+    def __init__(self, *args, dataset: DevDataset, **kwargs) -> None:
+        self.dataset = dataset
+        super().__init__(*args, directory=str(h2h.PUBLIC_DIR), **kwargs)
+
+    def send_head(self):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if not path.startswith(DATA_PREFIX):
+            return super().send_head()
+        data = self.dataset.file(path[len(DATA_PREFIX) :])
+        if data is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "Not a file of this dataset")
+            return None
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        return io.BytesIO(data)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the site with data built on demand.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Players, and separately og shards, kept in memory once built",
+    )
+    args = parser.parse_args()
+    if args.cache_size < 1:
+        raise ValueError("--cache-size must be at least 1.")
+    h2h.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    config = h2h.load_build_config()
+
+    started = time.perf_counter()
+    inputs = load_emit_inputs(config)
+    dataset = DevDataset(
+        inputs, config["h2h_encoding"], config["chart_min_matches"], args.cache_size
+    )
+    print(
+        f"Indexed {len(dataset.matches)} matches of {len(dataset.player_names)} players "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+    server = http.server.ThreadingHTTPServer(
+        (args.bind, args.port), functools.partial(DevRequestHandler, dataset=dataset)
+    )
+    print(f"Serving http://{args.bind}:{args.port}/ (Ctrl+C to stop).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
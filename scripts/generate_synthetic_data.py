@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""Write seeded synthetic source files in the layout scripts/build_h2h.py reads from .cache/.
+
+    python3 scripts/generate_synthetic_data.py [--output DIR] --players 1000 --matches 20000
+
+Tournaments have a round-robin group stage and a best-of-three playoff bracket, and players
+enter them with a skewed popularity, so a few long rivalries sit among many short ones. A
+share of the tournaments (--overlap-rate) is also listed in the supplemental bordshockey CSV
+under its own tournament IDs, as the live sources overlap; a few tournaments exist only there,
+some with blank player IDs that the build resolves from names. The same seed and sizes always
+produce the same files.
+
+The build's own .cache/ is refused: the downloader keeps ETag and Last-Modified sidecars
+there, so the next build would get a 304 for each overwritten source and publish synthetic
+matches.
+"""
+import argparse
+import csv
+import itertools
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+FIRST_NAMES = (
+    "Anders", "Björn", "Dmitri", "Elina", "Erik", "Fredrik", "Gustav", "Hanna", "Henrik",
+    "Ivan", "Jan", "Jarmo", "Jonas", "Kalle", "Kristian", "Lars", "Magnus", "Marek",
+    "Mikko", "Niklas", "Ola", "Pavel", "Petr", "Roman", "Sami", "Stefan", "Søren",
+    "Tomáš", "Ville", "Øystein",
+)
+LAST_NAMES = (
+    "Andersson", "Berg", "Dvořák", "Eriksson", "Halvorsen", "Hansen", "Johansson",
+    "Karlsson", "Korhonen", "Kuznetsov", "Larsen", "Lindqvist", "Mäkinen", "Nielsen",
+    "Novák", "Olsen", "Petrov", "Sokolov", "Svoboda", "Virtanen", "Wójcik", "Åberg",
+)
+COUNTRIES = (
+    ("Norway", "NOR"),
+    ("Sweden", "SWE"),
+    ("Finland", "FIN"),
+    ("Czech Republic", "CZE"),
+    ("Russia", "RUS"),
+    ("Latvia", "LAT"),
+)
+PARQUET_COLUMNS = [
+    "StageID",
+    "Player1",
+    "Player1ID",
+    "Player2",
+    "Player2ID",
+    "GoalsPlayer1",
+    "GoalsPlayer2",
+    "Overtime",
+    "Stage",
+    "RoundNumber",
+    "PlayoffGameNumber",
+    "Date",
+    "TournamentName",
+    "TournamentID",
+    "StageSequence",
+    "MatchID",
+]
+EXTRA_COLUMNS = [
+    "StageID",
+    "Player1",
+    "Player1ID",
+    "Player2",
+    "Player2ID",
+    "GoalsPlayer1",
+    "GoalsPlayer2",
+    "Overtime",
+    "Stage",
+    "RoundNumber",
+    "PlayoffGameNumber",
+    "Date",
+    "TournamentName",
+    "TournamentID",
+    "StageSequence",
+    "StageType",
+    "TournamentURL",
+    "ResultURL",
+    "StageURL",
+    "SourceURL",
+    "Source",
+    "SourceTournamentID",
+    "SourceStageID",
+    "SourceMatchID",
+]
+PLAYOFF_ROUNDS = ("Quarterfinal", "Semifinal", "Final")
+FIRST_DATE = date(2000, 1, 8)
+LAST_DATE = date(2026, 6, 27)
+GROUP_SIZE = 6
+# Share of tournaments listed only in the supplemental CSV, and of their player IDs left blank.
+EXTRA_ONLY_RATE = 0.02
+BLANK_EXTRA_ID_RATE = 0.05
+BORDSHOCKEY_TOURNAMENT_ID_OFFSET = 800_000_000
+# scripts/build_h2h.py's CACHE_DIR, where the downloaded sources live.
+BUILD_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+
+def player_names(count: int, rng: random.Random) -> list[str]:
+    """Draw names from a small pool so large rosters, like the real one, repeat some."""
+    return [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(count)]
+
+
+def play_game(rng: random.Random, strength1: float, strength2: float, playoff: bool):
+    share = strength1 / (strength1 + strength2)
+    goals1 = min(12, int(rng.expovariate(1 / (5.0 * share))))
+    goals2 = min(12, int(rng.expovariate(1 / (5.0 * (1 - share)))))
+    overtime = False
+    if playoff and goals1 == goals2:
+        overtime = True
+        if rng.random() < share:
+            goals1 += 1
+        else:
+            goals2 += 1
+    return goals1, goals2, overtime
+
+
+def generate_synthetic_sources(
+    output_dir: Path,
+    players: int = 1000,
+    matches: int = 20000,
+    overlap_rate: float = 0.1,
+    seed: int = 1,
+) -> dict:
+    """Write the six source files into output_dir and return their row counts."""
+    if players < 8:
+        raise ValueError("players must be at least 8.")
+    if matches < 1:
+        raise ValueError("matches must be at least 1.")
+    if not 0 <= overlap_rate <= 1:
+        raise ValueError("overlap_rate must be between 0 and 1.")
+    if output_dir.resolve() == BUILD_CACHE_DIR:
+        raise ValueError(
+            f"Refusing to overwrite the downloaded sources in {BUILD_CACHE_DIR}; "
+            "write synthetic data to another directory."
+        )
+    rng = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    names = player_names(players, rng)
+    strengths = [rng.lognormvariate(0, 0.5) for _ in range(players)]
+    # Activity follows a Zipf-like curve, so a few players enter most tournaments.
+    activity = [1 / (rank + 10) for rank in range(players)]
+    rng.shuffle(activity)
+    cumulative_activity = list(itertools.accumulate(activity))
+    countries = [rng.choice(COUNTRIES) for _ in range(players)]
+
+    primary_rows = []
+    extra_rows = []
+    tournaments = []
+    played = 0
+    match_id = 0
+    stage_id = 0
+    while played < matches:
+        tournament_id = len(tournaments) + 1
+        name = f"{rng.choice(LAST_NAMES)} Open {tournament_id}"
+        roll = rng.random()
+        listed_in = (
+            {"extra"}
+            if roll < EXTRA_ONLY_RATE
+            else {"primary", "extra"}
+            if roll < EXTRA_ONLY_RATE + overlap_rate
+            else {"primary"}
+        )
+        tournaments.append((tournament_id, name, listed_in))
+        entrants = list(
+            dict.fromkeys(
+                rng.choices(range(players), cum_weights=cumulative_activity, k=40)
+            )
+        )[: rng.randint(8, 32)]
+        rng.shuffle(entrants)
+
+        games = []
+        for group_index in range(0, len(entrants), GROUP_SIZE):
+            group = entrants[group_index : group_index + GROUP_SIZE]
+            stage_id += 1
+            per_round = max(1, len(group) // 2)
+            label = f"Group {chr(ord('A') + group_index // GROUP_SIZE)}"
+            for game_index, (player1, player2) in enumerate(itertools.combinations(group, 2)):
+                result = play_game(rng, strengths[player1], strengths[player2], False)
+                games.append(
+                    (stage_id, label, 1, game_index // per_round + 1, None, player1, player2,
+                     *result)
+                )
+        bracket = sorted(entrants, key=lambda player: -strengths[player])[:8]
+        for round_index, label in enumerate(PLAYOFF_ROUNDS):
+            stage_id += 1
+            winners = []
+            for pair_index in range(0, len(bracket) - 1, 2):
+                player1, player2 = bracket[pair_index], bracket[len(bracket) - 1 - pair_index]
+                wins = [0, 0]
+                game_number = 0
+                while max(wins) < 2:
+                    game_number += 1
+                    result = play_game(rng, strengths[player1], strengths[player2], True)
+                    games.append(
+                        (stage_id, label, round_index + 2, pair_index // 2 + 1, game_number,
+                         player1, player2, *result)
+                    )
+                    wins[0 if result[0] > result[1] else 1] += 1
+                winners.append(player1 if wins[0] == 2 else player2)
+            bracket = winners
+
+        day = FIRST_DATE + timedelta(
+            days=int((LAST_DATE - FIRST_DATE).days * rng.random())
+        )
+        for game in games:
+            stage, label, sequence, round_number, game_number, player1, player2 = game[:7]
+            goals1, goals2, overtime = game[7:]
+            match_id += 1
+            row = {
+                "StageID": stage,
+                "Player1": names[player1],
+                "Player1ID": player1 + 1,
+                "Player2": names[player2],
+                "Player2ID": player2 + 1,
+                "GoalsPlayer1": goals1,
+                "GoalsPlayer2": goals2,
+                "Overtime": "Yes" if overtime else "No",
+                "Stage": label,
+                "RoundNumber": round_number,
+                "PlayoffGameNumber": game_number,
+                "Date": (day + timedelta(days=sequence // 2)).isoformat(),
+                "TournamentName": name,
+                "TournamentID": tournament_id,
+                "StageSequence": sequence,
+                "MatchID": match_id,
+            }
+            if "primary" in listed_in:
+                primary_rows.append(row)
+            if "extra" in listed_in:
+                season = f"{day.year % 100:02d}{(day.year + 1) % 100:02d}"
+                slug = f"{season}/{name.lower().replace(' ', '-')}"
+                tournament_url = f"https://bordshockey.net/tavlingar/{slug}/"
+                stage_url = f"{tournament_url}resultat/stage-{stage}/"
+                extra_rows.append(
+                    {
+                        **row,
+                        "Player1ID": "" if rng.random() < BLANK_EXTRA_ID_RATE else player1 + 1,
+                        "TournamentID": BORDSHOCKEY_TOURNAMENT_ID_OFFSET + tournament_id,
+                        "StageType": "round-robin" if game_number is None else "playoff",
+                        "TournamentURL": tournament_url,
+                        "ResultURL": f"{tournament_url}resultat/",
+                        "StageURL": stage_url,
+                        "SourceURL": f"{stage_url}?matcher={round_number}",
+                        "Source": "bordshockey.net",
+                        "SourceTournamentID": slug,
+                        "SourceStageID": str(stage),
+                        "SourceMatchID": str(match_id),
+                    }
+                )
+            played += 1
+            if played >= matches:
+                break
+
+    primary = pd.DataFrame(primary_rows, columns=PARQUET_COLUMNS)
+    primary["PlayoffGameNumber"] = primary["PlayoffGameNumber"].astype("Int64")
+    primary.to_parquet(output_dir / "scraped_matches.parquet", index=False)
+    with (output_dir / "extra_matches.csv").open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=EXTRA_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(extra_rows)
+
+    ranked = sorted(
+        (player for player in range(players) if player % 10 < 7),
+        key=lambda player: -strengths[player],
+    )
+    pd.DataFrame(
+        {
+            "PlayerID": range(1, players + 1),
+            "Name": names,
+            "RankingID": [
+                10_000 + player if player % 10 < 7 else None for player in range(players)
+            ],
+            "Country": [country for country, _ in countries],
+            "City": "",
+            "DateOfBirth": "",
+            "Sex": [rng.choice(("Male", "Male", "Male", "Female")) for _ in range(players)],
+        }
+    ).astype({"RankingID": "Int64"}).to_csv(output_dir / "players_data.csv", index=False)
+    pd.DataFrame(
+        {
+            "ID": [tournament_id for tournament_id, _, _ in tournaments],
+            "Name": [name for _, name, _ in tournaments],
+            "Type": "Individual",
+        }
+    ).to_csv(output_dir / "tournament_data.csv", index=False)
+    pd.DataFrame(
+        {
+            "TournamentID": [tournament_id for tournament_id, _, _ in tournaments],
+            "Level": [rng.choice(("1", "2", "3", "4", "5", "WC")) for _ in tournaments],
+        }
+    ).to_csv(output_dir / "tournament_metadata.csv", index=False)
+    lines = [
+        f"Table hockey ranking up to {LAST_DATE.day}.{LAST_DATE.month}.{LAST_DATE.year}",
+        "Rank ID_Player Player Club Nation Points Player_Value",
+    ]
+    for rank, player in enumerate(ranked, start=1):
+        lines.append(
+            f"{rank} {10_000 + player} {names[player]} Club {countries[player][1]} "
+            f"{max(1, 9000 - 3 * rank)} {max(1, 1000 - rank // 3)}"
+        )
+    (output_dir / "ranking.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return {
+        "players": players,
+        "matches": played,
+        "primary_matches": len(primary_rows),
+        "supplemental_matches": len(extra_rows),
+        "overlapping_matches": len(primary_rows) + len(extra_rows) - played,
+        "tournaments": len(tournaments),
+        "ranked_players": len(ranked),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write seeded synthetic H2H source files.")
+    parser.add_argument(
+        "--output",
+        default=str(BUILD_CACHE_DIR / "synthetic"),
+        help="Directory for the source files; not the build's own .cache/",
+    )
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument(
+        "--overlap-rate",
+        type=float,
+        default=0.1,
+        help="Share of tournaments also listed in the supplemental CSV",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    counts = generate_synthetic_sources(
+        Path(args.output), args.players, args.matches, args.overlap_rate, args.seed
+    )
+    print(", ".join(f"{value} {name.replace('_', ' ')}" for name, value in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
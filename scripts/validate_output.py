@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""Check a built dataset for internal consistency across a process pool.
+
+    python3 scripts/validate_output.py [--data-dir public/data] [--workers N]
+                                       [--output report.json] [--max-errors 200]
+
+Every published player's h2h file is decoded in a worker process, which checks each
+opponent summary against its match list: totals, wins, draws, goals, overtime games, first
+and last meeting dates, last_10, and the tournaments the matches' stages point to. Each
+side of a pair is reduced to its summary and a digest of its matches and per-match ranks
+and ratings, seen from the lower ID, so the parent can check that A-vs-B mirrors B-vs-A
+without holding any match lists. The og shards are then checked against those summaries:
+every published pair has exactly one record, in the shard its key hashes to, with the same
+names and counts. A pair with an aliased player must instead carry the record of the two
+whole alias groups, recounted from the groups/ files the way the comparison page merges them.
+
+The report is printed as JSON; the exit status is 1 if any check failed.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import build_h2h as h2h  # noqa: E402
+
+REPORT_VERSION = 2
+PLAYERS_PER_TASK = 64
+# Names for the parts of a pair_side() tuple, in order.
+PAIR_SIDE_FIELDS = [
+    "total_matches",
+    "wins_draws_losses",
+    "goals",
+    "last_10",
+    "overtime_games",
+    "first_meeting_date",
+    "last_meeting_date",
+    "matches",
+]
+MIRRORED_MATCH_FIELDS = [
+    field
+    for field in h2h.MATCH_FIELDS
+    if field not in ("goals_for_player", "goals_for_opponent")
+]
+# Opponent records of player and opponent arrays aligned with the match list.
+ALIGNED_OPPONENT_FIELDS = ("ranks", "ratings")
+
+# Set once per worker process by init_worker().
+WORKER_STATE: dict = {}
+
+
+def init_worker(data_dir: str, names: Dict[int, str], stage_tournaments: Optional[dict]):
+    WORKER_STATE.update(
+        data_dir=Path(data_dir), names=names, stage_tournaments=stage_tournaments
+    )
+
+
+def load_lookup(data_dir: Path) -> Optional[dict]:
+    """The match lookup meta.json points to, or None without one."""
+    meta_path = data_dir / "meta.json"
+    if not meta_path.exists():
+        return None
+    with meta_path.open("r", encoding="utf-8") as handle:
+        lookup_name = json.load(handle).get("lookup")
+    if not lookup_name or not (data_dir / lookup_name).exists():
+        return None
+    with (data_dir / lookup_name).open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def load_stage_tournaments(lookup: Optional[dict]) -> Optional[Dict[str, Optional[int]]]:
+    """Map each lookup stage_ref to its tournament ID, or None without a lookup."""
+    if lookup is None:
+        return None
+    return {
+        stage_ref: lookup["tournaments"].get(stage.get("tournament_ref"), {}).get(
+            "tournament_id"
+        )
+        for stage_ref, stage in lookup["stages"].items()
+    }
+
+
+def expected_summary(matches: list[dict]) -> dict:
+    """Recount the summary fields that follow from an opponent's match list."""
+    results = [h2h.match_result(match) for match in matches]
+    dated = [match for match in matches if match.get("date")]
+    last_10 = [h2h.match_result(match) for match in dated[-10:]]
+    return {
+        "total_matches": len(matches),
+        "wins_player": results.count("W"),
+        "wins_opponent": results.count("L"),
+        "draws": results.count("D"),
+        "goals_for_player": sum(match["goals_for_player"] for match in matches),
+        "goals_for_opponent": sum(match["goals_for_opponent"] for match in matches),
+        "overtime_games": sum(1 for match in matches if match.get("overtime")),
+        "first_meeting_date": dated[0]["date"] if dated else None,
+        "last_meeting_date": dated[-1]["date"] if dated else None,
+        "last_10": {
+            "wins": last_10.count("W"),
+            "losses": last_10.count("L"),
+            "draws": last_10.count("D"),
+        },
+    }
+
+
+def pair_side(summary: dict, matches: list[dict], opponent: dict, owner_is_low: bool) -> tuple:
+    """One side of a pair as seen from the lower player ID, for the mirror check."""
+    last_10 = summary["last_10"]
+    counts = (summary["wins_player"], summary["draws"], summary["wins_opponent"])
+    goals = (summary["goals_for_player"], summary["goals_for_opponent"])
+    form = (last_10["wins"], last_10["draws"], last_10["losses"])
+    if not owner_is_low:
+        counts, goals, form = counts[::-1], goals[::-1], form[::-1]
+    digest = hashlib.sha1()
+    for match in matches:
+        score = [match["goals_for_player"], match["goals_for_opponent"]]
+        if not owner_is_low:
+            score.reverse()
+        row = [match.get(field) for field in MIRRORED_MATCH_FIELDS] + score
+        digest.update(json.dumps(row, separators=(",", ":")).encode("utf-8"))
+    for field in ALIGNED_OPPONENT_FIELDS:
+        if field in opponent:
+            sides = [opponent[field]["player"], opponent[field]["opponent"]]
+            if not owner_is_low:
+                sides.reverse()
+            digest.update(json.dumps([field, sides], separators=(",", ":")).encode("utf-8"))
+    return (
+        summary["total_matches"],
+        counts,
+        goals,
+        form,
+        summary["overtime_games"],
+        summary["first_meeting_date"],
+        summary["last_meeting_date"],
+        digest.hexdigest(),
+    )
+
+
+def alias_share_records(
+    data_dir: Path,
+    alias_groups: list[list[int]],
+    names: Dict[int, str],
+    lookup: dict,
+    pairs: Dict[Tuple[int, int], tuple],
+) -> Tuple[Dict[Tuple[int, int], list], list[dict]]:
+    """The merged share records of aliased pairs that met, from the groups/ files."""
+    group_of = {pid: tuple(group) for group in alias_groups for pid in group}
+    records: Dict[Tuple[int, int], list] = {}
+    errors: list[dict] = []
+    for group in alias_groups:
+        relative_path = f"groups/{h2h.alias_group_file_name(group)}"
+        try:
+            with (data_dir / relative_path).open("r", encoding="utf-8") as handle:
+                payload = h2h.decode_columnar_payload(json.load(handle))
+        except (OSError, ValueError, KeyError) as exc:
+            errors.append(
+                {"check": "group_readable", "file": relative_path, "detail": f"{exc}"}
+            )
+            continue
+        # An aliased opponent's members are merged too, and a game listed under several
+        # members of either group counts once.
+        identities: Dict[tuple, dict] = {}
+        for opponent_key, opponent in payload.get("opponents", {}).items():
+            identity = identities.setdefault(
+                group_of.get(int(opponent_key), (int(opponent_key),)), {}
+            )
+            for match in opponent["matches"]:
+                identity.setdefault(h2h.alias_match_key(match, lookup), match)
+        for opponent_group, merged in identities.items():
+            results = [h2h.match_result(match) for match in merged.values()]
+            counts = (results.count("W"), results.count("D"), results.count("L"))
+            for player_id in group:
+                for opponent_id in opponent_group:
+                    low, high = sorted((player_id, opponent_id))
+                    if (low, high) in pairs:
+                        records[(low, high)] = [
+                            names[low],
+                            names[high],
+                            len(results),
+                            *(counts if low == player_id else counts[::-1]),
+                        ]
+    return records, errors
+
+
+def validate_player_files(player_ids: list[int]) -> dict:
+    """Check the given players' h2h files; return their errors and pair sides."""
+    data_dir = WORKER_STATE["data_dir"]
+    names = WORKER_STATE["names"]
+    stage_tournaments = WORKER_STATE["stage_tournaments"]
+    errors: list[dict] = []
+    sides: Dict[Tuple[int, int, int], tuple] = {}
+    matches_seen = 0
+
+    def fail(check: str, path: str, detail: str) -> None:
+        errors.append({"check": check, "file": path, "detail": detail})
+
+    for player_id in player_ids:
+        relative_path = f"h2h/{player_id}.json"
+        try:
+            with (data_dir / relative_path).open("r", encoding="utf-8") as handle:
+                payload = h2h.decode_columnar_payload(json.load(handle))
+        except (OSError, ValueError, KeyError) as exc:
+            fail("readable", relative_path, f"{type(exc).__name__}: {exc}")
+            continue
+        if payload.get("player", {}).get("id") != player_id:
+            fail("player", relative_path, f"player.id is {payload.get('player', {}).get('id')}")
+        for opponent_key, opponent in payload.get("opponents", {}).items():
+            opponent_id = int(opponent_key)
+            where = f"{relative_path} vs {opponent_id}"
+            if opponent_id not in names:
+                fail("opponent_published", relative_path, f"{opponent_id} is not published")
+            elif opponent.get("player", {}).get("name") != names[opponent_id]:
+                name = opponent.get("player", {}).get("name")
+                fail("opponent_name", where, f"name is {name!r}")
+            if opponent_id == player_id:
+                fail("self_pair", where, "player lists itself as an opponent")
+                continue
+            summary = opponent["summary"]
+            matches = opponent["matches"]
+            matches_seen += len(matches)
+            for field, value in expected_summary(matches).items():
+                if summary.get(field) != value:
+                    fail(
+                        "summary",
+                        where,
+                        f"{field} is {summary.get(field)!r}, matches give {value!r}",
+                    )
+            if stage_tournaments is not None:
+                listed = {tournament["id"] for tournament in summary.get("tournaments", [])}
+                played = {stage_tournaments.get(match.get("stage_ref")) for match in matches}
+                played.discard(None)
+                if listed != played:
+                    fail(
+                        "tournaments",
+                        where,
+                        f"summary lists {sorted(listed)}, matches reach {sorted(played)}",
+                    )
+            for series in opponent.get("series", []):
+                if any(not 0 <= game < len(matches) for game in series["games"]):
+                    fail("series", where, f"series games {series['games']} out of range")
+            for field in ALIGNED_OPPONENT_FIELDS:
+                if field in opponent and any(
+                    len(opponent[field][side]) != len(matches) for side in ("player", "opponent")
+                ):
+                    fail(field, where, f"{field} do not line up with {len(matches)} matches")
+            low, high = sorted((player_id, opponent_id))
+            sides[(low, high, player_id)] = pair_side(summary, matches, opponent, player_id == low)
+    return {"errors": errors, "sides": sides, "matches": matches_seen}
+
+
+def validate_dataset(data_dir: Path, workers: Optional[int] = None) -> dict:
+    """Run every check over ``data_dir``; return the report."""
+    started = time.perf_counter()
+    with (data_dir / "players.json").open("r", encoding="utf-8") as handle:
+        names = {int(player["id"]): player["name"] for player in json.load(handle)}
+    player_ids = sorted(names)
+    errors: list[dict] = []
+    sides: Dict[Tuple[int, int, int], tuple] = {}
+    matches_seen = 0
+    lookup = load_lookup(data_dir)
+
+    tasks = [
+        player_ids[start : start + PLAYERS_PER_TASK]
+        for start in range(0, len(player_ids), PLAYERS_PER_TASK)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(str(data_dir), names, load_stage_tournaments(lookup)),
+    ) as pool:
+        for result in pool.map(validate_player_files, tasks):
+            errors.extend(result["errors"])
+            sides.update(result["sides"])
+            matches_seen += result["matches"]
+
+    pairs: Dict[Tuple[int, int], tuple] = {}
+    for (low, high, owner), side in sides.items():
+        other = sides.get((low, high, high if owner == low else low))
+        where = f"h2h/{low}.json vs {high}"
+        if other is None:
+            missing_in, missing_id = (high, low) if owner == low else (low, high)
+            errors.append(
+                {
+                    "check": "mirror_missing",
+                    "file": where,
+                    "detail": f"h2h/{missing_in}.json has no entry for {missing_id}",
+                }
+            )
+            continue
+        if owner != low:
+            continue
+        pairs[(low, high)] = side
+        if side != other:
+            differing = [
+                name for name, mine, theirs in zip(PAIR_SIDE_FIELDS, side, other) if mine != theirs
+            ]
+            errors.append(
+                {"check": "mirror", "file": where, "detail": f"sides differ in {differing}"}
+            )
+
+    alias_groups = h2h.load_alias_groups(data_dir.parent / "aliases.json", names)
+    alias_records: Dict[Tuple[int, int], list] = {}
+    if alias_groups and lookup is None:
+        errors.append(
+            {"check": "alias_lookup", "file": "meta.json", "detail": "no lookup to merge groups"}
+        )
+    elif alias_groups:
+        alias_records, alias_errors = alias_share_records(
+            data_dir, alias_groups, names, lookup, pairs
+        )
+        errors.extend(alias_errors)
+    og_pairs = 0
+    alias_pairs = 0
+    og_keys = set()
+    for index in range(h2h.OG_SHARD_COUNT):
+        relative_path = f"og/{h2h.og_shard_name(index)}"
+        try:
+            with (data_dir / relative_path).open("r", encoding="utf-8") as handle:
+                records = json.load(handle)["pairs"]
+        except (OSError, ValueError, KeyError) as exc:
+            errors.append(
+                {"check": "og_readable", "file": relative_path, "detail": f"{exc}"}
+            )
+            continue
+        for key, record in records.items():
+            low, high = (int(part) for part in key.split("-"))
+            og_pairs += 1
+            if h2h.og_shard_index(low, high) != index:
+                errors.append(
+                    {"check": "og_shard", "file": relative_path, "detail": f"{key} misplaced"}
+                )
+            og_keys.add((low, high))
+            side = pairs.get((low, high))
+            if side is None:
+                errors.append(
+                    {"check": "og_pair", "file": relative_path, "detail": f"{key} not in h2h"}
+                )
+                continue
+            if (low, high) in alias_records:
+                alias_pairs += 1
+                expected, source = alias_records[(low, high)], "alias groups give"
+            else:
+                expected = [names.get(low), names.get(high), side[0], *side[1]]
+                source = "h2h gives"
+            if record != expected:
+                errors.append(
+                    {
+                        "check": "og_record",
+                        "file": relative_path,
+                        "detail": f"{key} is {record}, {source} {expected}",
+                    }
+                )
+    for low, high in sorted(set(pairs) - og_keys):
+        errors.append(
+            {"check": "og_pair", "file": "og", "detail": f"{low}-{high} has no record"}
+        )
+
+    by_check: Dict[str, int] = {}
+    for error in errors:
+        by_check[error["check"]] = by_check.get(error["check"], 0) + 1
+    return {
+        "version": REPORT_VERSION,
+        "data_dir": str(data_dir),
+        "players": len(player_ids),
+        "pairs": len(pairs),
+        "player_side_matches": matches_seen,
+        "og_pairs": og_pairs,
+        "og_alias_pairs": alias_pairs,
+        "workers": workers or os.cpu_count(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "error_count": len(errors),
+        "errors_by_check": dict(sorted(by_check.items())),
+        "errors": errors,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate a built H2H dataset.")
+    parser.add_argument("--data-dir", default=str(h2h.DATA_DIR))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="Also write the full JSON report to this path")
+    parser.add_argument(
+        "--max-errors", type=int, default=200, help="Errors listed in the printed report"
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        raise ValueError("--workers must be at least 1.")
+    data_dir = Path(args.data_dir)
+    if not (data_dir / "players.json").exists():
+        raise FileNotFoundError(f"{data_dir / 'players.json'} missing. Run the build first.")
+
+    # Alias-group warnings go to stderr so stdout stays one JSON document.
+    with contextlib.redirect_stdout(sys.stderr):
+        report = validate_dataset(data_dir, args.workers)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    printed = {**report, "errors": report["errors"][: args.max_errors]}
+    print(json.dumps(printed, indent=2))
+    return 1 if report["error_count"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,15 +17,33 @@ const {
   selectionsShareIdentity,
 } = await import("../public/js/players.js");
 const { applyFilters } = await import("../public/js/filters.js");
-const { getSeriesGroupKey } = await import("../public/js/series.js");
+const { buildPlayoffSeries, getSeriesGroupKey } = await import("../public/js/series.js");
+const {
+  buildSuggestions,
+  createSearchIndex,
+  findCandidatePositions,
+} = await import("../public/js/typeahead.js");
 const { sanitizeName } = await import("../public/js/share.js");
 const { decodeHtmlEntities, parseOvertime } = await import("../public/js/utils.js");
-const { fetchJson } = await import("../public/js/data.js");
+const {
+  fetchJson,
+  attachColumnarMatches,
+  attachPairChart,
+  attachPrebuiltSeries,
+  expandMatchRefs,
+  loadMatchup,
+  loadPlayerCareer,
+  loadPlayerStats,
+  normalizePlayerMatch,
+} = await import("../public/js/data.js");
 const {
   allowsGenerationalMotion,
+  getChronologicalItems,
   getCurrentWinStreak,
+  getPairChart,
   getStreakPresentation,
 } = await import("../public/js/form.js?v=20260801-generational-run-v3");
+const { describeRivalry, getRivalryEntries } = await import("../public/js/rivalries.js");
 
 function resultItem(ts, result, extra = {}) {
   return {
@@ -93,6 +111,82 @@ test("ID-less recurring tournaments do not merge into one playoff series", () =>
   );
 });
 
+test("prebuilt playoff series group and order games like the key-based rebuild", () => {
+  const raw = [
+    { date: "2026-03-01", stage: "Quarterfinal", tournament_id: 10, round_number: 1, playoff_game_number: 2, goals_for_player: 1, goals_for_opponent: 3 },
+    { date: "2026-03-01", stage: "Quarterfinal", tournament_id: 10, round_number: 1, playoff_game_number: 1, goals_for_player: 2, goals_for_opponent: 1 },
+    { date: "2026-03-01", stage: "Group A", tournament_id: 10, round_number: 1, goals_for_player: 5, goals_for_opponent: 0 },
+    { date: "2026-03-01", stage: "Quarterfinal", tournament_id: 10, round_number: 1, playoff_game_number: 3, goals_for_player: 0, goals_for_opponent: 4 },
+    { date: "2026-03-02", stage: "Semifinal", tournament_id: 10, round_number: 2, playoff_game_number: 1, goals_for_player: 3, goals_for_opponent: 2 },
+  ];
+  const seriesOf = (matches) => buildPlayoffSeries(matches).map((series) => [
+    series.games.map((game) => matches.indexOf(game)),
+    series.game_wins_a,
+    series.game_wins_b,
+    series.best_of,
+  ]);
+  const plain = raw.map((match) => normalizePlayerMatch(match, false));
+  const prebuilt = attachPrebuiltSeries(raw.map((match) => normalizePlayerMatch(match, false)), [
+    { games: [1, 0, 3], best_of: 3 },
+    { games: [4], best_of: 1 },
+  ]);
+
+  assert.deepEqual(seriesOf(prebuilt), seriesOf(plain));
+  assert.deepEqual(seriesOf(prebuilt), [[[1, 0, 3], 2, 1, 3], [[4], 0, 1, 1]]);
+  assert.equal(prebuilt[2].prebuilt_series, undefined);
+  // A filtered view holding part of a series falls back to sorting its games.
+  const partial = [prebuilt[3], prebuilt[0]];
+  assert.deepEqual(buildPlayoffSeries(partial)[0].games, [prebuilt[0], prebuilt[3]]);
+});
+
+test("prebuilt pair charts place games and streaks like a chronological sort", () => {
+  const raw = [
+    { date: "2026-03-03", goals_for_player: 2, goals_for_opponent: 1 },
+    { date: "2026-03-01", goals_for_player: 0, goals_for_opponent: 0 },
+    { date: "2026-03-02", goals_for_player: 1, goals_for_opponent: 3 },
+    { date: "2026-03-04", goals_for_player: 4, goals_for_opponent: 2 },
+  ];
+  const chart = {
+    order: [1, 2, 0, 3],
+    wins: [0, 0, 1, 2],
+    draws: [1, 1, 1, 1],
+    years: [["2026", 7, 6, 4]],
+    streak: { result: "W", length: 2 },
+  };
+  try {
+    for (const isPlayerA of [true, false]) {
+      const plain = raw.map((match) => normalizePlayerMatch(match, isPlayerA));
+      const matches = raw.map((match) => normalizePlayerMatch(match, isPlayerA));
+      state.pairChart = attachPairChart(matches, chart, isPlayerA);
+      assert.equal(getPairChart(matches), state.pairChart);
+      assert.deepEqual(
+        getChronologicalItems(matches).map((match) => matches.indexOf(match)),
+        getChronologicalItems(plain).map((match) => plain.indexOf(match)),
+      );
+      assert.equal(getCurrentWinStreak(matches), getCurrentWinStreak(plain));
+      const ordered = getChronologicalItems(plain);
+      assert.deepEqual(
+        state.pairChart.wins,
+        ordered.map((_, index) => ordered.slice(0, index + 1).filter((m) => m.result === "A").length),
+      );
+      assert.deepEqual(state.pairChart.years, [
+        { year: "2026", goalsA: isPlayerA ? 7 : 6, goalsB: isPlayerA ? 6 : 7, games: 4 },
+      ]);
+      // Filtered views are sorted as before.
+      assert.equal(getPairChart(matches.slice(1)), null);
+    }
+
+    // An order that disagrees with the client's sort is never trusted.
+    const matches = raw.map((match) => normalizePlayerMatch(match, true));
+    state.pairChart = attachPairChart(matches, { ...chart, order: [0, 1, 2, 3] }, true);
+    assert.equal(getPairChart(matches), null);
+    assert.deepEqual(getChronologicalItems(matches).map((match) => match.date.slice(-2)), ["01", "02", "03", "04"]);
+    assert.equal(attachPairChart(matches, { ...chart, order: [0, 0, 1, 2] }, true), null);
+  } finally {
+    state.pairChart = null;
+  }
+});
+
 test("share filenames preserve non-Latin names and always have a fallback", () => {
   assert.equal(sanitizeName("Алексей Иванов"), "Алексей_Иванов");
   assert.equal(sanitizeName("***", "player_42"), "player_42");
@@ -129,6 +223,352 @@ test("JSON loads honor caller cancellation", async () => {
   }
 });
 
+test("columnar player files normalize exactly like object player files", () => {
+  const objectMatch = {
+    date: "2026-03-14",
+    tournament_id: 10,
+    tournament_name: "Oslo Open",
+    tournament_level: "3",
+    stage: "Playoff",
+    stage_type: "playoff",
+    stage_id: 7,
+    stage_sequence: 2,
+    round_number: 1,
+    playoff_game_number: 2,
+    goals_for_player: 4,
+    goals_for_opponent: 3,
+    overtime: true,
+    source: "",
+    source_url: "https://example.test/result",
+    stage_url: "https://example.test/result",
+    result_url: "",
+    tournament_url: "",
+    source_tournament_id: "",
+    source_stage_id: "",
+    source_match_id: "991",
+  };
+  const payload = attachColumnarMatches({
+    schema: 2,
+    encoding: "columnar",
+    player: { id: 1, name: "One" },
+    strings: ["Oslo Open", "3", "Playoff", "playoff", "", "https://example.test/result"],
+    opponents: {
+      2: {
+        player: { id: 2, name: "Two" },
+        summary: { total_matches: 2 },
+        match_columns: {
+          day: [20526, null],
+          tournament_id: [10, null],
+          tournament_name: [0, 4],
+          tournament_level: [1, null],
+          stage: [2, 4],
+          stage_type: [3, 4],
+          stage_id: [7, null],
+          stage_sequence: [2, null],
+          round_number: [1, null],
+          playoff_game_number: [2, null],
+          goals_for_player: [4, 1],
+          goals_for_opponent: [3, 1],
+          overtime: [1, 0],
+          source: [4, 4],
+          source_url: [5, 4],
+          stage_url: [5, 4],
+          result_url: [4, 4],
+          tournament_url: [4, 4],
+          source_tournament_id: [4, 4],
+          source_stage_id: [4, 4],
+          source_match_id: ["991", ""],
+        },
+      },
+    },
+  });
+
+  const [first, second] = payload.opponents[2].matches;
+  assert.deepEqual(normalizePlayerMatch(first, true), normalizePlayerMatch(objectMatch, true));
+  assert.equal(normalizePlayerMatch(second, false).date, "");
+  assert.equal(normalizePlayerMatch(second, false).result, "D");
+  assert.equal(payload.opponents[2].matches, payload.opponents[2].matches);
+});
+
+test("stage references resolve to the same match as inline tournament fields", () => {
+  const inline = {
+    date: "2026-03-14",
+    tournament_id: 10,
+    tournament_name: "Oslo Open",
+    tournament_level: "3",
+    tournament_url: "https://example.test/t/10",
+    source_tournament_id: "",
+    stage: "Playoff",
+    stage_type: "playoff",
+    stage_id: 7,
+    stage_sequence: 2,
+    stage_url: "https://example.test/s/7",
+    source_stage_id: "",
+    round_number: 1,
+    playoff_game_number: 2,
+    goals_for_player: 4,
+    goals_for_opponent: 3,
+    overtime: true,
+    source: "",
+    source_url: "",
+    result_url: "",
+    source_match_id: "991",
+  };
+  const lookup = {
+    tournaments: {
+      t1: {
+        tournament_id: 10,
+        tournament_name: "Oslo Open",
+        tournament_level: "3",
+        tournament_url: "https://example.test/t/10",
+        source_tournament_id: "",
+      },
+    },
+    stages: {
+      s1: {
+        tournament_ref: "t1",
+        stage: "Playoff",
+        stage_type: "playoff",
+        stage_id: 7,
+        stage_sequence: 2,
+        stage_url: "https://example.test/s/7",
+        source_stage_id: "",
+      },
+    },
+  };
+  const referenced = {
+    date: "2026-03-14",
+    stage_ref: "s1",
+    round_number: 1,
+    playoff_game_number: 2,
+    goals_for_player: 4,
+    goals_for_opponent: 3,
+    overtime: true,
+    source: "",
+    source_url: "",
+    result_url: "",
+    source_match_id: "991",
+  };
+
+  const previousLookup = state.lookup;
+  state.lookup = lookup;
+  try {
+    assert.deepEqual(normalizePlayerMatch(referenced, false), normalizePlayerMatch(inline, false));
+  } finally {
+    state.lookup = previousLookup;
+  }
+  assert.equal(expandMatchRefs({ ...referenced, stage_ref: "missing" }, lookup).tournament_name, undefined);
+});
+
+test("matchups read chunked pair files from the lower id's perspective", async () => {
+  const originalFetch = globalThis.fetch;
+  const requested = [];
+  const files = {
+    "data/meta.json": { layout: { pair_files: true, pair_chunk_matches: 1 } },
+    "data/h2h/3/8.json": {
+      player1: { id: 3, name: "Three" },
+      player2: { id: 8, name: "Eight" },
+      summary: { total_matches: 2 },
+      chunks: ["h2h/3/8.1.json", "h2h/3/8.2.json"],
+    },
+    "data/h2h/3/8.1.json": {
+      matches: [{ date: "2026-01-02", goals_for_player: 5, goals_for_opponent: 1 }],
+    },
+    "data/h2h/3/8.2.json": {
+      matches: [{ date: "2026-01-03", goals_for_player: 0, goals_for_opponent: 2 }],
+    },
+  };
+  globalThis.fetch = async (url) => {
+    requested.push(url);
+    const body = files[url];
+    return {
+      ok: Boolean(body),
+      status: body ? 200 : 404,
+      json: async () => body,
+    };
+  };
+  state.metaRequest = null;
+  state.pairCache.clear();
+  try {
+    const data = await loadMatchup(8, 3);
+    assert.equal(data.playerA.name, "Eight");
+    assert.equal(data.playerB.name, "Three");
+    assert.deepEqual(
+      data.matches.map((match) => match.result),
+      ["B", "A"],
+    );
+    assert.ok(!requested.some((url) => url.endsWith("h2h/8.json") || url.endsWith("h2h/3.json")));
+  } finally {
+    globalThis.fetch = originalFetch;
+    state.metaRequest = null;
+    state.pairCache.clear();
+  }
+});
+
+test("career files give a profile header without player files", async () => {
+  const originalFetch = globalThis.fetch;
+  const requested = [];
+  const career = (id, fields) => ({
+    player: { id, name: `Player ${id}` },
+    career: {
+      matches: 0, wins: 0, draws: 0, losses: 0, goals_for: 0, goals_against: 0,
+      goal_difference: 0, overtime_games: 0, opponents: 1, tournaments: 1,
+      first_date: null, last_date: null, current_streak: null, form: "",
+      ...fields,
+    },
+  });
+  const files = {
+    "data/career/1307.json": career(1307, {
+      matches: 4, wins: 3, losses: 1, goals_for: 9, goals_against: 4, goal_difference: 5,
+      first_date: "2019-03-01", last_date: "2021-05-02",
+      current_streak: { result: "W", length: 2 }, form: "LWWW",
+    }),
+    "data/career/2164.json": career(2164, {
+      matches: 2, wins: 1, draws: 1, goals_for: 3, goals_against: 2, goal_difference: 1,
+      first_date: "2022-01-01", last_date: "2024-06-30",
+    }),
+  };
+  globalThis.fetch = async (url) => {
+    requested.push(url);
+    const body = files[url];
+    return { ok: Boolean(body), status: body ? 200 : 404, json: async () => body };
+  };
+  state.aliasMap.clear();
+  state.aliasMap.set(1307, [1307, 2164]);
+  state.aliasMap.set(2164, [1307, 2164]);
+  state.careerFileCache.clear();
+  try {
+    assert.equal((await loadPlayerCareer(1307, [1307])).form, "LWWW");
+    const grouped = await loadPlayerCareer(1307, [1307, 2164]);
+    assert.equal(grouped.matches, 6);
+    assert.equal(grouped.wins, 4);
+    assert.equal(grouped.win_rate, 4 / 6);
+    assert.equal(grouped.first_date, "2019-03-01");
+    assert.equal(grouped.last_date, "2024-06-30");
+    assert.equal(grouped.current_streak, null);
+    assert.equal(await loadPlayerCareer(9999), null);
+    assert.ok(requested.every((url) => url.startsWith("data/career/")));
+  } finally {
+    globalThis.fetch = originalFetch;
+    state.aliasMap.clear();
+    state.careerFileCache.clear();
+  }
+});
+
+test("curated alias groups load one merged group file", async () => {
+  const originalFetch = globalThis.fetch;
+  const requested = [];
+  const game = (date, goalsFor, goalsAgainst) => ({
+    date, source_match_id: date, goals_for_player: goalsFor, goals_for_opponent: goalsAgainst,
+  });
+  const files = {
+    "data/meta.json": { layout: { group_files: true } },
+    "data/groups/1307-2164.json": {
+      player: { id: 1307, name: "Vegard", ids: [1307, 2164] },
+      opponents: {
+        5: { player: { id: 5, name: "Five" }, summary: {}, matches: [game("2026-01-02", 3, 1)] },
+        6: { player: { id: 6, name: "Six" }, summary: {}, matches: [game("2026-01-03", 0, 2)] },
+      },
+    },
+    "data/h2h/1307.json": { player: { id: 1307 }, opponents: {} },
+  };
+  globalThis.fetch = async (url) => {
+    requested.push(url);
+    const body = files[url];
+    return { ok: Boolean(body), status: body ? 200 : 404, json: async () => body };
+  };
+  state.aliasMap.clear();
+  state.aliasMap.set(1307, [1307, 2164]);
+  state.aliasMap.set(2164, [1307, 2164]);
+  state.metaRequest = null;
+  state.playerStatsCache.clear();
+  state.pairCache.clear();
+  state.groupFileCache.clear();
+  try {
+    const stats = await loadPlayerStats(1307, null, [1307, 2164]);
+    assert.deepEqual(stats.matches.map((match) => match.opponent_id), [5, 6]);
+    const matchup = await loadMatchup(2164, 6, null, [1307, 2164], [6]);
+    assert.deepEqual(matchup.matches.map((match) => match.result), ["B"]);
+    assert.equal(requested.filter((url) => url.startsWith("data/groups/")).length, 1);
+    assert.ok(!requested.some((url) => url.includes("/h2h/")));
+
+    // An explicit single alias still reads that ID's own player file.
+    await loadPlayerStats(1307, null, [1307]);
+    assert.ok(requested.includes("data/h2h/1307.json"));
+  } finally {
+    globalThis.fetch = originalFetch;
+    state.aliasMap.clear();
+    state.metaRequest = null;
+    state.playerStatsCache.clear();
+    state.pairCache.clear();
+    state.groupFileCache.clear();
+    state.playerFileCache.clear();
+  }
+});
+
+function searchIndexPayload(players, gramSizes = [2, 3]) {
+  // Same layout scripts/build_h2h.py writes to search/index.json.
+  const postings = new Map();
+  players.forEach((player, position) => {
+    const key = player.search_key;
+    const grams = new Set();
+    gramSizes.forEach((size) => {
+      for (let start = 0; start + size <= key.length; start += 1) {
+        grams.add(key.slice(start, start + size));
+      }
+    });
+    grams.forEach((gram) => postings.set(gram, [...(postings.get(gram) || []), position]));
+  });
+  return {
+    version: 1,
+    gram_sizes: gramSizes,
+    postings: Object.fromEntries(Array.from(postings, ([gram, positions]) => [
+      gram,
+      positions.map((position, index) => position - (index ? positions[index - 1] : 0)),
+    ])),
+  };
+}
+
+test("indexed typeahead suggestions match a full linear scan", () => {
+  const names = ["Ann", "Anna", "Hanne", "Johan", "Jóhanna", "Bjørn", "Stian", "Christian"];
+  const players = [];
+  for (let i = 0; i < 60; i += 1) {
+    const name = `${names[i % names.length]} ${names[(i * 7 + 3) % names.length]}sen`;
+    players.push({
+      id: i + 1,
+      name,
+      search_key: name.normalize("NFD").replace(/[\u0300-\u036f]/g, "").toLowerCase(),
+      ranking_points: i % 3 ? null : 1000 - i,
+      world_rank: i % 3 ? null : i + 1,
+      matches: 500 - (i % 4) * 10,
+    });
+  }
+  // The build stores players in suggestion rank order; equal match counts fall back to the key.
+  players.sort((a, b) => (a.world_rank ?? Infinity) - (b.world_rank ?? Infinity)
+    || b.matches - a.matches
+    || (a.search_key < b.search_key ? -1 : a.search_key > b.search_key ? 1 : a.id - b.id));
+  state.players = players;
+  state.playersById = new Map(players.map((player) => [player.id, player]));
+  state.aliasMap.clear();
+  state.aliasMap.set(4, [4, 40]);
+  state.aliasMap.set(40, [4, 40]);
+
+  const queries = ["", "a", "an", "ann", "anna", "johanna", "hanne", "bjørn s", "tian", "xyz", "n a"];
+  state.searchIndex = null;
+  const scanned = queries.map((query) => buildSuggestions(query).map((item) => item.id));
+  state.searchIndex = createSearchIndex(searchIndexPayload(players), players);
+  const indexed = queries.map((query) => buildSuggestions(query).map((item) => item.id));
+  assert.deepEqual(indexed, scanned);
+  assert.ok(scanned[3].length > 0);
+
+  assert.equal(findCandidatePositions(state.searchIndex, "a"), null);
+  const positions = findCandidatePositions(state.searchIndex, "johanna");
+  assert.ok(positions.every((position) => players[position].search_key.includes("joh")));
+  assert.deepEqual(findCandidatePositions(state.searchIndex, "qq"), []);
+  state.searchIndex = null;
+  state.aliasMap.clear();
+});
+
 test("current win streak is chronological and stops at losses or draws", () => {
   const tenWins = Array.from({ length: 10 }, (_, index) => resultItem(index + 2, "A"));
   const unsorted = [...tenWins, resultItem(1, "B")].reverse();
@@ -175,3 +615,30 @@ test("generational celebration stays static for accessibility and hidden pages",
   assert.equal(allowsGenerationalMotion({ ...visible, visibilityState: "hidden" }), false);
   assert.equal(allowsGenerationalMotion({ ...visible, supportsObserver: false }), false);
 });
+
+test("rivalry leaderboards describe each board and skip unpublished players", () => {
+  const entry = {
+    ids: [1, 2],
+    matches: 31,
+    wins: [14, 12],
+    draws: 5,
+    first_date: "2004-03-01",
+    last_date: "2026-09-12",
+  };
+  assert.equal(describeRivalry(entry, "most_played"), "31 games, 14-5-12");
+  assert.equal(describeRivalry(entry, "longest_span"), "31 games, 2004–2026");
+  assert.equal(describeRivalry(entry, "recent_heavy"), "31 games, last 2026-09-12");
+  assert.equal(describeRivalry({ ...entry, matches: 1 }, "most_even"), "1 game, 14-5-12");
+
+  const previousPlayers = state.playersById;
+  const previousBoards = state.leaderboards;
+  state.playersById = new Map([[1, { id: 1 }], [2, { id: 2 }]]);
+  state.leaderboards = { boards: { most_played: [{ ...entry, ids: [1, 9] }, entry] } };
+  try {
+    assert.deepEqual(getRivalryEntries("most_played"), [entry]);
+    assert.deepEqual(getRivalryEntries("most_even"), []);
+  } finally {
+    state.playersById = previousPlayers;
+    state.leaderboards = previousBoards;
+  }
+});
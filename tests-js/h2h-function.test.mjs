@@ -1,26 +1,17 @@
 import assert from "node:assert/strict";
 import test from "node:test";
 
-import { onRequest } from "../functions/h2h/[[path]].js";
+import { onRequest, ogShardIndex } from "../functions/h2h/[[path]].js";
 
 const payload = {
-  player: { id: 1, name: "<Alice & Co>" },
-  opponents: {
-    2: {
-      player: { id: 2, name: 'Bob "Two"' },
-      summary: {
-        wins_player: 3,
-        draws: 1,
-        wins_opponent: 2,
-        total_matches: 6,
-      },
-    },
+  pairs: {
+    "1-2": ["<Alice & Co>", 'Bob "Two"', 6, 3, 1, 2],
   },
 };
 
 function context(path, options = {}) {
   const requestedAssets = [];
-  const env = {
+  const env = options.env || {
     ASSETS: {
       fetch: async (url) => {
         requestedAssets.push(String(url));
@@ -46,13 +37,34 @@ test("valid share routes use compact metadata and escape generated HTML", async
     const response = await onRequest(requestContext);
     const html = await response.text();
     assert.equal(response.status, 200);
-    assert.equal(requestedAssets[0], "https://stats.example/data/og/1.json");
+    assert.equal(requestedAssets[0], "https://stats.example/data/og/c3.json");
     assert.match(html, /&lt;Alice &amp; Co&gt; vs Bob &quot;Two&quot;/);
     assert.doesNotMatch(html, /<Alice & Co>/);
     assert.match(html, /3-1-2 record over 6 games/);
   }
 });
 
+test("share shards use the build's pair hash and read from either side", async () => {
+  // The same pairs are asserted in tests/test_og_shards.py.
+  assert.equal(ogShardIndex(1, 2), 0xc3);
+  assert.equal(ogShardIndex(1, 999), 0xa4);
+  assert.equal(ogShardIndex(1307, 2164), 0);
+
+  const { context: requestContext } = context("/h2h/2/1");
+  const html = await (await onRequest(requestContext)).text();
+  assert.match(html, /Bob &quot;Two&quot; vs &lt;Alice &amp; Co&gt;/);
+  assert.match(html, /2-1-3 record over 6 games/);
+});
+
+test("shards are cached per isolate instead of refetched on every hit", async () => {
+  const first = context("/h2h/1/2");
+  assert.equal((await onRequest(first.context)).status, 200);
+  const second = context("/h2h/2/1", { env: first.context.env });
+  assert.equal((await onRequest(second.context)).status, 200);
+  assert.equal(first.requestedAssets.length, 1);
+  assert.equal(second.requestedAssets.length, 0);
+});
+
 test("HEAD and unsupported methods have correct response semantics", async () => {
   const head = context("/h2h/1/2", { method: "HEAD" });
   const headResponse = await onRequest(head.context);
@@ -0,0 +1,71 @@
+"""Fixture builders shared by the build tests."""
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import pandas as pd
+
+from scripts.build_h2h import process_matches_df
+
+FRONTEND_JS_DIR = Path(__file__).resolve().parents[1] / "public" / "js"
+
+# The browser globals the frontend modules touch on import, as in tests-js.
+FRONTEND_GLOBALS = """
+globalThis.document = {
+  getElementById: () => null,
+  querySelector: () => null,
+  querySelectorAll: () => [],
+};
+globalThis.window = {
+  location: { search: "", href: "https://example.test/" },
+  matchMedia: () => ({ matches: false, addEventListener: () => {} }),
+};
+const frontendModule = (name) => import(new URL(`${name}.js`, process.env.FRONTEND_JS_URL));
+"""
+
+# Source columns a fixture row holds, in order, unless a test names its own.
+MATCH_ROW_FIELDS = ("player1_id", "player2_id", "goals_player1", "goals_player2", "date_raw")
+
+
+def make_matches(
+    rows: Iterable[Sequence],
+    fields: Sequence[str] = MATCH_ROW_FIELDS,
+    sort: bool = True,
+    **columns,
+) -> pd.DataFrame:
+    """Process source rows into matches, sorted by pair and date unless ``sort`` is off.
+
+    Each row holds the values of ``fields``. Keyword arguments add source columns, either
+    one value for every row or a list with one value per row; ``overtime_raw`` is "No"
+    unless a field or keyword sets it.
+    """
+    records = [dict(zip(fields, row)) for row in rows]
+    for index, record in enumerate(records):
+        record.setdefault("overtime_raw", "No")
+        for name, value in columns.items():
+            record[name] = value[index] if isinstance(value, list) else value
+    matches = process_matches_df(pd.DataFrame(records), verbose=False)
+    if sort:
+        matches = matches.sort_values(["id1", "id2", "date_dt"], kind="mergesort")
+    return matches
+
+
+def run_frontend_script(script: str, *args) -> object:
+    """Run an ES module script under node and return the JSON it prints.
+
+    The script sees ``args`` as ``process.argv.slice(1)`` and imports a frontend module
+    with ``await frontendModule("data")``.
+    """
+    result = subprocess.run(
+        ["node", "--input-type=module", "-e", FRONTEND_GLOBALS + script, *map(str, args)],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={
+            "PATH": os.environ.get("PATH", ""),
+            "FRONTEND_JS_URL": FRONTEND_JS_DIR.as_uri() + "/",
+        },
+    )
+    return json.loads(result.stdout)
@@ -0,0 +1,178 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.build_h2h import (
+    alias_match_key,
+    build_alias_group_files,
+    build_match_lookup,
+    build_player_files,
+    decode_columnar_payload,
+    describe_output_file,
+    load_alias_groups,
+    match_lookup_frame,
+    og_shard_index,
+    og_shard_name,
+)
+from tests.helpers import MATCH_ROW_FIELDS, make_matches, run_frontend_script
+
+
+NAMES = {1: "One", 2: "One Alias", 3: "Three", 4: "Four", 5: "Five"}
+
+ROWS = [
+    # The same game, recorded once under each of player 1's IDs.
+    (1, 3, 2, 1, "2026-01-02", "a"),
+    (2, 3, 2, 1, "2026-01-02", "a"),
+    (3, 2, 1, 0, "2026-01-03", "b"),
+    (1, 4, 1, 1, "2026-01-04", "c"),
+    (1, 5, 0, 2, "2026-01-05", "d"),
+    # Games between two aliases of one person never count against themselves.
+    (1, 2, 3, 0, "2026-01-06", "e"),
+    (3, 4, 2, 2, "2026-01-07", "f"),
+    (4, 5, 5, 0, "2026-01-08", ""),
+    (4, 5, 5, 0, "2026-01-08", ""),
+]
+
+
+def read_json(path: Path):
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def build(root: Path, alias_groups, encoding="objects"):
+    matches = make_matches(
+        ROWS,
+        (*MATCH_ROW_FIELDS, "source_match_id"),
+        tournament_id=10,
+        tournament_name="Oslo Open",
+        stage="Group A",
+    )
+    matches["tournament_level"] = None
+    lookup = build_match_lookup(match_lookup_frame(matches))
+    build_player_files(
+        matches, NAMES, root / "h2h", root / "og", False, encoding=encoding
+    )
+    files = build_alias_group_files(
+        alias_groups, NAMES, lookup, root / "h2h", root / "groups", root / "og", False, encoding
+    )
+    return files, lookup
+
+
+def og_record(root: Path, id1: int, id2: int):
+    shard = read_json(root / "og" / og_shard_name(og_shard_index(id1, id2)))
+    return shard["pairs"].get(f"{id1}-{id2}")
+
+
+NODE_KEY_SCRIPT = """
+const [matchesPath, lookupPath] = process.argv.slice(1);
+const { readFileSync } = await import("node:fs");
+const { state } = await frontendModule("state");
+const { buildMatchKey, normalizePlayerMatch } = await frontendModule("data");
+state.lookup = JSON.parse(readFileSync(lookupPath, "utf-8"));
+const matches = JSON.parse(readFileSync(matchesPath, "utf-8"));
+const keys = matches.map((match) => buildMatchKey(normalizePlayerMatch(match, true)));
+console.log(JSON.stringify(keys));
+"""
+
+
+class TestAliasGroups(unittest.TestCase):
+    def test_alias_file_is_read_like_the_frontend(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "aliases.json"
+            path.write_text(
+                json.dumps(
+                    {
+                        "groups": [
+                            {"name": "One", "ids": [2, "1", None, "x"]},
+                            {"name": "Unpublished", "ids": [3, 99]},
+                            [3, 4],
+                            [4, 5],
+                        ]
+                    }
+                ),
+                encoding="utf-8",
+            )
+            self.assertEqual(load_alias_groups(path, NAMES), [[1, 2], [3, 4]])
+            path.write_text(json.dumps([[5, 4]]), encoding="utf-8")
+            self.assertEqual(load_alias_groups(path, NAMES), [[4, 5]])
+            path.write_text(json.dumps({"aliases": []}), encoding="utf-8")
+            with self.assertRaisesRegex(ValueError, "malformed"):
+                load_alias_groups(path, NAMES)
+            self.assertEqual(load_alias_groups(Path(tmpdir) / "missing.json", NAMES), [])
+
+    def test_group_files_merge_members_and_drop_duplicates(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            files, _ = build(root, [[1, 2]])
+            payload = read_json(root / "groups" / "1-2.json")
+            entry = describe_output_file(root / "groups" / "1-2.json")
+
+        self.assertEqual(payload["player"], {"id": 1, "name": "One", "ids": [1, 2]})
+        self.assertEqual(sorted(payload["opponents"]), ["3", "4", "5"])
+        three = payload["opponents"]["3"]
+        self.assertEqual([match["source_match_id"] for match in three["matches"]], ["a", "b"])
+        summary = three["summary"]
+        self.assertEqual(
+            (summary["total_matches"], summary["wins_player"], summary["wins_opponent"]), (2, 1, 1)
+        )
+        self.assertEqual(summary["last_meeting_date"], "2026-01-03")
+        self.assertEqual(summary["tournaments"], [{"id": 10, "name": "Oslo Open", "level": None}])
+        self.assertEqual(files["groups/1-2.json"], entry)
+        self.assertEqual(entry["matches"], 4)
+
+    def test_share_records_show_the_merged_group_record(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build(root, [])
+            self.assertEqual(og_record(root, 1, 3), ["One", "Three", 1, 1, 0, 0])
+            self.assertIsNone(og_record(root, 2, 4))
+
+            files, _ = build(root, [[1, 2]])
+            self.assertEqual(og_record(root, 1, 3), ["One", "Three", 2, 1, 0, 1])
+            self.assertEqual(og_record(root, 2, 3), ["One Alias", "Three", 2, 1, 0, 1])
+            # 2 and 4 never met, so a share link to them stays rejected.
+            self.assertIsNone(og_record(root, 2, 4))
+            self.assertEqual(og_record(root, 1, 2), ["One", "One Alias", 1, 1, 0, 0])
+            for path, entry in files.items():
+                self.assertEqual(describe_output_file(root / path), entry)
+
+            build(root, [[1, 2], [3, 4]])
+            self.assertEqual(og_record(root, 1, 3), ["One", "Three", 3, 1, 1, 1])
+            self.assertEqual(og_record(root, 2, 3), ["One Alias", "Three", 3, 1, 1, 1])
+            self.assertIsNone(og_record(root, 2, 4))
+            # 4-5 was listed twice without a source id; one game, as in a grouped view.
+            self.assertEqual(og_record(root, 4, 5), ["Four", "Five", 1, 1, 0, 0])
+            self.assertIsNone(og_record(root, 3, 5))
+
+    def test_columnar_group_files_decode_to_the_object_layout(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build(root / "objects", [[1, 2]])
+            build(root / "columnar", [[1, 2]], "columnar")
+            self.assertEqual(
+                decode_columnar_payload(read_json(root / "columnar" / "groups" / "1-2.json")),
+                read_json(root / "objects" / "groups" / "1-2.json"),
+            )
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_match_keys_match_the_frontend(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _, lookup = build(root, [])
+            matches = [
+                match
+                for opponent in read_json(root / "h2h" / "4.json")["opponents"].values()
+                for match in opponent["matches"]
+            ]
+            (root / "matches.json").write_text(json.dumps(matches), encoding="utf-8")
+            (root / "lookup.json").write_text(json.dumps(lookup), encoding="utf-8")
+            keys = run_frontend_script(NODE_KEY_SCRIPT, root / "matches.json", root / "lookup.json")
+
+        self.assertEqual([alias_match_key(match, lookup) for match in matches], keys)
+        self.assertTrue(any(not match["source_match_id"] for match in matches))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,45 @@
+import json
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from scripts.build_h2h import prepare_data_staging, publish_staged_data
+import pandas as pd
+
+from scripts import build_h2h
+from scripts.build_h2h import (
+    DURABILITY_POLICIES,
+    build_player_files,
+    prepare_data_staging,
+    process_matches_df,
+    publish_staged_data,
+)
+
+
+def sample_matches() -> pd.DataFrame:
+    return process_matches_df(
+        pd.DataFrame(
+            [
+                {
+                    "player1_id": player1,
+                    "player2_id": player2,
+                    "goals_player1": 3,
+                    "goals_player2": 1,
+                    "overtime_raw": "No",
+                    "date_raw": "2026-01-02",
+                }
+                for player1, player2 in [(1, 2), (1, 3), (2, 3), (3, 4)]
+            ]
+        )
+    )
+
+
+def snapshot(directory: Path) -> dict:
+    return {
+        str(path.relative_to(directory)): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
 
 
 class TestAtomicPublish(unittest.TestCase):
@@ -45,6 +82,98 @@ class TestAtomicPublish(unittest.TestCase):
             self.assertTrue(staging_dir.is_dir())
             self.assertFalse(backup_dir.exists())
 
+    def test_interrupted_build_never_exposes_a_partial_dataset(self):
+        names = {1: "One", 2: "Two", 3: "Three", 4: "Four"}
+        for durability in DURABILITY_POLICIES:
+            with self.subTest(durability=durability), tempfile.TemporaryDirectory() as tmpdir:
+                root = Path(tmpdir)
+                data_dir = root / "data"
+                staging_dir = root / "data-build"
+                backup_dir = root / "data-previous"
+                prepare_data_staging(data_dir, staging_dir, backup_dir)
+                build_player_files(
+                    sample_matches(),
+                    names,
+                    staging_dir / "h2h",
+                    staging_dir / "og",
+                    durability == "file",
+                )
+                publish_staged_data(data_dir, staging_dir, backup_dir, durability)
+                complete = snapshot(data_dir)
+
+                prepare_data_staging(data_dir, staging_dir, backup_dir)
+                original_write_json = build_h2h.write_json
+                written = []
+
+                def crash_after_two_files(path, payload, fsync=True):
+                    if len(written) == 2:
+                        raise KeyboardInterrupt("simulated interruption")
+                    written.append(path)
+                    return original_write_json(path, payload, fsync)
+
+                with mock.patch.object(build_h2h, "write_json", crash_after_two_files):
+                    with self.assertRaises(KeyboardInterrupt):
+                        build_player_files(
+                            sample_matches(),
+                            {**names, 1: "Renamed"},
+                            staging_dir / "h2h",
+                            staging_dir / "og",
+                            durability == "file",
+                        )
+
+                self.assertEqual(len(written), 2)
+                self.assertEqual(snapshot(data_dir), complete)
+                payload = json.loads((data_dir / "h2h" / "2.json").read_text(encoding="utf-8"))
+                self.assertEqual(payload["opponents"]["1"]["player"]["name"], "One")
+
+    def test_failed_swap_restores_previous_dataset(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            data_dir = root / "data"
+            staging_dir = root / "data-build"
+            backup_dir = root / "data-previous"
+            data_dir.mkdir()
+            (data_dir / "old.json").write_text("old", encoding="utf-8")
+            prepare_data_staging(data_dir, staging_dir, backup_dir)
+            (staging_dir / "new.json").write_text("new", encoding="utf-8")
+
+            original_replace = Path.replace
+
+            def fail_staging_swap(path, target):
+                if path == staging_dir:
+                    raise OSError("simulated crash during swap")
+                return original_replace(path, target)
+
+            with mock.patch.object(Path, "replace", fail_staging_swap):
+                with self.assertRaises(OSError):
+                    publish_staged_data(data_dir, staging_dir, backup_dir, "batch")
+
+            self.assertEqual((data_dir / "old.json").read_text(encoding="utf-8"), "old")
+            self.assertFalse(backup_dir.exists())
+
+    def test_batch_policy_syncs_staging_tree_once_before_swap(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            data_dir = root / "data"
+            staging_dir = root / "data-build"
+            backup_dir = root / "data-previous"
+            synced = []
+
+            def record_sync(path):
+                synced.append((path, (path / "h2h" / "1.json").exists()))
+
+            for durability, expected in [("batch", 1), ("file", 0), ("none", 0)]:
+                synced.clear()
+                prepare_data_staging(data_dir, staging_dir, backup_dir)
+                (staging_dir / "h2h").mkdir()
+                (staging_dir / "h2h" / "1.json").write_text("{}", encoding="utf-8")
+                with mock.patch.object(build_h2h, "sync_tree", record_sync):
+                    publish_staged_data(data_dir, staging_dir, backup_dir, durability)
+                self.assertEqual(synced, [(staging_dir, True)] * expected)
+
+            with self.assertRaises(ValueError):
+                publish_staged_data(data_dir, staging_dir, backup_dir, "sometimes")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,206 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    BUILD_STAGES,
+    BuildMetrics,
+    BuildStage,
+    SourcePipeline,
+    build_player_files,
+    load_players,
+    load_rankings,
+    process_matches_df,
+    read_matches_parquet,
+    run_build_stages,
+)
+from scripts.generate_synthetic_data import generate_synthetic_sources
+
+
+def toy_stages(calls: list):
+    def stage(name, inputs, outputs, function):
+        def run(config, values):
+            calls.append(name)
+            return function(config, values)
+
+        return BuildStage(name, inputs, outputs, run, lambda config: {"scale": config["scale"]})
+
+    return (
+        stage("read", (), ("rows",), lambda config, values: {"rows": [3, 1, 2]}),
+        stage(
+            "sort",
+            ("rows",),
+            ("rows", "count"),
+            lambda config, values: {"rows": sorted(values["rows"]), "count": 3},
+        ),
+        stage(
+            "scale",
+            ("rows",),
+            ("scaled",),
+            lambda config, values: {
+                "scaled": [row * config["scale"] for row in values["rows"]]
+            },
+        ),
+        stage("report", ("scaled", "count"), (), lambda config, values: {}),
+    )
+
+
+class TestBuildStages(unittest.TestCase):
+    def test_resumed_runs_read_only_the_checkpoints_they_need(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint_dir = Path(tmpdir)
+            calls = []
+            stages = toy_stages(calls)
+            full = run_build_stages(stages, {"scale": 2}, checkpoint_dir=checkpoint_dir)
+            self.assertEqual(calls, ["read", "sort", "scale", "report"])
+            self.assertEqual(full["scaled"], [2, 4, 6])
+            self.assertFalse((checkpoint_dir / "report").exists())
+
+            calls.clear()
+            resumed = run_build_stages(
+                stages, {"scale": 2}, "scale", "scale", checkpoint_dir=checkpoint_dir
+            )
+            self.assertEqual(calls, ["scale"])
+            # The sorted rows come from "sort", the later of the two stages that output them.
+            self.assertEqual(resumed, {"rows": [1, 2, 3], "scaled": [2, 4, 6]})
+
+            calls.clear()
+            run_build_stages(stages, {"scale": 2}, "report", checkpoint_dir=checkpoint_dir)
+            self.assertEqual(calls, ["report"])
+
+    def test_checkpoints_from_other_settings_or_failed_runs_are_rejected(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint_dir = Path(tmpdir)
+            calls = []
+            stages = toy_stages(calls)
+            run_build_stages(stages, {"scale": 2}, checkpoint_dir=checkpoint_dir)
+            with self.assertRaisesRegex(RuntimeError, "'sort' checkpoint"):
+                run_build_stages(stages, {"scale": 3}, "scale", checkpoint_dir=checkpoint_dir)
+
+            failing = list(stages)
+            failing[1] = failing[1]._replace(run=lambda config, values: 1 / 0)
+            with self.assertRaises(ZeroDivisionError):
+                run_build_stages(failing, {"scale": 2}, "sort", checkpoint_dir=checkpoint_dir)
+            with self.assertRaisesRegex(RuntimeError, "'sort' checkpoint"):
+                run_build_stages(stages, {"scale": 2}, "scale", checkpoint_dir=checkpoint_dir)
+
+    def test_metrics_time_resumed_and_run_stages(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint_dir = Path(tmpdir) / "stages"
+            stages = toy_stages([])
+            run_build_stages(stages, {"scale": 2}, checkpoint_dir=checkpoint_dir)
+            metrics = BuildMetrics(Path(tmpdir) / "profile")
+            run_build_stages(
+                stages, {"scale": 2}, "scale", checkpoint_dir=checkpoint_dir, metrics=metrics
+            )
+            profiles = sorted(path.name for path in (Path(tmpdir) / "profile").iterdir())
+
+        self.assertEqual([record["name"] for record in metrics.stages], ["sort", "scale", "report"])
+        sort, scale, _ = metrics.stages
+        self.assertTrue(sort["resumed"])
+        self.assertEqual(sort["rows_out"], {"rows": 3})
+        self.assertEqual((scale["rows_in"], scale["rows_out"]), ({"rows": 3}, {"scaled": 3}))
+        for record in metrics.stages:
+            self.assertGreaterEqual(record["wall_seconds"], 0)
+            self.assertGreaterEqual(record["cpu_seconds"], 0)
+            self.assertIn("peak_rss_delta_bytes", record)
+        self.assertIn("traced_peak_bytes", scale)
+        self.assertIn("scale.prof", profiles)
+        self.assertIn("scale.allocations.txt", profiles)
+
+    def test_player_file_phases_are_steps_of_the_open_stage(self):
+        matches = process_matches_df(
+            pd.DataFrame(
+                [
+                    {
+                        "player1_id": 1,
+                        "player2_id": 2,
+                        "goals_player1": 2,
+                        "goals_player2": 1,
+                        "overtime_raw": "No",
+                        "date_raw": "2026-01-02",
+                    }
+                ]
+            )
+        )
+        metrics = BuildMetrics()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            with metrics.measure("emit"):
+                build_player_files(
+                    matches, {1: "One", 2: "Two"}, root / "h2h", root / "og", False,
+                    metrics=metrics,
+                )
+
+        steps = {step["name"]: step for step in metrics.stages[0]["steps"]}
+        self.assertIn("pair_entries", steps)
+        self.assertEqual(steps["pair_hashes"]["rows_out"], {"pairs": 1, "players": 2})
+        self.assertEqual(steps["write_players"]["rows_out"], {"players": 2})
+
+    def test_sources_parse_as_soon_as_their_own_download_lands(self):
+        matches_fetched = threading.Event()
+        fetched = []
+
+        class BlockedMatches(SourcePipeline):
+            def download_source(self, source, download):
+                if source == "matches":
+                    self.matches_timed_out = not matches_fetched.wait(10)
+                fetched.append(source)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            generate_synthetic_sources(root, 30, 400, 0.0, seed=1)
+            config = {
+                "extra_matches_url": "",
+                "out_of_core": False,
+                "ingest_batch_rows": 100,
+                "paths": {
+                    "matches": root / "scraped_matches.parquet",
+                    "extra_matches": root / "extra_matches.csv",
+                    "players": root / "players_data.csv",
+                    "tournaments": root / "tournament_data.csv",
+                    "tournament_metadata": root / "tournament_metadata.csv",
+                    "ranking": root / "ranking.txt",
+                },
+            }
+            sources = BlockedMatches(config)
+            try:
+                sources.start(download=True)
+                # Players and tournaments finish while the matches download is still open.
+                players = sources.result("players")
+                self.assertGreater(len(sources.result("tournaments")), 0)
+                self.assertNotIn("matches", fetched)
+                self.assertFalse(sources.future("primary_matches").done())
+                matches_fetched.set()
+                sources.wait_for_downloads()
+                matches = sources.result("primary_matches")
+            finally:
+                matches_fetched.set()
+                sources.close()
+            expected_players, _ = load_players(
+                root / "players_data.csv", load_rankings(root / "ranking.txt")
+            )
+            expected_matches = read_matches_parquet(root / "scraped_matches.parquet")
+
+        self.assertFalse(sources.matches_timed_out)
+        self.assertEqual(players, expected_players)
+        pd.testing.assert_frame_equal(matches, expected_matches)
+        self.assertEqual(sorted(fetched), sorted(sources.source_files()))
+
+    def test_stage_ranges_must_be_in_order(self):
+        with self.assertRaisesRegex(ValueError, "runs after"):
+            run_build_stages(toy_stages([]), {"scale": 1}, "scale", "sort")
+
+    def test_build_stage_inputs_come_from_earlier_stages(self):
+        produced = set()
+        for stage in BUILD_STAGES:
+            self.assertLessEqual(set(stage.inputs), produced, stage.name)
+            produced.update(stage.outputs)
+        self.assertEqual(BUILD_STAGES[-1].name, "publish")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    build_career_aggregates,
+    build_player_files,
+    describe_output_file,
+)
+from tests.helpers import MATCH_ROW_FIELDS, make_matches
+
+
+NAMES = {1: "One", 2: "Two", 3: "Three"}
+
+
+CAREER_ROW_FIELDS = (
+    *MATCH_ROW_FIELDS[:4],
+    "overtime_raw",
+    "date_raw",
+    "tournament_id",
+    "round_number",
+)
+
+
+def career_matches(rows) -> pd.DataFrame:
+    return make_matches(
+        rows, CAREER_ROW_FIELDS, tournament_name=[f"Open {row[6]}" for row in rows]
+    )
+
+
+ROWS = [
+    (1, 2, 3, 1, "No", "2026-01-02", 10, 2),
+    (2, 1, 3, 1, "No", "2026-01-02", 10, 1),
+    (1, 3, 2, 2, "Yes", "2026-01-04", 20, 1),
+    (3, 1, 0, 1, "No", "2026-01-05", 20, 2),
+    (1, 2, 5, 0, "No", None, None, None),
+    (1, 4, 1, 0, "No", "2026-01-06", 20, 3),
+]
+
+
+def read_json(path: Path):
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class TestCareerFiles(unittest.TestCase):
+    def test_career_totals_streak_and_form_follow_the_profile_order(self):
+        careers = build_career_aggregates(career_matches(ROWS), NAMES.keys(), form_length=3)
+
+        # Undated first, then by date and round; player 4 is unpublished.
+        self.assertEqual(
+            careers[1],
+            {
+                "matches": 5,
+                "wins": 3,
+                "draws": 1,
+                "losses": 1,
+                "win_rate": 0.6,
+                "goals_for": 12,
+                "goals_against": 6,
+                "goal_difference": 6,
+                "overtime_games": 1,
+                "opponents": 2,
+                "tournaments": 2,
+                "first_date": "2026-01-02",
+                "last_date": "2026-01-05",
+                "current_streak": {"result": "W", "length": 1},
+                "form": "WDW",
+            },
+        )
+        # Round 1 on 2026-01-02 comes before round 2 on the same day.
+        self.assertEqual(careers[2]["form"], "LWL")
+        self.assertEqual(careers[2]["current_streak"], {"result": "L", "length": 1})
+        self.assertEqual(
+            build_career_aggregates(career_matches(ROWS), [1, 2, 5])[5]["current_streak"], None
+        )
+
+    def test_career_files_agree_with_player_files_and_link_when_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            previous_state = build_player_files(
+                career_matches(ROWS), NAMES, root / "previous" / "h2h", root / "previous" / "og",
+                False,
+            )
+            files = previous_state.pop("files")
+            for pid in NAMES:
+                career = read_json(root / "previous" / "career" / f"{pid}.json")
+                summaries = [
+                    opponent["summary"]
+                    for opponent in read_json(
+                        root / "previous" / "h2h" / f"{pid}.json"
+                    )["opponents"].values()
+                ]
+                self.assertEqual(career["player"], {"id": pid, "name": NAMES[pid]})
+                self.assertEqual(
+                    career["career"]["matches"],
+                    sum(summary["total_matches"] for summary in summaries),
+                )
+                self.assertEqual(
+                    career["career"]["wins"],
+                    sum(summary["wins_player"] for summary in summaries),
+                )
+                relative_path = f"career/{pid}.json"
+                self.assertEqual(
+                    describe_output_file(root / "previous" / relative_path), files[relative_path]
+                )
+
+            build_player_files(
+                career_matches([*ROWS, (3, 2, 4, 0, "No", "2026-02-01", 20, 1)]),
+                NAMES,
+                root / "next" / "h2h",
+                root / "next" / "og",
+                False,
+                previous_state,
+                root / "previous",
+            )
+            self.assertTrue(
+                (root / "next" / "career" / "1.json").samefile(
+                    root / "previous" / "career" / "1.json"
+                )
+            )
+            self.assertEqual(read_json(root / "next" / "career" / "3.json")["career"]["form"], "DLW")
+
+
+if __name__ == "__main__":
+    unittest.main()
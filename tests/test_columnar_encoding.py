@@ -0,0 +1,107 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    build_player_files,
+    decode_columnar_payload,
+    encode_columnar_payload,
+    process_matches_df,
+)
+
+
+def sample_matches() -> pd.DataFrame:
+    rows = []
+    for index in range(12):
+        rows.append(
+            {
+                "player1_id": 1 if index % 3 else 2,
+                "player2_id": 2 if index % 3 else 1,
+                "goals_player1": index % 5,
+                "goals_player2": 2,
+                "overtime_raw": "OT" if index % 4 == 0 else "No",
+                "date_raw": f"2026-01-{index + 1:02d}" if index != 5 else "",
+                "tournament_id": 10,
+                "tournament_name": "Oslo Open",
+                "stage": "Playoff",
+                "playoff_game_number": index % 3 + 1,
+                "source_url": "https://example.test/tournaments/oslo-open/results/",
+                "source_match_id": str(1000 + index),
+            }
+        )
+    rows.append({**rows[0], "player2_id": 3, "tournament_id": None})
+    matches = process_matches_df(pd.DataFrame(rows))
+    return matches.sort_values(["id1", "id2", "date_dt"], kind="mergesort")
+
+
+class TestColumnarEncoding(unittest.TestCase):
+    def test_columnar_files_decode_to_the_object_layout(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            names = {1: "One", 2: "Two", 3: "Three"}
+            object_files = build_player_files(
+                sample_matches(), names, root / "objects" / "h2h", root / "objects" / "og", False
+            )["files"]
+            columnar_files = build_player_files(
+                sample_matches(),
+                names,
+                root / "columnar" / "h2h",
+                root / "columnar" / "og",
+                False,
+                encoding="columnar",
+            )["files"]
+
+            for pid in names:
+                objects = json.loads(
+                    (root / "objects" / "h2h" / f"{pid}.json").read_text(encoding="utf-8")
+                )
+                columnar = json.loads(
+                    (root / "columnar" / "h2h" / f"{pid}.json").read_text(encoding="utf-8")
+                )
+                self.assertEqual(columnar["schema"], 2)
+                self.assertEqual(decode_columnar_payload(columnar), objects)
+                entry = columnar_files[f"h2h/{pid}.json"]
+                self.assertEqual(entry["object_bytes"], object_files[f"h2h/{pid}.json"]["bytes"])
+                if entry["matches"] >= 10:
+                    self.assertLess(entry["bytes"], entry["object_bytes"])
+
+    def test_strings_are_stored_once_and_dates_become_day_numbers(self):
+        payload = {
+            "player": {"id": 1, "name": "One"},
+            "opponents": {
+                "2": {
+                    "player": {"id": 2, "name": "Two"},
+                    "summary": {"total_matches": 0},
+                    "matches": [],
+                }
+            },
+        }
+        self.assertEqual(decode_columnar_payload(encode_columnar_payload(payload)), payload)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build_player_files(
+                sample_matches(),
+                {1: "One", 2: "Two", 3: "Three"},
+                root / "h2h",
+                root / "og",
+                False,
+                encoding="columnar",
+            )
+            encoded = json.loads((root / "h2h" / "1.json").read_text(encoding="utf-8"))
+
+        strings = encoded["strings"]
+        self.assertEqual(len(strings), len(set(strings)))
+        self.assertEqual(
+            strings.count("https://example.test/tournaments/oslo-open/results/"), 1
+        )
+        days = encoded["opponents"]["2"]["match_columns"]["day"]
+        self.assertEqual(days[0], 20454)
+        self.assertIn(None, days)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.build_h2h import (
+    OG_SHARD_COUNT,
+    PlayerRankings,
+    build_match_lookup,
+    build_player_files,
+    match_lookup_frame,
+    og_shard_name,
+    player_ratings,
+    read_ranking_history,
+    update_match_ratings,
+)
+from scripts.dev_server import DevDataset
+from tests.helpers import MATCH_ROW_FIELDS, make_matches
+
+ROWS = [
+    (2, 1, 3, 1, "2024-01-02", 10, 100),
+    (1, 2, 2, 2, "2024-02-03", 10, 101),
+    (1, 2, 0, 1, "2024-03-04", 20, 200),
+    (1, 3, 4, 0, "2024-04-05", 20, 200),
+    (3, 2, 1, 5, "2024-05-06", None, None),
+    (4, 1, 1, 0, "2024-05-07", None, None),
+]
+NAMES = {1: "One", 2: "Two", 3: "Three", 4: "Four"}
+
+
+def make_inputs(root: Path, names: dict) -> dict:
+    matches = make_matches(
+        ROWS,
+        (*MATCH_ROW_FIELDS, "tournament_id", "stage_id"),
+        tournament_name=[f"Cup {row[5]}" for row in ROWS],
+        stage="Group A",
+    )
+    matches["tournament_level"] = matches["tournament_id"].map({10: 3.0})
+    return {
+        "eligible_matches": matches.reset_index(drop=True),
+        "published_players": [
+            {
+                "id": pid,
+                "name": name,
+                "country": None,
+                "ranking_id": None,
+                "world_rank": None,
+                "ranking_points": None,
+                "ranking_as_of": None,
+            }
+            for pid, name in names.items()
+        ],
+        "player_names": names,
+        "match_counts": {pid: 1 for pid in names},
+        "tournaments": [{"id": 10, "name": "Cup 10"}, {"id": 30, "name": "Cup 30"}],
+        "source_validation": {},
+        "ranking_history": read_ranking_history(root / "missing.parquet"),
+        "match_ratings": update_match_ratings(matches, root / "ratings"),
+    }
+
+
+class TestDevServer(unittest.TestCase):
+    def test_served_files_match_a_full_build(self):
+        for encoding in ("objects", "columnar"):
+            with self.subTest(encoding=encoding), tempfile.TemporaryDirectory() as tmpdir:
+                root = Path(tmpdir)
+                inputs = make_inputs(root, NAMES)
+                dataset = DevDataset(make_inputs(root, NAMES), encoding, cache_size=2)
+                matches = inputs["eligible_matches"]
+                matches["stage_ref"] = match_lookup_frame(matches)["stage_ref"]
+                build_player_files(
+                    matches,
+                    NAMES,
+                    root / "data" / "h2h",
+                    root / "data" / "og",
+                    False,
+                    encoding=encoding,
+                    rankings=PlayerRankings(inputs["ranking_history"], {}),
+                    ratings=player_ratings(inputs["match_ratings"], NAMES),
+                )
+                for pid in NAMES:
+                    for kind in ("h2h", "summary", "career"):
+                        self.assertEqual(
+                            dataset.file(f"{kind}/{pid}.json"),
+                            (root / "data" / kind / f"{pid}.json").read_bytes(),
+                        )
+                for index in range(OG_SHARD_COUNT):
+                    name = og_shard_name(index)
+                    self.assertEqual(
+                        dataset.file(f"og/{name}"), (root / "data" / "og" / name).read_bytes()
+                    )
+
+    def test_meta_points_at_the_lookup_and_unknown_files_are_missing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inputs = make_inputs(Path(tmpdir), {1: "One", 2: "Two", 3: "Three"})
+            dataset = DevDataset(inputs)
+            meta = json.loads(dataset.file("meta.json"))
+            lookup = json.loads(dataset.file(meta["lookup"]))
+            tournaments = json.loads(dataset.file("tournaments.json"))
+            missing = [
+                dataset.file(path)
+                for path in ("h2h/4.json", "career/0.json", "og/ff0.json", "groups/1-2.json")
+            ]
+            published_rows = inputs["eligible_matches"]["player1_id"].isin([1, 2, 3]) & inputs[
+                "eligible_matches"
+            ]["player2_id"].isin([1, 2, 3])
+            expected_lookup = build_match_lookup(
+                match_lookup_frame(inputs["eligible_matches"]).loc[published_rows]
+            )
+
+        self.assertEqual(lookup, expected_lookup)
+        self.assertEqual((meta["players"], meta["matches"]), (3, len(ROWS)))
+        self.assertFalse(meta["layout"]["group_files"] or meta["layout"]["pair_files"])
+        self.assertEqual(tournaments, [{"id": 10, "name": "Cup 10"}])
+        self.assertEqual(missing, [None] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,9 @@ import pandas as pd
 
 from scripts.build_h2h import (  # noqa: E402
     EXTRA_MATCHES_URL,
+    OG_SHARD_COUNT,
     build_unique_player_name_index,
+    decode_columnar_payload,
     deduplicate_overlapping_source_matches,
     load_players,
     read_extra_matches_csv,
@@ -19,6 +21,8 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT_DIR / "public" / "data"
 H2H_DIR = DATA_DIR / "h2h"
 PLAYERS_PATH = DATA_DIR / "players.json"
+META_PATH = DATA_DIR / "meta.json"
+MANIFEST_PATH = DATA_DIR / "manifest.json"
 MATCHES_PATH = ROOT_DIR / ".cache" / "scraped_matches.parquet"
 EXTRA_MATCHES_PATH = ROOT_DIR / ".cache" / "extra_matches.csv"
 SOURCE_PLAYERS_PATH = ROOT_DIR / ".cache" / "players_data.csv"
@@ -33,7 +37,7 @@ def load_player_totals(player_ids):
             errors.append(f"Missing H2H file for player {player_id}.")
             continue
         with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
+            payload = decode_columnar_payload(json.load(handle))
         opponents = payload.get("opponents", {})
         total = 0
         for opponent_id, opponent_payload in opponents.items():
@@ -80,6 +84,14 @@ class TestH2HCounts(unittest.TestCase):
             cls.player_ids.append(player_id)
         cls.player_id_set = set(cls.player_ids)
         cls.player_totals, cls.internal_errors = load_player_totals(cls.player_ids)
+        if not MANIFEST_PATH.exists():
+            raise FileNotFoundError("manifest.json missing. Run scripts/build_h2h.py first.")
+        with MANIFEST_PATH.open("r", encoding="utf-8") as handle:
+            cls.manifest_files = json.load(handle)["files"]
+        cls.manifest_totals = {
+            player_id: cls.manifest_files.get(f"h2h/{player_id}.json", {}).get("matches", 0)
+            for player_id in cls.player_ids
+        }
 
     def test_internal_match_counts(self):
         if self.internal_errors:
@@ -89,6 +101,53 @@ class TestH2HCounts(unittest.TestCase):
                 extra = f"\n...and {len(self.internal_errors) - 20} more."
             self.fail(f"Found match count issues:\n{preview}{extra}")
 
+    def test_manifest_agrees_with_files_and_meta(self):
+        with META_PATH.open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        errors = []
+        for relative_path, entry in self.manifest_files.items():
+            path = DATA_DIR / relative_path
+            if not path.exists():
+                errors.append(f"{relative_path}: listed in manifest but missing.")
+            elif path.stat().st_size != entry["bytes"]:
+                errors.append(
+                    f"{relative_path}: manifest says {entry['bytes']} bytes, "
+                    f"file has {path.stat().st_size}."
+                )
+        for player_id in self.player_ids:
+            h2h_entry = self.manifest_files.get(f"h2h/{player_id}.json")
+            if h2h_entry is None:
+                errors.append(f"Player {player_id}: missing from manifest.")
+                continue
+            if h2h_entry["matches"] != self.player_totals.get(player_id):
+                errors.append(
+                    f"Player {player_id}: manifest has {h2h_entry['matches']} matches, "
+                    f"file has {self.player_totals.get(player_id)}."
+                )
+        og_entries = [
+            entry for path, entry in self.manifest_files.items() if path.startswith("og/")
+        ]
+        if len(og_entries) != OG_SHARD_COUNT:
+            errors.append(f"Expected {OG_SHARD_COUNT} share shards, found {len(og_entries)}.")
+        if sum(entry["matches"] for entry in og_entries) != meta["matches"]:
+            errors.append(
+                f"Share shards count {sum(entry['matches'] for entry in og_entries)} "
+                f"matches; meta.json has {meta['matches']}."
+            )
+        if sum(entry["pairs"] for entry in og_entries) * 2 != sum(
+            self.manifest_files.get(f"h2h/{player_id}.json", {}).get("opponents", 0)
+            for player_id in self.player_ids
+        ):
+            errors.append("Share shards and H2H files disagree on the number of pairs.")
+        if sum(self.manifest_totals.values()) != 2 * meta["matches"]:
+            errors.append(
+                f"Manifest counts {sum(self.manifest_totals.values())} player-side matches; "
+                f"meta.json implies {2 * meta['matches']}."
+            )
+        if errors:
+            preview = "\n".join(errors[:20])
+            self.fail(f"Manifest inconsistencies:\n{preview}")
+
     def test_counts_match_source_data(self):
         if not MATCHES_PATH.exists():
             self.skipTest("No cached matches parquet found; skipping source count check.")
@@ -125,7 +184,7 @@ class TestH2HCounts(unittest.TestCase):
         mismatches = []
         for player_id in self.player_ids:
             expected = expected_counts.get(player_id, 0)
-            actual = self.player_totals.get(player_id, 0)
+            actual = self.manifest_totals.get(player_id, 0)
             if actual != expected:
                 mismatches.append(
                     f"Player {player_id}: expected {expected}, got {actual}."
@@ -1,6 +1,8 @@
 import unittest
 from pathlib import Path
 
+from scripts.build_h2h import OG_SHARD_COUNT
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 PUBLIC_DIR = ROOT_DIR / "public"
 H2H_HTML_DIR = PUBLIC_DIR / "h2h"
@@ -43,9 +45,14 @@ class TestH2HRedirects(unittest.TestCase):
             "Pages Function should fetch player data from local static assets via env.ASSETS.fetch"
         )
         self.assertIn(
-            "/data/og/${p1}.json",
+            "/data/og/${name}",
+            content,
+            "Pages Function should use compact share shards instead of full H2H files",
+        )
+        self.assertIn(
+            f"const OG_SHARD_COUNT = {OG_SHARD_COUNT};",
             content,
-            "Pages Function should use compact share metadata instead of full H2H files",
+            "Pages Function and build must agree on the share shard count",
         )
         self.assertIn(
             "url.pathname.match",
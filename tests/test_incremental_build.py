@@ -0,0 +1,130 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.build_h2h import (
+    build_player_files,
+    load_incremental_state,
+)
+from tests.helpers import make_matches
+
+
+NAMES = {1: "One", 2: "Two", 3: "Three", 4: "Four"}
+TOURNAMENT = {"tournament_id": 10, "tournament_name": "Open"}
+
+
+BASE_ROWS = [
+    (1, 2, 3, 1, "2026-01-02"),
+    (2, 1, 2, 2, "2026-01-03"),
+    (1, 3, 0, 4, "2026-01-02"),
+    (3, 4, 5, 2, "2026-01-04"),
+]
+
+
+def build(root: Path, matches, names=NAMES, previous_state=None, previous_dir=None):
+    return build_player_files(
+        matches,
+        names,
+        root / "h2h",
+        root / "og",
+        False,
+        previous_state,
+        previous_dir or root,
+    )
+
+
+def tree_bytes(root: Path) -> dict:
+    return {
+        str(path.relative_to(root)): path.read_bytes()
+        for path in sorted(root.rglob("*.json"))
+    }
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def test_incremental_output_matches_full_rebuild(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            previous_state = build(root / "previous", make_matches(BASE_ROWS, **TOURNAMENT))
+
+            changed_rows = [*BASE_ROWS, (4, 3, 1, 0, "2026-02-01")]
+            build(
+                root / "incremental",
+                make_matches(changed_rows, **TOURNAMENT),
+                previous_state=previous_state,
+                previous_dir=root / "previous",
+            )
+            build(root / "full", make_matches(changed_rows, **TOURNAMENT))
+
+            self.assertEqual(tree_bytes(root / "incremental"), tree_bytes(root / "full"))
+            for pid in (1, 2):
+                self.assertTrue(
+                    (root / "incremental" / "h2h" / f"{pid}.json").samefile(
+                        root / "previous" / "h2h" / f"{pid}.json"
+                    )
+                )
+            self.assertFalse(
+                (root / "incremental" / "h2h" / "3.json").samefile(
+                    root / "previous" / "h2h" / "3.json"
+                )
+            )
+
+    def test_renamed_opponent_dirties_every_file_that_shows_the_name(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            previous_state = build(root / "previous", make_matches(BASE_ROWS, **TOURNAMENT))
+            renamed = {**NAMES, 4: "Four Renamed"}
+            build(
+                root / "incremental",
+                make_matches(BASE_ROWS, **TOURNAMENT),
+                names=renamed,
+                previous_state=previous_state,
+                previous_dir=root / "previous",
+            )
+
+            payload = json.loads(
+                (root / "incremental" / "h2h" / "3.json").read_text(encoding="utf-8")
+            )
+            self.assertEqual(payload["opponents"]["4"]["player"]["name"], "Four Renamed")
+            self.assertTrue(
+                (root / "incremental" / "h2h" / "1.json").samefile(
+                    root / "previous" / "h2h" / "1.json"
+                )
+            )
+
+    def test_changed_settings_or_foreign_live_data_force_full_rebuild(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            data_dir = root / "data"
+            data_dir.mkdir()
+            (data_dir / "meta.json").write_text(
+                json.dumps({"generated_at": "2026-10-01T00:00:00+00:00"}),
+                encoding="utf-8",
+            )
+            state_path = root / "state.json"
+            settings = {"schema": 1, "min_matches": 50}
+            state_path.write_text(
+                json.dumps(
+                    {
+                        "settings": settings,
+                        "generated_at": "2026-10-01T00:00:00+00:00",
+                        "pairs": {},
+                        "players": {},
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+            self.assertIsNotNone(load_incremental_state(state_path, data_dir, settings))
+            self.assertIsNone(
+                load_incremental_state(state_path, data_dir, {**settings, "min_matches": 10})
+            )
+            (data_dir / "meta.json").write_text(
+                json.dumps({"generated_at": "2026-10-08T00:00:00+00:00"}),
+                encoding="utf-8",
+            )
+            self.assertIsNone(load_incremental_state(state_path, data_dir, settings))
+
+
+if __name__ == "__main__":
+    unittest.main()
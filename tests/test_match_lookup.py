@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    LOOKUP_STAGE_FIELDS,
+    LOOKUP_TOURNAMENT_FIELDS,
+    build_match_lookup,
+    build_player_files,
+    match_lookup_frame,
+    write_content_hashed_json,
+)
+from tests.helpers import make_matches
+
+
+LOOKUP_ROW_FIELDS = (
+    "player1_id",
+    "player2_id",
+    "date_raw",
+    "tournament_id",
+    "tournament_name",
+    "stage",
+    "stage_id",
+)
+
+
+def make_lookup_matches(rows) -> pd.DataFrame:
+    matches = make_matches(
+        rows,
+        LOOKUP_ROW_FIELDS,
+        goals_player1=2,
+        goals_player2=1,
+        tournament_url=[f"https://example.test/t/{row[3]}" for row in rows],
+        stage_url=[f"https://example.test/s/{row[6]}" for row in rows],
+        source_match_id=[f"{row[2]}-{row[0]}-{row[1]}" for row in rows],
+    )
+    matches["tournament_level"] = matches["tournament_id"].map({10: 3.0, 20: "2"})
+    return matches
+
+
+ROWS = [
+    (1, 2, "2026-01-02", 10, "Oslo Open", "Group A", 100),
+    (2, 1, "2026-01-02", 10, "Oslo Open", "Playoff", 101),
+    (1, 3, "2026-02-01", 20, " Bergen Cup ", "Group A", 200),
+    (3, 2, "2026-02-02", None, "Club night", "", None),
+]
+
+
+class TestMatchLookup(unittest.TestCase):
+    def test_lookup_restores_every_tournament_and_stage_field(self):
+        matches = make_lookup_matches(ROWS)
+        frame = match_lookup_frame(matches)
+        lookup = build_match_lookup(frame)
+
+        self.assertEqual(len(lookup["tournaments"]), 3)
+        self.assertEqual(len(lookup["stages"]), 4)
+        stage = lookup["stages"][frame["stage_ref"].iloc[0]]
+        tournament = lookup["tournaments"][stage["tournament_ref"]]
+        self.assertEqual(
+            {**tournament, **stage},
+            {
+                "tournament_ref": stage["tournament_ref"],
+                "tournament_id": 10,
+                "tournament_name": "Oslo Open",
+                "tournament_level": "3",
+                "tournament_url": "https://example.test/t/10",
+                "source_tournament_id": "",
+                "stage": "Group A",
+                "stage_type": "",
+                "stage_id": 100,
+                "stage_sequence": None,
+                "stage_url": "https://example.test/s/100",
+                "source_stage_id": "",
+            },
+        )
+        club_night = frame.loc[frame["tournament_name"] == "Club night"].iloc[0]
+        self.assertIsNone(lookup["tournaments"][club_night["tournament_ref"]]["tournament_id"])
+        self.assertEqual(
+            lookup["tournaments"][
+                frame.loc[frame["tournament_id"] == 20, "tournament_ref"].iloc[0]
+            ]["tournament_name"],
+            "Bergen Cup",
+        )
+
+    def test_references_survive_new_tournaments_and_files_carry_only_refs(self):
+        frame = match_lookup_frame(make_lookup_matches(ROWS))
+        grown = match_lookup_frame(
+            make_lookup_matches([(1, 4, "2025-12-01", 5, "Winter Cup", "Final", 50), *ROWS])
+        )
+        grown_stages = build_match_lookup(grown)["stages"]
+        for ref, stage in build_match_lookup(frame)["stages"].items():
+            self.assertEqual(grown_stages[ref], stage)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            matches = make_lookup_matches(ROWS)
+            build_player_files(
+                matches, {1: "One", 2: "Two", 3: "Three"}, root / "h2h", root / "og", False
+            )
+            payload = json.loads((root / "h2h" / "1.json").read_text(encoding="utf-8"))
+            name, entry = write_content_hashed_json(root, build_match_lookup(frame), False)
+            self.assertEqual(name, f"{entry['sha256'][:16]}.json")
+            self.assertTrue((root / name).exists())
+
+        for opponent in payload["opponents"].values():
+            for match in opponent["matches"]:
+                self.assertIn(match["stage_ref"], build_match_lookup(frame)["stages"])
+                for field in LOOKUP_TOURNAMENT_FIELDS + LOOKUP_STAGE_FIELDS:
+                    self.assertNotIn(field, match)
+
+
+if __name__ == "__main__":
+    unittest.main()
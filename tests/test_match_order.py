@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from scripts.build_h2h import (
+    MATCH_SORT_COLUMNS,
+    count_player_matches,
+    match_sort_order,
+    pack_sort_keys,
+    sort_key_codes,
+)
+
+
+def random_matches(rng: np.random.Generator, rows: int) -> pd.DataFrame:
+    def nullable(values: np.ndarray, missing_rate: float) -> pd.Series:
+        return pd.Series(values, dtype="Int64").mask(rng.random(rows) < missing_rate)
+
+    dates = pd.Series(
+        pd.Timestamp("2001-01-01") + pd.to_timedelta(rng.integers(0, 40, rows) * 7, unit="D")
+    )
+    return pd.DataFrame(
+        {
+            "id1": rng.integers(1, 6, rows),
+            "id2": rng.integers(2_000_000, 2_000_004, rows),
+            "date_dt": dates.mask(rng.random(rows) < 0.1),
+            "tournament_id": nullable(rng.integers(-3, 3, rows) * 1000, 0.2),
+            "stage_sequence": nullable(rng.integers(0, 3, rows), 0.3),
+            "round_number": nullable(rng.integers(1, 4, rows), 0.3),
+            "playoff_game_number": nullable(np.full(rows, 2), 0.5),
+        },
+        index=rng.permutation(rows) + 100,
+    )
+
+
+class TestMatchOrder(unittest.TestCase):
+    def test_lexsort_order_matches_stable_na_last_sort(self):
+        rng = np.random.default_rng(7)
+        for rows in (0, 1, 50, 2000):
+            matches = random_matches(rng, rows)
+            expected = matches.sort_values(
+                MATCH_SORT_COLUMNS, kind="mergesort", na_position="last"
+            )
+            actual = matches.take(match_sort_order(matches))
+            self.assertTrue(actual.index.equals(expected.index), rows)
+
+    def test_sort_keys_are_compact_and_pack_into_few_words(self):
+        codes, top = sort_key_codes(pd.Series([30, None, -10, 10], dtype="Int64"))
+        self.assertEqual(codes.tolist(), [2, 3, 0, 1])
+        self.assertEqual(top, 3)
+        codes, top = sort_key_codes(pd.Series([None, None], dtype="Int64"))
+        self.assertEqual((codes.tolist(), top), ([0, 0], 0))
+
+        wide = np.array([0, 1 << 40], dtype="uint64")
+        words = pack_sort_keys([(wide, 1 << 40), (wide, 1 << 40), (np.ones(2, "uint64"), 1)])
+        self.assertEqual(len(words), 2)
+
+    def test_player_match_counts_cover_dense_and_sparse_ids(self):
+        for ids in ([3, 1, 3, 7], [5, 10**12, 5, 10**12 + 1]):
+            player1 = np.array(ids[:2], dtype="int64")
+            player2 = np.array(ids[2:], dtype="int64")
+            expected = pd.Series(ids).value_counts().sort_index()
+            counts = count_player_matches(player1, player2)
+            self.assertEqual(counts.to_dict(), expected.to_dict())
+        self.assertTrue(count_player_matches(np.array([]), np.array([])).empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
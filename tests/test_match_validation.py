@@ -1,8 +1,17 @@
+import contextlib
+import io
+import tempfile
 import unittest
+from pathlib import Path
 
 import pandas as pd
 
-from scripts.build_h2h import process_matches_df
+from scripts.build_h2h import (
+    PARQUET_COLUMN_NAMES,
+    process_matches_df,
+    read_extra_matches_csv,
+    read_matches_parquet,
+)
 
 
 class TestMatchValidation(unittest.TestCase):
@@ -135,5 +144,42 @@ class TestMatchValidation(unittest.TestCase):
         self.assertTrue(bool(processed.iloc[3].overtime))
 
 
+    def test_streamed_sources_match_a_whole_file_read(self):
+        # The first date fixes the format for every batch, as it does for a whole file.
+        raw = pd.DataFrame(
+            {
+                "Player1ID": [1, 2, 0, 4, 5, 6, 7],
+                "Player2ID": [2, 3, 4, 5, 6, 6, 8],
+                "GoalsPlayer1": [3, 1, 2, 0, 5, 1, 2],
+                "GoalsPlayer2": [1, 1, 2, 4, 5, 1, 0],
+                "Overtime": ["No", "maybe", "Yes", "No", "", "No", "OT"],
+                "Date": ["01.02.2024", None, "03.04.2024", "2024-05-06", "07.08.2024",
+                         "09.10.2024", "11.12.2024"],
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            raw.to_parquet(root / "matches.parquet", index=False)
+            raw.assign(Player1=[f"P{pid}" for pid in raw["Player1ID"]]).to_csv(
+                root / "extra.csv", index=False
+            )
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                expected = process_matches_df(raw.rename(columns=PARQUET_COLUMN_NAMES))
+                streamed = read_matches_parquet(root / "matches.parquet", batch_rows=3)
+                extra = read_extra_matches_csv(root / "extra.csv", batch_rows=3)
+
+        for frame in (streamed, extra):
+            pd.testing.assert_series_equal(frame["date"], expected["date"], check_index=False)
+            self.assertEqual(frame["id1"].tolist(), expected["id1"].tolist())
+            self.assertEqual(
+                {key: frame.attrs["validation"][key] for key in expected.attrs["validation"]},
+                expected.attrs["validation"],
+            )
+        self.assertEqual(expected.attrs["validation"]["dropped_rows"], 2)
+        self.assertTrue(pd.isna(expected["date"].iloc[2]))
+        # Each source reports its summed counters once, not once per batch.
+        self.assertEqual(output.getvalue().count("Dropped 2 match rows"), 3)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.build_h2h import (
+    OG_SHARD_COUNT,
+    build_player_files,
+    og_shard_index,
+    og_shard_name,
+)
+from tests.helpers import MATCH_ROW_FIELDS, make_matches
+
+
+class TestOgShards(unittest.TestCase):
+    def test_shard_index_matches_the_pages_function_hash(self):
+        # The same pairs are asserted in tests-js/h2h-function.test.mjs.
+        self.assertEqual(og_shard_index(1, 2), 0xC3)
+        self.assertEqual(og_shard_index(1, 999), 0xA4)
+        self.assertEqual(og_shard_index(1307, 2164), 0x00)
+        self.assertEqual(og_shard_name(0xC3), "c3.json")
+
+    def test_shards_hold_one_compact_record_per_published_pair(self):
+        rows = [(2, 1, 3, 1), (1, 2, 2, 2), (1, 2, 0, 1), (1, 3, 4, 0), (3, 4, 1, 0)]
+        matches = make_matches(rows, MATCH_ROW_FIELDS[:4], date_raw="2026-01-02")
+        names = {1: "One", 2: "Two", 3: "Three"}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            files = build_player_files(
+                matches, names, root / "h2h", root / "og", False
+            )["files"]
+            shards = {
+                path.name: json.loads(path.read_text(encoding="utf-8"))["pairs"]
+                for path in (root / "og").glob("*.json")
+            }
+            player = json.loads((root / "h2h" / "1.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(len(shards), OG_SHARD_COUNT)
+        records = {key: record for pairs in shards.values() for key, record in pairs.items()}
+        self.assertEqual(sorted(records), ["1-2", "1-3"])
+        self.assertIn("1-2", shards[og_shard_name(og_shard_index(1, 2))])
+        summary = player["opponents"]["2"]["summary"]
+        self.assertEqual(
+            records["1-2"],
+            [
+                "One",
+                "Two",
+                summary["total_matches"],
+                summary["wins_player"],
+                summary["draws"],
+                summary["wins_opponent"],
+            ],
+        )
+        self.assertEqual(records["1-2"], ["One", "Two", 3, 0, 1, 2])
+        self.assertEqual(
+            sum(entry["matches"] for path, entry in files.items() if path.startswith("og/")),
+            4,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.build_h2h import (
+    OUT_OF_CORE_PAYLOAD_FACTOR,
+    MatchPartitions,
+    build_match_lookup,
+    build_player_files,
+    build_rivalry_leaderboards,
+    build_unique_player_name_index,
+    deduplicate_overlapping_source_matches,
+    emit_match_partitions,
+    iter_extra_matches_csv,
+    iter_matches_parquet,
+    load_players,
+    load_rankings,
+    load_tournament_levels,
+    match_lookup_frame,
+    partition_matches,
+    plan_partition_groups,
+    read_extra_matches_csv,
+    read_matches_parquet,
+    run_filter_stage,
+)
+from scripts.generate_synthetic_data import generate_synthetic_sources
+
+
+def snapshot(directory: Path) -> dict:
+    return {
+        str(path.relative_to(directory)): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
+
+
+class TestOutOfCoreBuild(unittest.TestCase):
+    def test_partitioned_build_writes_the_in_memory_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            generate_synthetic_sources(root / "sources", 50, 3000, 0.2, seed=2)
+            players, _ = load_players(
+                root / "sources" / "players_data.csv",
+                load_rankings(root / "sources" / "ranking.txt"),
+            )
+            levels = load_tournament_levels(root / "sources" / "tournament_metadata.csv")
+            name_index = build_unique_player_name_index(players)
+
+            def with_levels(frame: pd.DataFrame) -> pd.DataFrame:
+                frame["tournament_level"] = frame["tournament_id"].map(
+                    lambda tid: levels.get(int(tid)) if pd.notna(tid) else None
+                )
+                return frame
+
+            matches = with_levels(
+                pd.concat(
+                    [
+                        read_matches_parquet(root / "sources" / "scraped_matches.parquet"),
+                        read_extra_matches_csv(
+                            root / "sources" / "extra_matches.csv", name_index
+                        ),
+                    ],
+                    ignore_index=True,
+                )
+            )
+            deduped = deduplicate_overlapping_source_matches(matches)
+            config = {"min_matches": 30}
+            in_memory = run_filter_stage(config, {"matches": deduped, "players": players})
+            eligible = in_memory["eligible_matches"].copy()
+            lookup_frame = match_lookup_frame(eligible)
+            eligible["stage_ref"] = lookup_frame["stage_ref"]
+            expected_state = build_player_files(
+                eligible, in_memory["player_names"], root / "a" / "h2h", root / "a" / "og",
+                False, pair_chunk_matches=40,
+            )
+
+            def frames():
+                row_number = 0
+                for batch in [
+                    *iter_matches_parquet(root / "sources" / "scraped_matches.parquet", 1000),
+                    *iter_extra_matches_csv(
+                        root / "sources" / "extra_matches.csv", name_index, 700
+                    ),
+                ]:
+                    batch["row_number"] = np.arange(row_number, row_number + len(batch))
+                    row_number += len(batch)
+                    yield with_levels(batch)
+
+            partitions, removed = partition_matches(frames(), root / "partitions", 8)
+            partitioned = run_filter_stage(config, {"matches": partitions, "players": players})
+            self.assertIsInstance(partitioned["eligible_matches"], MatchPartitions)
+            state = emit_match_partitions(
+                partitioned["eligible_matches"],
+                partitioned["player_names"],
+                1 << 16,
+                root / "b" / "h2h",
+                root / "b" / "og",
+                False,
+                pair_chunk_matches=40,
+            )
+
+            self.assertEqual(removed, len(matches) - len(deduped))
+            self.assertFalse((root / "partitions" / "raw").exists())
+            self.assertGreater(
+                len(plan_partition_groups(partitioned["eligible_matches"], 1 << 16)), 1
+            )
+            self.assertEqual(partitioned["match_counts"], in_memory["match_counts"])
+            self.assertEqual(partitioned["published_players"], in_memory["published_players"])
+            self.assertEqual(state["matches"], len(eligible))
+            self.assertEqual(state["lookup"], build_match_lookup(lookup_frame))
+            self.assertEqual(
+                build_rivalry_leaderboards(
+                    None, partitioned["player_names"], pair_rows=state["rivalry_rows"]
+                ),
+                build_rivalry_leaderboards(eligible, in_memory["player_names"]),
+            )
+            self.assertEqual(state["pairs"], expected_state["pairs"])
+            self.assertEqual(state["players"], expected_state["players"])
+            self.assertEqual(state["files"], expected_state["files"])
+            self.assertEqual(snapshot(root / "b"), snapshot(root / "a"))
+
+    def test_bucket_groups_stay_under_the_memory_budget(self):
+        partitions = MatchPartitions(Path("unused"), [1] * 5, [10, 40, 0, 30, 100])
+        budget = 2 * OUT_OF_CORE_PAYLOAD_FACTOR * 50
+        self.assertEqual(plan_partition_groups(partitions, budget), [[0, 1, 2], [3], [4]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    add_build_metrics,
+    build_player_files,
+    describe_output_file,
+    diff_output_manifests,
+    load_output_manifest,
+    process_matches_df,
+    write_json,
+)
+
+
+class TestOutputManifest(unittest.TestCase):
+    def test_write_json_entry_describes_written_bytes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "players.json"
+            entry = write_json(path, [{"id": 1, "name": "Åse"}], fsync=False)
+            data = path.read_bytes()
+
+        self.assertEqual(entry["bytes"], len(data))
+        self.assertEqual(entry["sha256"], hashlib.sha256(data).hexdigest())
+
+    def test_player_file_entries_carry_opponent_and_match_counts(self):
+        matches = process_matches_df(
+            pd.DataFrame(
+                [
+                    {
+                        "player1_id": player1,
+                        "player2_id": player2,
+                        "goals_player1": 2,
+                        "goals_player2": 1,
+                        "overtime_raw": "No",
+                        "date_raw": "2026-01-02",
+                    }
+                    for player1, player2 in [(1, 2), (2, 1), (1, 3)]
+                ]
+            )
+        ).sort_values(["id1", "id2"], kind="mergesort")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            files = build_player_files(
+                matches,
+                {1: "One", 2: "Two", 3: "Three"},
+                root / "h2h",
+                root / "og",
+                False,
+            )["files"]
+
+            self.assertEqual(files["h2h/1.json"]["opponents"], 2)
+            self.assertEqual(files["h2h/1.json"]["matches"], 3)
+            og_entries = [entry for path, entry in files.items() if path.startswith("og/")]
+            self.assertEqual(sum(entry["pairs"] for entry in og_entries), 2)
+            self.assertEqual(sum(entry["matches"] for entry in og_entries), 3)
+            for relative_path, entry in files.items():
+                self.assertEqual(describe_output_file(root / relative_path), entry)
+
+    def test_diff_reports_added_removed_and_changed_paths(self):
+        old = {
+            "h2h/1.json": {"sha256": "a", "bytes": 1},
+            "h2h/2.json": {"sha256": "b", "bytes": 1},
+            "h2h/3.json": {"sha256": "c", "bytes": 1},
+        }
+        new = {
+            "h2h/1.json": {"sha256": "a", "bytes": 1},
+            "h2h/2.json": {"sha256": "changed", "bytes": 2},
+            "h2h/4.json": {"sha256": "d", "bytes": 1},
+        }
+
+        self.assertEqual(
+            diff_output_manifests(old, new),
+            {
+                "added": ["h2h/4.json"],
+                "removed": ["h2h/3.json"],
+                "changed": ["h2h/2.json"],
+            },
+        )
+
+    def test_build_metrics_join_the_staged_meta_and_its_manifest_entry(self):
+        stages = [{"name": "emit", "wall_seconds": 1.5, "cpu_seconds": 1.2}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            staging_dir = Path(tmpdir)
+            files = {
+                "meta.json": write_json(staging_dir / "meta.json", {"players": 2}, fsync=False),
+                "players.json": write_json(staging_dir / "players.json", [], fsync=False),
+            }
+            write_json(staging_dir / "manifest.json", {"version": 1, "files": files}, False)
+            add_build_metrics(staging_dir, stages, fsync=False)
+            data = (staging_dir / "meta.json").read_bytes()
+            manifest = load_output_manifest(staging_dir)
+
+        self.assertIn(b'"build_metrics":{"stages":[{"name":"emit"', data)
+        self.assertEqual(manifest["meta.json"]["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(manifest["players.json"], files["players.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
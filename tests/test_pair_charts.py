@@ -0,0 +1,145 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    build_match_lookup,
+    build_pair_charts,
+    build_player_files,
+    match_lookup_frame,
+    opponent_chart,
+)
+from tests.helpers import MATCH_ROW_FIELDS, make_matches, run_frontend_script
+
+
+NAMES = {1: "One", 2: "Two", 3: "Three"}
+
+
+def chart_matches(rows) -> pd.DataFrame:
+    return make_matches(
+        rows,
+        (*MATCH_ROW_FIELDS, "round_number", "source_match_id"),
+        tournament_id=10,
+        tournament_name="Oslo Open",
+        stage="Group A",
+    )
+
+
+ROWS = [
+    (1, 2, 3, 1, "2026-03-01", 2, "7"),
+    (2, 1, 2, 2, "2026-03-01", 1, "8"),
+    # Numeric source ids order same-round games: 9 before 10.
+    (1, 2, 0, 1, "2026-03-02", 1, "10"),
+    (1, 2, 1, 0, "2026-03-02", 1, "9"),
+    (2, 1, 4, 1, "2025-12-30", 1, "abc"),
+    (1, 2, 5, 2, None, None, ""),
+    (1, 2, 1, 3, "2026-03-04", 1, "11"),
+    (1, 3, 2, 0, "2026-03-01", 1, "12"),
+]
+
+
+def read_json(path: Path):
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+NODE_CHART_SCRIPT = """
+const [dataDir, lookupPath] = process.argv.slice(1);
+const { readFileSync, readdirSync } = await import("node:fs");
+const { state } = await frontendModule("state");
+const { normalizePlayerMatch } = await frontendModule("data");
+const { getChronologicalItems, getCurrentWinStreak } = await frontendModule("form");
+state.lookup = JSON.parse(readFileSync(lookupPath, "utf-8"));
+const output = {};
+for (const name of readdirSync(dataDir)) {
+  const payload = JSON.parse(readFileSync(`${dataDir}/${name}`, "utf-8"));
+  for (const [opponentId, opponent] of Object.entries(payload.opponents)) {
+    if (!opponent.chart) continue;
+    const matches = opponent.matches.map((match) => normalizePlayerMatch(match, true));
+    const ordered = getChronologicalItems(matches);
+    let wins = 0;
+    output[`${payload.player.id}-${opponentId}`] = {
+      order: ordered.map((match) => matches.indexOf(match)),
+      wins: ordered.map((match) => (wins += match.result === "A" ? 1 : 0)),
+      win_streak: getCurrentWinStreak(matches),
+    };
+  }
+}
+console.log(JSON.stringify(output));
+"""
+
+
+class TestPairCharts(unittest.TestCase):
+    def test_charts_follow_the_chronological_order_of_the_pair(self):
+        matches = chart_matches(ROWS)
+        charts = build_pair_charts(matches, 3)
+        self.assertEqual(sorted(charts), [(1, 2)])
+        chart = charts[(1, 2)]
+        pair = matches[(matches["id1"] == 1) & (matches["id2"] == 2)].reset_index(drop=True)
+        ordered = pair.iloc[chart["order"]]
+        self.assertEqual(
+            ordered["source_match_id"].fillna("").tolist(), ["", "abc", "8", "7", "9", "10", "11"]
+        )
+        self.assertEqual(chart["wins"], [1, 1, 1, 2, 3, 3, 3])
+        self.assertEqual(chart["draws"], [0, 0, 1, 1, 1, 1, 1])
+        self.assertEqual(chart["years"], [["2025", 1, 4, 1], ["2026", 7, 7, 5]])
+        self.assertEqual(chart["streak"], {"result": "L", "length": 2})
+        self.assertEqual(build_pair_charts(matches, 8), {})
+
+    def test_opponent_charts_mirror_records_and_streaks(self):
+        chart = build_pair_charts(chart_matches(ROWS), 3)[(1, 2)]
+        flipped = opponent_chart(chart)
+        self.assertEqual(flipped["order"], chart["order"])
+        self.assertEqual(flipped["wins"], [0, 1, 1, 1, 1, 2, 3])
+        self.assertEqual(flipped["years"], [["2025", 4, 1, 1], ["2026", 7, 7, 5]])
+        self.assertEqual(flipped["streak"], {"result": "W", "length": 2})
+        self.assertEqual(opponent_chart(flipped), chart)
+
+    def test_player_files_carry_charts_only_for_long_rivalries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build_player_files(
+                chart_matches(ROWS), NAMES, root / "h2h", root / "og", False, chart_min_matches=3
+            )
+            one = read_json(root / "h2h" / "1.json")["opponents"]
+            two = read_json(root / "h2h" / "2.json")["opponents"]
+
+        self.assertEqual(len(one["2"]["chart"]["order"]), len(one["2"]["matches"]))
+        self.assertEqual(two["1"]["chart"], opponent_chart(one["2"]["chart"]))
+        self.assertNotIn("chart", one["3"])
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_build_charts_match_the_frontend_sort(self):
+        matches = chart_matches(ROWS)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build_player_files(
+                matches, NAMES, root / "h2h", root / "og", False, chart_min_matches=1
+            )
+            lookup_path = root / "lookup.json"
+            lookup_path.write_text(
+                json.dumps(build_match_lookup(match_lookup_frame(matches))), encoding="utf-8"
+            )
+            frontend = run_frontend_script(NODE_CHART_SCRIPT, root / "h2h", lookup_path)
+            build = {
+                f"{path.stem}-{opponent_id}": {
+                    "order": opponent["chart"]["order"],
+                    "wins": opponent["chart"]["wins"],
+                    "win_streak": opponent["chart"]["streak"]["length"]
+                    if opponent["chart"]["streak"]["result"] == "W"
+                    else 0,
+                }
+                for path in (root / "h2h").glob("*.json")
+                for opponent_id, opponent in read_json(path)["opponents"].items()
+            }
+
+        self.assertEqual(build, frontend)
+        self.assertEqual(len(build), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.build_h2h import (
+    build_player_files,
+    describe_output_file,
+)
+from tests.helpers import make_matches
+
+
+NAMES = {1: "One", 2: "Two", 3: "Three"}
+TOURNAMENT = {"tournament_id": 10, "tournament_name": "Open"}
+
+
+ROWS = [
+    (2, 1, 3, 1, "2026-01-02"),
+    (1, 2, 2, 2, "2026-01-03"),
+    (1, 2, 0, 1, "2026-01-04"),
+    (1, 2, 5, 4, "2026-01-05"),
+    (1, 2, 1, 0, "2026-01-06"),
+    (3, 1, 1, 0, "2026-01-06"),
+]
+
+
+def build(root: Path, rows=ROWS, pair_chunk_matches=2, previous_state=None, previous_dir=None):
+    return build_player_files(
+        make_matches(rows, **TOURNAMENT),
+        NAMES,
+        root / "h2h",
+        root / "og",
+        False,
+        previous_state,
+        previous_dir or root,
+        "objects",
+        None,
+        pair_chunk_matches,
+    )
+
+
+def read_json(path: Path):
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class TestPairFiles(unittest.TestCase):
+    def test_large_pairs_are_chunked_and_reassemble_to_player_file_matches(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            files = build(root)["files"]
+
+            pair = read_json(root / "h2h" / "1" / "2.json")
+            player_entry = read_json(root / "h2h" / "1.json")["opponents"]["2"]
+            self.assertEqual(pair["player1"], {"id": 1, "name": "One"})
+            self.assertEqual(pair["player2"], {"id": 2, "name": "Two"})
+            self.assertEqual(pair["summary"], player_entry["summary"])
+            self.assertEqual(
+                pair["chunks"],
+                ["h2h/1/2.1.json", "h2h/1/2.2.json", "h2h/1/2.3.json"],
+            )
+            chunked = [
+                match
+                for chunk in pair["chunks"]
+                for match in read_json(root / chunk)["matches"]
+            ]
+            self.assertEqual(chunked, player_entry["matches"])
+            self.assertEqual(files["h2h/1/2.json"]["chunks"], 3)
+            self.assertEqual(files["h2h/1/2.json"]["matches"], 5)
+
+            small_pair = read_json(root / "h2h" / "1" / "3.json")
+            self.assertNotIn("chunks", small_pair)
+            self.assertEqual(len(small_pair["matches"]), 1)
+            self.assertFalse((root / "h2h" / "3" / "1.json").exists())
+            for relative_path, entry in files.items():
+                self.assertEqual(describe_output_file(root / relative_path), entry)
+
+    def test_summary_files_list_opponents_without_matches(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build(root, pair_chunk_matches=None)
+
+            summary = read_json(root / "summary" / "1.json")
+            player = read_json(root / "h2h" / "1.json")
+            self.assertEqual(summary["player"], player["player"])
+            self.assertEqual(
+                summary["opponents"],
+                {
+                    opponent_id: {"player": entry["player"], "summary": entry["summary"]}
+                    for opponent_id, entry in player["opponents"].items()
+                },
+            )
+            self.assertFalse((root / "h2h" / "1").exists())
+
+    def test_incremental_build_links_unchanged_pair_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            previous_state = build(root / "previous")
+            changed_rows = [*ROWS, (3, 1, 0, 2, "2026-02-01")]
+            build(
+                root / "incremental",
+                changed_rows,
+                previous_state=previous_state,
+                previous_dir=root / "previous",
+            )
+            build(root / "full", changed_rows)
+
+            def tree_bytes(tree: Path) -> dict:
+                return {
+                    str(path.relative_to(tree)): path.read_bytes()
+                    for path in sorted(tree.rglob("*.json"))
+                }
+
+            self.assertEqual(tree_bytes(root / "incremental"), tree_bytes(root / "full"))
+            for relative_path in ("h2h/1/2.json", "h2h/1/2.3.json", "summary/2.json"):
+                self.assertTrue(
+                    (root / "incremental" / relative_path).samefile(
+                        root / "previous" / relative_path
+                    )
+                )
+            self.assertFalse(
+                (root / "incremental" / "h2h/1/3.json").samefile(
+                    root / "previous" / "h2h/1/3.json"
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
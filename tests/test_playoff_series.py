@@ -0,0 +1,175 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    build_match_lookup,
+    build_player_files,
+    build_playoff_series,
+    frontend_stage_type,
+    match_lookup_frame,
+)
+from tests.helpers import MATCH_ROW_FIELDS, make_matches, run_frontend_script
+
+
+NAMES = {1: "One", 2: "Two", 3: "Three"}
+
+
+SERIES_ROW_FIELDS = (
+    *MATCH_ROW_FIELDS[:4],
+    "overtime_raw",
+    "date_raw",
+    "tournament_id",
+    "tournament_name",
+    "stage",
+    "stage_type",
+    "round_number",
+    "playoff_game_number",
+)
+
+
+def series_matches(rows) -> pd.DataFrame:
+    return make_matches(
+        [(*row[:4], "Yes" if row[4] else "No", *row[5:]) for row in rows],
+        SERIES_ROW_FIELDS,
+        source_match_id=[f"m{index}" for index in range(len(rows))],
+    )
+
+
+ROWS = [
+    # Best of 5 won 3-1 by player 2; games arrive out of order on one day.
+    (1, 2, 1, 3, False, "2026-03-01", 10, "Oslo Open", "Quarterfinal", "", 1, 3),
+    (2, 1, 2, 1, False, "2026-03-01", 10, "Oslo Open", "Quarterfinal", "", 1, 1),
+    (1, 2, 4, 2, True, "2026-03-01", 10, "Oslo Open", "Quarterfinal", "", 1, 2),
+    (2, 1, 3, 0, False, "2026-03-01", 10, "Oslo Open", "Quarterfinal", "", 1, 4),
+    # Explicit playoff stage type on a neutral stage name.
+    (1, 2, 2, 2, False, "2026-03-02", 10, "Oslo Open", "Stage 3", "playoff", 2, 1),
+    (1, 2, 1, 1, False, "2026-03-02", 10, "Oslo Open", "Stage 3", "playoff", 2, 2),
+    # ID-less tournaments in different years stay separate series.
+    (2, 1, 1, 0, False, "2024-05-05", None, "Club &amp; Cup", "Final", "", 1, 1),
+    (2, 1, 0, 1, False, "2025-05-05", None, "Club &amp; Cup", "Final", "", 1, 1),
+    # Round-robin and team stages never form series.
+    (1, 2, 5, 0, False, "2026-03-01", 10, "Oslo Open", "Group A", "", 1, None),
+    (1, 2, 5, 0, False, "2026-03-05", 30, "Team Final Cup", "Final", "", 1, 1),
+    (1, 3, 2, 0, False, None, 10, "Oslo Open", "1/8 final", "", 1, 1),
+]
+
+
+def read_json(path: Path):
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def flatten(series: dict) -> list:
+    return [
+        series["games"],
+        series["wins_player"],
+        series["wins_opponent"],
+        series["draws"],
+        series["goals_for_player"],
+        series["goals_for_opponent"],
+        series["overtime_games"],
+        series["best_of"],
+    ]
+
+
+NODE_SERIES_SCRIPT = """
+const [dataDir, lookupPath] = process.argv.slice(1);
+const { readFileSync, readdirSync } = await import("node:fs");
+const { state } = await frontendModule("state");
+const { normalizeSinglePlayerMatch } = await frontendModule("data");
+const { buildPlayoffSeries } = await frontendModule("series");
+state.lookup = JSON.parse(readFileSync(lookupPath, "utf-8"));
+const output = {};
+for (const name of readdirSync(dataDir)) {
+  const payload = JSON.parse(readFileSync(`${dataDir}/${name}`, "utf-8"));
+  for (const [opponentId, opponent] of Object.entries(payload.opponents)) {
+    const matches = opponent.matches.map(
+      (match) => normalizeSinglePlayerMatch(match, Number(opponentId), opponent.player)
+    );
+    output[`${payload.player.id}-${opponentId}`] = buildPlayoffSeries(matches).map((series) => [
+      series.games.map((game) => matches.indexOf(game)),
+      series.game_wins_a,
+      series.game_wins_b,
+      series.game_draws,
+      series.goals_a,
+      series.goals_b,
+      series.overtime_games,
+      series.best_of,
+    ]);
+  }
+}
+console.log(JSON.stringify(output));
+"""
+
+
+class TestPlayoffSeries(unittest.TestCase):
+    def test_stage_classification_mirrors_the_frontend(self):
+        self.assertEqual(frontend_stage_type("", "Semi-final", "Open"), "playoff")
+        self.assertEqual(frontend_stage_type("", "1/16", "Open"), "playoff")
+        self.assertEqual(frontend_stage_type("PLAYOFF", "Group B", "Open"), "playoff")
+        self.assertEqual(frontend_stage_type("round_robin", "Final", "Open"), "round-robin")
+        self.assertEqual(frontend_stage_type("", "Final", "Team Cup"), "round-robin")
+        self.assertEqual(frontend_stage_type("", "Group B", "Open"), "round-robin")
+        self.assertEqual(frontend_stage_type("", "Qualification", "Open"), "other")
+
+    def test_series_are_grouped_ordered_and_scored_per_pair(self):
+        series = build_playoff_series(series_matches(ROWS))
+        self.assertEqual(sorted(series), [(1, 2), (1, 3)])
+        first, second, third, fourth = series[(1, 2)]
+        # The ID-less finals come first (2024, then 2025) and stay apart.
+        self.assertEqual((first["result"], second["result"]), ("L", "W"))
+        self.assertEqual(third["wins_player"], 1)
+        self.assertEqual(third["best_of"], 5)
+        self.assertEqual(third["result"], "L")
+        self.assertEqual(len(third["games"]), 4)
+        self.assertEqual(third["overtime_games"], 1)
+        self.assertEqual(fourth["result"], "D")
+        self.assertEqual(fourth["draws"], 2)
+        self.assertEqual(fourth["best_of"], 3)
+        self.assertEqual(series[(1, 3)][0]["best_of"], 1)
+
+    def test_player_files_carry_series_from_each_side(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build_player_files(series_matches(ROWS), NAMES, root / "h2h", root / "og", False)
+            one = read_json(root / "h2h" / "1.json")["opponents"]["2"]
+            two = read_json(root / "h2h" / "2.json")["opponents"]["1"]
+
+        self.assertEqual([len(item["games"]) for item in one["series"]], [1, 1, 4, 2])
+        for mine, theirs in zip(one["series"], two["series"]):
+            self.assertEqual(mine["games"], theirs["games"])
+            self.assertEqual(mine["wins_player"], theirs["wins_opponent"])
+            self.assertEqual(mine["goals_for_player"], theirs["goals_for_opponent"])
+        games = [one["matches"][index] for index in one["series"][2]["games"]]
+        self.assertEqual([game["playoff_game_number"] for game in games], [1, 2, 3, 4])
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_build_series_match_the_frontend_reconstruction(self):
+        matches = series_matches(ROWS)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            build_player_files(matches, NAMES, root / "h2h", root / "og", False)
+            lookup_path = root / "lookup.json"
+            lookup_path.write_text(
+                json.dumps(build_match_lookup(match_lookup_frame(matches))), encoding="utf-8"
+            )
+            frontend = run_frontend_script(NODE_SERIES_SCRIPT, root / "h2h", lookup_path)
+            build = {
+                f"{path.stem}-{opponent_id}": [
+                    flatten(series) for series in opponent.get("series", [])
+                ]
+                for path in (root / "h2h").glob("*.json")
+                for opponent_id, opponent in read_json(path)["opponents"].items()
+            }
+
+        self.assertEqual(build, frontend)
+        self.assertTrue(any(build.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.build_h2h import (
+    PlayerRankings,
+    add_match_ranks,
+    build_player_files,
+    read_ranking_history,
+    update_ranking_history,
+)
+from tests.helpers import make_matches
+
+
+def ranking(as_of: str, ranks: dict) -> dict:
+    return {
+        ranking_id: {
+            "world_rank": rank,
+            "ranking_points": 5000 - rank,
+            "ranking_player_value": 0,
+            "ranking_nation": "NOR",
+            "ranking_as_of": as_of,
+        }
+        for ranking_id, rank in ranks.items()
+    }
+
+
+class TestRankingHistory(unittest.TestCase):
+    def test_snapshots_append_and_replace_by_as_of_date(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "ranking-history.parquet"
+            update_ranking_history(path, ranking("2024-01-01", {100: 1, 200: 2}))
+            update_ranking_history(path, ranking("2024-06-01", {100: 2, 200: 1}))
+            history = update_ranking_history(path, ranking("2024-01-01", {100: 3}))
+            undated = update_ranking_history(path, ranking("", {100: 9}))
+            stored = read_ranking_history(path)
+
+        self.assertEqual(
+            stored[["ranking_id", "world_rank"]].values.tolist(),
+            [[100, 3], [100, 2], [200, 1]],
+        )
+        self.assertEqual(
+            stored["ranking_as_of"].dt.strftime("%Y-%m-%d").tolist(),
+            ["2024-01-01", "2024-06-01", "2024-06-01"],
+        )
+        pd.testing.assert_frame_equal(history, stored)
+        pd.testing.assert_frame_equal(undated, stored)
+
+    def test_matches_take_the_rank_of_the_latest_snapshot_on_or_before_their_date(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "ranking-history.parquet"
+            update_ranking_history(path, ranking("2024-01-01", {100: 5, 200: 7}))
+            history = update_ranking_history(path, ranking("2024-06-01", {100: 4}))
+        matches = make_matches(
+            [
+                (1, 2, 1, 0, "2023-12-31"),
+                (1, 2, 1, 0, "2024-01-01"),
+                (2, 1, 1, 0, "2024-05-31"),
+                (1, 2, 1, 0, "2024-06-01"),
+                (1, 3, 1, 0, "2024-07-01"),
+                (1, 2, 1, 0, ""),
+            ]
+        )
+        add_match_ranks(matches, PlayerRankings(history, {1: 100, 2: 200}))
+
+        ranks = {
+            (date, int(id1), int(id2)): (rank1, rank2)
+            for date, id1, id2, rank1, rank2 in zip(
+                matches["date"].to_numpy(dtype=object, na_value=None),
+                matches["id1"],
+                matches["id2"],
+                matches["rank_id1"].to_numpy(dtype=object, na_value=None),
+                matches["rank_id2"].to_numpy(dtype=object, na_value=None),
+            )
+        }
+        self.assertEqual(ranks[("2023-12-31", 1, 2)], (None, None))
+        self.assertEqual(ranks[("2024-01-01", 1, 2)], (5, 7))
+        self.assertEqual(ranks[("2024-05-31", 1, 2)], (5, 7))
+        # Player 2 is missing from the June snapshot, and player 3 has no ranking ID.
+        self.assertEqual(ranks[("2024-06-01", 1, 2)], (4, None))
+        self.assertEqual(ranks[("2024-07-01", 1, 3)], (4, None))
+        self.assertEqual(ranks[(None, 1, 2)], (None, None))
+
+    def test_player_files_carry_as_of_ranks_and_career_rank_history(self):
+        matches = make_matches(
+            [
+                (1, 2, 3, 1, "2024-02-01"),
+                (2, 1, 2, 2, "2024-07-01"),
+            ]
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            update_ranking_history(root / "history.parquet", ranking("2024-01-01", {100: 5}))
+            history = update_ranking_history(
+                root / "history.parquet", ranking("2024-06-01", {100: 4, 200: 9})
+            )
+            build_player_files(
+                matches,
+                {1: "One", 2: "Two"},
+                root / "data" / "h2h",
+                root / "data" / "og",
+                False,
+                rankings=PlayerRankings(history, {1: 100, 2: 200}),
+            )
+            player_one = json.loads((root / "data" / "h2h" / "1.json").read_text())
+            player_two = json.loads((root / "data" / "h2h" / "2.json").read_text())
+            career_one = json.loads((root / "data" / "career" / "1.json").read_text())
+            career_two = json.loads((root / "data" / "career" / "2.json").read_text())
+
+        self.assertEqual(
+            player_one["opponents"]["2"]["ranks"], {"player": [5, 4], "opponent": [None, 9]}
+        )
+        self.assertEqual(
+            player_two["opponents"]["1"]["ranks"], {"player": [None, 9], "opponent": [5, 4]}
+        )
+        self.assertEqual(
+            career_one["ranking_history"],
+            {"day": [19723, 19875], "world_rank": [5, 4], "ranking_points": [4995, 4996]},
+        )
+        self.assertEqual(
+            career_two["ranking_history"],
+            {"day": [19875], "world_rank": [9], "ranking_points": [4991]},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.build_h2h import (
+    RATING_INITIAL,
+    RATING_K_FACTOR,
+    build_player_files,
+    player_ratings,
+    update_match_ratings,
+)
+from tests.helpers import MATCH_ROW_FIELDS, make_matches
+
+
+RATING_ROW_FIELDS = (*MATCH_ROW_FIELDS, "round_number")
+
+
+# Unsorted, in the order a source lists them.
+def rating_matches(rows) -> pd.DataFrame:
+    return make_matches(rows, RATING_ROW_FIELDS, sort=False)
+
+
+def random_rows(rng: np.random.Generator, count: int, first_day: str) -> list:
+    days = pd.Timestamp(first_day) + pd.to_timedelta(rng.integers(0, 60, count), unit="D")
+    rows = []
+    for day, players, goals, round_number in zip(
+        days.strftime("%Y-%m-%d"),
+        rng.integers(1, 9, (count, 2)).tolist(),
+        rng.integers(0, 4, (count, 2)).tolist(),
+        rng.integers(1, 4, count).tolist(),
+    ):
+        if players[0] != players[1]:
+            rows.append((*players, *goals, day, round_number))
+    return rows
+
+
+class TestRatings(unittest.TestCase):
+    def test_first_win_between_new_players_moves_half_the_k_factor(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rated = update_match_ratings(
+                rating_matches([(2, 1, 3, 1, "2024-01-01", 1), (1, 2, 0, 0, "", 1)]),
+                Path(tmpdir),
+            )
+
+        self.assertEqual(len(rated), 1)
+        row = rated.iloc[0]
+        self.assertEqual((row["id1"], row["rating_id1"], row["rating_id2"]), (1, 1500.0, 1500.0))
+        self.assertEqual(RATING_INITIAL, 1500.0)
+        self.assertEqual(row["change"], -RATING_K_FACTOR / 2)
+
+    def test_incremental_updates_match_a_full_recompute(self):
+        rng = np.random.default_rng(3)
+        old_rows = random_rows(rng, 300, "2024-01-01")
+        new_rows = random_rows(rng, 200, "2024-03-01")
+        backfilled_rows = random_rows(rng, 20, "2024-01-01")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_dir = Path(tmpdir) / "ratings"
+            update_match_ratings(rating_matches(old_rows), state_dir)
+            # The weekly build lists the same games in another order, plus new ones.
+            with contextlib.redirect_stdout(io.StringIO()) as resumed_log:
+                resumed = update_match_ratings(
+                    rating_matches(new_rows + old_rows[::-1]), state_dir
+                )
+            state = json.loads((state_dir / "state.json").read_text())
+            full = update_match_ratings(
+                rating_matches(old_rows + new_rows), Path(tmpdir) / "full", resume=False
+            )
+            # Games dated before the last processed match force a recompute.
+            with contextlib.redirect_stdout(io.StringIO()) as backfilled_log:
+                backfilled = update_match_ratings(
+                    rating_matches(old_rows + backfilled_rows + new_rows), state_dir
+                )
+            backfilled_full = update_match_ratings(
+                rating_matches(backfilled_rows + new_rows + old_rows),
+                Path(tmpdir) / "backfilled-full",
+                resume=False,
+            )
+
+        self.assertIn(f"Rated {len(new_rows)} new matches", resumed_log.getvalue())
+        self.assertIn("from scratch", backfilled_log.getvalue())
+        pd.testing.assert_frame_equal(resumed, full)
+        pd.testing.assert_frame_equal(backfilled, backfilled_full)
+        self.assertEqual(state["matches"], len(full))
+        self.assertEqual(state["last_match"]["day"], "2024-04-29")
+
+    def test_player_files_carry_pre_match_ratings_and_rating_history(self):
+        matches = make_matches(
+            [
+                (1, 2, 3, 1, "2024-01-01", 1),
+                (2, 1, 2, 2, "2024-01-01", 2),
+                (1, 2, 0, 1, "2024-01-02", 1),
+                (1, 2, 1, 1, "", 1),
+            ],
+            RATING_ROW_FIELDS,
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            rated = update_match_ratings(matches, root / "ratings")
+            build_player_files(
+                matches,
+                {1: "One", 2: "Two"},
+                root / "data" / "h2h",
+                root / "data" / "og",
+                False,
+                ratings=player_ratings(rated, [1, 2]),
+            )
+            player_one = json.loads((root / "data" / "h2h" / "1.json").read_text())
+            player_two = json.loads((root / "data" / "h2h" / "2.json").read_text())
+            career_two = json.loads((root / "data" / "career" / "2.json").read_text())
+
+        self.assertEqual(
+            player_one["opponents"]["2"]["ratings"],
+            {"player": [1500, 1516, 1515, None], "opponent": [1500, 1484, 1485, None]},
+        )
+        self.assertEqual(
+            player_two["opponents"]["1"]["ratings"],
+            {"player": [1500, 1484, 1485, None], "opponent": [1500, 1516, 1515, None]},
+        )
+        self.assertEqual(
+            career_two["rating_history"], {"day": [19723, 19724], "rating": [1485, 1503]}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import random
+import unittest
+from datetime import date, timedelta
+
+from scripts.build_h2h import build_rivalry_leaderboards
+from tests.helpers import make_matches
+
+
+def random_rows(seed: int, players: int = 12, games: int = 900):
+    generator = random.Random(seed)
+    rows = []
+    for _ in range(games):
+        player1, player2 = generator.sample(range(1, players + 1), 2)
+        day = date(2010, 1, 1) + timedelta(days=generator.randrange(5000))
+        rows.append(
+            (
+                player1,
+                player2,
+                generator.randrange(5),
+                generator.randrange(5),
+                None if generator.random() < 0.05 else day.isoformat(),
+            )
+        )
+    return rows
+
+
+class TestRivalryLeaderboards(unittest.TestCase):
+    def test_boards_match_a_full_sort(self):
+        matches = make_matches(random_rows(7))
+        names = {pid: f"Player {pid}" for pid in range(1, 12)}
+        boards = build_rivalry_leaderboards(matches, names, size=5, min_matches=10)["boards"]
+
+        pairs = []
+        published = matches[matches["id1"].isin(names) & matches["id2"].isin(names)]
+        for (id1, id2), group in published.groupby(["id1", "id2"]):
+            goals1, goals2 = group["goals_id1"], group["goals_id2"]
+            dates = group["date"].dropna().sort_values().tolist()
+            pairs.append(
+                {
+                    "ids": [int(id1), int(id2)],
+                    "matches": len(group),
+                    "wins": [int((goals1 > goals2).sum()), int((goals1 < goals2).sum())],
+                    "first_date": dates[0] if dates else None,
+                    "last_date": dates[-1] if dates else None,
+                }
+            )
+
+        def ids(board):
+            return [pair["ids"] for pair in board]
+
+        def tiebreak(pair):
+            return (-pair["matches"], pair["ids"])
+
+        def span(pair):
+            first, last = pair["first_date"], pair["last_date"]
+            return (date.fromisoformat(last) - date.fromisoformat(first)).days
+
+        regulars = [pair for pair in pairs if pair["matches"] >= 10]
+        dated = [pair for pair in regulars if pair["first_date"]]
+        self.assertEqual(ids(boards["most_played"]), ids(sorted(pairs, key=tiebreak)[:5]))
+        self.assertEqual(
+            ids(boards["most_even"]),
+            ids(
+                sorted(
+                    regulars,
+                    key=lambda pair: (
+                        abs(pair["wins"][0] - pair["wins"][1]) / pair["matches"],
+                        *tiebreak(pair),
+                    ),
+                )[:5]
+            ),
+        )
+        self.assertEqual(
+            ids(boards["longest_span"]),
+            ids(sorted(dated, key=lambda pair: (-span(pair), *tiebreak(pair)))[:5]),
+        )
+        self.assertEqual(
+            ids(boards["recent_heavy"]),
+            ids(
+                sorted(
+                    dated, key=lambda pair: (pair["last_date"], pair["matches"]), reverse=True
+                )[:5]
+            ),
+        )
+        by_ids = {tuple(pair["ids"]): pair for pair in pairs}
+        for entry in boards["most_played"]:
+            expected = by_ids[tuple(entry["ids"])]
+            self.assertEqual(
+                (entry["wins"], entry["first_date"], entry["last_date"]),
+                (expected["wins"], expected["first_date"], expected["last_date"]),
+            )
+            self.assertEqual(entry["names"], [f"Player {pid}" for pid in entry["ids"]])
+
+    def test_small_and_unpublished_pairs_stay_off_the_rate_boards(self):
+        rows = [(1, 2, 1, 0, "2026-01-01")] * 3 + [(1, 3, 1, 1, "2000-01-01")] * 2
+        rows += [(1, 9, 0, 1, "2026-02-01")] * 5
+        leaderboards = build_rivalry_leaderboards(
+            make_matches(rows), {1: "One", 2: "Two", 3: "Three"}, min_matches=3
+        )
+
+        self.assertEqual(leaderboards["min_matches"], 3)
+        boards = leaderboards["boards"]
+        self.assertEqual([entry["ids"] for entry in boards["most_played"]], [[1, 2], [1, 3]])
+        for name in ("most_even", "longest_span", "recent_heavy"):
+            self.assertEqual([entry["ids"] for entry in boards[name]], [[1, 2]])
+        self.assertEqual(boards["most_played"][0]["wins"], [3, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
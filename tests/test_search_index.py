@@ -0,0 +1,65 @@
+import unittest
+from itertools import accumulate
+
+from scripts.build_h2h import (
+    SEARCH_PLAYER_FIELDS,
+    build_search_index,
+    typeahead_key,
+)
+
+
+def player(player_id, name, world_rank=None):
+    return {
+        "id": player_id,
+        "name": name,
+        "country": "Norway",
+        "world_rank": world_rank,
+        "ranking_points": None,
+        "ranking_as_of": None,
+    }
+
+
+PLAYERS = [
+    player(1, "Stian Bjørnstad"),
+    player(2, "Jóhann Dvořák", 3),
+    player(3, "Anna &amp; Co"),
+    player(4, "Johanna Berg", 1),
+    player(5, "Ann Berg"),
+]
+ACTIVITY = {1: 10, 3: 40, 5: 40}
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_keys_match_the_frontend_normalization(self):
+        self.assertEqual(typeahead_key("Jóhann Dvořák"), "johann dvorak")
+        self.assertEqual(typeahead_key("Stian Bjørnstad"), "stian bjørnstad")
+        self.assertEqual(typeahead_key("Anna &amp; Co"), "anna & co")
+
+    def test_players_are_ranked_and_slimmed(self):
+        slim, _ = build_search_index(PLAYERS, ACTIVITY)
+        self.assertEqual(slim["fields"], SEARCH_PLAYER_FIELDS)
+        ids = [row[0] for row in slim["players"]]
+        self.assertEqual(ids, [4, 2, 5, 3, 1])
+        self.assertEqual(dict(zip(slim["fields"], slim["players"][2]))["matches"], 40)
+
+    def test_ties_order_by_the_frontend_key_then_id(self):
+        tied = [player(9, "Eric"), player(8, "Émile"), player(7, "Eric"), player(6, "Zoë")]
+        slim, _ = build_search_index(tied, {})
+        self.assertEqual([row[0] for row in slim["players"]], [8, 7, 9, 6])
+
+    def test_postings_list_every_player_containing_the_gram(self):
+        slim, index = build_search_index(PLAYERS, ACTIVITY)
+        keys = [typeahead_key(row[1]) for row in slim["players"]]
+        self.assertEqual(index["gram_sizes"], [2, 3])
+        for gram, deltas in index["postings"].items():
+            positions = list(accumulate(deltas))
+            self.assertEqual(positions, sorted(set(positions)))
+            self.assertEqual(
+                positions, [i for i, key in enumerate(keys) if gram in key], gram
+            )
+        self.assertEqual(list(accumulate(index["postings"]["ann"])), [0, 1, 2, 3])
+        self.assertIn("jør", index["postings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+from scripts.build_h2h import (
+    build_size_report,
+    enforce_size_budget,
+    write_json,
+)
+
+
+class TestSizeReport(unittest.TestCase):
+    def build_report(self, root: Path, top_n: int = 2) -> dict:
+        files = {
+            "players.json": write_json(root / "players.json", [{"id": 1}], False),
+            "h2h/1.json": {
+                **write_json(
+                    root / "h2h" / "1.json",
+                    {"opponents": {"2": {"matches": [{"goals": 1}] * 400}}},
+                    False,
+                ),
+                "opponents": 1,
+                "matches": 400,
+            },
+            "h2h/2.json": write_json(root / "h2h" / "2.json", {"opponents": {}}, False),
+            "h2h/3.json": write_json(
+                root / "h2h" / "3.json", {"opponents": {"1": {"matches": []}}}, False
+            ),
+            "h2h/1/2.json": write_json(root / "h2h" / "1" / "2.json", {"matches": []}, False),
+        }
+        return build_size_report(root, files, {1: "One", 2: "Two"}, top_n)
+
+    def test_report_groups_histograms_and_ranks_player_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            report = self.build_report(root)
+            largest_bytes = (root / "h2h" / "1.json").read_bytes()
+
+        self.assertEqual(report["totals"]["files"], 5)
+        self.assertEqual(report["groups"]["h2h"]["files"], 3)
+        self.assertEqual(report["groups"]["pairs"]["files"], 1)
+        self.assertEqual(report["groups"]["root"]["files"], 1)
+        self.assertEqual(sum(bucket["files"] for bucket in report["histogram"]), 5)
+        self.assertEqual(report["histogram"][2]["files"], 1)
+        self.assertIsNone(report["histogram"][-1]["max_bytes"])
+
+        self.assertEqual([entry["id"] for entry in report["largest_players"]], [1, 3])
+        largest = report["largest_players"][0]
+        self.assertEqual(largest["name"], "One")
+        self.assertEqual(largest["matches"], 400)
+        self.assertEqual(largest["bytes"], len(largest_bytes))
+        self.assertEqual(largest["gzip_bytes"], len(zlib.compress(largest_bytes, 6)))
+        self.assertLess(largest["gzip_bytes"], largest["bytes"])
+
+    def test_budgets_fail_the_build_like_rejection_budgets(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report = self.build_report(Path(tmpdir))
+
+        enforce_size_budget(report, 5, report["groups"]["h2h"]["max_bytes"])
+        with self.assertRaisesRegex(RuntimeError, "produced 5 files"):
+            enforce_size_budget(report, max_files=4)
+        with self.assertRaisesRegex(RuntimeError, r"h2h/1\.json"):
+            enforce_size_budget(report, max_player_file_bytes=100)
+        with self.assertRaisesRegex(RuntimeError, "gzipped"):
+            enforce_size_budget(report, max_player_file_gzip_bytes=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.bench_build import compare_results, parse_scales
+from scripts.build_h2h import (
+    build_unique_player_name_index,
+    deduplicate_overlapping_source_matches,
+    load_players,
+    load_rankings,
+    load_tournament_levels,
+    load_tournaments,
+    read_extra_matches_csv,
+    read_matches_parquet,
+)
+from scripts.generate_synthetic_data import BUILD_CACHE_DIR, generate_synthetic_sources
+
+
+def snapshot(directory: Path) -> dict:
+    return {path.name: path.read_bytes() for path in sorted(directory.iterdir())}
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_same_seed_writes_the_same_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            first = generate_synthetic_sources(root / "a", 40, 800, 0.2, seed=3)
+            second = generate_synthetic_sources(root / "b", 40, 800, 0.2, seed=3)
+            generate_synthetic_sources(root / "c", 40, 800, 0.2, seed=4)
+            self.assertEqual(first, second)
+            self.assertEqual(snapshot(root / "a"), snapshot(root / "b"))
+            self.assertNotEqual(snapshot(root / "a"), snapshot(root / "c"))
+        self.assertEqual(first["matches"], 800)
+        with self.assertRaisesRegex(ValueError, "overlap_rate"):
+            generate_synthetic_sources(root, 40, 800, 1.5)
+        with self.assertRaisesRegex(ValueError, "downloaded sources"):
+            generate_synthetic_sources(BUILD_CACHE_DIR, 40, 800, 0.2)
+
+    def test_build_reads_the_sources_and_removes_the_overlap(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            counts = generate_synthetic_sources(root, 60, 3000, 0.3, seed=5)
+            rankings = load_rankings(root / "ranking.txt")
+            players, names = load_players(root / "players_data.csv", rankings)
+            levels = load_tournament_levels(root / "tournament_metadata.csv")
+            tournaments = load_tournaments(root / "tournament_data.csv", levels)
+            primary = read_matches_parquet(root / "scraped_matches.parquet")
+            extra = read_extra_matches_csv(
+                root / "extra_matches.csv", build_unique_player_name_index(players)
+            )
+
+        self.assertEqual(len(names), 60)
+        self.assertEqual(len(rankings), counts["ranked_players"])
+        self.assertEqual(len(tournaments), counts["tournaments"])
+        self.assertEqual(len(levels), counts["tournaments"])
+        self.assertEqual(len(primary), counts["primary_matches"])
+        self.assertEqual(primary.attrs["validation"]["dropped_rows"], 0)
+        self.assertGreater(extra.attrs["validation"]["resolved_missing_player_ids"], 0)
+        self.assertEqual(set(extra["source"]), {"bordshockey.net"})
+
+        # Every playoff series is a complete best of three without drawn games, except one
+        # that the match limit cut off.
+        playoffs = primary[primary["playoff_game_number"].notna()]
+        for _, series in playoffs.groupby(["stage_id", "round_number"]):
+            wins = sorted(
+                [
+                    int((series["goals_player1"] > series["goals_player2"]).sum()),
+                    int((series["goals_player1"] < series["goals_player2"]).sum()),
+                ]
+            )
+            if series["source_match_id"].astype(int).max() < counts["matches"]:
+                self.assertIn(wins, ([0, 2], [1, 2]))
+
+        matches = pd.concat([primary, extra], ignore_index=True)
+        removed = len(matches) - len(deduplicate_overlapping_source_matches(matches))
+        self.assertGreater(removed, 0)
+        self.assertLessEqual(removed, counts["overlapping_matches"])
+
+    def test_benchmark_comparison_flags_only_slow_steps_worth_timing(self):
+        def result(**steps):
+            return {
+                "scales": [
+                    {
+                        "scale": 1,
+                        "summary": {
+                            name: {"median_wall_seconds": seconds}
+                            for name, seconds in steps.items()
+                        },
+                    }
+                ]
+            }
+
+        rows = compare_results(
+            result(sort=0.02, build_player_files=3.0, publish_staged_data=0.5),
+            result(sort=0.01, build_player_files=2.0, publish_staged_data=0.5, extra=1.0),
+            1.25,
+        )
+        self.assertEqual(
+            [(name, regressed) for _, name, _, _, _, regressed in rows],
+            [("sort", False), ("build_player_files", True), ("publish_staged_data", False)],
+        )
+        self.assertEqual(parse_scales("10, 1,10"), [1, 10])
+        with self.assertRaises(ValueError):
+            parse_scales("0")
+
+
+if __name__ == "__main__":
+    unittest.main()
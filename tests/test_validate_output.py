@@ -0,0 +1,122 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.build_h2h import (
+    build_alias_group_files,
+    build_match_lookup,
+    build_player_files,
+    match_lookup_frame,
+    og_shard_index,
+    og_shard_name,
+)
+from scripts.validate_output import validate_dataset
+from tests.helpers import make_matches
+
+
+def build_dataset(data_dir: Path, rows, names, alias_groups=()) -> None:
+    matches = make_matches(rows)
+    build_player_files(matches, names, data_dir / "h2h", data_dir / "og", False)
+    (data_dir / "players.json").write_text(
+        json.dumps([{"id": pid, "name": name} for pid, name in names.items()]),
+        encoding="utf-8",
+    )
+    if alias_groups:
+        lookup = build_match_lookup(match_lookup_frame(matches))
+        (data_dir / "lookup.json").write_text(json.dumps(lookup), encoding="utf-8")
+        (data_dir / "meta.json").write_text(json.dumps({"lookup": "lookup.json"}), encoding="utf-8")
+        (data_dir.parent / "aliases.json").write_text(
+            json.dumps({"groups": [{"ids": group} for group in alias_groups]}), encoding="utf-8"
+        )
+        build_alias_group_files(
+            alias_groups,
+            names,
+            lookup,
+            data_dir / "h2h",
+            data_dir / "groups",
+            data_dir / "og",
+            False,
+        )
+
+
+def rewrite_json(path: Path, change) -> None:
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    change(payload)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+class TestValidateOutput(unittest.TestCase):
+    rows = [
+        (2, 1, 3, 1, "2024-01-02"),
+        (1, 2, 2, 2, "2024-02-03"),
+        (1, 2, 0, 1, "2024-03-04"),
+        (1, 3, 4, 0, "2024-04-05"),
+        (3, 2, 1, 5, "2024-05-06"),
+    ]
+    names = {1: "One", 2: "Two", 3: "Three"}
+
+    def test_a_fresh_build_passes_every_check(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = Path(tmpdir) / "data"
+            build_dataset(data_dir, self.rows, self.names)
+            report = validate_dataset(data_dir, workers=2)
+
+        self.assertEqual(report["errors"], [])
+        self.assertEqual((report["players"], report["pairs"], report["og_pairs"]), (3, 3, 3))
+        self.assertEqual(report["player_side_matches"], 2 * len(self.rows))
+
+    def test_broken_mirrors_summaries_and_share_records_are_reported(self):
+        def flip_first_match(payload):
+            match = payload["opponents"]["1"]["matches"][0]
+            match["goals_for_player"], match["goals_for_opponent"] = (
+                match["goals_for_opponent"],
+                match["goals_for_player"],
+            )
+
+        def flip_last_10(payload):
+            last_10 = payload["opponents"]["3"]["summary"]["last_10"]
+            last_10["wins"], last_10["losses"] = last_10["losses"], last_10["wins"]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = Path(tmpdir) / "data"
+            build_dataset(data_dir, self.rows, self.names)
+            rewrite_json(data_dir / "h2h" / "2.json", flip_first_match)
+            rewrite_json(data_dir / "h2h" / "1.json", flip_last_10)
+            rewrite_json(
+                data_dir / "og" / og_shard_name(og_shard_index(2, 3)),
+                lambda payload: payload["pairs"].pop("2-3"),
+            )
+            report = validate_dataset(data_dir, workers=1)
+
+        failures = {(error["check"], error["file"]) for error in report["errors"]}
+        self.assertIn(("summary", "h2h/2.json vs 1"), failures)
+        self.assertIn(("mirror", "h2h/1.json vs 2"), failures)
+        self.assertIn(("summary", "h2h/1.json vs 3"), failures)
+        self.assertIn(("mirror", "h2h/1.json vs 3"), failures)
+        self.assertIn(("og_pair", "og"), failures)
+        self.assertEqual(report["errors_by_check"]["og_pair"], 1)
+        self.assertEqual(report["error_count"], len(report["errors"]))
+
+    def test_alias_share_records_are_checked_against_the_group_files(self):
+        def drop_a_game(payload):
+            payload["pairs"]["1-3"][2] -= 1
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = Path(tmpdir) / "data"
+            build_dataset(data_dir, self.rows, self.names, [[1, 2]])
+            report = validate_dataset(data_dir, workers=1)
+            rewrite_json(data_dir / "og" / og_shard_name(og_shard_index(1, 3)), drop_a_game)
+            broken = validate_dataset(data_dir, workers=1)
+
+        self.assertEqual(report["errors"], [])
+        # 1-3 and 2-3 carry the merged record; 1-2 is inside the group and checked as is.
+        self.assertEqual((report["og_pairs"], report["og_alias_pairs"]), (3, 2))
+        self.assertEqual(
+            [(error["check"], error["detail"].split(" is ")[0]) for error in broken["errors"]],
+            [("og_record", "1-3")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()